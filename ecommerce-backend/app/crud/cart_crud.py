@@ -3,6 +3,7 @@ from app.models.cart import Cart
 from app.models.cart_item import CartItem
 from app.schemas.cart import CartCreate, CartOut
 from app.schemas.cart_item import CartItemCreate, CartItemUpdate
+from app.services.recommendation_service import RecommendationService
 
 async def create_cart(cart_data: CartCreate) -> Cart:
     """Create a new cart"""
@@ -25,6 +26,7 @@ async def delete_cart(cart_id: int) -> bool:
     cart = await Cart.get_by_id(cart_id)
     if not cart:
         return False
+    RecommendationService.invalidate_customer(cart.customer_id)
     return await cart.delete()
 
 async def get_cart_with_items(cart_id: int) -> Optional[dict]:
@@ -44,16 +46,19 @@ async def clear_cart(cart_id: int) -> bool:
     cart = await Cart.get_by_id(cart_id)
     if not cart:
         return False
+    RecommendationService.invalidate_customer(cart.customer_id)
     return await cart.clear_items()
 
 # Cart Item CRUD operations
 async def add_cart_item(item_data: CartItemCreate) -> CartItem:
     """Add item to cart"""
-    return await CartItem.create(
+    item = await CartItem.create(
         cart_id=item_data.cart_id,
         product_id=item_data.product_id,
         quantity=item_data.quantity
     )
+    await RecommendationService.invalidate_cart(item_data.cart_id)
+    return item
 
 async def get_cart_item_by_id(item_id: int) -> Optional[CartItem]:
     """Get cart item by ID"""
@@ -75,6 +80,7 @@ async def remove_cart_item(item_id: int) -> bool:
     item = await CartItem.get_by_id(item_id)
     if not item:
         return False
+    await RecommendationService.invalidate_cart(item.cart_id)
     return await item.delete()
 
 async def get_cart_item_with_product(item_id: int) -> Optional[dict]:
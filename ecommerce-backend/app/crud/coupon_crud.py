@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.coupon import Coupon
 from app.models.coupon_redeem import CouponRedeem
 from app.schemas.coupon import CouponCreate, CouponUpdate, CouponOut, CouponValidation
@@ -24,9 +24,10 @@ async def get_coupon_by_code(code: str) -> Optional[Coupon]:
     """Get coupon by code"""
     return await Coupon.get_by_code(code)
 
-async def get_coupons(skip: int = 0, limit: int = 100) -> List[Coupon]:
-    """Get all coupons with pagination"""
-    return await Coupon.get_all(skip=skip, limit=limit)
+async def get_coupons(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Coupon], Optional[str]]:
+    """Get a page of coupons and the cursor for the next page"""
+    coupons = await Coupon.get_all(skip=skip, limit=limit, cursor=cursor)
+    return coupons, Coupon.page_cursor(coupons, limit)
 
 async def get_active_coupons() -> List[Coupon]:
     """Get all active coupons"""
@@ -1,9 +1,11 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from app.models.order import Order
 from app.models.order_item import OrderItem
 from app.models.cart import Cart
+from app.models.product_copurchase import ProductCopurchase
 from app.schemas.order import OrderCreate, OrderUpdate, OrderOut
 from app.schemas.order_item import OrderItemCreate
+from app.services.recommendation_service import RecommendationService
 
 async def create_order(order_data: OrderCreate) -> Dict[str, Any]:
     """Create a new order from cart"""
@@ -25,6 +27,7 @@ async def create_order(order_data: OrderCreate) -> Dict[str, Any]:
                     quantity=item_data.quantity,
                     price=item_data.price
                 )
+            await ProductCopurchase.add_order(order.id)
         
         # Clear the customer's cart after successful order
         try:
@@ -35,6 +38,9 @@ async def create_order(order_data: OrderCreate) -> Dict[str, Any]:
         except Exception as e:
             print(f"Warning: Could not mark cart as deleted after order: {e}")
         
+        # New purchases and the cleared cart change the customer's recommendations
+        RecommendationService.invalidate_customer(order_data.customer_id)
+        
         # Return order data as dictionary with proper date formatting
         return order.to_dict()
     except Exception as e:
@@ -51,15 +57,18 @@ async def get_order_by_secure_id(secure_order_id: str) -> Optional[Dict[str, Any
     order = await Order.get_by_secure_id(secure_order_id)
     return order.to_dict() if order else None
 
-async def get_orders(skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-    """Get all orders with pagination"""
-    orders = await Order.get_all(skip=skip, limit=limit)
-    return [order.to_dict() for order in orders]
+async def get_orders(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Get a page of orders and the cursor for the next page"""
+    orders = await Order.get_all(skip=skip, limit=limit, cursor=cursor)
+    return [order.to_dict() for order in orders], Order.page_cursor(orders, limit)
 
 async def get_orders_by_customer(customer_id: int, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-    """Get orders by customer ID, including items for each order"""
-    orders = await Order.get_by_customer_id_with_details(customer_id)
-    return orders
+    """Get a page of a customer's orders, including items for each order"""
+    return await Order.get_by_customer_id_with_details(customer_id, skip=skip, limit=limit)
+
+async def count_orders_by_customer(customer_id: int) -> int:
+    """Total number of orders for a customer"""
+    return await Order.count_by_customer_id(customer_id)
 
 async def get_orders_by_status(status: str, skip: int = 0, limit: int = 100) -> List[Order]:
     """Get orders by status"""
@@ -113,6 +122,7 @@ async def add_order_item(item_data: OrderItemCreate) -> Dict[str, Any]:
         quantity=item_data.quantity,
         price=item_data.price
     )
+    await ProductCopurchase.add_product(item.order_id, item.product_id)
     return item.to_dict()
 
 async def get_order_items(order_id: int) -> List[Dict[str, Any]]:
@@ -133,6 +143,7 @@ async def delete_order_item(item_id: int) -> bool:
     item = await OrderItem.get_by_id(item_id)
     if not item:
         return False
+    await ProductCopurchase.remove_product(item.order_id, item.product_id)
     return await item.delete()
 
 async def get_order_item_with_product(item_id: int) -> Optional[dict]:
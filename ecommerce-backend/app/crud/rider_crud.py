@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from app.models.rider import Rider
 from app.models.delivery_assignment import DeliveryAssignment
 from app.schemas.rider import RiderCreate, RiderUpdate, DeliveryAssignmentCreate, DeliveryAssignmentUpdate
@@ -29,12 +29,12 @@ async def get_all_riders(skip: int = 0, limit: int = 100) -> List[Rider]:
     """Get all riders with pagination"""
     return await Rider.get_all(skip=skip, limit=limit)
 
-async def get_all_riders_with_user_info(skip: int = 0, limit: int = 100) -> List[dict]:
-    """Get all riders with user information"""
+async def get_all_riders_with_user_info(skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+    """Get a page of riders with user information and the cursor for the next page"""
     from app.models.user import User
     from app.models.customer import Customer
     
-    riders = await Rider.get_all(skip=skip, limit=limit)
+    riders = await Rider.get_all(skip=skip, limit=limit, cursor=cursor)
     riders_with_info = []
     
     for rider in riders:
@@ -50,7 +50,7 @@ async def get_all_riders_with_user_info(skip: int = 0, limit: int = 100) -> List
         
         riders_with_info.append(rider_dict)
     
-    return riders_with_info
+    return riders_with_info, Rider.page_cursor(riders, limit)
 
 async def get_active_riders() -> List[Rider]:
     """Get all active riders"""
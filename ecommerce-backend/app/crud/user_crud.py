@@ -1,21 +1,19 @@
 from typing import List, Optional
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserOut
-from passlib.context import CryptContext
+from app.utils.password_hasher import password_hasher
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
 
 async def create_user(user_data: UserCreate) -> User:
     """Create a new user"""
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     return await User.create(
         username=user_data.username,
         email=user_data.email,
@@ -50,7 +48,7 @@ async def update_user(user_id: int, user_data: UserUpdate) -> Optional[User]:
     if user_data.email is not None:
         update_data['email'] = user_data.email
     if user_data.password is not None:
-        update_data['hashed_password'] = get_password_hash(user_data.password)
+        update_data['hashed_password'] = await get_password_hash(user_data.password)
     
     return await user.update(**update_data)
 
@@ -83,6 +81,11 @@ async def authenticate_user(username_or_email: str, password: str) -> Optional[U
     
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored hash uses an outdated scheme; upgrade it now that we have the plain password
+        await user.update(hashed_password=new_hash)
+        user.hashed_password = new_hash
     return user 
\ No newline at end of file
@@ -3,6 +3,7 @@ from app.models.wishlist import Wishlist
 from app.models.wishlist_item import WishlistItem
 from app.schemas.wishlist import WishlistCreate, WishlistOut
 from app.schemas.wishlist_item import WishlistItemCreate
+from app.services.recommendation_service import RecommendationService
 
 async def create_wishlist(wishlist_data: WishlistCreate) -> Wishlist:
     """Create a new wishlist"""
@@ -25,6 +26,7 @@ async def delete_wishlist(wishlist_id: int) -> bool:
     wishlist = await Wishlist.get_by_id(wishlist_id)
     if not wishlist:
         return False
+    RecommendationService.invalidate_customer(wishlist.customer_id)
     return await wishlist.delete()
 
 async def get_wishlist_with_items(wishlist_id: int) -> Optional[dict]:
@@ -40,15 +42,18 @@ async def clear_wishlist(wishlist_id: int) -> bool:
     wishlist = await Wishlist.get_by_id(wishlist_id)
     if not wishlist:
         return False
+    RecommendationService.invalidate_customer(wishlist.customer_id)
     return await wishlist.clear_items()
 
 # Wishlist Item CRUD operations
 async def add_wishlist_item(item_data: WishlistItemCreate) -> WishlistItem:
     """Add item to wishlist"""
-    return await WishlistItem.create(
+    item = await WishlistItem.create(
         wishlist_id=item_data.wishlist_id,
         product_id=item_data.product_id
     )
+    await RecommendationService.invalidate_wishlist(item_data.wishlist_id)
+    return item
 
 async def get_wishlist_item_by_id(item_id: int) -> Optional[WishlistItem]:
     """Get wishlist item by ID"""
@@ -63,6 +68,7 @@ async def remove_wishlist_item(item_id: int) -> bool:
     item = await WishlistItem.get_by_id(item_id)
     if not item:
         return False
+    await RecommendationService.invalidate_wishlist(item.wishlist_id)
     return await item.delete()
 
 async def get_wishlist_item_with_product(item_id: int) -> Optional[dict]:
@@ -85,4 +91,5 @@ async def move_to_cart(wishlist_id: int, product_id: int, cart_id: int) -> bool:
     
     # Add to cart (you'll need to implement cart item creation)
     # Remove from wishlist
+    await RecommendationService.invalidate_wishlist(wishlist_id)
     return await wishlist_item.delete() 
\ No newline at end of file
@@ -1,21 +1,117 @@
+import asyncio
 import asyncpg
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional, Tuple
 from app.config import settings
+from app.utils.db_metrics import pool_metrics
 
 DATABASE_URL = settings.DATABASE_URL
 
+class PoolAcquireTimeout(TimeoutError):
+    """No pool connection became free within DB_POOL_ACQUIRE_TIMEOUT_SECONDS"""
+
+class _AcquireContext:
+    """Times pool.acquire(); usable with ``async with`` or ``await`` like asyncpg's own"""
+    def __init__(self, pool: asyncpg.Pool, timeout: Optional[float]):
+        self._pool = pool
+        self._timeout = timeout
+        self._conn = None
+
+    async def _acquire(self):
+        pool_metrics.waiting += 1
+        start = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=self._timeout)
+        except TimeoutError:
+            pool_metrics.acquire_timeouts += 1
+            raise PoolAcquireTimeout(f"No database connection available within {self._timeout}s") from None
+        finally:
+            pool_metrics.waiting -= 1
+        pool_metrics.observe_acquire(time.perf_counter() - start)
+        return conn
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        await self._pool.release(conn)
+
+class _BoundConnectionContext:
+    """Hands out the request's connection; releasing it is left to request_connection()"""
+    def __init__(self, conn: asyncpg.Connection):
+        self._conn = conn
+
+    def __await__(self):
+        yield from ()
+        return self._conn
+
+    async def __aenter__(self):
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+# (connection, task that owns it) while a request_connection() block is active
+_request_connection: ContextVar[Optional[Tuple[asyncpg.Connection, asyncio.Task]]] = ContextVar(
+    "request_connection", default=None
+)
+
+def _bound_connection() -> Optional[asyncpg.Connection]:
+    bound = _request_connection.get()
+    # Tasks spawned inside the block inherit the variable but must not share the
+    # connection (asyncpg runs one query at a time), so only the owner uses it
+    if bound is not None and bound[1] is asyncio.current_task():
+        return bound[0]
+    return None
+
+class InstrumentedPool:
+    """asyncpg pool whose acquire() applies the configured timeout and records wait time"""
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+
+    def acquire(self, *, timeout: Optional[float] = None):
+        conn = _bound_connection()
+        if conn is not None:
+            pool_metrics.reused += 1
+            return _BoundConnectionContext(conn)
+        if timeout is None and settings.DB_POOL_ACQUIRE_TIMEOUT_SECONDS > 0:
+            timeout = settings.DB_POOL_ACQUIRE_TIMEOUT_SECONDS
+        return _AcquireContext(self._pool, timeout)
+
+    async def release(self, conn: asyncpg.Connection, *, timeout: Optional[float] = None) -> None:
+        if conn is not _bound_connection():
+            await self._pool.release(conn, timeout=timeout)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+async def _init_connection(conn: asyncpg.Connection):
+    if settings.DB_QUERY_METRICS:
+        conn.add_query_logger(pool_metrics.observe_query)
+
 # Global connection pool
-pool: Optional[asyncpg.Pool] = None
+pool: Optional[InstrumentedPool] = None
 
-async def get_database_pool() -> asyncpg.Pool:
+async def get_database_pool() -> InstrumentedPool:
     """Get or create database connection pool"""
     global pool
     if pool is None:
-        pool = await asyncpg.create_pool(
+        pool = InstrumentedPool(await asyncpg.create_pool(
             DATABASE_URL,
-            min_size=1,
-            max_size=10
-        )
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            max_inactive_connection_lifetime=settings.DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME,
+            statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS or None,
+            init=_init_connection
+        ))
     return pool
 
 async def close_database_pool():
@@ -29,3 +125,37 @@ async def get_db_connection():
     """Get database connection from pool"""
     pool = await get_database_pool()
     return pool
+
+@asynccontextmanager
+async def request_connection(readonly: bool = False):
+    """
+    Serve every pool.acquire() made by the current task from one connection, so a
+    handler calling several model methods holds one pool slot instead of
+    acquiring and releasing per call. ``readonly`` also wraps the block in a
+    read-only REPEATABLE READ transaction, giving all reads one snapshot (don't
+    use it where a failed query is caught and the handler carries on).
+    """
+    if _bound_connection() is not None:
+        yield _bound_connection()
+        return
+    pool = await get_database_pool()
+    async with pool.acquire() as conn:
+        token = _request_connection.set((conn, asyncio.current_task()))
+        try:
+            if readonly:
+                async with conn.transaction(isolation='repeatable_read', readonly=True):
+                    yield conn
+            else:
+                yield conn
+        finally:
+            _request_connection.reset(token)
+
+async def use_request_connection():
+    """FastAPI dependency: run the handler on one pooled connection"""
+    async with request_connection():
+        yield
+
+async def use_readonly_request_connection():
+    """FastAPI dependency: run the handler on one connection in a read-only snapshot"""
+    async with request_connection(readonly=True):
+        yield
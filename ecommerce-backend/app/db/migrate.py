@@ -0,0 +1,128 @@
+"""
+Schema migration runner
+
+Applies the pending migrations in app/db/migrations and records each in
+schema_version. Run it once per deploy, before starting the app; startup only
+checks the recorded version (see verify_schema).
+
+Usage (from ecommerce-backend/):
+    python -m app.db.migrate            # apply pending migrations
+    python -m app.db.migrate status     # show applied and pending migrations
+    python -m app.db.migrate upgrade --to 3
+"""
+
+import argparse
+import asyncio
+import importlib
+import pkgutil
+from types import ModuleType
+from typing import List, Optional, Tuple
+import asyncpg
+from app.database import get_db_connection, close_database_pool, request_connection
+from app.db import migrations
+
+# Held while migrating so concurrent deploys apply each migration once
+MIGRATION_LOCK_KEY = 84_201_025
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is behind the migrations this code ships with"""
+
+def load_migrations() -> List[Tuple[int, str, ModuleType]]:
+    """(version, name, module) for every migration module, in version order"""
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        version, _, name = info.name.partition("_")
+        if not version.isdigit():
+            continue
+        found.append((int(version), name, importlib.import_module(f"{migrations.__name__}.{info.name}")))
+    found.sort(key=lambda migration: migration[0])
+    versions = [version for version, _, _ in found]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Duplicate migration versions in {migrations.__name__}: {versions}")
+    return found
+
+def latest_version() -> int:
+    return max((version for version, _, _ in load_migrations()), default=0)
+
+async def _create_version_table(conn) -> None:
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+
+async def _applied_versions(conn) -> List[asyncpg.Record]:
+    return await conn.fetch("SELECT version, name, applied_at FROM schema_version ORDER BY version")
+
+async def apply_migrations(target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: all); returns the versions applied"""
+    applied = []
+    # Anything a migration acquires from the pool shares this connection, and so its transaction
+    async with request_connection() as conn:
+        await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+        try:
+            await _create_version_table(conn)
+            done = {row["version"] for row in await _applied_versions(conn)}
+            for version, name, module in load_migrations():
+                if version in done or (target is not None and version > target):
+                    continue
+                print(f"Applying migration {version:04d}_{name}")
+                if getattr(module, "TRANSACTIONAL", True):
+                    async with conn.transaction():
+                        await module.upgrade(conn)
+                        await conn.execute("INSERT INTO schema_version (version, name) VALUES ($1, $2)", version, name)
+                else:
+                    await module.upgrade(conn)
+                    await conn.execute("INSERT INTO schema_version (version, name) VALUES ($1, $2)", version, name)
+                applied.append(version)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+    return applied
+
+async def verify_schema() -> int:
+    """Raise SchemaOutOfDate unless every shipped migration has been applied; returns the database version"""
+    expected = latest_version()
+    pool = await get_db_connection()
+    async with pool.acquire() as conn:
+        try:
+            version = await conn.fetchval("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        except asyncpg.UndefinedTableError:
+            version = 0
+    if version < expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {version}, this build needs {expected}; "
+            f"run `python -m app.db.migrate` first"
+        )
+    if version > expected:
+        # Expected mid rolling deploy: a newer build has already migrated
+        print(f"Warning: database schema version {version} is ahead of this build ({expected})")
+    return version
+
+async def print_status() -> None:
+    pool = await get_db_connection()
+    async with pool.acquire() as conn:
+        await _create_version_table(conn)
+        applied = {row["version"]: row for row in await _applied_versions(conn)}
+    for version, name, _ in load_migrations():
+        row = applied.get(version)
+        state = f"applied {row['applied_at']:%Y-%m-%d %H:%M:%S}" if row else "pending"
+        print(f"{version:04d}_{name:<40} {state}")
+
+async def main(command: str, target: Optional[int]) -> None:
+    try:
+        if command == "status":
+            await print_status()
+        else:
+            applied = await apply_migrations(target)
+            print(f"Applied {len(applied)} migration(s)" if applied else "Schema is up to date")
+    finally:
+        await close_database_pool()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    parser.add_argument("--to", type=int, dest="target", help="stop after this migration version")
+    args = parser.parse_args()
+    asyncio.run(main(args.command, args.target))
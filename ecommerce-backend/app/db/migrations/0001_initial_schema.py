@@ -0,0 +1,1133 @@
+"""
+Baseline schema: the tables, indexes and triggers the app used to create on
+every startup, recorded as the literal SQL this migration ran when it shipped.
+Every statement is idempotent (IF NOT EXISTS / CREATE OR REPLACE), so this
+also adopts databases created before migrations existed.
+
+Do not edit these statements, even to match a model change; that would leave
+fresh and upgraded databases with different schemas. Add a new migration.
+"""
+
+import asyncpg
+from app.config import settings
+
+TABLES = [
+    """
+        CREATE TABLE IF NOT EXISTS users (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR(50) NOT NULL UNIQUE,
+            email VARCHAR(100) NOT NULL UNIQUE,
+            hashed_password VARCHAR NOT NULL,
+            role VARCHAR(20) DEFAULT 'user',
+            login_count INTEGER DEFAULT 0,
+            last_login TIMESTAMP,
+            is_active BOOLEAN DEFAULT true,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS customers (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
+            first_name VARCHAR(100),
+            last_name VARCHAR(100),
+            phone VARCHAR(20),
+            date_of_birth DATE,
+            gender VARCHAR(10) CHECK (gender IN ('Male', 'Female', 'Other')),
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS addresses (
+            id SERIAL PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            street VARCHAR NOT NULL,
+            city VARCHAR NOT NULL,
+            division VARCHAR NOT NULL,
+            country VARCHAR NOT NULL,
+            postal_code VARCHAR NOT NULL
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS products (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            description TEXT NOT NULL,
+            price DECIMAL(10,2) NOT NULL,
+            stock INTEGER NOT NULL DEFAULT 0,
+            brand VARCHAR(100),
+            material TEXT,
+            colors JSONB DEFAULT '[]',
+            sizes JSONB DEFAULT '[]',
+            care_instructions TEXT,
+            features JSONB DEFAULT '[]',
+            specifications JSONB DEFAULT '{}',
+            views INTEGER DEFAULT 0,
+            purchase_count INTEGER DEFAULT 0,
+            add_to_cart_count INTEGER DEFAULT 0
+        )
+    """,
+    """
+        ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', COALESCE(name, '')), 'A') ||
+            setweight(to_tsvector('simple', COALESCE(brand, '')), 'B') ||
+            setweight(to_tsvector('simple', COALESCE(material, '')), 'C') ||
+            setweight(to_tsvector('simple', COALESCE(description, '')), 'D')
+        ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING GIN(search_vector)",
+    """
+        CREATE TABLE IF NOT EXISTS tags (
+            id SERIAL PRIMARY KEY,
+            tag_name VARCHAR(50) NOT NULL UNIQUE,
+            parent_id INTEGER REFERENCES tags(id) ON DELETE SET NULL
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS product_tags (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+            UNIQUE(product_id, tag_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS product_images (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            image_url VARCHAR NOT NULL,
+            is_primary BOOLEAN DEFAULT FALSE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS payment_methods (
+            id SERIAL PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            account_no VARCHAR NOT NULL,
+            is_default BOOLEAN DEFAULT FALSE,
+            type VARCHAR(20) NOT NULL CHECK (type IN ('credit_card', 'debit_card', 'paypal', 'upi'))
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS orders (
+            id SERIAL PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            total_price DECIMAL(10,2) NOT NULL,
+            address_id INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
+            payment_id INTEGER REFERENCES payment_methods(id) ON DELETE SET NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'shipped', 'delivered', 'cancelled')),
+            secure_order_id VARCHAR(50) UNIQUE NOT NULL,
+            transaction_id VARCHAR(100) UNIQUE
+        )
+    """,
+    "ALTER TABLE orders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT NOW()",
+    """
+        CREATE TABLE IF NOT EXISTS order_items (
+            id SERIAL PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL,
+            price DECIMAL(10,2) NOT NULL
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS product_copurchase (
+            product_a INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            product_b INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            count INTEGER NOT NULL,
+            last_seen TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (product_a, product_b)
+        )
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_product_copurchase_top
+        ON product_copurchase(product_a, count DESC, product_b)
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_product_copurchase_pairs
+        ON product_copurchase(count DESC) WHERE product_a < product_b
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS customer_order_stats (
+            customer_id INTEGER PRIMARY KEY,
+            order_count INTEGER NOT NULL,
+            total_spent DECIMAL(14,2) NOT NULL,
+            first_order_date TIMESTAMP NOT NULL,
+            last_order_date TIMESTAMP NOT NULL,
+            cohort_month DATE NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS customer_active_months (
+            customer_id INTEGER NOT NULL,
+            month DATE NOT NULL,
+            orders INTEGER NOT NULL,
+            PRIMARY KEY (customer_id, month)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS cohort_retention (
+            cohort_month DATE NOT NULL,
+            month_number INTEGER NOT NULL,
+            customers INTEGER NOT NULL,
+            PRIMARY KEY (cohort_month, month_number)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS customer_churn_scores (
+            customer_id INTEGER PRIMARY KEY REFERENCES customers(id) ON DELETE CASCADE,
+            total_orders INTEGER NOT NULL,
+            lifetime_value DOUBLE PRECISION NOT NULL,
+            avg_order_value DOUBLE PRECISION NOT NULL,
+            last_order_date TIMESTAMP,
+            days_since_last_order INTEGER,
+            days_since_registration INTEGER NOT NULL,
+            expected_gap_days DOUBLE PRECISION,
+            churn_probability DOUBLE PRECISION NOT NULL,
+            churn_risk VARCHAR(20) NOT NULL,
+            activity_status VARCHAR(20) NOT NULL,
+            customer_segment VARCHAR(20) NOT NULL,
+            scored_at TIMESTAMP NOT NULL
+        )
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_churn_scores_rank
+        ON customer_churn_scores(churn_probability DESC, lifetime_value DESC, customer_id)
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS product_demand_forecasts (
+            product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+            stock INTEGER NOT NULL,
+            demand_last_30_days DOUBLE PRECISION NOT NULL,
+            forecast_next_30_days DOUBLE PRECISION NOT NULL,
+            seasonal_naive_next_30_days DOUBLE PRECISION NOT NULL,
+            avg_daily_demand DOUBLE PRECISION NOT NULL,
+            days_of_cover DOUBLE PRECISION,
+            inventory_turnover DOUBLE PRECISION NOT NULL,
+            stock_status VARCHAR(20) NOT NULL,
+            turnover_category VARCHAR(20) NOT NULL,
+            scored_at TIMESTAMP NOT NULL
+        )
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_demand_forecasts_rank
+        ON product_demand_forecasts(forecast_next_30_days DESC, product_id)
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS admins (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE UNIQUE,
+            admin_role VARCHAR(20) NOT NULL CHECK (admin_role IN ('product', 'sales', 'superadmin'))
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS order_statuses (
+            id SERIAL PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            admin_id INTEGER NOT NULL REFERENCES admins(id) ON DELETE CASCADE,
+            status VARCHAR(20) NOT NULL CHECK (status IN ('pending', 'shipped', 'delivered', 'cancelled')),
+            update_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS carts (
+            id SERIAL PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            creation_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE,
+            is_deleted BOOLEAN DEFAULT FALSE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS cart_items (
+            id SERIAL PRIMARY KEY,
+            cart_id INTEGER NOT NULL REFERENCES carts(id) ON DELETE CASCADE,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            UNIQUE(cart_id, product_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS reviews (
+            id SERIAL PRIMARY KEY,
+            rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
+            comment TEXT,
+            review_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            UNIQUE(customer_id, product_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS wishlists (
+            id SERIAL PRIMARY KEY,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS wishlist_items (
+            id SERIAL PRIMARY KEY,
+            wishlist_id INTEGER NOT NULL REFERENCES wishlists(id) ON DELETE CASCADE,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            UNIQUE(wishlist_id, product_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS search_histories (
+            id SERIAL PRIMARY KEY,
+            query VARCHAR(100) NOT NULL,
+            search_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS discounts (
+            id SERIAL PRIMARY KEY,
+            product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+            discount_type VARCHAR(20) NOT NULL CHECK (discount_type IN ('percentage', 'fixed')),
+            value DECIMAL(10,2) NOT NULL CHECK (value > 0),
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL CHECK (end_date >= start_date)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS coupons (
+            id SERIAL PRIMARY KEY,
+            code VARCHAR(50) UNIQUE NOT NULL,
+            discount_type VARCHAR(20) NOT NULL CHECK (discount_type IN ('percentage', 'fixed')),
+            value DECIMAL(10,2) NOT NULL CHECK (value > 0),
+            usage_limit INTEGER NOT NULL CHECK (usage_limit > 0),
+            used INTEGER NOT NULL DEFAULT 0 CHECK (used >= 0),
+            valid_from TIMESTAMP NOT NULL,
+            valid_until TIMESTAMP NOT NULL CHECK (valid_until > valid_from),
+            is_active BOOLEAN NOT NULL DEFAULT true,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS coupon_redeems (
+            id SERIAL PRIMARY KEY,
+            coupon_id INTEGER NOT NULL REFERENCES coupons(id) ON DELETE CASCADE,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
+            redeemed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS shipping_info (
+            id SERIAL PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            courier_service VARCHAR(100) NOT NULL,
+            tracking_id VARCHAR(100) NOT NULL,
+            estimated_delivery VARCHAR(50),
+            notes TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(order_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS event_rollups_hourly (
+            bucket TIMESTAMP NOT NULL,
+            event_type VARCHAR(50) NOT NULL,
+            events INTEGER NOT NULL DEFAULT 0,
+            unique_users INTEGER NOT NULL DEFAULT 0,
+            revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, event_type)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS event_rollups_daily_device (
+            day DATE NOT NULL,
+            device_type VARCHAR(100) NOT NULL,
+            browser VARCHAR(100) NOT NULL,
+            operating_system VARCHAR(100) NOT NULL,
+            unique_users INTEGER NOT NULL DEFAULT 0,
+            total_events INTEGER NOT NULL DEFAULT 0,
+            purchases INTEGER NOT NULL DEFAULT 0,
+            cart_adds INTEGER NOT NULL DEFAULT 0,
+            product_views INTEGER NOT NULL DEFAULT 0,
+            revenue DECIMAL(14,2) NOT NULL DEFAULT 0,
+            time_spent_total DECIMAL(14,2) NOT NULL DEFAULT 0,
+            time_spent_samples INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, device_type, browser, operating_system)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS event_partition_rollups (
+            partition_name VARCHAR(100) PRIMARY KEY,
+            range_end TIMESTAMP NOT NULL,
+            rolled_up_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS analytics_snapshots (
+            key VARCHAR(100) PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            arg INTEGER,
+            data JSONB NOT NULL,
+            generated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id BIGSERIAL PRIMARY KEY,
+            to_email VARCHAR(255) NOT NULL,
+            subject VARCHAR(255) NOT NULL,
+            html_body TEXT NOT NULL,
+            text_body TEXT NOT NULL,
+            kind VARCHAR(50) NOT NULL,
+            order_id INTEGER,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            locked_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            sent_at TIMESTAMP
+        )
+    """,
+    """
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+        ON email_outbox(next_attempt_at, id) WHERE status IN ('pending', 'sending')
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_email_outbox_order ON email_outbox(order_id)",
+    """
+        CREATE TABLE IF NOT EXISTS riders (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
+            is_active BOOLEAN NOT NULL DEFAULT true,
+            vehicle_type VARCHAR(50) NOT NULL,
+            vehicle_number VARCHAR(20),
+            delivery_zones TEXT[] NOT NULL DEFAULT '{}',
+
+            total_deliveries INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS delivery_assignments (
+            id SERIAL PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            rider_id INTEGER NOT NULL REFERENCES riders(id) ON DELETE CASCADE,
+            assigned_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            status VARCHAR(20) NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'accepted', 'rejected', 'picked_up', 'in_transit', 'delivered', 'cancelled')),
+            accepted_at TIMESTAMP,
+            rejected_at TIMESTAMP,
+            rejection_reason TEXT,
+            estimated_delivery TIMESTAMP,
+            actual_delivery TIMESTAMP,
+            delivery_notes TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            secure_assignment_id VARCHAR(50) UNIQUE NOT NULL
+        )
+    """,
+]
+
+# May be unavailable (e.g. no pg_trgm); each runs in a savepoint and is skipped on failure
+OPTIONAL = [
+    "CREATE INDEX IF NOT EXISTS idx_users_name ON users(name)",
+    "CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_user_id ON customers(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_created_at ON customers(created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(first_name, last_name)",
+    "CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone)",
+    "CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)",
+    "CREATE INDEX IF NOT EXISTS idx_products_price ON products(price)",
+    "CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)",
+    "CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock)",
+    "CREATE INDEX IF NOT EXISTS idx_products_views ON products(views)",
+    "CREATE INDEX IF NOT EXISTS idx_products_purchase_count ON products(purchase_count)",
+    "CREATE INDEX IF NOT EXISTS idx_products_add_to_cart_count ON products(add_to_cart_count)",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING GIN(name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(tag_name)",
+    "CREATE INDEX IF NOT EXISTS idx_product_tags_product ON product_tags(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_product_tags_tag ON product_tags(tag_id)",
+    "CREATE INDEX IF NOT EXISTS idx_product_images_product ON product_images(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_product_images_primary ON product_images(is_primary)",
+    "CREATE INDEX IF NOT EXISTS idx_payment_methods_customer ON payment_methods(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payment_methods_type ON payment_methods(type)",
+    "CREATE INDEX IF NOT EXISTS idx_payment_methods_default ON payment_methods(is_default)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_date_id ON orders(order_date DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_payment ON orders(payment_id)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_status_date_id ON orders(status, order_date DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_secure_id ON orders(secure_order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_total_price ON orders(total_price)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_address ON orders(address_id)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_updated_at ON orders(updated_at)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_quantity ON order_items(quantity)",
+    "CREATE INDEX IF NOT EXISTS idx_order_items_price ON order_items(price)",
+    "CREATE INDEX IF NOT EXISTS idx_customer_order_stats_spent ON customer_order_stats(total_spent DESC, customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_customer_order_stats_cohort ON customer_order_stats(cohort_month)",
+    "CREATE INDEX IF NOT EXISTS idx_admins_user ON admins(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_admins_role ON admins(admin_role)",
+    "CREATE INDEX IF NOT EXISTS idx_order_statuses_order ON order_statuses(order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_statuses_admin ON order_statuses(admin_id)",
+    "CREATE INDEX IF NOT EXISTS idx_order_statuses_status ON order_statuses(status)",
+    "CREATE INDEX IF NOT EXISTS idx_order_statuses_date ON order_statuses(update_date)",
+    "CREATE INDEX IF NOT EXISTS idx_carts_customer ON carts(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_carts_active ON carts(is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_carts_deleted ON carts(is_deleted)",
+    "CREATE INDEX IF NOT EXISTS idx_carts_creation_id ON carts(creation_date DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_cart_items_cart ON cart_items(cart_id)",
+    "CREATE INDEX IF NOT EXISTS idx_cart_items_product ON cart_items(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_customer ON reviews(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_product ON reviews(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_rating ON reviews(rating)",
+    "CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews(review_date)",
+    "CREATE INDEX IF NOT EXISTS idx_wishlists_customer ON wishlists(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_wishlist_items_wishlist ON wishlist_items(wishlist_id)",
+    "CREATE INDEX IF NOT EXISTS idx_wishlist_items_product ON wishlist_items(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_search_histories_customer ON search_histories(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_search_histories_date ON search_histories(search_date)",
+    "CREATE INDEX IF NOT EXISTS idx_search_histories_query ON search_histories(query)",
+    "CREATE INDEX IF NOT EXISTS idx_discounts_product ON discounts(product_id)",
+    "CREATE INDEX IF NOT EXISTS idx_discounts_dates ON discounts(start_date, end_date)",
+    "CREATE INDEX IF NOT EXISTS idx_discounts_type ON discounts(discount_type)",
+    "CREATE INDEX IF NOT EXISTS idx_coupons_code ON coupons(code)",
+    "CREATE INDEX IF NOT EXISTS idx_coupons_validity ON coupons(valid_from, valid_until)",
+    "CREATE INDEX IF NOT EXISTS idx_coupons_type ON coupons(discount_type)",
+    "CREATE INDEX IF NOT EXISTS idx_coupons_active ON coupons(is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_coupon_redeems_coupon ON coupon_redeems(coupon_id)",
+    "CREATE INDEX IF NOT EXISTS idx_coupon_redeems_customer ON coupon_redeems(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_coupon_redeems_order ON coupon_redeems(order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_coupon_redeems_date ON coupon_redeems(redeemed_at)",
+    "CREATE INDEX IF NOT EXISTS idx_shipping_order_id ON shipping_info(order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_shipping_tracking_id ON shipping_info(tracking_id)",
+    "CREATE INDEX IF NOT EXISTS idx_events_type ON real_time_events(event_type)",
+    "CREATE INDEX IF NOT EXISTS idx_events_timestamp ON real_time_events(timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_events_processed ON real_time_events(processed)",
+    "CREATE INDEX IF NOT EXISTS idx_events_user ON real_time_events(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_riders_user_id ON riders(user_id)",
+    "CREATE INDEX IF NOT EXISTS idx_riders_customer_id ON riders(customer_id)",
+    "CREATE INDEX IF NOT EXISTS idx_riders_active ON riders(is_active)",
+    "CREATE INDEX IF NOT EXISTS idx_riders_created_id ON riders(created_at DESC, id DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_riders_zones ON riders USING GIN(delivery_zones)",
+    "CREATE INDEX IF NOT EXISTS idx_delivery_assignments_order ON delivery_assignments(order_id)",
+    "CREATE INDEX IF NOT EXISTS idx_delivery_assignments_rider ON delivery_assignments(rider_id)",
+    "CREATE INDEX IF NOT EXISTS idx_delivery_assignments_status ON delivery_assignments(status)",
+    "CREATE INDEX IF NOT EXISTS idx_delivery_assignments_date ON delivery_assignments(assigned_at)",
+    "CREATE INDEX IF NOT EXISTS idx_delivery_assignments_secure_id ON delivery_assignments(secure_assignment_id)",
+]
+
+TRIGGERS = [
+    """
+        CREATE OR REPLACE FUNCTION update_product_stock_on_order()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE products
+            SET stock = stock - NEW.quantity
+            WHERE id = NEW.product_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_product_stock_on_order ON order_items;
+        CREATE TRIGGER trigger_update_product_stock_on_order
+            AFTER INSERT ON order_items
+            FOR EACH ROW
+            EXECUTE FUNCTION update_product_stock_on_order();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION restore_product_stock_on_order_cancel()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF OLD.status != 'cancelled' AND NEW.status = 'cancelled' THEN
+                UPDATE products
+                SET stock = stock + (
+                    SELECT SUM(quantity)
+                    FROM order_items
+                    WHERE order_id = NEW.id
+                )
+                WHERE id IN (
+                    SELECT product_id
+                    FROM order_items
+                    WHERE order_id = NEW.id
+                );
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_restore_product_stock_on_order_cancel ON orders;
+        CREATE TRIGGER trigger_restore_product_stock_on_order_cancel
+            AFTER UPDATE ON orders
+            FOR EACH ROW
+            EXECUTE FUNCTION restore_product_stock_on_order_cancel();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION update_coupon_usage_on_redeem()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE coupons
+            SET used = used + 1
+            WHERE id = NEW.coupon_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_coupon_usage_on_redeem ON coupon_redeems;
+        CREATE TRIGGER trigger_update_coupon_usage_on_redeem
+            AFTER INSERT ON coupon_redeems
+            FOR EACH ROW
+            EXECUTE FUNCTION update_coupon_usage_on_redeem();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION sync_user_role_on_admin_change()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE users SET role = 'admin' WHERE id = NEW.user_id;
+            ELSIF TG_OP = 'DELETE' THEN
+                IF NOT EXISTS (SELECT 1 FROM admins WHERE user_id = OLD.user_id) THEN
+                    UPDATE users SET role = 'user' WHERE id = OLD.user_id;
+                END IF;
+            END IF;
+            RETURN COALESCE(NEW, OLD);
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_sync_user_role_on_admin_insert ON admins;
+        CREATE TRIGGER trigger_sync_user_role_on_admin_insert
+            AFTER INSERT ON admins
+            FOR EACH ROW
+            EXECUTE FUNCTION sync_user_role_on_admin_change();
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_sync_user_role_on_admin_delete ON admins;
+        CREATE TRIGGER trigger_sync_user_role_on_admin_delete
+            AFTER DELETE ON admins
+            FOR EACH ROW
+            EXECUTE FUNCTION sync_user_role_on_admin_change();
+    """,
+    """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'products' AND column_name = 'average_rating') THEN
+                ALTER TABLE products ADD COLUMN average_rating DECIMAL(3,2) DEFAULT 0;
+            END IF;
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'products' AND column_name = 'rating_histogram') THEN
+                ALTER TABLE products ADD COLUMN rating_count INTEGER NOT NULL DEFAULT 0;
+                ALTER TABLE products ADD COLUMN rating_histogram INTEGER[] NOT NULL DEFAULT '{0,0,0,0,0}';
+
+                -- Backfill from existing reviews
+                UPDATE products p
+                SET rating_histogram = ARRAY[s.r1, s.r2, s.r3, s.r4, s.r5],
+                    rating_count = s.total,
+                    average_rating = s.average
+                FROM (
+                    SELECT product_id,
+                           COUNT(*) FILTER (WHERE rating = 1) as r1,
+                           COUNT(*) FILTER (WHERE rating = 2) as r2,
+                           COUNT(*) FILTER (WHERE rating = 3) as r3,
+                           COUNT(*) FILTER (WHERE rating = 4) as r4,
+                           COUNT(*) FILTER (WHERE rating = 5) as r5,
+                           COUNT(*) as total,
+                           ROUND(AVG(rating)::numeric, 2) as average
+                    FROM reviews
+                    GROUP BY product_id
+                ) s
+                WHERE p.id = s.product_id;
+
+                UPDATE products SET average_rating = 0 WHERE average_rating IS NULL;
+            END IF;
+        END $$;
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_rating ON products(average_rating DESC, id DESC)",
+    """
+        CREATE OR REPLACE FUNCTION adjust_product_rating(p_product_id INTEGER, p_rating INTEGER, p_delta INTEGER)
+        RETURNS VOID AS $$
+        DECLARE
+            h INTEGER[];
+            total INTEGER;
+        BEGIN
+            SELECT rating_histogram INTO h FROM products WHERE id = p_product_id FOR UPDATE;
+            IF NOT FOUND THEN
+                RETURN;
+            END IF;
+
+            h[p_rating] := GREATEST(h[p_rating] + p_delta, 0);
+            total := h[1] + h[2] + h[3] + h[4] + h[5];
+
+            UPDATE products
+            SET rating_histogram = h,
+                rating_count = total,
+                average_rating = CASE WHEN total = 0 THEN 0
+                    ELSE ROUND((h[1] + 2 * h[2] + 3 * h[3] + 4 * h[4] + 5 * h[5])::numeric / total, 2)
+                END
+            WHERE id = p_product_id;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        CREATE OR REPLACE FUNCTION update_product_rating_on_review()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NEW.product_id = OLD.product_id AND NEW.rating = OLD.rating THEN
+                RETURN NEW;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM adjust_product_rating(OLD.product_id, OLD.rating, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM adjust_product_rating(NEW.product_id, NEW.rating, 1);
+            END IF;
+
+            RETURN COALESCE(NEW, OLD);
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_product_rating_on_review_insert ON reviews;
+        CREATE TRIGGER trigger_update_product_rating_on_review_insert
+            AFTER INSERT ON reviews
+            FOR EACH ROW
+            EXECUTE FUNCTION update_product_rating_on_review();
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_product_rating_on_review_update ON reviews;
+        CREATE TRIGGER trigger_update_product_rating_on_review_update
+            AFTER UPDATE ON reviews
+            FOR EACH ROW
+            EXECUTE FUNCTION update_product_rating_on_review();
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_product_rating_on_review_delete ON reviews;
+        CREATE TRIGGER trigger_update_product_rating_on_review_delete
+            AFTER DELETE ON reviews
+            FOR EACH ROW
+            EXECUTE FUNCTION update_product_rating_on_review();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION manage_payment_method_default()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.is_default = TRUE THEN
+                UPDATE payment_methods
+                SET is_default = FALSE
+                WHERE customer_id = NEW.customer_id
+                AND id != NEW.id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_manage_payment_method_default ON payment_methods;
+        CREATE TRIGGER trigger_manage_payment_method_default
+            BEFORE INSERT OR UPDATE ON payment_methods
+            FOR EACH ROW
+            EXECUTE FUNCTION manage_payment_method_default();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION manage_product_image_primary()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.is_primary = TRUE THEN
+                UPDATE product_images
+                SET is_primary = FALSE
+                WHERE product_id = NEW.product_id
+                AND id != NEW.id;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_manage_product_image_primary ON product_images;
+        CREATE TRIGGER trigger_manage_product_image_primary
+            BEFORE INSERT OR UPDATE ON product_images
+            FOR EACH ROW
+            EXECUTE FUNCTION manage_product_image_primary();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION create_customer_on_user_insert()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            INSERT INTO customers (user_id, first_name, last_name)
+            VALUES (NEW.id, NEW.name, '');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_create_customer_on_user_insert ON users;
+        CREATE TRIGGER trigger_create_customer_on_user_insert
+            AFTER INSERT ON users
+            FOR EACH ROW
+            EXECUTE FUNCTION create_customer_on_user_insert();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION validate_discount_dates()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.end_date <= NEW.start_date THEN
+                RAISE EXCEPTION 'Discount end_date must be after start_date';
+            END IF;
+
+            IF NEW.value <= 0 THEN
+                RAISE EXCEPTION 'Discount value must be greater than 0';
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_validate_discount_dates ON discounts;
+        CREATE TRIGGER trigger_validate_discount_dates
+            BEFORE INSERT OR UPDATE ON discounts
+            FOR EACH ROW
+            EXECUTE FUNCTION validate_discount_dates();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION validate_cart_item_quantity()
+        RETURNS TRIGGER AS $$
+        DECLARE
+            available_stock INTEGER;
+        BEGIN
+            SELECT stock INTO available_stock
+            FROM products
+            WHERE id = NEW.product_id;
+
+            IF NEW.quantity > available_stock THEN
+                RAISE EXCEPTION 'Quantity exceeds available stock. Available: %, Requested: %',
+                               available_stock, NEW.quantity;
+            END IF;
+
+            IF NEW.quantity <= 0 THEN
+                RAISE EXCEPTION 'Quantity must be greater than 0';
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_validate_cart_item_quantity ON cart_items;
+        CREATE TRIGGER trigger_validate_cart_item_quantity
+            BEFORE INSERT OR UPDATE ON cart_items
+            FOR EACH ROW
+            EXECUTE FUNCTION validate_cart_item_quantity();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION validate_review_rating()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.rating < 1 OR NEW.rating > 5 THEN
+                RAISE EXCEPTION 'Rating must be between 1 and 5';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_validate_review_rating ON reviews;
+        CREATE TRIGGER trigger_validate_review_rating
+            BEFORE INSERT OR UPDATE ON reviews
+            FOR EACH ROW
+            EXECUTE FUNCTION validate_review_rating();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION validate_coupon()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF NEW.valid_until <= NEW.valid_from THEN
+                RAISE EXCEPTION 'Coupon valid_until must be after valid_from';
+            END IF;
+
+            IF NEW.value <= 0 THEN
+                RAISE EXCEPTION 'Coupon value must be greater than 0';
+            END IF;
+
+            IF NEW.usage_limit <= 0 THEN
+                RAISE EXCEPTION 'Coupon usage_limit must be greater than 0';
+            END IF;
+
+            IF NEW.used > NEW.usage_limit THEN
+                RAISE EXCEPTION 'Coupon used count cannot exceed usage_limit';
+            END IF;
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_validate_coupon ON coupons;
+        CREATE TRIGGER trigger_validate_coupon
+            BEFORE INSERT OR UPDATE ON coupons
+            FOR EACH ROW
+            EXECUTE FUNCTION validate_coupon();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION calculate_order_total()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            UPDATE orders
+            SET total_price = (
+                SELECT COALESCE(SUM(quantity * price), 0)
+                FROM order_items
+                WHERE order_id = COALESCE(NEW.order_id, OLD.order_id)
+            )
+            WHERE id = COALESCE(NEW.order_id, OLD.order_id);
+
+            RETURN COALESCE(NEW, OLD);
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_calculate_order_total_insert ON order_items;
+        CREATE TRIGGER trigger_calculate_order_total_insert
+            AFTER INSERT ON order_items
+            FOR EACH ROW
+            EXECUTE FUNCTION calculate_order_total();
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_calculate_order_total_update ON order_items;
+        CREATE TRIGGER trigger_calculate_order_total_update
+            AFTER UPDATE ON order_items
+            FOR EACH ROW
+            EXECUTE FUNCTION calculate_order_total();
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_calculate_order_total_delete ON order_items;
+        CREATE TRIGGER trigger_calculate_order_total_delete
+            AFTER DELETE ON order_items
+            FOR EACH ROW
+            EXECUTE FUNCTION calculate_order_total();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION touch_order_updated_at()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.updated_at := NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_touch_order_updated_at ON orders;
+        CREATE TRIGGER trigger_touch_order_updated_at
+            BEFORE UPDATE ON orders
+            FOR EACH ROW
+            EXECUTE FUNCTION touch_order_updated_at();
+    """,
+    """
+        CREATE OR REPLACE FUNCTION cohort_month_number(p_cohort_month DATE, p_month DATE)
+        RETURNS INTEGER AS $$
+            SELECT ((EXTRACT(YEAR FROM p_month) - EXTRACT(YEAR FROM p_cohort_month)) * 12
+                    + EXTRACT(MONTH FROM p_month) - EXTRACT(MONTH FROM p_cohort_month))::int
+        $$ LANGUAGE sql IMMUTABLE;
+    """,
+    """
+        CREATE OR REPLACE FUNCTION adjust_customer_order_stats(p_customer_id INTEGER, p_order_date TIMESTAMP,
+                                                               p_total NUMERIC, p_delta INTEGER)
+        RETURNS VOID AS $$
+        DECLARE
+            v_month DATE := date_trunc('month', p_order_date)::date;
+            v_old_cohort DATE;
+            v_new_cohort DATE;
+            v_month_orders INTEGER;
+        BEGIN
+            -- Serializes changes per customer, including two first orders racing to create the row
+            PERFORM pg_advisory_xact_lock(84201024, p_customer_id);
+            SELECT cohort_month INTO v_old_cohort FROM customer_order_stats WHERE customer_id = p_customer_id;
+            IF p_delta < 0 AND NOT FOUND THEN
+                RETURN;
+            END IF;
+
+            IF p_delta > 0 THEN
+                INSERT INTO customer_order_stats (customer_id, order_count, total_spent, first_order_date,
+                                                  last_order_date, cohort_month)
+                VALUES (p_customer_id, 1, p_total, p_order_date, p_order_date, v_month)
+                ON CONFLICT (customer_id) DO UPDATE SET
+                    order_count = customer_order_stats.order_count + 1,
+                    total_spent = customer_order_stats.total_spent + EXCLUDED.total_spent,
+                    first_order_date = LEAST(customer_order_stats.first_order_date, EXCLUDED.first_order_date),
+                    last_order_date = GREATEST(customer_order_stats.last_order_date, EXCLUDED.last_order_date),
+                    cohort_month = LEAST(customer_order_stats.cohort_month, EXCLUDED.cohort_month),
+                    updated_at = NOW()
+                RETURNING cohort_month INTO v_new_cohort;
+            ELSE
+                -- This runs after the order was deleted or cancelled, so the remaining orders give first/last
+                UPDATE customer_order_stats s SET
+                    order_count = s.order_count - 1,
+                    total_spent = s.total_spent - p_total,
+                    first_order_date = COALESCE(r.first_order_date, s.first_order_date),
+                    last_order_date = COALESCE(r.last_order_date, s.last_order_date),
+                    cohort_month = COALESCE(date_trunc('month', r.first_order_date)::date, s.cohort_month),
+                    updated_at = NOW()
+                FROM (
+                    SELECT MIN(order_date) AS first_order_date, MAX(order_date) AS last_order_date
+                    FROM orders
+                    WHERE customer_id = p_customer_id AND status <> 'cancelled'
+                ) r
+                WHERE s.customer_id = p_customer_id
+                RETURNING CASE WHEN s.order_count > 0 THEN s.cohort_month END INTO v_new_cohort;
+                DELETE FROM customer_order_stats WHERE customer_id = p_customer_id AND order_count <= 0;
+            END IF;
+
+            -- A customer changing cohort (first order placed, cancelled or backdated) moves all their months
+            IF v_old_cohort IS NOT NULL AND v_old_cohort IS DISTINCT FROM v_new_cohort THEN
+                UPDATE cohort_retention r SET customers = r.customers - 1
+                FROM customer_active_months m
+                WHERE m.customer_id = p_customer_id
+                AND r.cohort_month = v_old_cohort
+                AND r.month_number = cohort_month_number(v_old_cohort, m.month);
+            END IF;
+
+            INSERT INTO customer_active_months (customer_id, month, orders)
+            VALUES (p_customer_id, v_month, p_delta)
+            ON CONFLICT (customer_id, month) DO UPDATE SET orders = customer_active_months.orders + p_delta
+            RETURNING orders INTO v_month_orders;
+            IF v_month_orders <= 0 THEN
+                DELETE FROM customer_active_months WHERE customer_id = p_customer_id AND month = v_month;
+            END IF;
+
+            IF v_new_cohort IS NOT NULL AND v_old_cohort IS DISTINCT FROM v_new_cohort THEN
+                INSERT INTO cohort_retention (cohort_month, month_number, customers)
+                SELECT v_new_cohort, cohort_month_number(v_new_cohort, month), 1
+                FROM customer_active_months
+                WHERE customer_id = p_customer_id
+                ON CONFLICT (cohort_month, month_number) DO UPDATE SET customers = cohort_retention.customers + 1;
+            ELSIF v_new_cohort IS NOT NULL
+                  AND ((p_delta > 0 AND v_month_orders = 1) OR (p_delta < 0 AND v_month_orders <= 0)) THEN
+                -- Same cohort; the customer just became (in)active in this month
+                INSERT INTO cohort_retention (cohort_month, month_number, customers)
+                VALUES (v_new_cohort, cohort_month_number(v_new_cohort, v_month), p_delta)
+                ON CONFLICT (cohort_month, month_number) DO UPDATE SET customers = cohort_retention.customers + p_delta;
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        CREATE OR REPLACE FUNCTION update_customer_order_stats()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                IF OLD.status <> 'cancelled' AND NEW.status <> 'cancelled'
+                   AND NEW.customer_id = OLD.customer_id AND NEW.order_date = OLD.order_date THEN
+                    -- Still the same counted order, e.g. its total followed an item change
+                    IF NEW.total_price IS DISTINCT FROM OLD.total_price THEN
+                        UPDATE customer_order_stats
+                        SET total_spent = total_spent + NEW.total_price - OLD.total_price, updated_at = NOW()
+                        WHERE customer_id = NEW.customer_id;
+                    END IF;
+                    RETURN NULL;
+                END IF;
+            END IF;
+
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                IF OLD.status <> 'cancelled' THEN
+                    PERFORM adjust_customer_order_stats(OLD.customer_id, OLD.order_date, OLD.total_price, -1);
+                END IF;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                IF NEW.status <> 'cancelled' THEN
+                    PERFORM adjust_customer_order_stats(NEW.customer_id, NEW.order_date, NEW.total_price, 1);
+                END IF;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """,
+    """
+        DROP TRIGGER IF EXISTS trigger_update_customer_order_stats ON orders;
+        CREATE TRIGGER trigger_update_customer_order_stats
+            AFTER INSERT OR UPDATE OF status, customer_id, order_date, total_price OR DELETE ON orders
+            FOR EACH ROW
+            EXECUTE FUNCTION update_customer_order_stats();
+    """,
+]
+
+async def upgrade(conn):
+    for statement in TABLES:
+        await conn.execute(statement)
+    await _create_real_time_events(conn)
+    for statement in TRIGGERS:
+        await conn.execute(statement)
+    for statement in OPTIONAL:
+        try:
+            async with conn.transaction():
+                await conn.execute(statement)
+        except asyncpg.PostgresError:
+            pass
+
+async def _create_real_time_events(conn):
+    """Create real_time_events range-partitioned by event timestamp.
+
+    An existing unpartitioned table is kept and attached as one partition
+    covering everything up to the first new partition.
+    """
+    relkind = await conn.fetchval("SELECT relkind FROM pg_class WHERE oid = to_regclass('real_time_events')")
+    if relkind == 'p':
+        return
+    if relkind == 'r':
+        await conn.execute("ALTER TABLE real_time_events RENAME TO real_time_events_legacy")
+        await conn.execute("ALTER TABLE real_time_events_legacy RENAME CONSTRAINT real_time_events_pkey TO real_time_events_legacy_pkey")
+        for index in ('idx_events_type', 'idx_events_timestamp', 'idx_events_processed', 'idx_events_user'):
+            await conn.execute(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy")
+        await conn.execute("""
+            UPDATE real_time_events_legacy SET timestamp = COALESCE(created_at, NOW())
+            WHERE timestamp IS NULL
+        """)
+        await conn.execute("ALTER TABLE real_time_events_legacy ALTER COLUMN timestamp SET NOT NULL")
+        id_column = "id INTEGER NOT NULL DEFAULT nextval('real_time_events_id_seq')"
+    else:
+        id_column = "id SERIAL"
+
+    await conn.execute(f"""
+        CREATE TABLE real_time_events (
+            {id_column},
+            event_type VARCHAR(50) NOT NULL,
+            event_data JSONB NOT NULL,
+            user_id INTEGER REFERENCES users(id),
+            customer_id INTEGER REFERENCES customers(id),
+            product_id INTEGER REFERENCES products(id),
+            order_id INTEGER REFERENCES orders(id),
+            timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+            processed BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+
+    if relkind == 'r':
+        # The sequence must belong to the parent so dropping the old partition keeps it
+        await conn.execute("ALTER SEQUENCE real_time_events_id_seq OWNED BY real_time_events.id")
+        upper_bound = await conn.fetchval("""
+            SELECT date_trunc('day', COALESCE(MAX(timestamp), NOW())) + INTERVAL '1 day'
+            FROM real_time_events_legacy
+        """)
+        if settings.EVENT_PARTITION_INTERVAL == 'month':
+            upper_bound = await conn.fetchval(
+                "SELECT date_trunc('month', $1::timestamp - INTERVAL '1 microsecond') + INTERVAL '1 month'",
+                upper_bound
+            )
+        await conn.execute(f"""
+            ALTER TABLE real_time_events ATTACH PARTITION real_time_events_legacy
+            FOR VALUES FROM (MINVALUE) TO ('{upper_bound.isoformat(sep=' ')}')
+        """)
@@ -0,0 +1,8 @@
+"""
+Late offline events re-roll their partition instead of being missed by
+event_rollups_daily_device; event_rollups_hourly had no readers.
+"""
+
+async def upgrade(conn):
+    await conn.execute("ALTER TABLE event_partition_rollups ADD COLUMN IF NOT EXISTS stale BOOLEAN NOT NULL DEFAULT FALSE")
+    await conn.execute("DROP TABLE IF EXISTS event_rollups_hourly")
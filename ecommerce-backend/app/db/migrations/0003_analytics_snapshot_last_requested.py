@@ -0,0 +1,7 @@
+"""
+Track when each analytics snapshot was last requested so the refresher can
+drop variants nobody reads.
+"""
+
+async def upgrade(conn):
+    await conn.execute("ALTER TABLE analytics_snapshots ADD COLUMN IF NOT EXISTS last_requested_at TIMESTAMP NOT NULL DEFAULT NOW()")
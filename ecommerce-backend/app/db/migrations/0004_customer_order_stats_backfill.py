@@ -0,0 +1,38 @@
+"""
+Backfill customer_order_stats, customer_active_months and cohort_retention
+from order history. trigger_update_customer_order_stats (0001) only counts
+orders written after it exists, so customers who ordered before it had no
+row, and their next order would start them at order_count = 1 with this
+month as their cohort.
+"""
+
+async def upgrade(conn):
+    # Holds back order writes until this commits: every order is counted by
+    # exactly one of this backfill or the trigger
+    await conn.execute("LOCK TABLE orders IN SHARE MODE")
+    await conn.execute("DELETE FROM cohort_retention")
+    await conn.execute("DELETE FROM customer_active_months")
+    await conn.execute("DELETE FROM customer_order_stats")
+    await conn.execute("""
+        INSERT INTO customer_order_stats (customer_id, order_count, total_spent, first_order_date,
+                                          last_order_date, cohort_month)
+        SELECT customer_id, COUNT(*), SUM(total_price), MIN(order_date), MAX(order_date),
+               date_trunc('month', MIN(order_date))::date
+        FROM orders
+        WHERE status <> 'cancelled'
+        GROUP BY customer_id
+    """)
+    await conn.execute("""
+        INSERT INTO customer_active_months (customer_id, month, orders)
+        SELECT customer_id, date_trunc('month', order_date)::date, COUNT(*)
+        FROM orders
+        WHERE status <> 'cancelled'
+        GROUP BY 1, 2
+    """)
+    await conn.execute("""
+        INSERT INTO cohort_retention (cohort_month, month_number, customers)
+        SELECT s.cohort_month, cohort_month_number(s.cohort_month, m.month), COUNT(*)
+        FROM customer_active_months m
+        JOIN customer_order_stats s ON s.customer_id = m.customer_id
+        GROUP BY 1, 2
+    """)
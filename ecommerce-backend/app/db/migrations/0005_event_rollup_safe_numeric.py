@@ -0,0 +1,19 @@
+"""
+Tracked events arrive unvalidated from /analytics/track, so reading amounts
+out of event_data must not fail on junk. safe_numeric() returns NULL for
+anything but a plain non-negative decimal below 10^9, and the rollup sums are
+widened so many large (but valid) amounts can't overflow them.
+"""
+
+async def upgrade(conn):
+    await conn.execute(r"""
+        CREATE OR REPLACE FUNCTION safe_numeric(p_value TEXT)
+        RETURNS NUMERIC AS $$
+            SELECT CASE WHEN p_value ~ '^\s*[0-9]{1,9}(\.[0-9]{1,6})?\s*$' THEN p_value::numeric END
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+    await conn.execute("""
+        ALTER TABLE event_rollups_daily_device
+            ALTER COLUMN revenue TYPE DECIMAL(20,2),
+            ALTER COLUMN time_spent_total TYPE DECIMAL(20,2)
+    """)
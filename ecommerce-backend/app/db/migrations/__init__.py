@@ -0,0 +1,11 @@
+"""
+Versioned schema migrations, applied by ``python -m app.db.migrate``.
+
+Each module is named ``<version>_<name>.py`` (e.g. ``0002_add_order_notes.py``)
+and defines ``async def upgrade(conn)``. Migrations run in version order on
+one connection and, unless the module sets ``TRANSACTIONAL = False``, inside
+one transaction together with their schema_version row. Write them as
+literal SQL rather than calling model code, so a migration always runs the
+same statements; once one has shipped, put further schema changes in a new
+one rather than editing it.
+"""
@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.routes import (
@@ -17,15 +18,20 @@ from app.routes import (
     analytics as analytics_routes,
     advanced_analytics as advanced_analytics_routes,
     analytics_tracking as analytics_tracking_routes,
-    rider as rider_routes
+    rider as rider_routes,
+    metrics as metrics_routes
 )
-from app.models import (
-    user, customer, address, product, tag, product_tag, product_image,
-    order, order_item, order_status, cart, cart_item, payment_method,
-    review, wishlist, wishlist_item, search_history, discount, coupon,
-    coupon_redeem, admin, shipping, analytics, rider, delivery_assignment
-)
-from app.db.init_triggers import create_triggers
+from app.config import settings
+from app.db.migrate import apply_migrations, verify_schema
+from app.database import close_database_pool, PoolAcquireTimeout
+from app.services.event_ingestion_service import EventIngestionService
+from app.services.event_partition_service import EventPartitionService
+from app.services.analytics_snapshot_service import AnalyticsSnapshotService
+from app.services.sslcommerz_service import sslcommerz_service
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.product_copurchase_service import ProductCopurchaseService
+from app.services.predictive_scoring_service import PredictiveScoringService
+from app.services.customer_stats_service import CustomerStatsService
 
 app = FastAPI(title="E-commerce API", version="1.0.0")
 
@@ -67,40 +73,54 @@ app.include_router(analytics_routes.router, prefix="/api/v1")
 app.include_router(advanced_analytics_routes.router, prefix="/api/v1")
 app.include_router(analytics_tracking_routes.router, prefix="/api/v1")
 app.include_router(rider_routes.router, prefix="/api/v1")
+app.include_router(metrics_routes.router)
+
+@app.exception_handler(PoolAcquireTimeout)
+async def pool_acquire_timeout_handler(request: Request, exc: PoolAcquireTimeout):
+    """The pool is saturated; ask clients to back off instead of queueing forever"""
+    return JSONResponse(status_code=503, content={"detail": "Service busy, please retry shortly"})
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
-    # Create tables in dependency order
-    await user.User.create_table()
-    await customer.Customer.create_table()
-    await address.Address.create_table()
-    await product.Product.create_table()
-    await tag.Tag.create_table()
-    await product_tag.ProductTag.create_table()
-    await product_image.ProductImage.create_table()
-    await payment_method.PaymentMethod.create_table()  # Must be before order
-    await order.Order.create_table()
-    await order_item.OrderItem.create_table()
-    await admin.Admin.create_table()  # Must be before order_status
-    await order_status.OrderStatus.create_table()
-    await cart.Cart.create_table()
-    await cart_item.CartItem.create_table()
-    await review.Review.create_table()
-    await wishlist.Wishlist.create_table()
-    await wishlist_item.WishlistItem.create_table()
-    await search_history.SearchHistory.create_table()
-    await discount.Discount.create_table()
-    await coupon.Coupon.create_table()
-    await coupon_redeem.CouponRedeem.create_table()
-    await shipping.ShippingInfo.create_table()
-    await analytics.RealTimeEvents.create_table() # Add this line
-    await rider.Rider.create_table()
-    await delivery_assignment.DeliveryAssignment.create_table()
-    # await order_status.OrderStatus.create_table()  # Temporarily disabled
+    """Check the schema version and start background services"""
+    # Schema changes are applied ahead of time by `python -m app.db.migrate`
+    if settings.DB_AUTO_MIGRATE:
+        await apply_migrations()
+    await verify_schema()
+    
+    # Create, roll up and expire real_time_events partitions; the first run starts right away
+    EventPartitionService.start()
+    
+    # Start the write-behind buffer for tracked analytics events
+    EventIngestionService.start()
+    
+    # Keep admin dashboard snapshots warm
+    AnalyticsSnapshotService.start()
     
-    # Initialize database triggers
-    await create_triggers()
+    # Deliver queued notification emails
+    EmailOutboxService.start()
+    
+    # Backfill and periodically re-derive "frequently bought together" counts
+    ProductCopurchaseService.start()
+    
+    # Score churn risk and forecast demand off the request path
+    PredictiveScoringService.start()
+    
+    # Optionally re-derive per-customer order stats and cohort retention (kept current by trigger)
+    CustomerStatsService.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered analytics events and close the gateway client and database pool"""
+    await EventIngestionService.stop()
+    await EventPartitionService.stop()
+    await AnalyticsSnapshotService.stop()
+    await EmailOutboxService.stop()
+    await ProductCopurchaseService.stop()
+    await PredictiveScoringService.stop()
+    await CustomerStatsService.stop()
+    await sslcommerz_service.close()
+    await close_database_pool()
 
 @app.get("/")
 async def root():
@@ -12,23 +12,6 @@ class Address:
         self.country = country
         self.postal_code = postal_code
 
-    @classmethod
-    async def create_table(cls):
-        """Create addresses table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS addresses (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    street VARCHAR NOT NULL,
-                    city VARCHAR NOT NULL,
-                    division VARCHAR NOT NULL,
-                    country VARCHAR NOT NULL,
-                    postal_code VARCHAR NOT NULL
-                )
-            """)
-
     @classmethod
     async def create(cls, customer_id: int, street: str, city: str, 
                     division: str, country: str, postal_code: str) -> 'Address':
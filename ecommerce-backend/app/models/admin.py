@@ -13,25 +13,6 @@ class Admin:
         self.user_id = user_id
         self.admin_role = admin_role
 
-    @classmethod
-    async def create_table(cls):
-        """Create admins table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS admins (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE UNIQUE,
-                    admin_role VARCHAR(20) NOT NULL CHECK (admin_role IN ('product', 'sales', 'superadmin'))
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_admins_user ON admins(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_admins_role ON admins(admin_role)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, user_id: int, admin_role: str) -> 'Admin':
         """Create a new admin"""
@@ -1,7 +1,8 @@
 # app/models/analytics.py
 
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from app.database import get_db_connection
 import json
 
@@ -20,36 +21,6 @@ class GeographicAnalytics:
         self.total_spent = total_spent
         self.last_order_date = last_order_date
 
-    @classmethod
-    async def create_table(cls):
-        """Create geographic analytics table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS geographic_analytics (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER REFERENCES customers(id),
-                    city VARCHAR(100) NOT NULL,
-                    region VARCHAR(100) NOT NULL,
-                    country VARCHAR(100) NOT NULL,
-                    latitude DECIMAL(10,8),
-                    longitude DECIMAL(11,8),
-                    total_orders INTEGER DEFAULT 0,
-                    total_spent DECIMAL(12,2) DEFAULT 0.0,
-                    last_order_date TIMESTAMP,
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_geo_city ON geographic_analytics(city)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_geo_region ON geographic_analytics(region)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_geo_country ON geographic_analytics(country)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_geo_customer ON geographic_analytics(customer_id)")
-            except Exception as e:
-                pass
-
 class MarketingAnalytics:
     def __init__(self, id: int, campaign_name: str, campaign_type: str, start_date: datetime, 
                  end_date: Optional[datetime] = None, budget: float = 0.0, spent: float = 0.0,
@@ -69,39 +40,6 @@ class MarketingAnalytics:
         self.status = status
         self.source = source
 
-    @classmethod
-    async def create_table(cls):
-        """Create marketing analytics table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS marketing_analytics (
-                    id SERIAL PRIMARY KEY,
-                    campaign_name VARCHAR(200) NOT NULL,
-                    campaign_type VARCHAR(50) NOT NULL,
-                    start_date TIMESTAMP NOT NULL,
-                    end_date TIMESTAMP,
-                    budget DECIMAL(12,2) DEFAULT 0.0,
-                    spent DECIMAL(12,2) DEFAULT 0.0,
-                    impressions INTEGER DEFAULT 0,
-                    clicks INTEGER DEFAULT 0,
-                    conversions INTEGER DEFAULT 0,
-                    revenue DECIMAL(12,2) DEFAULT 0.0,
-                    status VARCHAR(20) DEFAULT 'active',
-                    source VARCHAR(50) DEFAULT 'unknown',
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_marketing_campaign ON marketing_analytics(campaign_name)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_marketing_type ON marketing_analytics(campaign_type)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_marketing_status ON marketing_analytics(status)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_marketing_date ON marketing_analytics(start_date)")
-            except Exception as e:
-                pass
-
 class ProductAnalytics:
     def __init__(self, id: int, product_id: int, views: int = 0, clicks: int = 0, 
                  add_to_cart: int = 0, purchases: int = 0, returns: int = 0,
@@ -125,41 +63,6 @@ class ProductAnalytics:
         self.inventory_turnover = inventory_turnover
         self.days_in_stock = days_in_stock
 
-    @classmethod
-    async def create_table(cls):
-        """Create product analytics table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS product_analytics (
-                    id SERIAL PRIMARY KEY,
-                    product_id INTEGER REFERENCES products(id),
-                    views INTEGER DEFAULT 0,
-                    clicks INTEGER DEFAULT 0,
-                    add_to_cart INTEGER DEFAULT 0,
-                    purchases INTEGER DEFAULT 0,
-                    returns INTEGER DEFAULT 0,
-                    avg_rating DECIMAL(3,2) DEFAULT 0.0,
-                    total_reviews INTEGER DEFAULT 0,
-                    conversion_rate DECIMAL(5,4) DEFAULT 0.0,
-                    revenue DECIMAL(12,2) DEFAULT 0.0,
-                    cost DECIMAL(12,2) DEFAULT 0.0,
-                    profit_margin DECIMAL(5,4) DEFAULT 0.0,
-                    inventory_turnover DECIMAL(8,4) DEFAULT 0.0,
-                    days_in_stock INTEGER DEFAULT 0,
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_analytics_id ON product_analytics(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_views ON product_analytics(views)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_revenue ON product_analytics(revenue)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_rating ON product_analytics(avg_rating)")
-            except Exception as e:
-                pass
-
 class CustomerAnalytics:
     def __init__(self, id: int, customer_id: int, lifetime_value: float = 0.0, 
                  acquisition_cost: float = 0.0, retention_rate: float = 0.0,
@@ -181,39 +84,6 @@ class CustomerAnalytics:
         self.referral_count = referral_count
         self.total_spent = total_spent
 
-    @classmethod
-    async def create_table(cls):
-        """Create customer analytics table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS customer_analytics (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER REFERENCES customers(id),
-                    lifetime_value DECIMAL(12,2) DEFAULT 0.0,
-                    acquisition_cost DECIMAL(12,2) DEFAULT 0.0,
-                    retention_rate DECIMAL(5,4) DEFAULT 0.0,
-                    churn_probability DECIMAL(5,4) DEFAULT 0.0,
-                    avg_order_value DECIMAL(10,2) DEFAULT 0.0,
-                    total_orders INTEGER DEFAULT 0,
-                    days_since_last_order INTEGER DEFAULT 0,
-                    segment VARCHAR(20) DEFAULT 'new',
-                    engagement_score DECIMAL(5,4) DEFAULT 0.0,
-                    referral_count INTEGER DEFAULT 0,
-                    total_spent DECIMAL(12,2) DEFAULT 0.0,
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_analytics_id ON customer_analytics(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_lifetime_value ON customer_analytics(lifetime_value)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_segment ON customer_analytics(segment)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customer_churn ON customer_analytics(churn_probability)")
-            except Exception as e:
-                pass
-
 class RealTimeEvents:
     def __init__(self, id: int, event_type: str, event_data: Dict[str, Any], 
                  user_id: Optional[int] = None, customer_id: Optional[int] = None,
@@ -229,34 +99,6 @@ class RealTimeEvents:
         self.timestamp = timestamp or datetime.now()
         self.processed = processed
 
-    @classmethod
-    async def create_table(cls):
-        """Create real-time events table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS real_time_events (
-                    id SERIAL PRIMARY KEY,
-                    event_type VARCHAR(50) NOT NULL,
-                    event_data JSONB NOT NULL,
-                    user_id INTEGER REFERENCES users(id),
-                    customer_id INTEGER REFERENCES customers(id),
-                    product_id INTEGER REFERENCES products(id),
-                    order_id INTEGER REFERENCES orders(id),
-                    timestamp TIMESTAMP DEFAULT NOW(),
-                    processed BOOLEAN DEFAULT FALSE,
-                    created_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_type ON real_time_events(event_type)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON real_time_events(timestamp)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_processed ON real_time_events(processed)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_events_user ON real_time_events(user_id)")
-            except Exception as e:
-                pass
-
 class PredictiveModels:
     def __init__(self, id: int, model_name: str, model_type: str, 
                  model_data: Dict[str, Any], accuracy: float = 0.0,
@@ -272,30 +114,74 @@ class PredictiveModels:
         self.version = version
         self.description = description
 
+class AnalyticsSnapshot:
+    def __init__(self, key: str, name: str, data: Dict[str, Any], generated_at: datetime,
+                 arg: Optional[int] = None):
+        self.key = key
+        self.name = name
+        self.arg = arg
+        self.data = data
+        self.generated_at = generated_at
+
     @classmethod
-    async def create_table(cls):
-        """Create predictive models table"""
+    async def get_by_key(cls, key: str) -> Optional['AnalyticsSnapshot']:
+        """Get a stored snapshot, noting that it was requested (at most once a minute)"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS predictive_models (
-                    id SERIAL PRIMARY KEY,
-                    model_name VARCHAR(100) NOT NULL,
-                    model_type VARCHAR(50) NOT NULL,
-                    model_data JSONB NOT NULL,
-                    accuracy DECIMAL(5,4) DEFAULT 0.0,
-                    last_trained TIMESTAMP DEFAULT NOW(),
-                    status VARCHAR(20) DEFAULT 'active',
-                    version VARCHAR(20) DEFAULT '1.0',
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT NOW(),
-                    updated_at TIMESTAMP DEFAULT NOW()
+            row = await conn.fetchrow("""
+                WITH touched AS (
+                    UPDATE analytics_snapshots SET last_requested_at = NOW()
+                    WHERE key = $1 AND last_requested_at < NOW() - INTERVAL '1 minute'
                 )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_models_name ON predictive_models(model_name)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_models_type ON predictive_models(model_type)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_models_status ON predictive_models(status)")
-            except Exception as e:
-                pass 
\ No newline at end of file
+                SELECT key, name, arg, data, generated_at
+                FROM analytics_snapshots WHERE key = $1
+            """, key)
+            if not row:
+                return None
+            snapshot = dict(row)
+            snapshot['data'] = json.loads(snapshot['data'])
+            return cls(**snapshot)
+
+    @classmethod
+    async def save(cls, key: str, name: str, arg: Optional[int], data: Dict[str, Any],
+                   generated_at: datetime) -> 'AnalyticsSnapshot':
+        """Insert or replace a snapshot"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                INSERT INTO analytics_snapshots (key, name, arg, data, generated_at)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (key) DO UPDATE SET data = EXCLUDED.data, generated_at = EXCLUDED.generated_at
+            """, key, name, arg, json.dumps(data, default=_json_default), generated_at)
+            return cls(key, name, data, generated_at, arg)
+
+    @classmethod
+    async def get_active_keys(cls, idle_seconds: int) -> List[Dict[str, Any]]:
+        """Get name/arg of every snapshot requested within the last ``idle_seconds``"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT name, arg FROM analytics_snapshots
+                WHERE last_requested_at >= NOW() - $1::int * INTERVAL '1 second'
+                ORDER BY key
+            """, idle_seconds)
+            return [dict(row) for row in rows]
+
+    @classmethod
+    async def delete_idle(cls, idle_seconds: int, keep: List[str]) -> int:
+        """Delete snapshots not requested within ``idle_seconds``, except ``keep``; returns how many"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            result = await conn.execute("""
+                DELETE FROM analytics_snapshots
+                WHERE last_requested_at < NOW() - $1::int * INTERVAL '1 second' AND key <> ALL($2::varchar[])
+            """, idle_seconds, keep)
+            return int(result.split()[-1])
+
+def _json_default(value: Any) -> Any:
+    """Serialize query results (Decimal, date, datetime) for JSONB storage"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -1,6 +1,10 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from app.database import get_db_connection
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
+
+# Keyset cursor of get_admin_summaries: (creation_date, id), newest first
+ADMIN_SUMMARY_CURSOR_KEY = "carts:creation_date:desc"
 
 class Cart:
     def __init__(self, id: int, customer_id: int, creation_date: datetime, 
@@ -12,28 +16,6 @@ class Cart:
         self.is_deleted = is_deleted
         self.deleted_at = deleted_at
 
-    @classmethod
-    async def create_table(cls):
-        """Create carts table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS carts (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    creation_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    is_deleted BOOLEAN DEFAULT FALSE
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_carts_customer ON carts(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_carts_active ON carts(is_active)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_carts_deleted ON carts(is_deleted)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int, creation_date: Optional[datetime] = None) -> 'Cart':
         """Create a new cart"""
@@ -113,6 +95,53 @@ class Cart:
             """, limit, skip)
             return [cls(**dict(row)) for row in rows]
 
+    @classmethod
+    async def get_admin_summaries(cls, skip: int = 0, limit: int = 100,
+                                  cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Non-empty carts, newest first, with customer name, item count and price
+        total, in one query; returns the page and the cursor for the next one
+        """
+        params: List[Any] = []
+        where_clause = ""
+        if cursor:
+            params.extend(decode_cursor(cursor, ADMIN_SUMMARY_CURSOR_KEY, datetime, int))
+            where_clause = f"WHERE {keyset_condition(['c.creation_date', 'c.id'], True, 1)}"
+        params.append(limit)
+        page_clause = f"LIMIT ${len(params)}"
+        if not cursor:
+            params.append(skip)
+            page_clause += f" OFFSET ${len(params)}"
+
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(f"""
+                SELECT c.id, c.customer_id, c.creation_date, c.is_active, c.is_deleted,
+                       CONCAT(cust.first_name, ' ', cust.last_name) as customer_name,
+                       totals.total_items, totals.total_price
+                FROM carts c
+                JOIN LATERAL (
+                    SELECT SUM(ci.quantity) AS total_items,
+                           COALESCE(SUM(ci.quantity * p.price), 0) AS total_price
+                    FROM cart_items ci
+                    LEFT JOIN products p ON ci.product_id = p.id
+                    WHERE ci.cart_id = c.id
+                ) totals ON totals.total_items > 0
+                LEFT JOIN customers cust ON c.customer_id = cust.id
+                {where_clause}
+                ORDER BY c.creation_date DESC, c.id DESC
+                {page_clause}
+            """, *params)
+
+        carts = []
+        for row in rows:
+            cart_data = dict(row)
+            cart_data['total_items'] = int(cart_data['total_items'])
+            cart_data['total_price'] = float(cart_data['total_price'])
+            carts.append(cart_data)
+        next_cursor = encode_cursor(ADMIN_SUMMARY_CURSOR_KEY, rows[-1]['creation_date'], rows[-1]['id']) if len(rows) == limit else None
+        return carts, next_cursor
+
     @classmethod
     async def get_by_customer_id(cls, customer_id: int, include_deleted: bool = False) -> Optional['Cart']:
         pool = await get_db_connection()
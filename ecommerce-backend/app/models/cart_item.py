@@ -8,27 +8,6 @@ class CartItem:
         self.product_id = product_id
         self.quantity = quantity
 
-    @classmethod
-    async def create_table(cls):
-        """Create cart_items table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS cart_items (
-                    id SERIAL PRIMARY KEY,
-                    cart_id INTEGER NOT NULL REFERENCES carts(id) ON DELETE CASCADE,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    quantity INTEGER NOT NULL DEFAULT 1,
-                    UNIQUE(cart_id, product_id)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_cart_items_cart ON cart_items(cart_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_cart_items_product ON cart_items(product_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, cart_id: int, product_id: int, quantity: int = 1) -> 'CartItem':
         """Create a new cart item"""
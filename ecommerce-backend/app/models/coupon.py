@@ -3,6 +3,10 @@ from datetime import datetime
 from enum import Enum
 from app.database import get_db_connection
 from app.models.coupon_redeem import CouponRedeem
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_table_rows
+
+# Keyset cursor of get_all: id, newest first
+CURSOR_KEY = "coupons:id:desc"
 
 class DiscountTypeEnum(str, Enum):
     PERCENTAGE = "percentage"
@@ -20,34 +24,6 @@ class Coupon:
         self.valid_from = valid_from
         self.valid_until = valid_until
 
-    @classmethod
-    async def create_table(cls):
-        """Create coupons table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS coupons (
-                    id SERIAL PRIMARY KEY,
-                    code VARCHAR(50) UNIQUE NOT NULL,
-                    discount_type VARCHAR(20) NOT NULL CHECK (discount_type IN ('percentage', 'fixed')),
-                    value DECIMAL(10,2) NOT NULL CHECK (value > 0),
-                    usage_limit INTEGER NOT NULL CHECK (usage_limit > 0),
-                    used INTEGER NOT NULL DEFAULT 0 CHECK (used >= 0),
-                    valid_from TIMESTAMP NOT NULL,
-                    valid_until TIMESTAMP NOT NULL CHECK (valid_until > valid_from),
-                    is_active BOOLEAN NOT NULL DEFAULT true,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupons_code ON coupons(code)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupons_validity ON coupons(valid_from, valid_until)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupons_type ON coupons(discount_type)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupons_active ON coupons(is_active)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, code: str, discount_type: str, value: float, usage_limit: int,
                     valid_from: datetime, valid_until: datetime, is_active: bool = True) -> 'Coupon':
@@ -161,18 +137,42 @@ class Coupon:
             return [cls(**dict(row)) for row in rows]
 
     @classmethod
-    async def get_all(cls, skip: int = 0, limit: int = 100) -> List['Coupon']:
-        """Get all coupons with pagination"""
+    async def get_all(cls, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List['Coupon']:
+        """Get all coupons, newest first, by offset or by keyset cursor (see page_cursor)"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT id, code, discount_type, value, usage_limit, used, valid_from, valid_until
-                FROM coupons 
-                ORDER BY id DESC
-                LIMIT $1 OFFSET $2
-            """, limit, skip)
+            if cursor:
+                (coupon_id,) = decode_cursor(cursor, CURSOR_KEY, int)
+                rows = await conn.fetch("""
+                    SELECT id, code, discount_type, value, usage_limit, used, valid_from, valid_until
+                    FROM coupons 
+                    WHERE id < $1
+                    ORDER BY id DESC
+                    LIMIT $2
+                """, coupon_id, limit)
+            else:
+                rows = await conn.fetch("""
+                    SELECT id, code, discount_type, value, usage_limit, used, valid_from, valid_until
+                    FROM coupons 
+                    ORDER BY id DESC
+                    LIMIT $1 OFFSET $2
+                """, limit, skip)
             return [cls(**dict(row)) for row in rows]
 
+    @classmethod
+    async def estimate_count(cls) -> int:
+        """Approximate number of coupons from planner statistics"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await estimate_table_rows(conn, "coupons")
+
+    @staticmethod
+    def page_cursor(coupons: List['Coupon'], limit: int) -> Optional[str]:
+        """Cursor for the page after ``coupons``, or None if this was the last page"""
+        if len(coupons) < limit:
+            return None
+        return encode_cursor(CURSOR_KEY, coupons[-1].id)
+
     @classmethod
     async def get_active(cls) -> List['Coupon']:
         """Get all active coupons"""
@@ -12,30 +12,6 @@ class CouponRedeem:
         self.discount_amount = discount_amount
         self.redeemed_at = redeemed_at
 
-    @classmethod
-    async def create_table(cls):
-        """Create coupon_redeems table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS coupon_redeems (
-                    id SERIAL PRIMARY KEY,
-                    coupon_id INTEGER NOT NULL REFERENCES coupons(id) ON DELETE CASCADE,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                    discount_amount DECIMAL(10,2) NOT NULL DEFAULT 0,
-                    redeemed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupon_redeems_coupon ON coupon_redeems(coupon_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupon_redeems_customer ON coupon_redeems(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupon_redeems_order ON coupon_redeems(order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_coupon_redeems_date ON coupon_redeems(redeemed_at)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, coupon_id: int, customer_id: int, order_id: int,
                     discount_amount: float = 0, redeemed_at: Optional[datetime] = None) -> 'CouponRedeem':
@@ -16,32 +16,6 @@ class Customer:
         self.gender = gender
         self.created_at = created_at
 
-    @classmethod
-    async def create_table(cls):
-        """Create customers table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS customers (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
-                    first_name VARCHAR(100),
-                    last_name VARCHAR(100),
-                    phone VARCHAR(20),
-                    date_of_birth DATE,
-                    gender VARCHAR(10) CHECK (gender IN ('Male', 'Female', 'Other')),
-                    created_at TIMESTAMP DEFAULT NOW()
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_user_id ON customers(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_created_at ON customers(created_at)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_name ON customers(first_name, last_name)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, user_id: int, first_name: str = None, last_name: str = None,
                     phone: str = None, date_of_birth: date = None, gender: str = None) -> 'Customer':
@@ -0,0 +1,54 @@
+from app.database import get_db_connection
+
+class CustomerOrderStats:
+    """
+    Running per-customer order aggregates and monthly cohort retention, kept
+    current by trigger_update_customer_order_stats on orders (see
+    app/db/migrations) so customer analytics read these instead of aggregating
+    every order. Only non-cancelled orders count; a customer whose last
+    counted order goes away loses their row.
+
+    - customer_order_stats: one row per customer with counted orders
+    - customer_active_months: counted orders per customer and calendar month
+    - cohort_retention: customers of each first-order month (cohort) who
+      ordered month_number months later (0 = the cohort month itself)
+
+    No foreign keys: when a customer is deleted their orders' delete
+    triggers still need these rows to take the customer back out.
+    """
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """Recompute all three tables from order history; returns the number of customers"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                # Order writes that would move these rows wait for the swap, so orders can't change underneath
+                await conn.execute("LOCK TABLE customer_order_stats, customer_active_months, cohort_retention IN EXCLUSIVE MODE")
+                await conn.execute("DELETE FROM cohort_retention")
+                await conn.execute("DELETE FROM customer_active_months")
+                await conn.execute("DELETE FROM customer_order_stats")
+                result = await conn.execute("""
+                    INSERT INTO customer_order_stats (customer_id, order_count, total_spent, first_order_date,
+                                                      last_order_date, cohort_month)
+                    SELECT customer_id, COUNT(*), SUM(total_price), MIN(order_date), MAX(order_date),
+                           date_trunc('month', MIN(order_date))::date
+                    FROM orders
+                    WHERE status <> 'cancelled'
+                    GROUP BY customer_id
+                """)
+                await conn.execute("""
+                    INSERT INTO customer_active_months (customer_id, month, orders)
+                    SELECT customer_id, date_trunc('month', order_date)::date, COUNT(*)
+                    FROM orders
+                    WHERE status <> 'cancelled'
+                    GROUP BY 1, 2
+                """)
+                await conn.execute("""
+                    INSERT INTO cohort_retention (cohort_month, month_number, customers)
+                    SELECT s.cohort_month, cohort_month_number(s.cohort_month, m.month), COUNT(*)
+                    FROM customer_active_months m
+                    JOIN customer_order_stats s ON s.customer_id = m.customer_id
+                    GROUP BY 1, 2
+                """)
+            return int(result.split()[-1])
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.database import get_db_connection
+from app.models.order_tracking import OrderTracking
 from app.utils.id_generator import id_generator
 
 class DeliveryAssignment:
@@ -25,40 +26,6 @@ class DeliveryAssignment:
         self.updated_at = updated_at
         self.secure_assignment_id = secure_assignment_id or id_generator.generate_delivery_assignment_id()
 
-    @classmethod
-    async def create_table(cls):
-        """Create delivery_assignments table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS delivery_assignments (
-                    id SERIAL PRIMARY KEY,
-                    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                    rider_id INTEGER NOT NULL REFERENCES riders(id) ON DELETE CASCADE,
-                    assigned_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    status VARCHAR(20) NOT NULL DEFAULT 'pending' 
-                        CHECK (status IN ('pending', 'accepted', 'rejected', 'picked_up', 'in_transit', 'delivered', 'cancelled')),
-                    accepted_at TIMESTAMP,
-                    rejected_at TIMESTAMP,
-                    rejection_reason TEXT,
-                    estimated_delivery TIMESTAMP,
-                    actual_delivery TIMESTAMP,
-                    delivery_notes TEXT,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    secure_assignment_id VARCHAR(50) UNIQUE NOT NULL
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_delivery_assignments_order ON delivery_assignments(order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_delivery_assignments_rider ON delivery_assignments(rider_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_delivery_assignments_status ON delivery_assignments(status)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_delivery_assignments_date ON delivery_assignments(assigned_at)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_delivery_assignments_secure_id ON delivery_assignments(secure_assignment_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     def calculate_estimated_delivery(cls, assigned_at: datetime = None) -> datetime:
         """Calculate estimated delivery time (2-4 hours from assignment)"""
@@ -94,6 +61,7 @@ class DeliveryAssignment:
                          rejection_reason, estimated_delivery, actual_delivery, delivery_notes, 
                          created_at, updated_at, secure_assignment_id
             """, order_id, rider_id, estimated_delivery, delivery_notes, secure_assignment_id)
+            OrderTracking.invalidate(order_id)
             return cls(**dict(row))
 
     @classmethod
@@ -193,6 +161,7 @@ class DeliveryAssignment:
             """
             
             row = await conn.fetchrow(query, *values)
+            OrderTracking.invalidate(self.order_id)
             return DeliveryAssignment(**dict(row))
 
     async def update_estimated_delivery(self, estimated_delivery: datetime) -> 'DeliveryAssignment':
@@ -208,6 +177,7 @@ class DeliveryAssignment:
                          rejection_reason, estimated_delivery, actual_delivery, delivery_notes, 
                          created_at, updated_at, secure_assignment_id
             """, self.id, estimated_delivery)
+            OrderTracking.invalidate(self.order_id)
             return DeliveryAssignment(**dict(row))
 
     async def cancel(self, delivery_notes: str = None) -> 'DeliveryAssignment':
@@ -243,6 +213,7 @@ class DeliveryAssignment:
                          rejection_reason, estimated_delivery, actual_delivery, delivery_notes, 
                          created_at, updated_at, secure_assignment_id
             """, self.id, estimated_delivery)
+            OrderTracking.invalidate(self.order_id)
             if row:
                 return DeliveryAssignment(**dict(row))
             return None
@@ -260,6 +231,7 @@ class DeliveryAssignment:
                          rejection_reason, estimated_delivery, actual_delivery, delivery_notes, 
                          created_at, updated_at, secure_assignment_id
             """, self.id, rejection_reason)
+            OrderTracking.invalidate(self.order_id)
             if row:
                 return DeliveryAssignment(**dict(row))
             return None
@@ -269,6 +241,7 @@ class DeliveryAssignment:
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             result = await conn.execute("DELETE FROM delivery_assignments WHERE id = $1", self.id)
+            OrderTracking.invalidate(self.order_id)
             return result == "DELETE 1"
 
     def to_dict(self) -> Dict[str, Any]:
@@ -19,29 +19,6 @@ class Discount:
         self.start_date = start_date
         self.end_date = end_date
 
-    @classmethod
-    async def create_table(cls):
-        """Create discounts table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS discounts (
-                    id SERIAL PRIMARY KEY,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    discount_type VARCHAR(20) NOT NULL CHECK (discount_type IN ('percentage', 'fixed')),
-                    value DECIMAL(10,2) NOT NULL CHECK (value > 0),
-                    start_date DATE NOT NULL,
-                    end_date DATE NOT NULL CHECK (end_date >= start_date)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_discounts_product ON discounts(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_discounts_dates ON discounts(start_date, end_date)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_discounts_type ON discounts(discount_type)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, product_id: int, discount_type: str, value: float, 
                     start_date: date, end_date: date) -> 'Discount':
@@ -0,0 +1,117 @@
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+from app.database import get_db_connection
+
+class EmailOutbox:
+    def __init__(self, id: int, to_email: str, subject: str, html_body: str, text_body: str,
+                 kind: str, status: str, attempts: int, created_at: datetime,
+                 order_id: Optional[int] = None, last_error: Optional[str] = None,
+                 next_attempt_at: Optional[datetime] = None, sent_at: Optional[datetime] = None):
+        self.id = id
+        self.to_email = to_email
+        self.subject = subject
+        self.html_body = html_body
+        self.text_body = text_body
+        self.kind = kind
+        self.order_id = order_id
+        self.status = status
+        self.attempts = attempts
+        self.last_error = last_error
+        self.next_attempt_at = next_attempt_at
+        self.created_at = created_at
+        self.sent_at = sent_at
+
+    @classmethod
+    async def enqueue(cls, to_email: str, subject: str, html_body: str, text_body: str,
+                      kind: str, order_id: Optional[int] = None) -> int:
+        """Queue an email for the outbox worker; returns its id"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await conn.fetchval("""
+                INSERT INTO email_outbox (to_email, subject, html_body, text_body, kind, order_id)
+                VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING id
+            """, to_email, subject, html_body, text_body, kind, order_id)
+
+    @classmethod
+    async def claim_batch(cls, limit: int, sending_timeout_seconds: int) -> List['EmailOutbox']:
+        """
+        Mark up to ``limit`` due emails as sending and return them. Rows left in
+        'sending' longer than ``sending_timeout_seconds`` (a crashed worker) are
+        claimed again; SKIP LOCKED lets several workers share the outbox.
+        """
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                UPDATE email_outbox SET status = 'sending', attempts = attempts + 1, locked_at = NOW()
+                WHERE id IN (
+                    SELECT id FROM email_outbox
+                    WHERE (status = 'pending' AND next_attempt_at <= NOW())
+                       OR (status = 'sending' AND locked_at < NOW() - make_interval(secs => $2))
+                    ORDER BY next_attempt_at, id
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, to_email, subject, html_body, text_body, kind, order_id,
+                          status, attempts, last_error, next_attempt_at, created_at, sent_at
+            """, limit, sending_timeout_seconds)
+            return sorted((cls(**dict(row)) for row in rows), key=lambda email: email.id)
+
+    @classmethod
+    async def mark_sent(cls, email_ids: List[int]) -> None:
+        if not email_ids:
+            return
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE email_outbox
+                SET status = 'sent', sent_at = NOW(), locked_at = NULL, last_error = NULL
+                WHERE id = ANY($1::bigint[])
+            """, email_ids)
+
+    @classmethod
+    async def mark_failed(cls, failures: List[Tuple[int, str, Optional[float]]]) -> None:
+        """Record (id, error, retry_in_seconds) per email; None gives up on it.
+
+        The retry time is computed from the database's NOW(), the clock claim_batch compares against.
+        """
+        if not failures:
+            return
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            await conn.execute("""
+                UPDATE email_outbox e
+                SET status = CASE WHEN f.retry_in IS NULL THEN 'failed' ELSE 'pending' END,
+                    next_attempt_at = COALESCE(NOW() + f.retry_in * INTERVAL '1 second', e.next_attempt_at),
+                    last_error = f.error,
+                    locked_at = NULL
+                FROM unnest($1::bigint[], $2::text[], $3::float8[]) AS f(id, error, retry_in)
+                WHERE e.id = f.id
+            """,
+                [failure[0] for failure in failures],
+                [failure[1][:1000] for failure in failures],
+                [failure[2] for failure in failures]
+            )
+
+    @classmethod
+    async def get_status_counts(cls) -> Dict[str, int]:
+        """Number of outbox emails per status"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT status, COUNT(*) as count FROM email_outbox GROUP BY status")
+            return {row['status']: row['count'] for row in rows}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "to_email": self.to_email,
+            "subject": self.subject,
+            "kind": self.kind,
+            "order_id": self.order_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "next_attempt_at": self.next_attempt_at.isoformat() if self.next_attempt_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None
+        }
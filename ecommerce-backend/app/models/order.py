@@ -3,7 +3,59 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.database import get_db_connection
+from app.models.order_tracking import OrderTracking
+from app.models.product_copurchase import ProductCopurchase
 from app.utils.id_generator import id_generator
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_table_rows
+
+# Keyset cursor of get_all: (order_date, id), newest first
+CURSOR_KEY = "orders:order_date:desc"
+
+async def attach_order_details(conn, orders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Add ``items``, ``address`` and ``payment_method`` to order rows with one
+    query per kind (instead of three per order) and format ``order_date``
+    """
+    if not orders:
+        return orders
+    order_ids = [order['id'] for order in orders]
+    address_ids = list({order['address_id'] for order in orders if order['address_id'] is not None})
+    payment_ids = list({order['payment_id'] for order in orders if order['payment_id'] is not None})
+
+    items = await conn.fetch("""
+        SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price,
+               p.name as product_name,
+               COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as product_image
+        FROM order_items oi
+        LEFT JOIN products p ON oi.product_id = p.id
+        LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
+        WHERE oi.order_id = ANY($1::int[])
+        ORDER BY oi.order_id, oi.id
+    """, order_ids)
+    addresses = await conn.fetch("""
+        SELECT id, street, city, division, country, postal_code
+        FROM addresses
+        WHERE id = ANY($1::int[])
+    """, address_ids) if address_ids else []
+    payments = await conn.fetch("""
+        SELECT id, method_name
+        FROM payment_methods
+        WHERE id = ANY($1::int[])
+    """, payment_ids) if payment_ids else []
+
+    items_by_order: Dict[int, List[Dict[str, Any]]] = {order_id: [] for order_id in order_ids}
+    for item in items:
+        items_by_order[item['order_id']].append(dict(item))
+    address_by_id = {address['id']: dict(address) for address in addresses}
+    method_by_id = {payment['id']: payment['method_name'] for payment in payments}
+
+    for order in orders:
+        if isinstance(order.get('order_date'), datetime):
+            order['order_date'] = order['order_date'].isoformat()
+        order['items'] = items_by_order[order['id']]
+        order['address'] = address_by_id.get(order['address_id'])
+        order['payment_method'] = method_by_id.get(order['payment_id'])
+    return orders
 
 class Order:
     def __init__(self, id: int, customer_id: int, order_date: datetime, 
@@ -20,36 +72,6 @@ class Order:
         self.secure_order_id = secure_order_id or id_generator.generate_order_id()
         self.transaction_id = transaction_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create orders table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS orders (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    total_price DECIMAL(10,2) NOT NULL,
-                    address_id INTEGER NOT NULL REFERENCES addresses(id) ON DELETE CASCADE,
-                    payment_id INTEGER REFERENCES payment_methods(id) ON DELETE SET NULL,
-                    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'approved', 'shipped', 'delivered', 'cancelled')),
-                    secure_order_id VARCHAR(50) UNIQUE NOT NULL,
-                    transaction_id VARCHAR(100) UNIQUE
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_payment ON orders(payment_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_secure_id ON orders(secure_order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_total_price ON orders(total_price)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_address ON orders(address_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int, total_price: float, address_id: int, 
                     payment_id: Optional[int] = None, order_date: Optional[datetime] = None, status: str = 'pending') -> 'Order':
@@ -105,18 +127,42 @@ class Order:
             return [cls(**dict(row)) for row in rows]
 
     @classmethod
-    async def get_all(cls, skip: int = 0, limit: int = 100) -> List['Order']:
-        """Get all orders with pagination"""
+    async def get_all(cls, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List['Order']:
+        """Get all orders, newest first, by offset or by keyset cursor (see page_cursor)"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT id, customer_id, order_date, total_price, address_id, payment_id, status, secure_order_id, transaction_id
-                FROM orders 
-                ORDER BY order_date DESC
-                LIMIT $1 OFFSET $2
-            """, limit, skip)
+            if cursor:
+                order_date, order_id = decode_cursor(cursor, CURSOR_KEY, datetime, int)
+                rows = await conn.fetch("""
+                    SELECT id, customer_id, order_date, total_price, address_id, payment_id, status, secure_order_id, transaction_id
+                    FROM orders 
+                    WHERE (order_date, id) < ($1, $2)
+                    ORDER BY order_date DESC, id DESC
+                    LIMIT $3
+                """, order_date, order_id, limit)
+            else:
+                rows = await conn.fetch("""
+                    SELECT id, customer_id, order_date, total_price, address_id, payment_id, status, secure_order_id, transaction_id
+                    FROM orders 
+                    ORDER BY order_date DESC, id DESC
+                    LIMIT $1 OFFSET $2
+                """, limit, skip)
             return [cls(**dict(row)) for row in rows]
 
+    @classmethod
+    async def estimate_count(cls) -> int:
+        """Approximate number of orders from planner statistics"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await estimate_table_rows(conn, "orders")
+
+    @staticmethod
+    def page_cursor(orders: List['Order'], limit: int) -> Optional[str]:
+        """Cursor for the page after ``orders``, or None if this was the last page"""
+        if len(orders) < limit:
+            return None
+        return encode_cursor(CURSOR_KEY, orders[-1].order_date, orders[-1].id)
+
     @classmethod
     async def get_by_date_range(cls, start_date: datetime, end_date: datetime) -> List['Order']:
         """Get orders within date range"""
@@ -144,64 +190,26 @@ class Order:
             return [cls(**dict(row)) for row in rows]
 
     @classmethod
-    async def get_by_customer_id_with_details(cls, customer_id: int) -> List[Dict[str, Any]]:
-        """Get all orders for a customer with details"""
+    async def get_by_customer_id_with_details(cls, customer_id: int, skip: int = 0,
+                                              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a customer's orders, newest first, with items, address and payment method"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            # Get orders with basic info
             rows = await conn.fetch("""
                 SELECT o.id, o.customer_id, o.order_date, o.total_price, o.address_id, o.payment_id, o.status, o.secure_order_id, o.transaction_id
                 FROM orders o
                 WHERE o.customer_id = $1
-                ORDER BY o.order_date DESC
-            """, customer_id)
-            
-            orders_with_details = []
-            for row in rows:
-                order_data = dict(row)
-                
-                # Convert order_date to string if it's a datetime
-                if order_data.get('order_date') and isinstance(order_data['order_date'], datetime):
-                    order_data['order_date'] = order_data['order_date'].isoformat()
+                ORDER BY o.order_date DESC, o.id DESC
+                LIMIT $2 OFFSET $3
+            """, customer_id, limit, skip)
+            return await attach_order_details(conn, [dict(row) for row in rows])
 
-                # Get order items
-                items = await conn.fetch("""
-                    SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price,
-                           p.name as product_name,
-                           COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as product_image
-                    FROM order_items oi
-                    LEFT JOIN products p ON oi.product_id = p.id
-                    LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
-                    WHERE oi.order_id = $1
-                """, order_data['id'])
-                
-                order_data['items'] = [dict(item) for item in items]
-                
-                # Get address details
-                address = await conn.fetchrow("""
-                    SELECT id, street, city, division, country, postal_code
-                    FROM addresses
-                    WHERE id = $1
-                """, order_data['address_id'])
-                
-                order_data['address'] = dict(address) if address else None
-                
-                # Get payment method details
-                if order_data['payment_id']:
-                    payment = await conn.fetchrow("""
-                        SELECT id, method_name
-                        FROM payment_methods
-                        WHERE id = $1
-                    """, order_data['payment_id'])
-                    order_data['payment_method'] = payment['method_name'] if payment else None
-                else:
-                    order_data['payment_method'] = None
-                
-                # Status is already included from the database query
-                
-                orders_with_details.append(order_data)
-            
-            return orders_with_details
+    @classmethod
+    async def count_by_customer_id(cls, customer_id: int) -> int:
+        """Number of orders placed by a customer"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await conn.fetchval("SELECT COUNT(*) FROM orders WHERE customer_id = $1", customer_id)
 
     @classmethod
     async def get_by_id_with_details(cls, order_id: int) -> Optional[Dict[str, Any]]:
@@ -349,13 +357,17 @@ class Order:
             """
             
             row = await conn.fetchrow(query, *values)
+            OrderTracking.invalidate(self.id)
             return Order(**dict(row))
 
     async def delete(self) -> bool:
         """Delete order"""
+        if self.status != 'cancelled':
+            await ProductCopurchase.remove_order(self.id)
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             result = await conn.execute("DELETE FROM orders WHERE id = $1", self.id)
+            OrderTracking.invalidate(self.id)
             return result == "DELETE 1"
 
     def to_dict(self) -> Dict[str, Any]:
@@ -386,7 +398,13 @@ class Order:
                 WHERE id = $2
                 RETURNING id, customer_id, order_date, total_price, address_id, payment_id, status, secure_order_id, transaction_id
             """, new_status, self.id)
-            return Order(**dict(row))
+        OrderTracking.invalidate(self.id)
+        # Cancelled orders don't count towards "frequently bought together"
+        if new_status == 'cancelled' and self.status != 'cancelled':
+            await ProductCopurchase.remove_order(self.id)
+        elif self.status == 'cancelled' and new_status != 'cancelled':
+            await ProductCopurchase.add_order(self.id)
+        return Order(**dict(row))
     
     async def update_transaction_id(self, transaction_id: str) -> 'Order':
         """Update transaction ID"""
@@ -398,5 +416,6 @@ class Order:
                 WHERE id = $2
                 RETURNING id, customer_id, order_date, total_price, address_id, payment_id, status, secure_order_id, transaction_id
             """, transaction_id, self.id)
+            OrderTracking.invalidate(self.id)
             return Order(**dict(row))
 
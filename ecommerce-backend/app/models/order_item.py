@@ -11,29 +11,6 @@ class OrderItem:
         self.quantity = quantity
         self.price = price
 
-    @classmethod
-    async def create_table(cls):
-        """Create order_items table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS order_items (
-                    id SERIAL PRIMARY KEY,
-                    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    quantity INTEGER NOT NULL,
-                    price DECIMAL(10,2) NOT NULL
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_quantity ON order_items(quantity)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_price ON order_items(price)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, order_id: int, product_id: int, quantity: int, price: float) -> 'OrderItem':
         """Create a new order item"""
@@ -19,29 +19,6 @@ class OrderStatus:
         self.status = status
         self.update_date = update_date
 
-    @classmethod
-    async def create_table(cls):
-        """Create order_statuses table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS order_statuses (
-                    id SERIAL PRIMARY KEY,
-                    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                    admin_id INTEGER NOT NULL REFERENCES admins(id) ON DELETE CASCADE,
-                    status VARCHAR(20) NOT NULL CHECK (status IN ('pending', 'shipped', 'delivered', 'cancelled')),
-                    update_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_statuses_order ON order_statuses(order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_statuses_admin ON order_statuses(admin_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_statuses_status ON order_statuses(status)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_order_statuses_date ON order_statuses(update_date)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, order_id: int, admin_id: int, status: str, 
                     update_date: Optional[datetime] = None) -> 'OrderStatus':
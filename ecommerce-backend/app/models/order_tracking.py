@@ -0,0 +1,161 @@
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.database import get_db_connection
+
+SHIPPING_FIELDS = ("id", "order_id", "courier_service", "tracking_id", "estimated_delivery",
+                   "notes", "created_at", "updated_at")
+ASSIGNMENT_FIELDS = ("id", "order_id", "rider_id", "assigned_at", "status", "accepted_at", "rejected_at",
+                     "rejection_reason", "estimated_delivery", "actual_delivery", "delivery_notes",
+                     "created_at", "updated_at", "secure_assignment_id")
+ADDRESS_FIELDS = ("id", "customer_id", "street", "city", "division", "country", "postal_code")
+
+# Everything the tracking page shows, in one round trip. The latest assignment
+# wins if an order was reassigned after a rejection.
+TRACKING_QUERY = """
+    SELECT o.id, o.secure_order_id, o.status, o.order_date, o.total_price, o.transaction_id,
+           c.first_name, c.last_name, c.phone, u.email,
+           a.id AS address_id, a.customer_id AS address_customer_id, a.street AS address_street,
+           a.city AS address_city, a.division AS address_division, a.country AS address_country,
+           a.postal_code AS address_postal_code,
+           s.id AS shipping_id, s.order_id AS shipping_order_id, s.courier_service AS shipping_courier_service,
+           s.tracking_id AS shipping_tracking_id, s.estimated_delivery AS shipping_estimated_delivery,
+           s.notes AS shipping_notes, s.created_at AS shipping_created_at, s.updated_at AS shipping_updated_at,
+           da.id AS assignment_id, da.order_id AS assignment_order_id, da.rider_id AS assignment_rider_id,
+           da.assigned_at AS assignment_assigned_at, da.status AS assignment_status,
+           da.accepted_at AS assignment_accepted_at, da.rejected_at AS assignment_rejected_at,
+           da.rejection_reason AS assignment_rejection_reason,
+           da.estimated_delivery AS assignment_estimated_delivery,
+           da.actual_delivery AS assignment_actual_delivery, da.delivery_notes AS assignment_delivery_notes,
+           da.created_at AS assignment_created_at, da.updated_at AS assignment_updated_at,
+           da.secure_assignment_id AS assignment_secure_assignment_id,
+           r.id AS rider_id, r.vehicle_type AS rider_vehicle_type, r.delivery_zones AS rider_delivery_zones,
+           r.is_active AS rider_is_active, rc.id AS rider_customer_id, rc.first_name AS rider_first_name,
+           rc.last_name AS rider_last_name, rc.phone AS rider_phone, ru.email AS rider_email,
+           COALESCE((
+               SELECT json_agg(json_build_object(
+                   'id', oi.id, 'order_id', oi.order_id, 'product_id', oi.product_id,
+                   'quantity', oi.quantity, 'price', oi.price
+               ) ORDER BY oi.id)
+               FROM order_items oi WHERE oi.order_id = o.id
+           ), '[]') AS items
+    FROM orders o
+    LEFT JOIN customers c ON c.id = o.customer_id
+    LEFT JOIN users u ON u.id = c.user_id
+    LEFT JOIN addresses a ON a.id = o.address_id
+    LEFT JOIN shipping_info s ON s.order_id = o.id
+    LEFT JOIN LATERAL (
+        SELECT * FROM delivery_assignments
+        WHERE order_id = o.id
+        ORDER BY assigned_at DESC, id DESC
+        LIMIT 1
+    ) da ON true
+    LEFT JOIN riders r ON r.id = da.rider_id
+    LEFT JOIN customers rc ON rc.id = r.customer_id
+    LEFT JOIN users ru ON ru.id = r.user_id
+    WHERE o.secure_order_id = $1
+"""
+
+def _pick(row, prefix: str, fields: Tuple[str, ...]) -> Dict[str, Any]:
+    return {field: row[f"{prefix}_{field}"] for field in fields}
+
+class OrderTracking:
+    """Read model behind GET /orders/track/{secure_order_id}"""
+    # secure_order_id -> (expires_at, tracking data)
+    _cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    # order id -> secure_order_id, so mutators that only know the id can invalidate
+    _secure_ids: Dict[int, str] = {}
+    # Bumped by every invalidation; a load that overlapped one isn't cached
+    _generation = 0
+    stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @classmethod
+    async def load(cls, secure_order_id: str) -> Optional[Dict[str, Any]]:
+        """Build the tracking payload with a single query"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            row = await conn.fetchrow(TRACKING_QUERY, secure_order_id)
+        if not row:
+            return None
+
+        # Imported here: these models import OrderTracking to invalidate it
+        from app.models.address import Address
+        from app.models.delivery_assignment import DeliveryAssignment
+        from app.models.shipping import ShippingInfo
+
+        rider_info = None
+        if row['rider_id'] is not None:
+            has_customer = row['rider_customer_id'] is not None
+            rider_info = {
+                "id": row['rider_id'],
+                "name": f"{row['rider_first_name']} {row['rider_last_name']}".strip() if has_customer else "Unknown Rider",
+                "phone": row['rider_phone'],
+                "email": row['rider_email'],
+                "vehicle_type": row['rider_vehicle_type'],
+                "delivery_zones": row['rider_delivery_zones'],
+                "is_active": row['rider_is_active']
+            }
+
+        items = json.loads(row['items'])
+        for item in items:
+            item['price'] = float(item['price'])
+
+        return {
+            "order": {
+                "id": row['id'],
+                "secure_order_id": row['secure_order_id'],
+                "status": row['status'],
+                "order_date": row['order_date'].isoformat() if row['order_date'] else None,
+                "total_price": float(row['total_price']) if row['total_price'] is not None else 0.0,
+                "transaction_id": row['transaction_id']
+            },
+            "customer": {
+                "first_name": row['first_name'],
+                "last_name": row['last_name'],
+                "email": row['email'],
+                "phone": row['phone']
+            },
+            "address": Address(**_pick(row, "address", ADDRESS_FIELDS)).to_dict() if row['address_id'] is not None else None,
+            "items": items,
+            "shipping_info": ShippingInfo(**_pick(row, "shipping", SHIPPING_FIELDS)).to_dict() if row['shipping_id'] is not None else None,
+            "delivery_assignment": DeliveryAssignment(**_pick(row, "assignment", ASSIGNMENT_FIELDS)).to_dict() if row['assignment_id'] is not None else None,
+            "rider_info": rider_info
+        }
+
+    @classmethod
+    async def get(cls, secure_order_id: str) -> Optional[Dict[str, Any]]:
+        """Tracking payload, served from the short-lived cache when enabled"""
+        ttl = settings.ORDER_TRACKING_CACHE_TTL_SECONDS
+        cached = cls._cache.get(secure_order_id) if ttl > 0 else None
+        if cached and cached[0] > time.monotonic():
+            cls.stats["hits"] += 1
+            return cached[1]
+
+        cls.stats["misses"] += 1
+        generation = cls._generation
+        data = await cls.load(secure_order_id)
+        if data is not None and ttl > 0 and generation == cls._generation:
+            if len(cls._cache) >= settings.ORDER_TRACKING_CACHE_MAX_ORDERS:
+                # Evict the oldest entry (dicts keep insertion order)
+                evicted = next(iter(cls._cache))
+                cls._cache.pop(evicted, None)
+            cls._cache.pop(secure_order_id, None)
+            cls._cache[secure_order_id] = (time.monotonic() + ttl, data)
+            cls._secure_ids[data["order"]["id"]] = secure_order_id
+            if len(cls._secure_ids) > 2 * settings.ORDER_TRACKING_CACHE_MAX_ORDERS:
+                cls._secure_ids = {order_id: secure_id for order_id, secure_id in cls._secure_ids.items()
+                                   if secure_id in cls._cache}
+        return data
+
+    @classmethod
+    def invalidate(cls, order_id: int) -> None:
+        """Drop the cached payload for an order after its status, shipping or assignment changed"""
+        cls._generation += 1
+        secure_order_id = cls._secure_ids.pop(order_id, None)
+        if secure_order_id is not None and cls._cache.pop(secure_order_id, None) is not None:
+            cls.stats["invalidations"] += 1
+
+    @classmethod
+    def cache_size(cls) -> int:
+        return len(cls._cache)
@@ -19,28 +19,6 @@ class PaymentMethod:
         self.is_default = is_default
         self.type = type
 
-    @classmethod
-    async def create_table(cls):
-        """Create payment_methods table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS payment_methods (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    account_no VARCHAR NOT NULL,
-                    is_default BOOLEAN DEFAULT FALSE,
-                    type VARCHAR(20) NOT NULL CHECK (type IN ('credit_card', 'debit_card', 'paypal', 'upi'))
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_methods_customer ON payment_methods(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_methods_type ON payment_methods(type)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_methods_default ON payment_methods(is_default)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int, account_no: str, type: str, 
                     is_default: bool = False) -> 'PaymentMethod':
@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Sequence
+from app.database import get_db_connection
+
+CUSTOMER_SCORE_COLUMNS = (
+    "customer_id", "total_orders", "lifetime_value", "avg_order_value", "last_order_date",
+    "days_since_last_order", "days_since_registration", "expected_gap_days", "churn_probability",
+    "churn_risk", "activity_status", "customer_segment", "scored_at",
+)
+
+PRODUCT_FORECAST_COLUMNS = (
+    "product_id", "stock", "demand_last_30_days", "forecast_next_30_days", "seasonal_naive_next_30_days",
+    "avg_daily_demand", "days_of_cover", "inventory_turnover", "stock_status", "turnover_category", "scored_at",
+)
+
+class PredictiveScores:
+    """
+    Per-customer churn scores and per-product demand forecasts written by
+    PredictiveScoringService; the predictive dashboard pages through these
+    instead of scoring every customer and product per request.
+    """
+
+    @staticmethod
+    async def _replace(conn, table: str, columns: Sequence[str], records: List[tuple]) -> None:
+        # Readers see the previous run until this commits
+        async with conn.transaction():
+            await conn.execute(f"DELETE FROM {table}")
+            await conn.copy_records_to_table(table, records=records, columns=list(columns))
+
+    @classmethod
+    async def replace_customer_scores(cls, conn, records: List[tuple]) -> None:
+        """Swap in a full set of churn scores (tuples in CUSTOMER_SCORE_COLUMNS order)"""
+        await cls._replace(conn, "customer_churn_scores", CUSTOMER_SCORE_COLUMNS, records)
+
+    @classmethod
+    async def replace_product_forecasts(cls, conn, records: List[tuple]) -> None:
+        """Swap in a full set of demand forecasts (tuples in PRODUCT_FORECAST_COLUMNS order)"""
+        await cls._replace(conn, "product_demand_forecasts", PRODUCT_FORECAST_COLUMNS, records)
+
+    @classmethod
+    async def last_scored_at(cls) -> Optional[datetime]:
+        """When the scoring job last wrote results (UTC), or None if nothing is scored yet"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await conn.fetchval("""
+                SELECT GREATEST(
+                    (SELECT MAX(scored_at) FROM customer_churn_scores),
+                    (SELECT MAX(scored_at) FROM product_demand_forecasts)
+                )
+            """)
+
+    @classmethod
+    async def get_dashboard(cls, limit: int = 100, offset: int = 0) -> Dict[str, Any]:
+        """One page of churn scores and demand forecasts, plus the activity summaries"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            churn = await conn.fetch("""
+                SELECT s.customer_id as id, c.first_name, c.last_name, s.total_orders, s.lifetime_value,
+                       s.avg_order_value, COALESCE(s.days_since_last_order, 0) as days_since_last_order,
+                       s.days_since_registration, s.expected_gap_days, s.churn_probability, s.churn_risk,
+                       s.activity_status, s.customer_segment
+                FROM customer_churn_scores s
+                JOIN customers c ON s.customer_id = c.id
+                ORDER BY s.churn_probability DESC, s.lifetime_value DESC, s.customer_id
+                LIMIT $1 OFFSET $2
+            """, limit, offset)
+            demand = await conn.fetch("""
+                SELECT f.product_id as id, p.name, f.stock, f.demand_last_30_days, f.forecast_next_30_days,
+                       f.seasonal_naive_next_30_days, f.avg_daily_demand, f.days_of_cover,
+                       f.inventory_turnover, f.stock_status, f.turnover_category
+                FROM product_demand_forecasts f
+                JOIN products p ON f.product_id = p.id
+                ORDER BY f.forecast_next_30_days DESC, f.product_id
+                LIMIT $1 OFFSET $2
+            """, limit, offset)
+            activity = await conn.fetch("""
+                SELECT s.customer_id as id, c.first_name, c.last_name, s.total_orders, s.lifetime_value,
+                       COALESCE(s.last_order_date, c.created_at) as last_order_date,
+                       COALESCE(s.days_since_last_order, 0) as days_since_last_order,
+                       CASE WHEN s.total_orders = 0 THEN 'No Orders' ELSE s.activity_status END as activity_status
+                FROM customer_churn_scores s
+                JOIN customers c ON s.customer_id = c.id
+                ORDER BY days_since_last_order ASC, s.total_orders DESC
+                LIMIT 50
+            """)
+            distribution = await conn.fetch("""
+                SELECT CASE WHEN total_orders = 0 THEN 'No Orders' ELSE activity_status END as activity_status,
+                       COUNT(*) as customer_count,
+                       AVG(lifetime_value) as avg_lifetime_value,
+                       AVG(total_orders) as avg_orders
+                FROM customer_churn_scores
+                GROUP BY 1
+                ORDER BY customer_count DESC
+            """)
+            totals = await conn.fetchrow("""
+                SELECT (SELECT COUNT(*) FROM customer_churn_scores) as customers,
+                       (SELECT COUNT(*) FROM product_demand_forecasts) as products,
+                       (SELECT MAX(scored_at) FROM customer_churn_scores) as scored_at
+            """)
+        return {
+            "churn_prediction": [dict(row) for row in churn],
+            "customer_activity": [dict(row) for row in activity],
+            "activity_distribution": [dict(row) for row in distribution],
+            "demand_forecast": [dict(row) for row in demand],
+            "churn_prediction_total": totals['customers'],
+            "demand_forecast_total": totals['products'],
+            "scored_at": totals['scored_at'].isoformat() if totals['scored_at'] else None,
+        }
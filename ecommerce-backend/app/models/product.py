@@ -1,10 +1,53 @@
 # app/models/product.py
 
 import json
-from typing import List, Optional, Dict, Any
+import re
+from decimal import Decimal
+from typing import List, Optional, Dict, Any, Tuple
 from app.database import get_db_connection
 from app.models.product_tag import ProductTag
 from app.models.tag import Tag
+from app.utils.pagination import decode_cursor, keyset_condition, estimate_count
+
+# Sort expressions for product card listings, usable in ORDER BY and keyset predicates
+CARD_SORT_EXPRESSIONS = {
+    'name': 'p.name',
+    'price': 'p.price',
+    'rating': 'p.average_rating',
+}
+
+# Type of each card sort column's value in a keyset cursor
+CARD_SORT_TYPES = {
+    'name': str,
+    'price': Decimal,
+    'rating': Decimal,
+}
+
+# Weighted full-text document maintained on products.search_vector
+SEARCH_VECTOR_SQL = """
+    setweight(to_tsvector('simple', COALESCE(name, '')), 'A') ||
+    setweight(to_tsvector('simple', COALESCE(brand, '')), 'B') ||
+    setweight(to_tsvector('simple', COALESCE(material, '')), 'C') ||
+    setweight(to_tsvector('simple', COALESCE(description, '')), 'D')
+"""
+
+def build_prefix_tsquery(search_term: str) -> Optional[str]:
+    """Turn free text into a prefix tsquery, e.g. 'blue sh' -> 'blue:* & sh:*'"""
+    tokens = re.findall(r"\w+", search_term.lower())
+    if not tokens:
+        return None
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+def build_search_filter(search_term: str, param_start: int = 1) -> Tuple[str, str, List[Any]]:
+    """Build the product search condition, its rank expression and parameters.
+
+    Matches word prefixes through the GIN-indexed search_vector, and substrings
+    of the name through the pg_trgm index so 'phone' still finds 'Smartphone'.
+    """
+    tsquery = f"to_tsquery('simple', ${param_start})"
+    condition = f"(p.search_vector @@ {tsquery} OR p.name ILIKE ${param_start + 1})"
+    rank = f"COALESCE(ts_rank(p.search_vector, {tsquery}), 0)"
+    return condition, rank, [build_prefix_tsquery(search_term), f"%{search_term}%"]
 
 class Product:
     def __init__(self, id: int, name: str, description: str, price: float, stock: int, 
@@ -12,7 +55,9 @@ class Product:
                  colors: Optional[List[str]] = None, sizes: Optional[List[str]] = None,
                  care_instructions: Optional[str] = None, features: Optional[List[str]] = None,
                  specifications: Optional[Dict[str, Any]] = None, views: int = 0,
-                 purchase_count: int = 0, add_to_cart_count: int = 0):
+                 purchase_count: int = 0, add_to_cart_count: int = 0,
+                 average_rating: float = 0.0, rating_count: int = 0,
+                 rating_histogram: Optional[List[int]] = None):
         self.id = id
         self.name = name
         self.description = description
@@ -28,42 +73,10 @@ class Product:
         self.views = views
         self.purchase_count = purchase_count
         self.add_to_cart_count = add_to_cart_count
-
-    @classmethod
-    async def create_table(cls):
-        """Create products table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS products (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR NOT NULL,
-                    description TEXT NOT NULL,
-                    price DECIMAL(10,2) NOT NULL,
-                    stock INTEGER NOT NULL DEFAULT 0,
-                    brand VARCHAR(100),
-                    material TEXT,
-                    colors JSONB DEFAULT '[]',
-                    sizes JSONB DEFAULT '[]',
-                    care_instructions TEXT,
-                    features JSONB DEFAULT '[]',
-                    specifications JSONB DEFAULT '{}',
-                    views INTEGER DEFAULT 0,
-                    purchase_count INTEGER DEFAULT 0,
-                    add_to_cart_count INTEGER DEFAULT 0
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_name ON products(name)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_price ON products(price)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_brand ON products(brand)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_views ON products(views)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_purchase_count ON products(purchase_count)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_products_add_to_cart_count ON products(add_to_cart_count)")
-            except Exception as e:
-                pass
+        self.average_rating = average_rating
+        self.rating_count = rating_count
+        # Review counts per star, index 0 = 1 star ... index 4 = 5 stars
+        self.rating_histogram = rating_histogram or [0, 0, 0, 0, 0]
 
     @classmethod
     async def create(cls, name: str, description: str, price: float, stock: int = 0,
@@ -101,7 +114,8 @@ class Product:
             row = await conn.fetchrow("""
                 SELECT id, name, description, price, stock, brand, material, 
                        colors, sizes, care_instructions, features, specifications,
-                       views, purchase_count, add_to_cart_count
+                       views, purchase_count, add_to_cart_count,
+                       average_rating, rating_count, rating_histogram
                 FROM products WHERE id = $1
             """, product_id)
             return cls(**dict(row)) if row else None
@@ -133,16 +147,17 @@ class Product:
 
     @classmethod
     async def search_by_name(cls, search_term: str) -> List['Product']:
-        """Search products by name"""
+        """Search products by name, brand, material and description"""
+        search_condition, _, params = build_search_filter(search_term)
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
+            rows = await conn.fetch(f"""
                 SELECT id, name, description, price, stock, brand, material, 
                        colors, sizes, care_instructions, features, specifications
-                FROM products 
-                WHERE name ILIKE $1
+                FROM products p
+                WHERE {search_condition}
                 ORDER BY name
-            """, f"%{search_term}%")
+            """, *params)
             return [cls(**dict(row)) for row in rows]
 
     @classmethod
@@ -173,11 +188,26 @@ class Product:
             """)
             return [cls(**dict(row)) for row in rows]
 
+    @staticmethod
+    def card_cursor_key(sort_by: str, sort_order: str) -> str:
+        """Cursor key of a product card listing, so a cursor only resumes the sort it came from"""
+        return f"products:{sort_by}:{sort_order.lower()}"
+
     @classmethod
     async def get_products_for_card(cls, limit: int = 20, offset: int = 0, 
                                    sort_by: str = 'name', sort_order: str = 'asc',
-                                   min_price: float = None, max_price: float = None) -> List[Dict[str, Any]]:
-        """Get products with all information needed for ProductCard component"""
+                                   min_price: float = None, max_price: float = None,
+                                   cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get products with all information needed for ProductCard component.
+
+        When ``cursor`` is given (see ``app.utils.pagination``), the page starts
+        right after the cursor row and ``offset`` is ignored.
+        """
+        if sort_by not in CARD_SORT_EXPRESSIONS:
+            sort_by, sort_order = 'name', 'asc'
+        sort_expression = CARD_SORT_EXPRESSIONS[sort_by]
+        descending = sort_order.lower() == 'desc'
+        
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             # Build WHERE clause
@@ -195,19 +225,20 @@ class Product:
                 where_conditions.append(f"p.price <= ${param_count}")
                 params.append(max_price)
             
+            # Seek past the cursor row instead of scanning and discarding earlier pages
+            if cursor:
+                params.extend(decode_cursor(cursor, cls.card_cursor_key(sort_by, sort_order), CARD_SORT_TYPES[sort_by], int))
+                condition = keyset_condition([sort_expression, "p.id"], descending, param_count + 1)
+                param_count += 2
+                offset = 0
+                where_conditions.append(condition)
+            
             # Build WHERE clause string
             where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
             
-            # Build ORDER BY clause
-            order_clause = "ORDER BY "
-            if sort_by == 'price':
-                order_clause += f"p.price {sort_order.upper()}"
-            elif sort_by == 'name':
-                order_clause += f"p.name {sort_order.upper()}"
-            elif sort_by == 'rating':
-                order_clause += f"rating {sort_order.upper()}"
-            else:
-                order_clause += "p.name ASC"
+            # Build ORDER BY clause; id breaks ties so cursors are stable
+            direction = "DESC" if descending else "ASC"
+            order_clause = f"ORDER BY {sort_expression} {direction}, p.id {direction}"
             
             # Add limit and offset
             param_count += 1
@@ -222,17 +253,15 @@ class Product:
                     p.stock,
                     COALESCE(pi.image_url, 'https://via.placeholder.com/300x300?text=No+Image') as image,
                     COALESCE(d.value / 100.0, 0.0) as discount,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COALESCE(COUNT(r.id), 0) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
                     AND d.discount_type = 'percentage'
-                LEFT JOIN reviews r ON p.id = r.product_id
                 {where_clause}
-                GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, d.value
                 {order_clause}
                 LIMIT ${param_count} OFFSET ${param_count + 1}
             """
@@ -241,8 +270,9 @@ class Product:
             return [dict(row) for row in rows]
 
     @classmethod
-    async def get_products_count(cls, min_price: float = None, max_price: float = None) -> int:
-        """Get total count of products for pagination"""
+    async def get_products_count(cls, min_price: float = None, max_price: float = None,
+                                 approximate: bool = False) -> int:
+        """Get total count of products for pagination, optionally estimated from planner statistics"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             # Build WHERE clause
@@ -263,8 +293,11 @@ class Product:
             # Build WHERE clause string
             where_clause = f"WHERE {' AND '.join(where_conditions)}" if where_conditions else ""
             
+            if approximate:
+                return await estimate_count(conn, f"SELECT p.id FROM products p {where_clause}", *params)
+            
             query = f"""
-                SELECT COUNT(DISTINCT p.id) as total
+                SELECT COUNT(*) as total
                 FROM products p
                 {where_clause}
             """
@@ -278,9 +311,9 @@ class Product:
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             # Build WHERE clause
-            where_conditions = ["p.name ILIKE $1"]
-            params = [f"%{search_term}%"]
-            param_count = 1
+            search_condition, _, params = build_search_filter(search_term)
+            where_conditions = [search_condition]
+            param_count = len(params)
             
             if min_price is not None:
                 param_count += 1
@@ -315,17 +348,15 @@ class Product:
                     p.stock,
                     COALESCE(pi.image_url, 'https://via.placeholder.com/300x300?text=No+Image') as image,
                     COALESCE(d.value / 100.0, 0.0) as discount,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COALESCE(COUNT(r.id), 0) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
                     AND d.discount_type = 'percentage'
-                LEFT JOIN reviews r ON p.id = r.product_id
                 WHERE p.id = $1
-                GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, d.value
             """, product_id)
             if not row:
                 return None
@@ -335,17 +366,71 @@ class Product:
             product['category'] = tags[0] if tags else None
             return product
 
+    @classmethod
+    async def get_products_for_card_bulk(cls, product_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get ProductCard data (including category) for many products in one query.
+
+        Results keep the order of ``product_ids``; unknown IDs are skipped.
+        """
+        if not product_ids:
+            return []
+
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT
+                    p.id,
+                    p.name,
+                    p.description,
+                    p.price,
+                    p.stock,
+                    COALESCE(pi.image_url, 'https://via.placeholder.com/300x300?text=No+Image') as image,
+                    COALESCE(d.value / 100.0, 0.0) as discount,
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews,
+                    t.tag_name as category
+                FROM unnest($1::int[]) WITH ORDINALITY AS ids(id, position)
+                JOIN products p ON p.id = ids.id
+                LEFT JOIN LATERAL (
+                    SELECT image_url FROM product_images
+                    WHERE product_id = p.id AND is_primary = TRUE
+                    LIMIT 1
+                ) pi ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT value FROM discounts
+                    WHERE product_id = p.id
+                        AND start_date <= CURRENT_DATE
+                        AND end_date >= CURRENT_DATE
+                        AND discount_type = 'percentage'
+                    LIMIT 1
+                ) d ON TRUE
+                LEFT JOIN LATERAL (
+                    SELECT tg.tag_name
+                    FROM product_tags pt
+                    JOIN tags tg ON pt.tag_id = tg.id
+                    WHERE pt.product_id = p.id
+                    ORDER BY pt.id
+                    LIMIT 1
+                ) t ON TRUE
+                ORDER BY ids.position
+            """, list(product_ids))
+            return [dict(row) for row in rows]
+
     @classmethod
     async def search_products_for_card(cls, search_term: str, limit: int = 20, offset: int = 0, 
                                       sort_by: str = 'name', sort_order: str = 'asc',
                                       min_price: float = None, max_price: float = None) -> List[Dict[str, Any]]:
-        """Search products with all information needed for ProductCard component"""
+        """Search products with all information needed for ProductCard component.
+
+        Each row carries ``total_count`` (all matches, ignoring limit/offset)
+        so callers don't need a separate count query.
+        """
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             # Build WHERE clause
-            where_conditions = ["p.name ILIKE $1"]
-            params = [f"%{search_term}%"]
-            param_count = 1
+            search_condition, rank_expression, params = build_search_filter(search_term)
+            where_conditions = [search_condition]
+            param_count = len(params)
             
             if min_price is not None:
                 param_count += 1
@@ -365,6 +450,8 @@ class Product:
                 order_clause += f"p.name {sort_order.upper()}"
             elif sort_by == 'rating':
                 order_clause += f"rating {sort_order.upper()}"
+            elif sort_by == 'relevance':
+                order_clause += "relevance DESC, p.name ASC"
             else:
                 order_clause += "p.name ASC"
             
@@ -381,17 +468,17 @@ class Product:
                     p.stock,
                     COALESCE(pi.image_url, 'https://via.placeholder.com/300x300?text=No+Image') as image,
                     COALESCE(d.value / 100.0, 0.0) as discount,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COALESCE(COUNT(r.id), 0) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews,
+                    {rank_expression} as relevance,
+                    COUNT(*) OVER() as total_count
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
                     AND d.discount_type = 'percentage'
-                LEFT JOIN reviews r ON p.id = r.product_id
                 WHERE {' AND '.join(where_conditions)}
-                GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, d.value
                 {order_clause}
                 LIMIT ${param_count} OFFSET ${param_count + 1}
             """
@@ -425,19 +512,15 @@ class Product:
                     p.specifications,
                     COALESCE(pi.image_url, 'https://via.placeholder.com/300x300?text=No+Image') as image,
                     COALESCE(d.value / 100.0, 0.0) as discount,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COALESCE(COUNT(r.id), 0) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
                     AND d.discount_type = 'percentage'
-                LEFT JOIN reviews r ON p.id = r.product_id
                 WHERE p.id IN ({placeholders})
-                GROUP BY p.id, p.name, p.price, p.stock, p.brand, p.material, 
-                         p.colors, p.sizes, p.care_instructions, p.features, 
-                         p.specifications, pi.image_url, d.value
                 ORDER BY p.id
             """
             
@@ -504,14 +587,13 @@ class Product:
                     p.stock,
                     pi.image_url as image,
                     COALESCE(d.value, 0) / 100.0 as discount,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COUNT(r.id) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
-                LEFT JOIN reviews r ON p.id = r.product_id
                 WHERE d.value > 0
                 GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, discount
                 ORDER BY discount DESC
@@ -534,14 +616,13 @@ class Product:
                     p.stock,
                     pi.image_url as image,
                     COALESCE(d.value, 0) / 100.0 as discount,
-                    COALESCE(AVG(r.rating), 0) as rating,
-                    COUNT(r.id) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
-                LEFT JOIN reviews r ON p.id = r.product_id
                 WHERE d.value > 0
                 GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, discount
                 ORDER BY discount DESC
@@ -564,15 +645,14 @@ class Product:
                     p.stock,
                     pi.image_url as image,
                     COALESCE(d.value, 0) / 100.0 as discount,
-                    COALESCE(AVG(r.rating), 0) as rating,
-                    COUNT(r.id) as total_reviews,
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews,
                     COALESCE(SUM(oi.quantity), 0) as total_sold
                 FROM products p
                 LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
                 LEFT JOIN discounts d ON p.id = d.product_id 
                     AND d.start_date <= CURRENT_DATE 
                     AND d.end_date >= CURRENT_DATE
-                LEFT JOIN reviews r ON p.id = r.product_id
                 LEFT JOIN order_items oi ON p.id = oi.product_id
                 LEFT JOIN orders o ON oi.order_id = o.id AND o.status != 'cancelled'
                 GROUP BY p.id, p.name, p.description, p.price, p.stock, pi.image_url, discount
@@ -587,38 +667,27 @@ class Product:
         """Get products frequently bought together with the given product"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
+            # Partners come from the precomputed product_copurchase counts (see ProductCopurchase)
             rows = await conn.fetch("""
-                WITH product_orders AS (
-                    -- Get all orders that contain the target product
-                    SELECT DISTINCT oi.order_id
-                    FROM order_items oi
-                    WHERE oi.product_id = $1
-                ),
-                frequently_bought AS (
-                    -- Get other products from those orders
-                    SELECT DISTINCT
-                        p.id,
-                        p.name,
-                        p.price,
-                        p.description,
-                        COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as image,
-                        p.stock,
-                        p.average_rating as rating,
-                        p.brand,
-                        p.material,
-                        COALESCE(d.value, 0) as discount,
-                        COUNT(*) as co_occurrence_count
-                    FROM order_items oi
-                    JOIN products p ON oi.product_id = p.id
-                    LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
-                    LEFT JOIN discounts d ON p.id = d.product_id AND d.start_date <= CURRENT_DATE AND d.end_date >= CURRENT_DATE
-                    WHERE oi.order_id IN (SELECT order_id FROM product_orders)
-                    AND oi.product_id != $1  -- Exclude the target product itself
-                    AND p.stock > 0  -- Only in-stock products
-                    GROUP BY p.id, p.name, p.price, p.description, pi.image_url, p.stock, p.average_rating, p.brand, p.material, d.value
-                )
-                SELECT * FROM frequently_bought
-                ORDER BY co_occurrence_count DESC, rating DESC, id
+                SELECT
+                    p.id,
+                    p.name,
+                    p.price,
+                    p.description,
+                    COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as image,
+                    p.stock,
+                    p.average_rating as rating,
+                    p.brand,
+                    p.material,
+                    COALESCE(d.value, 0) as discount,
+                    pc.count as co_occurrence_count
+                FROM product_copurchase pc
+                JOIN products p ON pc.product_b = p.id
+                LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
+                LEFT JOIN discounts d ON p.id = d.product_id AND d.start_date <= CURRENT_DATE AND d.end_date >= CURRENT_DATE
+                WHERE pc.product_a = $1
+                AND p.stock > 0  -- Only in-stock products
+                ORDER BY pc.count DESC, p.average_rating DESC, p.id
                 LIMIT $2
             """, product_id, limit)
             
@@ -0,0 +1,191 @@
+from typing import List, Dict, Any
+from app.database import get_db_connection
+
+# Distinct products per order, so a product listed twice still counts once
+ORDER_PRODUCTS_SQL = "SELECT DISTINCT product_id FROM order_items WHERE order_id = $1"
+
+# Both directions of every pair in one order; sorted so concurrent upserts lock rows in the same order
+ORDER_PAIRS_SQL = f"""
+    WITH products AS ({ORDER_PRODUCTS_SQL})
+    SELECT a.product_id AS product_a, b.product_id AS product_b
+    FROM products a JOIN products b ON a.product_id <> b.product_id
+    ORDER BY 1, 2
+"""
+
+# Both directions of the pairs one product forms with the rest of its order
+PRODUCT_PAIRS_SQL = """
+    WITH others AS (
+        SELECT DISTINCT product_id FROM order_items WHERE order_id = $1 AND product_id <> $2
+    )
+    SELECT product_a, product_b FROM (
+        SELECT $2::int AS product_a, product_id AS product_b FROM others
+        UNION ALL
+        SELECT product_id, $2::int FROM others
+    ) pairs
+    ORDER BY 1, 2
+"""
+
+# Rebuilt counts minus the current ones, both read in one snapshot; applied as deltas so increments
+# committed after the snapshot are kept and not counted twice
+CORRECTION_SQL = """
+    CREATE TEMP TABLE copurchase_correction AS
+    SELECT product_a, product_b, SUM(count)::int AS delta, MAX(last_seen) AS last_seen
+    FROM (
+        SELECT a.product_id AS product_a, b.product_id AS product_b, COUNT(*) AS count, MAX(o.order_date) AS last_seen
+        FROM orders o
+        JOIN (SELECT DISTINCT order_id, product_id FROM order_items) a ON a.order_id = o.id
+        JOIN (SELECT DISTINCT order_id, product_id FROM order_items) b
+            ON b.order_id = o.id AND a.product_id <> b.product_id
+        WHERE o.status <> 'cancelled'
+        GROUP BY a.product_id, b.product_id
+        UNION ALL
+        SELECT product_a, product_b, -count, NULL FROM product_copurchase
+    ) c
+    GROUP BY product_a, product_b
+    HAVING SUM(count) <> 0
+"""
+
+# Caps how long an order request waits on co-purchase row locks; a skipped update is repaired by the rebuild
+INCREMENTAL_LOCK_TIMEOUT = "1s"
+
+# Most frequent pairs overall, each pair once: $1 = limit, $2 = minimum count
+TOP_PAIRS_SQL = """
+    SELECT pc.product_a as product1, p1.name as product1_name,
+           pc.product_b as product2, p2.name as product2_name,
+           pc.count as frequency
+    FROM product_copurchase pc
+    JOIN products p1 ON pc.product_a = p1.id
+    JOIN products p2 ON pc.product_b = p2.id
+    WHERE pc.product_a < pc.product_b AND pc.count >= $2
+    ORDER BY pc.count DESC
+    LIMIT $1
+"""
+
+class ProductCopurchase:
+    """
+    How many (non-cancelled) orders contain each pair of products. Both
+    directions are stored so a product's top partners are one index range
+    scan; order changes adjust the counts and ProductCopurchaseService
+    periodically recounts them to correct any drift.
+    """
+
+    @staticmethod
+    async def _increment(conn, pairs_sql: str, *params) -> None:
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL lock_timeout = '{INCREMENTAL_LOCK_TIMEOUT}'")
+            await conn.execute(f"""
+                INSERT INTO product_copurchase (product_a, product_b, count, last_seen)
+                SELECT product_a, product_b, 1, NOW() FROM ({pairs_sql}) pairs
+                ON CONFLICT (product_a, product_b) DO UPDATE
+                SET count = product_copurchase.count + 1, last_seen = NOW()
+            """, *params)
+
+    @staticmethod
+    async def _decrement(conn, pairs_sql: str, *params) -> None:
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL lock_timeout = '{INCREMENTAL_LOCK_TIMEOUT}'")
+            rows = await conn.fetch(f"""
+                UPDATE product_copurchase pc SET count = pc.count - 1
+                FROM ({pairs_sql}) pairs
+                WHERE pc.product_a = pairs.product_a AND pc.product_b = pairs.product_b
+                RETURNING pc.product_a
+            """, *params)
+            if rows:
+                await conn.execute("""
+                    DELETE FROM product_copurchase
+                    WHERE product_a = ANY($1::int[]) AND count <= 0
+                """, list({row['product_a'] for row in rows}))
+
+    @classmethod
+    async def add_order(cls, order_id: int) -> None:
+        """Count the pairs in a newly placed (or un-cancelled) order"""
+        try:
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                await cls._increment(conn, ORDER_PAIRS_SQL, order_id)
+        except Exception as e:
+            # Derived data: the periodic rebuild repairs anything missed here
+            print(f"Warning: Could not update co-purchase counts for order {order_id}: {e}")
+
+    @classmethod
+    async def remove_order(cls, order_id: int) -> None:
+        """Uncount the pairs of an order that was cancelled or is about to be deleted"""
+        try:
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                await cls._decrement(conn, ORDER_PAIRS_SQL, order_id)
+        except Exception as e:
+            print(f"Warning: Could not update co-purchase counts for order {order_id}: {e}")
+
+    @classmethod
+    async def _apply_product(cls, order_id: int, product_id: int, added: bool) -> None:
+        try:
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                # Only the first row of a product in the order adds pairs, and only the last one removes them
+                rows, status = await conn.fetchrow("""
+                    SELECT (SELECT COUNT(*) FROM order_items WHERE order_id = $1 AND product_id = $2),
+                           (SELECT status FROM orders WHERE id = $1)
+                """, order_id, product_id)
+                if rows != 1 or status is None or status == 'cancelled':
+                    return
+                if added:
+                    await cls._increment(conn, PRODUCT_PAIRS_SQL, order_id, product_id)
+                else:
+                    await cls._decrement(conn, PRODUCT_PAIRS_SQL, order_id, product_id)
+        except Exception as e:
+            print(f"Warning: Could not update co-purchase counts for order {order_id}: {e}")
+
+    @classmethod
+    async def add_product(cls, order_id: int, product_id: int) -> None:
+        """Count the pairs formed by an item just added to an existing order"""
+        await cls._apply_product(order_id, product_id, added=True)
+
+    @classmethod
+    async def remove_product(cls, order_id: int, product_id: int) -> None:
+        """Uncount the pairs of an item about to be removed from an order"""
+        await cls._apply_product(order_id, product_id, added=False)
+
+    @classmethod
+    async def rebuild(cls) -> int:
+        """Bring every pair in line with order history; returns the number of pairs corrected.
+
+        The expensive recount runs against a snapshot without locking the
+        table, and the difference is then added to the live counts, so
+        incremental updates never wait for the recount.
+        """
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            try:
+                async with conn.transaction(isolation='repeatable_read'):
+                    await conn.execute(CORRECTION_SQL)
+                async with conn.transaction():
+                    # Sorted like the incremental upserts so the two lock rows in the same order
+                    result = await conn.execute("""
+                        INSERT INTO product_copurchase (product_a, product_b, count, last_seen)
+                        SELECT c.product_a, c.product_b, c.delta, COALESCE(c.last_seen, '-infinity')
+                        FROM copurchase_correction c
+                        WHERE EXISTS (SELECT 1 FROM products WHERE id = c.product_a)
+                        AND EXISTS (SELECT 1 FROM products WHERE id = c.product_b)
+                        ORDER BY c.product_a, c.product_b
+                        ON CONFLICT (product_a, product_b) DO UPDATE
+                        SET count = product_copurchase.count + EXCLUDED.count,
+                            last_seen = GREATEST(product_copurchase.last_seen, EXCLUDED.last_seen)
+                    """)
+                    await conn.execute("""
+                        DELETE FROM product_copurchase pc
+                        USING copurchase_correction c
+                        WHERE c.delta < 0 AND pc.product_a = c.product_a AND pc.product_b = c.product_b
+                        AND pc.count <= 0
+                    """)
+            finally:
+                await conn.execute("DROP TABLE IF EXISTS pg_temp.copurchase_correction")
+            return int(result.split()[-1])
+
+    @classmethod
+    async def get_top_pairs(cls, limit: int = 20, min_count: int = 2) -> List[Dict[str, Any]]:
+        """Most frequent product pairs overall (each pair once)"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            rows = await conn.fetch(TOP_PAIRS_SQL, limit, min_count)
+            return [dict(row) for row in rows]
@@ -10,26 +10,6 @@ class ProductImage:
         self.image_url = image_url
         self.is_primary = is_primary
 
-    @classmethod
-    async def create_table(cls):
-        """Create product_images table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS product_images (
-                    id SERIAL PRIMARY KEY,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    image_url VARCHAR NOT NULL,
-                    is_primary BOOLEAN DEFAULT FALSE
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_images_product ON product_images(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_images_primary ON product_images(is_primary)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, product_id: int, image_url: str, is_primary: bool = False) -> 'ProductImage':
         """Create a new product image"""
@@ -9,26 +9,6 @@ class ProductTag:
         self.product_id = product_id
         self.tag_id = tag_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create product_tags table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS product_tags (
-                    id SERIAL PRIMARY KEY,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
-                    UNIQUE(product_id, tag_id)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_tags_product ON product_tags(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_product_tags_tag ON product_tags(tag_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, product_id: int, tag_id: int) -> 'ProductTag':
         """Create a new product-tag association"""
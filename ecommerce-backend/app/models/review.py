@@ -12,31 +12,6 @@ class Review:
         self.customer_id = customer_id
         self.product_id = product_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create reviews table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS reviews (
-                    id SERIAL PRIMARY KEY,
-                    rating INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
-                    comment TEXT,
-                    review_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    UNIQUE(customer_id, product_id)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_customer ON reviews(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_product ON reviews(product_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_rating ON reviews(rating)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews(review_date)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int, product_id: int, rating: int, 
                     comment: Optional[str] = None, review_date: Optional[datetime] = None) -> 'Review':
@@ -133,11 +108,9 @@ class Review:
         """Get average rating for a product"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            result = await conn.fetchval("""
-                SELECT COALESCE(AVG(rating), 0)
-                FROM reviews 
-                WHERE product_id = $1
-            """, product_id)
+            result = await conn.fetchval(
+                "SELECT average_rating FROM products WHERE id = $1", product_id
+            )
             return float(result) if result else 0.0
 
     @classmethod
@@ -145,11 +118,9 @@ class Review:
         """Get number of reviews for a product"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            result = await conn.fetchval("""
-                SELECT COUNT(*)
-                FROM reviews 
-                WHERE product_id = $1
-            """, product_id)
+            result = await conn.fetchval(
+                "SELECT rating_count FROM products WHERE id = $1", product_id
+            )
             return int(result) if result else 0
 
     @classmethod
@@ -157,14 +128,10 @@ class Review:
         """Get rating distribution for a product"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT rating, COUNT(*) as count
-                FROM reviews 
-                WHERE product_id = $1
-                GROUP BY rating
-                ORDER BY rating
-            """, product_id)
-            return {row['rating']: row['count'] for row in rows}
+            histogram = await conn.fetchval(
+                "SELECT rating_histogram FROM products WHERE id = $1", product_id
+            )
+            return {star: count for star, count in enumerate(histogram or [], start=1) if count}
 
     async def update(self, rating: int = None, comment: str = None) -> 'Review':
         """Update review fields"""
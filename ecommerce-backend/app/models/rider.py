@@ -1,6 +1,10 @@
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.database import get_db_connection
+from app.utils.pagination import decode_cursor, encode_cursor, estimate_table_rows
+
+# Keyset cursor of get_all: (created_at, id), newest first
+CURSOR_KEY = "riders:created_at:desc"
 
 class Rider:
     def __init__(self, id: int, user_id: int, customer_id: int, is_active: bool, 
@@ -18,36 +22,6 @@ class Rider:
         self.created_at = created_at
         self.updated_at = updated_at
 
-    @classmethod
-    async def create_table(cls):
-        """Create riders table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS riders (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE,
-                    is_active BOOLEAN NOT NULL DEFAULT true,
-                    vehicle_type VARCHAR(50) NOT NULL,
-                    vehicle_number VARCHAR(20),
-                    delivery_zones TEXT[] NOT NULL DEFAULT '{}',
-
-                    total_deliveries INTEGER NOT NULL DEFAULT 0,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_riders_user_id ON riders(user_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_riders_customer_id ON riders(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_riders_active ON riders(is_active)")
-
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_riders_zones ON riders USING GIN(delivery_zones)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, user_id: int, customer_id: int, vehicle_type: str, 
                     vehicle_number: str = None, delivery_zones: List[str] = None) -> 'Rider':
@@ -131,19 +105,44 @@ class Rider:
             return [cls(**dict(row)) for row in rows]
 
     @classmethod
-    async def get_all(cls, skip: int = 0, limit: int = 100) -> List['Rider']:
-        """Get all riders with pagination"""
+    async def get_all(cls, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List['Rider']:
+        """Get all riders, newest first, by offset or by keyset cursor (see page_cursor)"""
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            rows = await conn.fetch("""
-                SELECT id, user_id, customer_id, is_active, vehicle_type, vehicle_number,
-                       delivery_zones, total_deliveries, created_at, updated_at
-                FROM riders 
-                ORDER BY created_at DESC
-                LIMIT $1 OFFSET $2
-            """, limit, skip)
+            if cursor:
+                created_at, rider_id = decode_cursor(cursor, CURSOR_KEY, datetime, int)
+                rows = await conn.fetch("""
+                    SELECT id, user_id, customer_id, is_active, vehicle_type, vehicle_number,
+                           delivery_zones, total_deliveries, created_at, updated_at
+                    FROM riders 
+                    WHERE (created_at, id) < ($1, $2)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT $3
+                """, created_at, rider_id, limit)
+            else:
+                rows = await conn.fetch("""
+                    SELECT id, user_id, customer_id, is_active, vehicle_type, vehicle_number,
+                           delivery_zones, total_deliveries, created_at, updated_at
+                    FROM riders 
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT $1 OFFSET $2
+                """, limit, skip)
             return [cls(**dict(row)) for row in rows]
 
+    @classmethod
+    async def estimate_count(cls) -> int:
+        """Approximate number of riders from planner statistics"""
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            return await estimate_table_rows(conn, "riders")
+
+    @staticmethod
+    def page_cursor(riders: List['Rider'], limit: int) -> Optional[str]:
+        """Cursor for the page after ``riders``, or None if this was the last page"""
+        if len(riders) < limit:
+            return None
+        return encode_cursor(CURSOR_KEY, riders[-1].created_at, riders[-1].id)
+
     async def update(self, vehicle_type: str = None, vehicle_number: str = None,
                     delivery_zones: List[str] = None, is_active: bool = None) -> 'Rider':
         """Update rider information"""
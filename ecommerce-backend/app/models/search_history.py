@@ -9,27 +9,6 @@ class SearchHistory:
         self.search_date = search_date
         self.customer_id = customer_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create search_histories table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS search_histories (
-                    id SERIAL PRIMARY KEY,
-                    query VARCHAR(100) NOT NULL,
-                    search_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_histories_customer ON search_histories(customer_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_histories_date ON search_histories(search_date)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_search_histories_query ON search_histories(query)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int, query: str, 
                     search_date: Optional[datetime] = None) -> 'SearchHistory':
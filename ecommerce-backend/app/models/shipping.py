@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any
 from datetime import datetime
 from app.database import get_db_connection
+from app.models.order_tracking import OrderTracking
 
 class ShippingInfo:
     def __init__(self, id: int, order_id: int, courier_service: str, tracking_id: str, 
@@ -15,31 +16,6 @@ class ShippingInfo:
         self.created_at = created_at or datetime.now()
         self.updated_at = updated_at or datetime.now()
 
-    @classmethod
-    async def create_table(cls):
-        """Create shipping_info table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS shipping_info (
-                    id SERIAL PRIMARY KEY,
-                    order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
-                    courier_service VARCHAR(100) NOT NULL,
-                    tracking_id VARCHAR(100) NOT NULL,
-                    estimated_delivery VARCHAR(50),
-                    notes TEXT,
-                    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(order_id)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_shipping_order_id ON shipping_info(order_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_shipping_tracking_id ON shipping_info(tracking_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, order_id: int, courier_service: str, tracking_id: str, 
                     estimated_delivery: Optional[str] = None, notes: Optional[str] = None) -> 'ShippingInfo':
@@ -51,6 +27,7 @@ class ShippingInfo:
                 VALUES ($1, $2, $3, $4, $5)
                 RETURNING id, order_id, courier_service, tracking_id, estimated_delivery, notes, created_at, updated_at
             """, order_id, courier_service, tracking_id, estimated_delivery, notes)
+            OrderTracking.invalidate(order_id)
             return cls(**dict(row))
 
     @classmethod
@@ -119,6 +96,7 @@ class ShippingInfo:
             """
 
             row = await conn.fetchrow(query, *params)
+            OrderTracking.invalidate(row['order_id'])
             return ShippingInfo(**dict(row))
 
     async def delete(self) -> bool:
@@ -126,6 +104,7 @@ class ShippingInfo:
         pool = await get_db_connection()
         async with pool.acquire() as conn:
             result = await conn.execute("DELETE FROM shipping_info WHERE id = $1", self.id)
+            OrderTracking.invalidate(self.order_id)
             return result == "DELETE 1"
 
     def to_dict(self) -> Dict[str, Any]:
@@ -7,24 +7,6 @@ class Tag:
         self.tag_name = tag_name
         self.parent_id = parent_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create tags table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS tags (
-                    id SERIAL PRIMARY KEY,
-                    tag_name VARCHAR(50) NOT NULL UNIQUE,
-                    parent_id INTEGER REFERENCES tags(id) ON DELETE SET NULL
-                )
-            """)
-            # Create index
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_tags_name ON tags(tag_name)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, tag_name: str, parent_id: Optional[int] = None) -> 'Tag':
         """Create a new tag"""
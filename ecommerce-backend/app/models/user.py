@@ -19,34 +19,6 @@ class User:
         self.updated_at = updated_at
         print(f"DEBUG: User constructor - id: {id}, name: {name}, role: {role}, role type: {type(role)}")
 
-    @classmethod
-    async def create_table(cls):
-        """Create users table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            # Create table first
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id SERIAL PRIMARY KEY,
-                    name VARCHAR(50) NOT NULL UNIQUE,
-                    email VARCHAR(100) NOT NULL UNIQUE,
-                    hashed_password VARCHAR NOT NULL,
-                    role VARCHAR(20) DEFAULT 'user',
-                    login_count INTEGER DEFAULT 0,
-                    last_login TIMESTAMP,
-                    is_active BOOLEAN DEFAULT true,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # Create indexes after table exists
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users(name)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
-            except Exception as e:
-                # Indexes might already exist, ignore errors
-                pass
-
     @classmethod
     async def create(cls, username: str, email: str, hashed_password: str) -> 'User':
         """Create a new user"""
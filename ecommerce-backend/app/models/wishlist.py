@@ -6,23 +6,6 @@ class Wishlist:
         self.id = id
         self.customer_id = customer_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create wishlists table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS wishlists (
-                    id SERIAL PRIMARY KEY,
-                    customer_id INTEGER NOT NULL REFERENCES customers(id) ON DELETE CASCADE
-                )
-            """)
-            # Create index
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_wishlists_customer ON wishlists(customer_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, customer_id: int) -> 'Wishlist':
         """Create a new wishlist"""
@@ -7,26 +7,6 @@ class WishlistItem:
         self.wishlist_id = wishlist_id
         self.product_id = product_id
 
-    @classmethod
-    async def create_table(cls):
-        """Create wishlist_items table"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            await conn.execute("""
-                CREATE TABLE IF NOT EXISTS wishlist_items (
-                    id SERIAL PRIMARY KEY,
-                    wishlist_id INTEGER NOT NULL REFERENCES wishlists(id) ON DELETE CASCADE,
-                    product_id INTEGER NOT NULL REFERENCES products(id) ON DELETE CASCADE,
-                    UNIQUE(wishlist_id, product_id)
-                )
-            """)
-            # Create indexes
-            try:
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_wishlist_items_wishlist ON wishlist_items(wishlist_id)")
-                await conn.execute("CREATE INDEX IF NOT EXISTS idx_wishlist_items_product ON wishlist_items(product_id)")
-            except Exception as e:
-                pass
-
     @classmethod
     async def create(cls, wishlist_id: int, product_id: int) -> 'WishlistItem':
         """Add a product to wishlist"""
@@ -1,14 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from app.models.order import Order
+from datetime import datetime, timezone
+from app.models.order import Order, attach_order_details
 from app.models.admin import Admin
 from app.models.user import User
 from app.models.shipping import ShippingInfo
+from app.models.order_tracking import OrderTracking
+from app.models.product_copurchase import ProductCopurchase
 from app.schemas.shipping import ShippingUpdate
 from app.services.email_service import email_service
 from app.database import get_db_connection
 from app.utils.jwt_utils import get_current_admin
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_condition
+
+# Keyset cursor of the admin order listing: (order_date, id), newest first
+ADMIN_ORDERS_CURSOR_KEY = "admin_orders:order_date:desc"
+
+def _as_naive_utc(value: datetime) -> datetime:
+    # order_date is TIMESTAMP without time zone; asyncpg rejects aware values for it
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -18,76 +28,54 @@ async def get_all_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, description="Only orders placed at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only orders placed before this time"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)"),
     current_admin: dict = Depends(get_current_admin)
 ):
     """Get all orders with details for admin dashboard"""
     try:
         pool = await get_db_connection()
         async with pool.acquire() as conn:
+            conditions = []
+            params = []
             if status:
-                query = """
-                    SELECT o.id, o.customer_id, o.order_date, o.total_price, o.address_id, o.payment_id, o.status,
-                           o.secure_order_id,
-                           c.first_name, c.last_name, u.email, c.phone
-                    FROM orders o
-                    LEFT JOIN customers c ON o.customer_id = c.id
-                    LEFT JOIN users u ON c.user_id = u.id
-                    WHERE o.status = $1
-                    ORDER BY o.order_date DESC LIMIT $2 OFFSET $3
-                """
-                params = [status, limit, skip]
-            else:
-                query = """
-                    SELECT o.id, o.customer_id, o.order_date, o.total_price, o.address_id, o.payment_id, o.status,
-                           o.secure_order_id,
-                           c.first_name, c.last_name, u.email, c.phone
-                    FROM orders o
-                    LEFT JOIN customers c ON o.customer_id = c.id
-                    LEFT JOIN users u ON c.user_id = u.id
-                    ORDER BY o.order_date DESC LIMIT $1 OFFSET $2
-                """
-                params = [limit, skip]
+                params.append(status)
+                conditions.append(f"o.status = ${len(params)}")
+            if date_from:
+                params.append(_as_naive_utc(date_from))
+                conditions.append(f"o.order_date >= ${len(params)}")
+            if date_to:
+                params.append(_as_naive_utc(date_to))
+                conditions.append(f"o.order_date < ${len(params)}")
+            if cursor:
+                # Seek past the last order of the previous page instead of using OFFSET
+                params.extend(decode_cursor(cursor, ADMIN_ORDERS_CURSOR_KEY, datetime, int))
+                conditions.append(keyset_condition(["o.order_date", "o.id"], True, len(params) - 1))
+            where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            
+            params.append(limit)
+            page_clause = f"LIMIT ${len(params)}"
+            if not cursor:
+                params.append(skip)
+                page_clause += f" OFFSET ${len(params)}"
+            
+            query = f"""
+                SELECT o.id, o.customer_id, o.order_date, o.total_price, o.address_id, o.payment_id, o.status,
+                       o.secure_order_id,
+                       c.first_name, c.last_name, u.email, c.phone
+                FROM orders o
+                LEFT JOIN customers c ON o.customer_id = c.id
+                LEFT JOIN users u ON c.user_id = u.id
+                {where_clause}
+                ORDER BY o.order_date DESC, o.id DESC {page_clause}
+            """
             
             rows = await conn.fetch(query, *params)
+            next_cursor = encode_cursor(ADMIN_ORDERS_CURSOR_KEY, rows[-1]['order_date'], rows[-1]['id']) if len(rows) == limit else None
             
-            orders_with_details = []
-            for row in rows:
-                order_data = dict(row)
-                
-                # Get order items
-                items = await conn.fetch("""
-                    SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price,
-                           p.name as product_name,
-                           COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as product_image
-                    FROM order_items oi
-                    LEFT JOIN products p ON oi.product_id = p.id
-                    LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
-                    WHERE oi.order_id = $1
-                """, order_data['id'])
-                
-                order_data['items'] = [dict(item) for item in items]
-                
-                # Get address details
-                address = await conn.fetchrow("""
-                    SELECT id, street, city, division, country, postal_code
-                    FROM addresses
-                    WHERE id = $1
-                """, order_data['address_id'])
-                
-                order_data['address'] = dict(address) if address else None
-                
-                # Get payment method details
-                if order_data['payment_id']:
-                    payment = await conn.fetchrow("""
-                        SELECT id, method_name
-                        FROM payment_methods
-                        WHERE id = $1
-                    """, order_data['payment_id'])
-                    order_data['payment_method'] = payment['method_name'] if payment else None
-                else:
-                    order_data['payment_method'] = None
-                
-                orders_with_details.append(order_data)
+            # Items, addresses and payment methods for the whole page: one query each
+            orders_with_details = await attach_order_details(conn, [dict(row) for row in rows])
             
             return {
                 "success": True,
@@ -95,9 +83,12 @@ async def get_all_orders(
                 "data": orders_with_details,
                 "total": len(orders_with_details),
                 "skip": skip,
-                "limit": limit
+                "limit": limit,
+                "next_cursor": next_cursor
             }
             
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving orders: {str(e)}")
 
@@ -149,6 +140,7 @@ async def update_order_status(order_id: int, status_update: Dict[str, Any], curr
                         raise HTTPException(status_code=404, detail="Order not found")
                     
                     updated_order = Order(**dict(row))
+                OrderTracking.invalidate(order_id)
                 
             except Exception as e:
                 # If there's still an issue, try to provide more specific error handling
@@ -158,6 +150,10 @@ async def update_order_status(order_id: int, status_update: Dict[str, Any], curr
                 else:
                     raise HTTPException(status_code=500, detail=f"Error updating order status: {str(e)}")
         
+        # Cancelled orders don't count towards "frequently bought together"
+        if new_status_lower == 'cancelled' and order.status != 'cancelled':
+            await ProductCopurchase.remove_order(order_id)
+        
         # If status is being changed to "Shipped", handle shipping details
         if new_status_lower == "shipped":
             shipping_data = status_update.get('shipping')
@@ -209,20 +205,19 @@ async def update_order_status(order_id: int, status_update: Dict[str, Any], curr
                         customer_name = f"{customer_data['first_name']} {customer_data['last_name']}"
                         customer_email = customer_data['email']
                         
-                        # Send shipping notification email
-                        email_sent = email_service.send_shipping_notification(
+                        # Queue shipping notification email
+                        email_sent = await email_service.send_shipping_notification(
                             customer_email=customer_email,
                             customer_name=customer_name,
                             order_id=order.secure_order_id or str(order.id),
                             courier_service=courier_service,
                             tracking_id=tracking_id,
-                            estimated_delivery=estimated_delivery
+                            estimated_delivery=estimated_delivery,
+                            order_pk=order.id
                         )
                         
-                        if email_sent:
-                            print(f"Shipping notification email sent to {customer_email}")
-                        else:
-                            print(f"Failed to send shipping notification email to {customer_email}")
+                        if not email_sent:
+                            print(f"Failed to queue shipping notification email to {customer_email}")
                 
                 except Exception as email_error:
                     print(f"Error sending shipping notification email: {email_error}")
@@ -280,18 +275,17 @@ async def update_order_status(order_id: int, status_update: Dict[str, Any], curr
                     # Format delivery date
                     delivery_date = datetime.now().strftime('%B %d, %Y at %I:%M %p')
                     
-                    # Send delivery notification email
-                    email_sent = email_service.send_delivery_notification(
+                    # Queue delivery notification email
+                    email_sent = await email_service.send_delivery_notification(
                         customer_email=customer_email,
                         customer_name=customer_name,
                         order_id=order.secure_order_id or str(order.id),
-                        delivery_date=delivery_date
+                        delivery_date=delivery_date,
+                        order_pk=order.id
                     )
                     
-                    if email_sent:
-                        print(f"Delivery notification email sent to {customer_email}")
-                    else:
-                        print(f"Failed to send delivery notification email to {customer_email}")
+                    if not email_sent:
+                        print(f"Failed to queue delivery notification email to {customer_email}")
             
             except Exception as email_error:
                 print(f"Error sending delivery notification email: {email_error}")
@@ -507,22 +501,28 @@ async def assign_rider_to_order(order_id: int, assignment_data: Dict[str, Any],
 async def get_all_riders_admin(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)"),
+    approximate_total: bool = Query(False, description="Report the estimated total number of riders"),
     current_admin: dict = Depends(get_current_admin)
 ):
     """Get all riders with user information for admin dashboard"""
     try:
         from app.crud import rider_crud
+        from app.models.rider import Rider
         
-        riders = await rider_crud.get_all_riders_with_user_info(skip=skip, limit=limit)
+        riders, next_cursor = await rider_crud.get_all_riders_with_user_info(skip=skip, limit=limit, cursor=cursor)
         
         return {
             "success": True,
             "message": "Riders retrieved successfully",
             "riders": riders,
-            "total": len(riders),
+            "total": await Rider.estimate_count() if approximate_total else len(riders),
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving riders: {str(e)}")
 
@@ -3,6 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 from app.services.advanced_analytics_service import AdvancedAnalyticsService
+from app.utils.query_group import request_query_limit
 from app.utils.jwt_utils import get_current_admin
 from app.models.user import User
 
@@ -54,11 +55,13 @@ async def get_customer_analytics(
 
 @router.get("/predictive")
 async def get_predictive_analytics(
+    limit: int = Query(100, ge=1, le=1000, description="Customers and products per page"),
+    offset: int = Query(0, ge=0),
     current_admin: User = Depends(get_current_admin)
 ):
     """Get predictive analytics data"""
     try:
-        data = await AdvancedAnalyticsService.get_predictive_analytics()
+        data = await AdvancedAnalyticsService.get_predictive_analytics(limit, offset)
         return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching predictive analytics: {str(e)}")
@@ -83,6 +86,8 @@ async def get_advanced_dashboard(
         # Fetch all analytics data in parallel
         import asyncio
         
+        # All sections share this request's QueryGroup connection cap
+        request_query_limit()
         tasks = [
             AdvancedAnalyticsService.get_geographic_analytics(),
             AdvancedAnalyticsService.get_product_analytics(),
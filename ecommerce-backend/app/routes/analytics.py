@@ -1,98 +1,111 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Dict, Any
-from app.services.analytics_service import AnalyticsService
+from app.services.analytics_snapshot_service import AnalyticsSnapshotService
 from app.routes.admin import get_current_admin
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+FRESH_QUERY = Query(False, description="Recompute from live data instead of the latest snapshot")
+
 @router.get("/sales-dashboard")
 async def get_sales_dashboard(
     days: int = Query(30, ge=1, le=365),
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get real-time sales analytics"""
     try:
-        data = await AnalyticsService.get_sales_dashboard_data(days)
+        data, generated_at = await AnalyticsSnapshotService.get("sales_dashboard", days, fresh)
         return {
             "success": True,
             "message": "Sales dashboard data retrieved successfully",
-            "data": data
+            "data": data,
+            "generated_at": generated_at
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving sales dashboard: {str(e)}")
 
 @router.get("/inventory")
 async def get_inventory_analytics(
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get inventory management analytics"""
     try:
-        data = await AnalyticsService.get_inventory_analytics()
+        data, generated_at = await AnalyticsSnapshotService.get("inventory", fresh=fresh)
         return {
             "success": True,
             "message": "Inventory analytics retrieved successfully",
-            "data": data
+            "data": data,
+            "generated_at": generated_at
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving inventory analytics: {str(e)}")
 
 @router.get("/customer-segmentation")
 async def get_customer_segmentation(
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get customer segmentation analytics"""
     try:
-        data = await AnalyticsService.get_customer_segmentation()
+        data, generated_at = await AnalyticsSnapshotService.get("customer_segmentation", fresh=fresh)
         return {
             "success": True,
             "message": "Customer segmentation data retrieved successfully",
-            "data": data
+            "data": data,
+            "generated_at": generated_at
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving customer segmentation: {str(e)}")
 
 @router.get("/performance-metrics")
 async def get_performance_metrics(
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get performance metrics and KPIs"""
     try:
-        data = await AnalyticsService.get_performance_metrics()
+        data, generated_at = await AnalyticsSnapshotService.get("performance_metrics", fresh=fresh)
         return {
             "success": True,
             "message": "Performance metrics retrieved successfully",
-            "data": data
+            "data": data,
+            "generated_at": generated_at
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving performance metrics: {str(e)}")
 
 @router.get("/trend-analysis")
 async def get_trend_analysis(
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get trend analysis and seasonal patterns"""
     try:
-        data = await AnalyticsService.get_trend_analysis()
+        data, generated_at = await AnalyticsSnapshotService.get("trend_analysis", fresh=fresh)
         return {
             "success": True,
             "message": "Trend analysis data retrieved successfully",
-            "data": data
+            "data": data,
+            "generated_at": generated_at
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving trend analysis: {str(e)}")
 
 @router.get("/dashboard-overview")
 async def get_dashboard_overview(
+    fresh: bool = FRESH_QUERY,
     current_admin: Dict = Depends(get_current_admin)
 ):
     """Get comprehensive dashboard overview with all analytics"""
     try:
         # Get all analytics data
-        sales_data = await AnalyticsService.get_sales_dashboard_data(30)
-        inventory_data = await AnalyticsService.get_inventory_analytics()
-        customer_data = await AnalyticsService.get_customer_segmentation()
-        performance_data = await AnalyticsService.get_performance_metrics()
-        trend_data = await AnalyticsService.get_trend_analysis()
+        sales_data, sales_generated_at = await AnalyticsSnapshotService.get("sales_dashboard", 30, fresh)
+        inventory_data, inventory_generated_at = await AnalyticsSnapshotService.get("inventory", fresh=fresh)
+        customer_data, customer_generated_at = await AnalyticsSnapshotService.get("customer_segmentation", fresh=fresh)
+        performance_data, performance_generated_at = await AnalyticsSnapshotService.get("performance_metrics", fresh=fresh)
+        trend_data, trend_generated_at = await AnalyticsSnapshotService.get("trend_analysis", fresh=fresh)
         
         return {
             "success": True,
@@ -103,7 +116,10 @@ async def get_dashboard_overview(
                 "customers": customer_data,
                 "performance": performance_data,
                 "trends": trend_data
-            }
+            },
+            # Oldest snapshot the overview was assembled from
+            "generated_at": min(sales_generated_at, inventory_generated_at, customer_generated_at,
+                                performance_generated_at, trend_generated_at)
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error retrieving dashboard overview: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error retrieving dashboard overview: {str(e)}")
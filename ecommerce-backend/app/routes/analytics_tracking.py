@@ -7,6 +7,10 @@ from app.database import get_db_connection
 import json
 from datetime import datetime
 from typing import Dict, Any, List
+from app.services.event_ingestion_service import (
+    EventIngestionService, EventQueueFull, MAX_EVENT_QUANTITY, copy_offline_events, parse_event_id, parse_event_quantity
+)
+from app.config import settings
 
 router = APIRouter(prefix="/analytics", tags=["Analytics Tracking"])
 security = HTTPBearer(auto_error=False)
@@ -24,63 +28,74 @@ async def get_optional_user(request: Request):
     except:
         return None
 
+def _optional_int(value: Any, field: str) -> Optional[int]:
+    """Coerce an optional ID from the event payload, rejecting non-numeric values"""
+    try:
+        return parse_event_id(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}")
+
+def _quantity(value: Any) -> int:
+    """Coerce a purchased item's quantity, rejecting non-integer, non-positive and oversized values"""
+    try:
+        return parse_event_quantity(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid quantity: must be an integer from 1 to {MAX_EVENT_QUANTITY}")
+
 @router.post("/track")
 async def track_event(
     request: Request,
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """Track user events and behavior"""
+    """Track user events and behavior.
+
+    Events are buffered and written in batches, so they show up in
+    real_time_events within EVENT_FLUSH_INTERVAL_MS rather than immediately.
+    """
     try:
         body = await request.json()
         event_type = body.get("event_type")
         event_data = body.get("event_data", {})
+        if not event_type:
+            raise HTTPException(status_code=400, detail="event_type is required")
+        if not isinstance(event_data, dict):
+            raise HTTPException(status_code=400, detail="event_data must be an object")
         
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
-            # Store tracking event
-            await conn.execute("""
-                INSERT INTO real_time_events (
-                    event_type, event_data, user_id, customer_id, 
-                    product_id, order_id, timestamp
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-            """, 
-                event_type,
-                json.dumps(event_data),
-                current_user.get("user_id") if current_user else None,
-                event_data.get("customer_id"),
-                event_data.get("product_id"),
-                event_data.get("order_id"),
-                datetime.utcnow()
-            )
-            
-            # Update product views if it's a product view event
-            if event_type == "product_view" and event_data.get("product_id"):
-                await conn.execute("""
-                    UPDATE products 
-                    SET views = COALESCE(views, 0) + 1 
-                    WHERE id = $1
-                """, event_data["product_id"])
-            
-            # Update product purchase count if it's an add to cart event
-            if event_type == "add_to_cart" and event_data.get("product_id"):
-                await conn.execute("""
-                    UPDATE products 
-                    SET add_to_cart_count = COALESCE(add_to_cart_count, 0) + 1 
-                    WHERE id = $1
-                """, event_data["product_id"])
-            
-            # Update product purchase count if it's a purchase event
-            if event_type == "purchase" and event_data.get("items"):
-                for item in event_data["items"]:
-                    if item.get("product_id"):
-                        await conn.execute("""
-                            UPDATE products 
-                            SET purchase_count = COALESCE(purchase_count, 0) + $1 
-                            WHERE id = $2
-                        """, item.get("quantity", 1), item["product_id"])
+        product_id = _optional_int(event_data.get("product_id"), "product_id")
+        record = (
+            event_type,
+            json.dumps(event_data),
+            current_user.get("user_id") if current_user else None,
+            _optional_int(event_data.get("customer_id"), "customer_id"),
+            product_id,
+            _optional_int(event_data.get("order_id"), "order_id"),
+            datetime.utcnow()
+        )
+        
+        # Product counter deltas: (views, add_to_cart, purchases)
+        counters = {}
+        if event_type == "product_view" and product_id:
+            counters[product_id] = (1, 0, 0)
+        elif event_type == "add_to_cart" and product_id:
+            counters[product_id] = (0, 1, 0)
+        elif event_type == "purchase" and event_data.get("items"):
+            items = event_data["items"]
+            if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+                raise HTTPException(status_code=400, detail="items must be a list of objects")
+            for item in items:
+                item_product_id = _optional_int(item.get("product_id"), "product_id")
+                quantity = _quantity(item.get("quantity"))
+                if item_product_id:
+                    purchases = counters.get(item_product_id, (0, 0, 0))[2]
+                    counters[item_product_id] = (0, 0, min(purchases + quantity, MAX_EVENT_QUANTITY))
         
+        await EventIngestionService.enqueue(record, counters)
         return {"success": True, "message": "Event tracked successfully"}
         
+    except EventQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Event tracking is busy, retry later: {str(e)}")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error tracking event: {str(e)}")
 
@@ -89,34 +104,36 @@ async def sync_offline_events(
     request: Request,
     current_user: Optional[dict] = Depends(get_optional_user)
 ):
-    """Sync offline tracking events"""
+    """Sync offline tracking events.
+
+    Valid events are written with a single COPY; the response lists the
+    index and reason of every event that was rejected.
+    """
     try:
         body = await request.json()
         events = body.get("events", [])
+        if not isinstance(events, list):
+            raise HTTPException(status_code=400, detail="events must be a list")
+        if len(events) > settings.OFFLINE_EVENT_MAX_BATCH:
+            raise HTTPException(
+                status_code=413,
+                detail=f"At most {settings.OFFLINE_EVENT_MAX_BATCH} events can be synced per request"
+            )
         
         pool = await get_db_connection()
         async with pool.acquire() as conn:
-            for event in events:
-                event_type = event.get("event_type")
-                event_data = event.get("event_data", {})
-                
-                await conn.execute("""
-                    INSERT INTO real_time_events (
-                        event_type, event_data, user_id, customer_id, 
-                        product_id, order_id, timestamp
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """, 
-                    event_type,
-                    json.dumps(event_data),
-                    current_user.get("user_id") if current_user else None,
-                    event_data.get("customer_id"),
-                    event_data.get("product_id"),
-                    event_data.get("order_id"),
-                    datetime.fromisoformat(event.get("timestamp", datetime.utcnow().isoformat()))
-                )
+            synced, rejected = await copy_offline_events(
+                conn, events, current_user.get("user_id") if current_user else None
+            )
         
-        return {"success": True, "message": f"Synced {len(events)} offline events"}
+        return {
+            "success": True,
+            "message": f"Synced {synced} offline events",
+            "data": {"synced": synced, "rejected": rejected}
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error syncing offline events: {str(e)}")
 
@@ -6,7 +6,6 @@ from app.schemas.cart import (
 )
 from app.schemas.cart_item import CartItemCreate, CartItemUpdate, CartItemOut
 from app.utils.jwt_utils import get_current_user, get_current_admin
-from app.database import get_db_connection
 
 router = APIRouter(prefix="/carts", tags=["carts"])
 
@@ -86,47 +85,30 @@ async def get_carts(
     )
 
 @router.get("/admin/all", dependencies=[Depends(get_current_admin)])
-async def get_all_carts_for_admin():
-    """Get all carts with totals and item counts for admin"""
+async def get_all_carts_for_admin(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)")
+):
+    """Get non-empty carts with totals and item counts for admin"""
     from app.models.cart import Cart
-    from app.models.cart_item import CartItem
     
-    pool = await get_db_connection()
-    async with pool.acquire() as conn:
-        # Get only carts that have items (non-empty carts)
-        rows = await conn.fetch("""
-            SELECT DISTINCT
-                c.id, c.customer_id, c.creation_date, c.is_active, c.is_deleted,
-                CONCAT(cust.first_name, ' ', cust.last_name) as customer_name
-            FROM carts c
-            LEFT JOIN customers cust ON c.customer_id = cust.id
-            INNER JOIN cart_items ci ON c.id = ci.cart_id
-            WHERE ci.is_deleted = FALSE  -- Only include carts with non-deleted items
-            ORDER BY c.creation_date DESC
-        """)
-        
-        carts_with_details = []
-        for row in rows:
-            cart_data = dict(row)
-            
-            # Get total items and price for this cart
-            total_items = await CartItem.get_cart_total_items(cart_data['id'])
-            total_price = await CartItem.get_cart_total_price(cart_data['id'])
-            
-            # Only include carts that actually have items
-            if total_items > 0:
-                cart_data['total_items'] = total_items
-                cart_data['total_price'] = total_price
-                carts_with_details.append(cart_data)
-        
-        return {
-            "success": True,
-            "message": "Carts retrieved successfully",
-            "data": {
-                "carts": carts_with_details,
-                "total": len(carts_with_details)
-            }
+    try:
+        carts, next_cursor = await Cart.get_admin_summaries(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "success": True,
+        "message": "Carts retrieved successfully",
+        "data": {
+            "carts": carts,
+            "total": len(carts),
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor
         }
+    }
 
 @router.delete("/{cart_id}")
 async def delete_cart(cart_id: int):
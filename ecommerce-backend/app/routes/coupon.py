@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from app.crud import coupon_crud
+from app.models.coupon import Coupon
 from app.schemas.coupon import (
     CouponCreate, CouponUpdate, CouponOut, CouponValidation, 
     CouponValidationResponse, CouponList, ActiveCouponList, CouponResponse
@@ -101,17 +102,23 @@ async def get_coupon(coupon_id: int):
 @router.get("/", response_model=CouponList)
 async def get_coupons(
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)"),
+    approximate_total: bool = Query(False, description="Report the estimated total number of coupons")
 ):
     """Get all coupons with pagination"""
-    coupons = await coupon_crud.get_coupons(skip=skip, limit=limit)
-    total = len(coupons)
+    try:
+        coupons, next_cursor = await coupon_crud.get_coupons(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await Coupon.estimate_count() if approximate_total else len(coupons)
     
     return CouponList(
         coupons=coupons,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 @router.put("/{coupon_id}", response_model=CouponResponse)
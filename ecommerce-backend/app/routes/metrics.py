@@ -0,0 +1,64 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app import database
+from app.config import settings
+from app.utils.jwt_utils import get_current_admin
+from app.utils.db_metrics import pool_metrics, prometheus_text
+from app.utils.password_hasher import password_hasher
+from app.services.event_ingestion_service import EventIngestionService
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.sslcommerz_service import sslcommerz_service
+from app.models.order_tracking import OrderTracking
+from app.services.product_copurchase_service import ProductCopurchaseService
+from app.services.predictive_scoring_service import PredictiveScoringService
+from app.services.analytics_cache_service import AnalyticsCacheService
+from app.services.customer_stats_service import CustomerStatsService
+from app.services.event_partition_service import EventPartitionService
+
+router = APIRouter(tags=["metrics"])
+
+scrape_bearer = HTTPBearer(auto_error=False)
+
+async def require_metrics_access(credentials: Optional[HTTPAuthorizationCredentials] = Depends(scrape_bearer)):
+    """Allow Prometheus with METRICS_TOKEN as its bearer token, otherwise require an admin JWT"""
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(credentials.credentials.encode(), token.encode()):
+        return
+    await get_current_admin(credentials)
+
+def _service_stats():
+    return {
+        "password_hash": password_hasher.stats(),
+        "event_ingestion": {**EventIngestionService.stats, "queue_size": EventIngestionService.queue_size()},
+        "email_outbox": EmailOutboxService.stats,
+        "sslcommerz_breaker": sslcommerz_service.breaker.stats(),
+        "order_tracking_cache": {**OrderTracking.stats, "size": OrderTracking.cache_size()},
+        "product_copurchase": ProductCopurchaseService.stats,
+        "predictive_scoring": PredictiveScoringService.stats,
+        "analytics_cache": AnalyticsCacheService.info(),
+        "customer_stats": CustomerStatsService.stats,
+        "event_partitions": EventPartitionService.stats,
+    }
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def get_metrics(
+    format: str = Query("prometheus", pattern="^(prometheus|json)$"),
+    top: int = Query(20, ge=1, le=200, description="Slowest statements to list (json)")
+):
+    """Connection pool, query and background worker metrics"""
+    pool = database.pool
+    if format == "json":
+        return {
+            "success": True,
+            "data": {
+                "pool": pool_metrics.snapshot(pool),
+                "top_queries": pool_metrics.top_queries(top),
+                **_service_stats()
+            }
+        }
+    return PlainTextResponse(prometheus_text(pool, _service_stats()), media_type="text/plain; version=0.0.4")
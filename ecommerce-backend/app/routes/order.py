@@ -6,6 +6,8 @@ from app.schemas.order import (
     OrderList, OrderResponse
 )
 from app.schemas.order_item import OrderItemCreate, OrderItemOut
+from app.models.order import Order
+from app.models.order_tracking import OrderTracking
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -52,85 +54,10 @@ async def get_order_by_secure_id(secure_order_id: str):
 async def track_order(secure_order_id: str):
     """Track order with shipping information"""
     try:
-        print(f"Tracking order with ID: {secure_order_id}")
-        
-        # Get order details
-        order = await order_crud.get_order_by_secure_id(secure_order_id)
-        if not order:
-            print(f"Order not found for ID: {secure_order_id}")
+        tracking_data = await OrderTracking.get(secure_order_id)
+        if not tracking_data:
             raise HTTPException(status_code=404, detail="Order not found")
         
-        print(f"Order found: {order}")
-        
-        # Get shipping information if available
-        from app.models.shipping import ShippingInfo
-        shipping_info = await ShippingInfo.get_by_order_id(order['id'])
-        
-        # Get delivery assignment information if available
-        from app.models.delivery_assignment import DeliveryAssignment
-        delivery_assignment = await DeliveryAssignment.get_by_order_id(order['id'])
-        
-        # Get rider information if delivery assignment exists
-        rider_info = None
-        if delivery_assignment:
-            from app.models.rider import Rider
-            from app.models.customer import Customer as RiderCustomer
-            from app.models.user import User as RiderUser
-            
-            rider = await Rider.get_by_id(delivery_assignment.rider_id)
-            if rider:
-                rider_customer = await RiderCustomer.get_by_id(rider.customer_id)
-                rider_user = await RiderUser.get_by_id(rider.user_id) if rider else None
-                
-                rider_info = {
-                    "id": rider.id,
-                    "name": f"{rider_customer.first_name} {rider_customer.last_name}".strip() if rider_customer else "Unknown Rider",
-                    "phone": rider_customer.phone if rider_customer else None,
-                    "email": rider_user.email if rider_user else None,
-                    "vehicle_type": rider.vehicle_type,
-                    "delivery_zones": rider.delivery_zones,
-                    "is_active": rider.is_active
-                }
-        
-        # Get order items
-        from app.models.order_item import OrderItem
-        items = await OrderItem.get_by_order_id(order['id'])
-        
-        # Get customer information
-        from app.models.customer import Customer
-        customer = await Customer.get_by_id(order['customer_id'])
-        
-        # Get user information for email
-        from app.models.user import User
-        user = await User.get_by_id(customer.user_id) if customer else None
-        
-        # Get address information
-        from app.models.address import Address
-        address = await Address.get_by_id(order['address_id']) if order['address_id'] else None
-        
-        # Prepare tracking data
-        tracking_data = {
-            "order": {
-                "id": order['id'],
-                "secure_order_id": order['secure_order_id'],
-                "status": order['status'],
-                "order_date": order['order_date'],
-                "total_price": order['total_price'],
-                "transaction_id": order.get('transaction_id')
-            },
-            "customer": {
-                "first_name": customer.first_name if customer else None,
-                "last_name": customer.last_name if customer else None,
-                "email": user.email if user else None,
-                "phone": customer.phone if customer else None
-            },
-            "address": address.to_dict() if address else None,
-            "items": [item.to_dict() for item in items] if items else [],
-            "shipping_info": shipping_info.to_dict() if shipping_info else None,
-            "delivery_assignment": delivery_assignment.to_dict() if delivery_assignment else None,
-            "rider_info": rider_info
-        }
-        
         return {
             "success": True,
             "message": "Order tracking information retrieved successfully",
@@ -149,17 +76,23 @@ async def track_order(secure_order_id: str):
 @router.get("/", response_model=OrderList)
 async def get_orders(
     skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000)
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)"),
+    approximate_total: bool = Query(False, description="Report the estimated total number of orders")
 ):
     """Get all orders with pagination"""
-    orders = await order_crud.get_orders(skip=skip, limit=limit)
-    total = len(orders)
+    try:
+        orders, next_cursor = await order_crud.get_orders(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = await Order.estimate_count() if approximate_total else len(orders)
     
     return OrderList(
         orders=orders,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 @router.get("/customer/{customer_id}", response_model=OrderList)
@@ -170,15 +103,17 @@ async def get_orders_by_customer(
 ):
     """Get orders by customer ID"""
     orders = await order_crud.get_orders_by_customer(customer_id, skip=skip, limit=limit)
-    total = len(orders)
+    if len(orders) < limit and (orders or skip == 0):
+        # A short page is the last one, so the total is known without counting
+        total = skip + len(orders)
+    else:
+        total = await order_crud.count_orders_by_customer(customer_id)
     
     return OrderList(
     orders=orders,
     total=total,
     skip=skip,
-    limit=limit,
-    page=1,         # or your actual page logic
-    per_page=limit  # or your actual per_page logic
+    limit=limit
 )
 
 @router.get("/status/{status}", response_model=OrderList)
@@ -145,7 +145,7 @@ async def create_sslcommerz_session(order_data: Dict[str, Any]):
                 raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
         
         # Create payment session
-        result = sslcommerz_service.create_session(order_data)
+        result = await sslcommerz_service.create_session(order_data)
         
         if result['success']:
             return {
@@ -157,6 +157,8 @@ async def create_sslcommerz_session(order_data: Dict[str, Any]):
                     "tran_id": result['tran_id']
                 }
             }
+        elif result.get('unavailable'):
+            raise HTTPException(status_code=503, detail=result['error'])
         else:
             raise HTTPException(status_code=400, detail=result['error'])
             
@@ -173,7 +175,7 @@ async def validate_sslcommerz_payment(
 ):
     """Validate SSL Commerz payment"""
     try:
-        result = sslcommerz_service.validate_payment(sessionkey, tran_id, amount)
+        result = await sslcommerz_service.validate_payment(sessionkey, tran_id, amount)
         
         if result['success']:
             # Update order status to approved if payment is valid
@@ -1,5 +1,5 @@
 import json
-from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, status, Query, UploadFile, File, Form, Depends
 from typing import List, Optional, Dict, Any
 from app.schemas.product import ProductCreate, ProductUpdate, ProductOut, ProductCard, ProductCardList, ProductForCompare
 from app.schemas.product_image import ProductImageCreate, ProductImageOut
@@ -13,11 +13,10 @@ from app.crud.product_crud import (
     create_tag, get_tags, get_tag_by_name, get_products_by_tag_id
 )
 from app.models.product import Product
-from app.models.order import Order
-from app.models.wishlist_item import WishlistItem
-from app.models.cart_item import CartItem
 from app.models.product_tag import ProductTag
-from app.database import get_db_connection
+from app.services.recommendation_service import RecommendationService
+from app.utils.pagination import encode_cursor
+from app.database import get_db_connection, use_request_connection
 import random
 import logging
 from app.models.tag import Tag
@@ -216,34 +215,52 @@ async def get_products_for_card(
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Products per page"),
     search: Optional[str] = Query(None, description="Search term"),
-    sort: Optional[str] = Query(None, description="Sort field (name, price, rating)"),
+    sort: Optional[str] = Query(None, description="Sort field (name, price, rating, relevance)"),
     order: Optional[str] = Query(None, description="Sort order (asc, desc)"),
     min_price: Optional[float] = Query(None, description="Minimum price"),
-    max_price: Optional[float] = Query(None, description="Maximum price")
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces page)"),
+    approximate_total: bool = Query(False, description="Estimate total from planner statistics instead of counting")
 ):
     """Get products formatted for ProductCard components"""
+    if cursor and search:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not supported for search results")
     try:
         offset = (page - 1) * per_page
+        next_cursor = None
         
         # Validate sort parameters
-        valid_sort_fields = ['name', 'price', 'rating']
+        valid_sort_fields = ['name', 'price', 'rating', 'relevance']
         valid_orders = ['asc', 'desc']
         
-        sort_by = sort if sort in valid_sort_fields else 'name'
+        # Search results default to relevance ranking
+        default_sort = 'relevance' if search else 'name'
+        sort_by = sort if sort in valid_sort_fields else default_sort
+        if sort_by == 'relevance' and not search:
+            sort_by = 'name'
         sort_order = order if order in valid_orders else 'asc'
         
         # Get total count
         if search:
-            total_count = await Product.search_products_count(search, min_price, max_price)
             products_data = await Product.search_products_for_card(
                 search, per_page, offset, sort_by, sort_order, min_price, max_price
             )
+            # The search query reports its own total; only count separately past the last page
+            if products_data:
+                total_count = products_data[0]["total_count"]
+            elif offset > 0:
+                total_count = await Product.search_products_count(search, min_price, max_price)
+            else:
+                total_count = 0
         else:
-            total_count = await Product.get_products_count(min_price, max_price)
+            total_count = await Product.get_products_count(min_price, max_price, approximate=approximate_total)
             # Use the updated method with filtering support
             products_data = await Product.get_products_for_card(
-                per_page, offset, sort_by, sort_order, min_price, max_price
+                per_page, offset, sort_by, sort_order, min_price, max_price, cursor
             )
+            if len(products_data) == per_page:
+                last = products_data[-1]
+                next_cursor = encode_cursor(Product.card_cursor_key(sort_by, sort_order), last[sort_by], last["id"])
         
         # Convert to ProductCard objects
         products = []
@@ -265,9 +282,12 @@ async def get_products_for_card(
             products=products,
             total=total_count,  # Use the actual total count
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            next_cursor=next_cursor
         )
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
 
@@ -386,26 +406,24 @@ async def get_product_for_card(product_id: int):
 async def get_products_by_tag_for_card(tag_id: int):
     """Get products by tag formatted for ProductCard components"""
     try:
-        # First get products by tag using existing CRUD
-        products = await get_products_by_tag_id(tag_id)
+        # Get ProductCard data for all tagged products in one query
+        product_tags = await ProductTag.get_by_tag_id(tag_id)
+        products_data = await Product.get_products_for_card_bulk([pt.product_id for pt in product_tags])
         
-        # Then get ProductCard data for each product
         product_cards = []
-        for product in products:
-            product_data = await Product.get_product_for_card(product.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"]
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"]
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -449,8 +467,8 @@ async def search_products_for_suggestions(
         if not q.strip():
             return []
         
-        # Use the existing search method but limit results
-        products_data = await Product.search_products_for_card(q.strip(), limit, 0)
+        # Prefix-matched, relevance-ranked suggestions
+        products_data = await Product.search_products_for_card(q.strip(), limit, 0, sort_by='relevance')
         
         # Convert to ProductCard objects
         products = []
@@ -520,112 +538,26 @@ async def get_unmatched_searches(limit: int = Query(20, ge=1, le=100)):
         raise HTTPException(status_code=500, detail=f"Error retrieving unmatched searches: {str(e)}")
 
 @router.get("/for_you/{customer_id}", response_model=List[ProductCard])
-async def get_for_you_recommendations(customer_id: int, limit: int = 20):
+async def get_for_you_recommendations(customer_id: int, limit: int = Query(20, ge=1, le=100)):
     """Get personalized product recommendations for a user based on their orders, wishlist, and cart."""
-    # 1. Gather all product IDs from orders, wishlist, and cart
-    seen_product_ids = set()
-    debug_info = {}
-
-    # Orders
-    orders = await Order.get_by_customer_id_with_details(customer_id)
-    debug_info['orders'] = orders
-    for order in orders:
-        for item in order.get('items', []):
-            seen_product_ids.add(item['product_id'])
-
-    # Wishlist
-    wishlist_items = await WishlistItem.get_by_customer_id(customer_id)
-    debug_info['wishlist_items'] = [item.product_id for item in wishlist_items]
-    for item in wishlist_items:
-        seen_product_ids.add(item.product_id)
-
-    # Cart
-    from app.models.cart import Cart
-    cart = await Cart.get_by_customer_id(customer_id)
-    debug_info['cart'] = cart.id if cart else None
-    cart_items = []
-    if cart:
-        cart_items = await CartItem.get_by_cart_id(cart.id)
-        debug_info['cart_items'] = [item.product_id for item in cart_items]
-        for item in cart_items:
-            seen_product_ids.add(item.product_id)
-    else:
-        debug_info['cart_items'] = []
-
-    debug_info['seen_product_ids'] = list(seen_product_ids)
-    print(f"[FOR YOU DEBUG] User {customer_id} - Seen product IDs: {seen_product_ids}")
-    print(f"[FOR YOU DEBUG] Orders: {orders}")
-    print(f"[FOR YOU DEBUG] Wishlist items: {debug_info['wishlist_items']}")
-    print(f"[FOR YOU DEBUG] Cart items: {debug_info['cart_items']}")
-
-    if not seen_product_ids:
-        print(f"[FOR YOU DEBUG] No seen products for user {customer_id}, returning empty list.")
-        return []  # No recommendations if user has no history
-
-    # 2. Get all unique tag IDs for those products
-    tag_ids = set()
-    for pid in seen_product_ids:
-        tags = await ProductTag.get_tags_for_product(pid)
-        print(f"[FOR YOU DEBUG] Product {pid} tags: {tags}")
-        for tag in tags:
-            if isinstance(tag, dict) and 'id' in tag:
-                tag_ids.add(tag['id'])
-            elif isinstance(tag, int):
-                tag_ids.add(tag)
-            elif isinstance(tag, str):
-                # Look up tag ID by name
-                tag_obj = await Tag.get_by_name(tag)
-                if tag_obj:
-                    tag_ids.add(tag_obj.id)
-    debug_info['tag_ids'] = list(tag_ids)
-    print(f"[FOR YOU DEBUG] Tag IDs: {tag_ids}")
-
-    if not tag_ids:
-        print(f"[FOR YOU DEBUG] No tag IDs found for user {customer_id}, returning empty list.")
-        return []
-
-    # 3. Fetch products from those categories/tags, excluding already seen products
-    from app.crud.product_crud import get_products_by_tag_id
-    candidate_products = []
-    for tag_id in tag_ids:
-        products = await get_products_by_tag_id(tag_id)
-        print(f"[FOR YOU DEBUG] Products for tag {tag_id}: {[p.id for p in products]}")
-        for product in products:
-            if product.id not in seen_product_ids:
-                candidate_products.append(product)
-    debug_info['candidate_products'] = [p.id for p in candidate_products]
-    print(f"[FOR YOU DEBUG] Candidate products: {debug_info['candidate_products']}")
-
-    if not candidate_products:
-        print(f"[FOR YOU DEBUG] No candidate products for user {customer_id}, returning empty list.")
-        return []
-
-    # 4. Pick random recommendations
-    import random
-    random.shuffle(candidate_products)
-    recommended = candidate_products[:limit]
-    print(f"[FOR YOU DEBUG] Recommended product IDs: {[p.id for p in recommended]}")
-
-    # 5. Convert to ProductCard format
-    from app.models.product import Product
+    products_data = await RecommendationService.get_for_you_recommendations(customer_id, limit)
+    
+    # Convert to ProductCard format
     product_cards = []
-    for product in recommended:
-        product_data = await Product.get_product_for_card(product.id)
-        if product_data:
-            product_card = ProductCard(
-                id=product_data["id"],
-                name=product_data["name"],
-                description=product_data["description"],
-                price=float(product_data["price"]),
-                stock=product_data["stock"],
-                image=product_data["image"],
-                discount=float(product_data["discount"]),
-                rating=float(product_data["rating"]) if product_data["rating"] else None,
-                total_reviews=product_data["total_reviews"],
-                category=product_data.get("category")
-            )
-            product_cards.append(product_card)
-    print(f"[FOR YOU DEBUG] Final product cards: {[p.id for p in product_cards]}")
+    for product_data in products_data:
+        product_card = ProductCard(
+            id=product_data["id"],
+            name=product_data["name"],
+            description=product_data["description"],
+            price=float(product_data["price"]),
+            stock=product_data["stock"],
+            image=product_data["image"],
+            discount=float(product_data["discount"]),
+            rating=float(product_data["rating"]) if product_data["rating"] else None,
+            total_reviews=product_data["total_reviews"],
+            category=product_data.get("category")
+        )
+        product_cards.append(product_card)
     return product_cards
 
 @router.get("/similar/{product_id}", response_model=List[ProductCard])
@@ -703,23 +635,22 @@ async def get_similar_products(product_id: int, limit: int = 8):
         # Take top products and convert to ProductCard format
         top_products = [item['product'] for item in similar_products[:limit]]
         
+        products_data = await Product.get_products_for_card_bulk([p.id for p in top_products])
         product_cards = []
-        for p in top_products:
-            product_data = await Product.get_product_for_card(p.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -742,23 +673,22 @@ async def get_price_range_recommendations(
         random.shuffle(products)
         products = products[:limit]
         
+        products_data = await Product.get_products_for_card_bulk([product.id for product in products])
         product_cards = []
-        for product in products:
-            product_data = await Product.get_product_for_card(product.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -786,23 +716,22 @@ async def get_category_recommendations(
         random.shuffle(products)
         products = products[:limit]
         
+        products_data = await Product.get_products_for_card_bulk([product.id for product in products])
         product_cards = []
-        for product in products:
-            product_data = await Product.get_product_for_card(product.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -819,23 +748,22 @@ async def get_trending_recommendations(limit: int = Query(8, ge=1, le=20)):
         from app.crud.product_crud import get_products_with_highest_discounts
         products = await get_products_with_highest_discounts(limit)
         
+        products_data = await Product.get_products_for_card_bulk([product.id for product in products])
         product_cards = []
-        for product in products:
-            product_data = await Product.get_product_for_card(product.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -856,7 +784,7 @@ async def get_trending_products(limit: int = Query(12, ge=1, le=50)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving trending products: {str(e)}")
 
-@router.get("/{product_id}", response_model=ProductOut)
+@router.get("/{product_id}", response_model=ProductOut, dependencies=[Depends(use_request_connection)])
 async def get_product_route(product_id: int):
     """Get product by ID"""
     try:
@@ -871,16 +799,6 @@ async def get_product_route(product_id: int):
         images = await get_product_images(product_id)
         tags = await get_product_tags(product_id)
         
-        # Get average rating and review count
-        from app.models.review import Review
-        try:
-            average_rating = await Review.get_product_average_rating(product_id)
-            review_count = await Review.get_product_rating_count(product_id)
-        except Exception as e:
-            print(f"Error getting review data: {e}")
-            average_rating = 0.0
-            review_count = 0
-        
         # Get active discount
         from app.models.discount import Discount
         try:
@@ -921,8 +839,8 @@ async def get_product_route(product_id: int):
                 ) for img in images
             ],
             tags=tags,
-            rating=average_rating,
-            reviews=review_count,
+            rating=float(product.average_rating or 0),
+            reviews=product.rating_count,
             discount=discount_value
         )
     except Exception as e:
@@ -1211,7 +1129,6 @@ async def get_guest_recommendations(limit: int = Query(12, ge=1, le=50)):
 async def get_admin_products_route():
     """Get all products with rating information for admin dashboard"""
     try:
-        from app.models.review import Review
         from app.database import get_db_connection
         
         pool = await get_db_connection()
@@ -1231,13 +1148,9 @@ async def get_admin_products_route():
                     p.care_instructions,
                     p.features,
                     p.specifications,
-                    COALESCE(AVG(r.rating), 0.0) as rating,
-                    COALESCE(COUNT(r.id), 0) as total_reviews
+                    COALESCE(p.average_rating, 0.0) as rating,
+                    p.rating_count as total_reviews
                 FROM products p
-                LEFT JOIN reviews r ON p.id = r.product_id
-                GROUP BY p.id, p.name, p.description, p.price, p.stock, p.brand, 
-                         p.material, p.colors, p.sizes, p.care_instructions, 
-                         p.features, p.specifications
                 ORDER BY p.id DESC
             """)
             
@@ -1301,23 +1214,22 @@ async def get_product_price_range_recommendations(
         random.shuffle(filtered_products)
         filtered_products = filtered_products[:limit]
         
+        products_data = await Product.get_products_for_card_bulk([p.id for p in filtered_products])
         product_cards = []
-        for p in filtered_products:
-            product_data = await Product.get_product_for_card(p.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -1355,23 +1267,22 @@ async def get_product_category_recommendations(
         random.shuffle(filtered_products)
         filtered_products = filtered_products[:limit]
         
+        products_data = await Product.get_products_for_card_bulk([p.id for p in filtered_products])
         product_cards = []
-        for p in filtered_products:
-            product_data = await Product.get_product_for_card(p.id)
-            if product_data:
-                product_card = ProductCard(
-                    id=product_data["id"],
-                    name=product_data["name"],
-                    description=product_data["description"],
-                    price=float(product_data["price"]),
-                    stock=product_data["stock"],
-                    image=product_data["image"],
-                    discount=float(product_data["discount"]),
-                    rating=float(product_data["rating"]) if product_data["rating"] else None,
-                    total_reviews=product_data["total_reviews"],
-                    category=product_data.get("category")
-                )
-                product_cards.append(product_card)
+        for product_data in products_data:
+            product_card = ProductCard(
+                id=product_data["id"],
+                name=product_data["name"],
+                description=product_data["description"],
+                price=float(product_data["price"]),
+                stock=product_data["stock"],
+                image=product_data["image"],
+                discount=float(product_data["discount"]),
+                rating=float(product_data["rating"]) if product_data["rating"] else None,
+                total_reviews=product_data["total_reviews"],
+                category=product_data.get("category")
+            )
+            product_cards.append(product_card)
         
         return product_cards
         
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from app.crud import rider_crud
+from app.models.rider import Rider
 from app.schemas.rider import (
     RiderCreate, RiderUpdate, RiderOut, RiderList, RiderResponse,
     DeliveryAssignmentCreate, DeliveryAssignmentUpdate, DeliveryAssignmentOut,
@@ -287,12 +288,13 @@ async def update_delivery_status(
                     # Format delivery date
                     delivery_date = updated_assignment.actual_delivery.strftime('%B %d, %Y at %I:%M %p') if updated_assignment.actual_delivery else None
                     
-                    # Send delivery notification email
-                    email_service.send_delivery_notification(
+                    # Queue delivery notification email
+                    await email_service.send_delivery_notification(
                         customer_email=user.email,
                         customer_name=f"{customer.first_name} {customer.last_name}".strip(),
                         order_id=order.secure_order_id,
-                        delivery_date=delivery_date
+                        delivery_date=delivery_date,
+                        order_pk=order.id
                     )
         except Exception as e:
             print(f"Error sending delivery notification email: {e}")
@@ -309,17 +311,23 @@ async def update_delivery_status(
 async def get_all_riders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from a previous page's next_cursor (replaces skip)"),
+    approximate_total: bool = Query(False, description="Report the estimated total number of riders"),
     current_user: dict = Depends(get_current_user)
 ):
     """Get all riders (admin only)"""
     if current_user.get("role") != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    riders = await rider_crud.get_all_riders_with_user_info(skip=skip, limit=limit)
+    try:
+        riders, next_cursor = await rider_crud.get_all_riders_with_user_info(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return RiderList(
         riders=riders,
-        total=len(riders)
+        total=await Rider.estimate_count() if approximate_total else len(riders),
+        next_cursor=next_cursor
     )
 
 @router.get("/active", response_model=RiderList)
@@ -495,12 +503,13 @@ async def update_assignment(
                         # Format delivery date
                         delivery_date = updated_assignment.actual_delivery.strftime('%B %d, %Y at %I:%M %p') if updated_assignment.actual_delivery else None
                         
-                        # Send delivery notification email
-                        email_service.send_delivery_notification(
+                        # Queue delivery notification email
+                        await email_service.send_delivery_notification(
                             customer_email=user.email,
                             customer_name=f"{customer.first_name} {customer.last_name}".strip(),
                             order_id=order.secure_order_id,
-                            delivery_date=delivery_date
+                            delivery_date=delivery_date,
+                            order_pk=order.id
                         )
             except Exception as e:
                 print(f"Error sending delivery notification email: {e}")
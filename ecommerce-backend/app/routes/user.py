@@ -3,13 +3,19 @@ from typing import List
 from app.crud import user_crud
 from app.schemas.user import UserCreate, UserUpdate, UserOut, UserLogin
 from app.models.customer import Customer
-from passlib.context import CryptContext
-from app.utils.jwt_utils import create_access_token, get_current_user
+from app.utils.jwt_utils import create_access_token, get_current_user, get_current_admin
 from app.models.user import User
 from app.database import get_db_connection
+from app.utils.password_hasher import PasswordHasherBusy
 
 router = APIRouter(prefix="/users", tags=["users"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+async def _authenticate(username_or_email: str, password: str):
+    """authenticate_user, answering 503 instead of queueing when the hashing pool is saturated"""
+    try:
+        return await user_crud.authenticate_user(username_or_email, password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
 
 @router.post("/", response_model=UserOut)
 async def create_user(user_data: UserCreate):
@@ -25,6 +31,8 @@ async def create_user(user_data: UserCreate):
         user_dict["customer_id"] = customer.id if customer else None
         
         return user_dict
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
     except Exception as e:
         # Check if it's a duplicate key error
         if "duplicate key value violates unique constraint" in str(e):
@@ -48,7 +56,10 @@ async def get_users():
 
 @router.put("/{user_id}", response_model=UserOut)
 async def update_user(user_id: int, user_data: UserUpdate):
-    user = await user_crud.update_user(user_id, user_data)
+    try:
+        user = await user_crud.update_user(user_id, user_data)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -62,7 +73,7 @@ async def delete_user(user_id: int):
 
 @router.post("/authenticate")
 async def authenticate_user(login_data: UserLogin):
-    user = await user_crud.authenticate_user(login_data.username, login_data.password)
+    user = await _authenticate(login_data.username, login_data.password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -103,7 +114,7 @@ async def login(data: dict):
         raise HTTPException(status_code=400, detail="Username/email and password are required")
     
     # Try to authenticate using the proper method
-    user = await user_crud.authenticate_user(username_or_email, password)
+    user = await _authenticate(username_or_email, password)
     
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -217,8 +228,8 @@ async def fix_null_roles():
     }
 
 @router.post("/debug-auth")
-async def debug_auth(data: dict):
-    """Debug authentication process"""
+async def debug_auth(data: dict, current_admin: dict = Depends(get_current_admin)):
+    """Debug authentication process (admin only: every call runs a password hash)"""
     username_or_email = data.get("username")
     password = data.get("password")
     
@@ -112,6 +112,7 @@ class CouponList(BaseModel):
     total: int = Field(..., description="Total number of coupons")
     skip: int = Field(..., description="Number of coupons skipped")
     limit: int = Field(..., description="Maximum number of coupons returned")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 class ActiveCouponList(BaseModel):
     active_coupons: List[CouponOut] = Field(..., description="List of active coupons")
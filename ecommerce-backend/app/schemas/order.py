@@ -69,8 +69,9 @@ class OrderWithDetails(BaseModel):
 class OrderList(BaseModel):
     orders: List[OrderOut] = Field(..., description="List of orders")
     total: int = Field(..., description="Total number of orders")
-    page: int = Field(..., description="Current page number")
-    per_page: int = Field(..., description="Orders per page")
+    skip: int = Field(..., description="Number of orders skipped")
+    limit: int = Field(..., description="Maximum number of orders returned")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 class OrderResponse(BaseModel):
     success: bool = Field(..., description="Operation success status")
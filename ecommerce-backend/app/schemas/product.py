@@ -169,6 +169,7 @@ class ProductCardList(BaseModel):
     total: int = Field(..., description="Total number of products")
     page: int = Field(..., description="Current page number")
     per_page: int = Field(..., description="Products per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 class ProductList(BaseModel):
     products: List[ProductOut] = Field(..., description="List of products")
@@ -39,6 +39,7 @@ class RiderWithUserInfo(RiderOut):
 class RiderList(BaseModel):
     riders: List[RiderWithUserInfo] = Field(..., description="List of riders")
     total: int = Field(..., description="Total number of riders")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if there is one")
 
 class RiderResponse(BaseModel):
     success: bool = Field(..., description="Operation success status")
@@ -2,7 +2,9 @@
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from app.database import get_db_connection
+from app.utils.query_group import QueryGroup
+from app.models.product_copurchase import TOP_PAIRS_SQL
+from app.models.predictive_scores import PredictiveScores
 import json
 
 class AdvancedAnalyticsService:
@@ -10,11 +12,10 @@ class AdvancedAnalyticsService:
     @staticmethod
     async def get_geographic_analytics() -> Dict[str, Any]:
         """Get geographic analytics data"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
             # Customer distribution by city (using address data)
-            customer_distribution = await conn.fetch("""
+            customer_distribution = group.fetch("""
                 SELECT 
                     COALESCE(a.city, 'Unknown') as location,
                     COUNT(DISTINCT c.id) as customer_count,
@@ -29,7 +30,7 @@ class AdvancedAnalyticsService:
             """)
             
             # Regional sales performance by division/state
-            regional_sales = await conn.fetch("""
+            regional_sales = group.fetch("""
                 WITH regional_data AS (
                     SELECT 
                         a.division as region,
@@ -62,7 +63,7 @@ class AdvancedAnalyticsService:
             """)
             
             # Country-wise sales analytics
-            country_analytics = await conn.fetch("""
+            country_analytics = group.fetch("""
                 SELECT 
                     COALESCE(a.country, 'Unknown') as country,
                     COUNT(DISTINCT c.id) as customer_count,
@@ -78,7 +79,7 @@ class AdvancedAnalyticsService:
             """)
             
             # City-wise order distribution
-            city_orders = await conn.fetch("""
+            city_orders = group.fetch("""
                 SELECT 
                     a.city,
                     a.division,
@@ -94,22 +95,21 @@ class AdvancedAnalyticsService:
                 ORDER BY total_orders DESC
                 LIMIT 30
             """)
-            
-            return {
-                "customer_distribution": [dict(row) for row in customer_distribution],
-                "regional_sales": [dict(row) for row in regional_sales],
-                "country_analytics": [dict(row) for row in country_analytics],
-                "city_orders": [dict(row) for row in city_orders]
-            }
+
+        return {
+            "customer_distribution": [dict(row) for row in customer_distribution.result()],
+            "regional_sales": [dict(row) for row in regional_sales.result()],
+            "country_analytics": [dict(row) for row in country_analytics.result()],
+            "city_orders": [dict(row) for row in city_orders.result()]
+        }
     
     @staticmethod
     async def get_product_analytics() -> Dict[str, Any]:
         """Get advanced product analytics"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
             # Product performance matrix (BCG-style)
-            product_matrix = await conn.fetch("""
+            product_matrix = group.fetch("""
                 SELECT 
                     p.id,
                     p.name,
@@ -135,7 +135,7 @@ class AdvancedAnalyticsService:
             """)
             
             # Seasonal product trends
-            seasonal_trends = await conn.fetch("""
+            seasonal_trends = group.fetch("""
                 SELECT 
                     p.name,
                     p.seasonality,
@@ -150,28 +150,11 @@ class AdvancedAnalyticsService:
                 ORDER BY p.name, month
             """)
             
-            # Product affinity analysis (simplified)
-            product_affinity = await conn.fetch("""
-                SELECT 
-                    p1.id as product1,
-                    p1.name as product1_name,
-                    p2.id as product2,
-                    p2.name as product2_name,
-                    COUNT(DISTINCT o.id) as frequency
-                FROM products p1
-                JOIN order_items oi1 ON p1.id = oi1.product_id
-                JOIN orders o ON oi1.order_id = o.id
-                JOIN order_items oi2 ON o.id = oi2.order_id
-                JOIN products p2 ON oi2.product_id = p2.id
-                WHERE p1.id < p2.id
-                GROUP BY p1.id, p1.name, p2.id, p2.name
-                HAVING COUNT(DISTINCT o.id) > 1
-                ORDER BY frequency DESC
-                LIMIT 20
-            """)
+            # Product affinity: pairs bought together in more than one order
+            product_affinity = group.fetch(TOP_PAIRS_SQL, 20, 2)
             
             # Inventory turnover analysis
-            inventory_turnover = await conn.fetch("""
+            inventory_turnover = group.fetch("""
                 SELECT 
                     p.id,
                     p.name,
@@ -199,22 +182,21 @@ class AdvancedAnalyticsService:
                 ORDER BY inventory_turnover DESC
                 LIMIT 30
             """)
-            
-            return {
-                "product_matrix": [dict(row) for row in product_matrix],
-                "seasonal_trends": [dict(row) for row in seasonal_trends],
-                "product_affinity": [dict(row) for row in product_affinity],
-                "inventory_turnover": [dict(row) for row in inventory_turnover]
-            }
+
+        return {
+            "product_matrix": [dict(row) for row in product_matrix.result()],
+            "seasonal_trends": [dict(row) for row in seasonal_trends.result()],
+            "product_affinity": [dict(row) for row in product_affinity.result()],
+            "inventory_turnover": [dict(row) for row in inventory_turnover.result()]
+        }
     
     @staticmethod
     async def get_marketing_analytics() -> Dict[str, Any]:
         """Get marketing analytics data"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
             # Campaign performance
-            campaign_performance = await conn.fetch("""
+            campaign_performance = group.fetch("""
                 SELECT 
                     o.conversion_source,
                     COUNT(o.id) as orders,
@@ -229,7 +211,7 @@ class AdvancedAnalyticsService:
             """)
             
             # Customer acquisition by source
-            acquisition_by_source = await conn.fetch("""
+            acquisition_by_source = group.fetch("""
                 SELECT 
                     c.source,
                     COUNT(c.id) as new_customers,
@@ -244,7 +226,7 @@ class AdvancedAnalyticsService:
             """)
             
             # UTM parameter analysis
-            utm_analysis = await conn.fetch("""
+            utm_analysis = group.fetch("""
                 SELECT 
                     COALESCE(utm_source, 'direct') as source,
                     COALESCE(utm_medium, 'none') as medium,
@@ -259,76 +241,102 @@ class AdvancedAnalyticsService:
                 LIMIT 20
             """)
             
-            # Device and browser analytics (using real tracking data)
-            device_analytics = await conn.fetch("""
+            # Device and browser analytics: daily rollups for closed partitions,
+            # raw tracking events only for the part not rolled up yet (read the
+            # same way as the rollup). unique_users sums per-day distinct users.
+            device_analytics = group.fetch("""
+                WITH combined AS (
+                    SELECT device_type, browser, operating_system, unique_users, total_events,
+                           purchases, cart_adds, product_views, revenue, time_spent_total, time_spent_samples
+                    FROM event_rollups_daily_device
+                    WHERE day >= CURRENT_DATE - INTERVAL '30 days'
+                    AND day < (SELECT COALESCE(MAX(range_end), '-infinity') FROM event_partition_rollups)
+                    UNION ALL
+                    SELECT 
+                        LEFT(COALESCE(e.event_data->>'device_type', 'Unknown'), 100),
+                        LEFT(COALESCE(e.event_data->>'browser', 'Unknown'), 100),
+                        LEFT(COALESCE(e.event_data->>'operating_system', 'Unknown'), 100),
+                        COUNT(DISTINCT e.user_id),
+                        COUNT(*),
+                        COUNT(*) FILTER (WHERE e.event_type = 'purchase'),
+                        COUNT(*) FILTER (WHERE e.event_type = 'add_to_cart'),
+                        COUNT(*) FILTER (WHERE e.event_type = 'product_view'),
+                        COALESCE(SUM(safe_numeric(e.event_data->>'total_amount')) FILTER (WHERE e.event_type = 'purchase'), 0),
+                        COALESCE(SUM(safe_numeric(e.event_data->>'time_spent')), 0),
+                        COUNT(safe_numeric(e.event_data->>'time_spent'))
+                    FROM real_time_events e
+                    WHERE e.timestamp >= CURRENT_DATE - INTERVAL '30 days'
+                    AND e.timestamp >= (SELECT COALESCE(MAX(range_end), '-infinity') FROM event_partition_rollups)
+                    GROUP BY 1, 2, 3
+                )
                 SELECT 
-                    COALESCE(e.event_data->>'device_type', 'Unknown') as device_type,
-                    COALESCE(e.event_data->>'browser', 'Unknown') as browser,
-                    COALESCE(e.event_data->>'operating_system', 'Unknown') as operating_system,
-                    COUNT(DISTINCT e.user_id) as unique_users,
-                    COUNT(e.id) as total_events,
-                    COUNT(DISTINCT CASE WHEN e.event_type = 'purchase' THEN e.id END) as orders,
-                    COUNT(DISTINCT CASE WHEN e.event_type = 'add_to_cart' THEN e.id END) as cart_adds,
-                    COUNT(DISTINCT CASE WHEN e.event_type = 'product_view' THEN e.id END) as product_views,
-                    COALESCE(SUM(CASE WHEN e.event_type = 'purchase' THEN (e.event_data->>'total_amount')::DECIMAL ELSE 0 END), 0) as revenue,
+                    device_type,
+                    browser,
+                    operating_system,
+                    SUM(unique_users) as unique_users,
+                    SUM(total_events) as total_events,
+                    SUM(purchases) as orders,
+                    SUM(cart_adds) as cart_adds,
+                    SUM(product_views) as product_views,
+                    SUM(revenue) as revenue,
                     CASE 
-                        WHEN COUNT(DISTINCT CASE WHEN e.event_type = 'purchase' THEN e.id END) > 0 
-                        THEN COALESCE(SUM(CASE WHEN e.event_type = 'purchase' THEN (e.event_data->>'total_amount')::DECIMAL ELSE 0 END), 0) / COUNT(DISTINCT CASE WHEN e.event_type = 'purchase' THEN e.id END)
+                        WHEN SUM(purchases) > 0 THEN SUM(revenue) / SUM(purchases)
                         ELSE 0 
                     END as avg_order_value,
-                    COALESCE(AVG(CASE WHEN e.event_data ? 'time_spent' THEN (e.event_data->>'time_spent')::DECIMAL ELSE NULL END), 0) as avg_time_on_site
-                FROM real_time_events e
-                WHERE e.created_at >= CURRENT_DATE - INTERVAL '30 days'
-                GROUP BY e.event_data->>'device_type', e.event_data->>'browser', e.event_data->>'operating_system'
+                    CASE 
+                        WHEN SUM(time_spent_samples) > 0 THEN SUM(time_spent_total) / SUM(time_spent_samples)
+                        ELSE 0 
+                    END as avg_time_on_site
+                FROM combined
+                GROUP BY device_type, browser, operating_system
                 ORDER BY total_events DESC
                 LIMIT 20
             """)
-            
-            return {
-                "campaign_performance": [dict(row) for row in campaign_performance],
-                "acquisition_by_source": [dict(row) for row in acquisition_by_source],
-                "utm_analysis": [dict(row) for row in utm_analysis],
-                "device_analytics": [dict(row) for row in device_analytics]
-            }
+
+        return {
+            "campaign_performance": [dict(row) for row in campaign_performance.result()],
+            "acquisition_by_source": [dict(row) for row in acquisition_by_source.result()],
+            "utm_analysis": [dict(row) for row in utm_analysis.result()],
+            "device_analytics": [dict(row) for row in device_analytics.result()]
+        }
     
     @staticmethod
     async def get_customer_analytics() -> Dict[str, Any]:
         """Get advanced customer analytics"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
-            # Customer lifetime value analysis
-            clv_analysis = await conn.fetch("""
+            # Customer lifetime value analysis (customer_order_stats is maintained by trigger)
+            clv_analysis = group.fetch("""
                 SELECT 
                     c.id,
                     c.first_name,
                     c.last_name,
-                    COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                    COUNT(o.id) as total_orders,
-                    COALESCE(AVG(o.total_price), 0) as avg_order_value,
+                    s.total_spent as lifetime_value,
+                    s.order_count as total_orders,
+                    s.total_spent / s.order_count as avg_order_value,
                     CASE 
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 10000 THEN 'VIP'
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 5000 THEN 'Premium'
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 1000 THEN 'Regular'
+                        WHEN s.total_spent >= 10000 THEN 'VIP'
+                        WHEN s.total_spent >= 5000 THEN 'Premium'
+                        WHEN s.total_spent >= 1000 THEN 'Regular'
                         ELSE 'New'
                     END as segment,
-                    COALESCE(c.churn_probability, 0) as churn_probability,
-                    COALESCE(c.engagement_score, 0) as engagement_score,
-                    COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) as days_since_last_order,
+                    COALESCE(cs.churn_probability, 0) as churn_probability,
+                    0 as engagement_score,
+                    EXTRACT(DAYS FROM (CURRENT_DATE - s.last_order_date)) as days_since_last_order,
                     CASE 
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 10000 THEN 'High Value'
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 5000 THEN 'Medium Value'
+                        WHEN s.total_spent >= 10000 THEN 'High Value'
+                        WHEN s.total_spent >= 5000 THEN 'Medium Value'
                         ELSE 'Low Value'
                     END as value_category
-                FROM customers c
-                LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                GROUP BY c.id, c.first_name, c.last_name, c.churn_probability, c.engagement_score
-                ORDER BY lifetime_value DESC
+                FROM customer_order_stats s
+                JOIN customers c ON c.id = s.customer_id
+                LEFT JOIN customer_churn_scores cs ON cs.customer_id = s.customer_id
+                ORDER BY s.total_spent DESC
                 LIMIT 50
             """)
             
             # Customer segmentation analysis
-            customer_segments = await conn.fetch("""
+            customer_segments = group.fetch("""
                 SELECT 
                     segment,
                     COUNT(*) as customer_count,
@@ -336,54 +344,42 @@ class AdvancedAnalyticsService:
                     AVG(total_orders) as avg_orders,
                     AVG(avg_order_value) as avg_order_value,
                     AVG(churn_probability) as avg_churn_probability,
-                    AVG(engagement_score) as avg_engagement
+                    0 as avg_engagement
                 FROM (
                     SELECT 
-                        c.id,
                         CASE 
-                            WHEN COALESCE(SUM(o.total_price), 0) >= 10000 THEN 'VIP'
-                            WHEN COALESCE(SUM(o.total_price), 0) >= 5000 THEN 'Premium'
-                            WHEN COALESCE(SUM(o.total_price), 0) >= 1000 THEN 'Regular'
+                            WHEN COALESCE(s.total_spent, 0) >= 10000 THEN 'VIP'
+                            WHEN COALESCE(s.total_spent, 0) >= 5000 THEN 'Premium'
+                            WHEN COALESCE(s.total_spent, 0) >= 1000 THEN 'Regular'
                             ELSE 'New'
                         END as segment,
-                        COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                        COUNT(o.id) as total_orders,
-                        COALESCE(AVG(o.total_price), 0) as avg_order_value,
-                        COALESCE(c.churn_probability, 0) as churn_probability,
-                        COALESCE(c.engagement_score, 0) as engagement_score
+                        COALESCE(s.total_spent, 0) as lifetime_value,
+                        COALESCE(s.order_count, 0) as total_orders,
+                        COALESCE(s.total_spent / s.order_count, 0) as avg_order_value,
+                        COALESCE(cs.churn_probability, 0) as churn_probability
                     FROM customers c
-                    LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                    GROUP BY c.id, c.churn_probability, c.engagement_score
+                    LEFT JOIN customer_order_stats s ON s.customer_id = c.id
+                    LEFT JOIN customer_churn_scores cs ON cs.customer_id = c.id
                 ) customer_stats
                 GROUP BY segment
                 ORDER BY avg_lifetime_value DESC
             """)
             
-            # Cohort analysis
-            cohort_analysis = await conn.fetch("""
-                WITH customer_cohorts AS (
-                    SELECT 
-                        c.id,
-                        DATE_TRUNC('month', c.first_order_date) as cohort_month,
-                        DATE_TRUNC('month', o.order_date) as order_month,
-                        EXTRACT(MONTH FROM AGE(o.order_date, c.first_order_date)) as month_number
-                    FROM customers c
-                    JOIN orders o ON c.id = o.customer_id
-                    WHERE c.first_order_date IS NOT NULL
-                )
+            # Cohort analysis (month_number counts calendar months since the first order's month)
+            cohort_analysis = group.fetch("""
                 SELECT 
-                    cohort_month,
+                    cohort_month::timestamp as cohort_month,
                     month_number,
-                    COUNT(DISTINCT id) as customers,
-                    COUNT(DISTINCT id)::float / 
-                        FIRST_VALUE(COUNT(DISTINCT id)) OVER (PARTITION BY cohort_month ORDER BY month_number) as retention_rate
-                FROM customer_cohorts
-                GROUP BY cohort_month, month_number
+                    customers,
+                    customers::float / 
+                        FIRST_VALUE(customers) OVER (PARTITION BY cohort_month ORDER BY month_number) as retention_rate
+                FROM cohort_retention
+                WHERE customers > 0
                 ORDER BY cohort_month, month_number
             """)
             
             # Customer behavior patterns
-            behavior_patterns = await conn.fetch("""
+            behavior_patterns = group.fetch("""
                 SELECT 
                     behavior_pattern,
                     COUNT(*) as customer_count,
@@ -392,40 +388,37 @@ class AdvancedAnalyticsService:
                     AVG(days_since_last_order) as avg_days_since_order
                 FROM (
                     SELECT 
-                        c.id,
                         CASE 
-                            WHEN COUNT(o.id) = 0 THEN 'No Orders'
-                            WHEN COUNT(o.id) = 1 THEN 'One-time'
-                            WHEN COUNT(o.id) BETWEEN 2 AND 5 THEN 'Occasional'
-                            WHEN COUNT(o.id) BETWEEN 6 AND 20 THEN 'Regular'
+                            WHEN s.order_count IS NULL THEN 'No Orders'
+                            WHEN s.order_count = 1 THEN 'One-time'
+                            WHEN s.order_count BETWEEN 2 AND 5 THEN 'Occasional'
+                            WHEN s.order_count BETWEEN 6 AND 20 THEN 'Regular'
                             ELSE 'Loyal'
                         END as behavior_pattern,
-                        COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                        COALESCE(AVG(o.total_price), 0) as avg_order_value,
-                        COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) as days_since_last_order
+                        COALESCE(s.total_spent, 0) as lifetime_value,
+                        COALESCE(s.total_spent / s.order_count, 0) as avg_order_value,
+                        COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - s.last_order_date)), 0) as days_since_last_order
                     FROM customers c
-                    LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                    GROUP BY c.id
+                    LEFT JOIN customer_order_stats s ON s.customer_id = c.id
                 ) customer_stats
                 GROUP BY behavior_pattern
                 ORDER BY avg_lifetime_value DESC
             """)
-            
-            return {
-                "clv_analysis": [dict(row) for row in clv_analysis],
-                "customer_segments": [dict(row) for row in customer_segments],
-                "cohort_analysis": [dict(row) for row in cohort_analysis],
-                "behavior_patterns": [dict(row) for row in behavior_patterns]
-            }
+
+        return {
+            "clv_analysis": [dict(row) for row in clv_analysis.result()],
+            "customer_segments": [dict(row) for row in customer_segments.result()],
+            "cohort_analysis": [dict(row) for row in cohort_analysis.result()],
+            "behavior_patterns": [dict(row) for row in behavior_patterns.result()]
+        }
     
     @staticmethod
-    async def get_predictive_analytics() -> Dict[str, Any]:
+    async def get_predictive_analytics(limit: int = 100, offset: int = 0) -> Dict[str, Any]:
         """Get predictive analytics data"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
             # Sales forecasting (simple trend analysis)
-            sales_forecast = await conn.fetch("""
+            sales_forecast = group.fetch("""
                 WITH monthly_sales AS (
                     SELECT 
                         DATE_TRUNC('month', order_date) as month,
@@ -475,154 +468,18 @@ class AdvancedAnalyticsService:
                 ORDER BY month DESC
                 LIMIT 12
             """)
-            
-            # Churn prediction with comprehensive analysis - show ALL customers
-            churn_prediction = await conn.fetch("""
-                SELECT 
-                    c.id,
-                    c.first_name,
-                    c.last_name,
-                    COUNT(o.id) as total_orders,
-                    COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                    COALESCE(AVG(o.total_price), 0) as avg_order_value,
-                    COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) as days_since_last_order,
-                    COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - c.created_at)), 0) as days_since_registration,
-                    CASE 
-                        WHEN COUNT(o.id) = 0 THEN 0.9  -- High churn risk for no orders
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 90 THEN 0.8  -- High risk if no order in 90 days
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 60 THEN 0.6  -- Medium risk if no order in 60 days
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 30 THEN 0.4  -- Low risk if no order in 30 days
-                        ELSE 0.1  -- Very low risk for recent orders
-                    END as churn_probability,
-                    CASE 
-                        WHEN COUNT(o.id) = 0 THEN 'High Risk'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 90 THEN 'High Risk'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 60 THEN 'Medium Risk'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) > 30 THEN 'Low Risk'
-                        ELSE 'Very Low Risk'
-                    END as churn_risk,
-                    CASE 
-                        WHEN COUNT(o.id) = 0 THEN 'Never Ordered'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 7 THEN 'Very Active'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 30 THEN 'Active'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 90 THEN 'Inactive'
-                        ELSE 'Very Inactive'
-                    END as activity_status,
-                    CASE 
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 10000 THEN 'VIP'
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 5000 THEN 'Premium'
-                        WHEN COALESCE(SUM(o.total_price), 0) >= 1000 THEN 'Regular'
-                        ELSE 'New'
-                    END as customer_segment
-                FROM customers c
-                LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                GROUP BY c.id, c.first_name, c.last_name, c.created_at
-                ORDER BY churn_probability DESC, lifetime_value DESC
-            """)
-            
-            # Customer activity analysis
-            customer_activity = await conn.fetch("""
-                SELECT 
-                    c.id,
-                    c.first_name,
-                    c.last_name,
-                    COUNT(o.id) as total_orders,
-                    COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                    COALESCE(MAX(o.order_date), c.created_at) as last_order_date,
-                    COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) as days_since_last_order,
-                    CASE 
-                        WHEN COUNT(o.id) = 0 THEN 'No Orders'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 7 THEN 'Very Active'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 30 THEN 'Active'
-                        WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 90 THEN 'Inactive'
-                        ELSE 'Very Inactive'
-                    END as activity_status
-                FROM customers c
-                LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                GROUP BY c.id, c.first_name, c.last_name, c.created_at
-                ORDER BY days_since_last_order ASC, total_orders DESC
-                LIMIT 50
-            """)
-            
-            # Customer activity distribution
-            activity_distribution = await conn.fetch("""
-                SELECT 
-                    activity_status,
-                    COUNT(*) as customer_count,
-                    AVG(lifetime_value) as avg_lifetime_value,
-                    AVG(total_orders) as avg_orders
-                FROM (
-                    SELECT 
-                        c.id,
-                        COUNT(o.id) as total_orders,
-                        COALESCE(SUM(o.total_price), 0) as lifetime_value,
-                        CASE 
-                            WHEN COUNT(o.id) = 0 THEN 'No Orders'
-                            WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 7 THEN 'Very Active'
-                            WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 30 THEN 'Active'
-                            WHEN COALESCE(EXTRACT(DAYS FROM (CURRENT_DATE - MAX(o.order_date))), 0) <= 90 THEN 'Inactive'
-                            ELSE 'Very Inactive'
-                        END as activity_status
-                    FROM customers c
-                    LEFT JOIN orders o ON c.id = o.customer_id AND o.status != 'cancelled'
-                    GROUP BY c.id
-                ) activity_stats
-                GROUP BY activity_status
-                ORDER BY customer_count DESC
-            """)
-            
-            # Demand forecasting with improved inventory turnover - show ALL products
-            demand_forecast = await conn.fetch("""
-                SELECT 
-                    p.id,
-                    p.name,
-                    p.stock,
-                    COALESCE(COUNT(oi.id), 0) as demand_last_30_days,
-                    COALESCE(SUM(oi.quantity), 0) as total_quantity_demanded,
-                    COALESCE(AVG(oi.quantity), 0) as avg_order_quantity,
-                    CASE 
-                        WHEN p.stock = 0 THEN 'Out of Stock'
-                        WHEN p.stock < COALESCE(COUNT(oi.id), 0) THEN 'Understocked'
-                        WHEN p.stock > COALESCE(COUNT(oi.id), 0) * 2 THEN 'Overstocked'
-                        ELSE 'Well Stocked'
-                    END as stock_status,
-                    CASE 
-                        WHEN p.stock > 0 THEN (COALESCE(COUNT(oi.id), 0)::float / p.stock) * 12
-                        ELSE 0 
-                    END as inventory_turnover,
-                    CASE 
-                        WHEN p.stock > 0 THEN 365 / NULLIF((COALESCE(COUNT(oi.id), 0)::float / p.stock) * 12, 0)
-                        ELSE 999 
-                    END as days_in_stock,
-                    CASE 
-                        WHEN p.stock = 0 THEN 'No Turnover'
-                        WHEN p.stock > 0 AND (COALESCE(COUNT(oi.id), 0)::float / p.stock) * 12 > 12 THEN 'High Turnover'
-                        WHEN p.stock > 0 AND (COALESCE(COUNT(oi.id), 0)::float / p.stock) * 12 > 6 THEN 'Medium Turnover'
-                        ELSE 'Low Turnover'
-                    END as turnover_category
-                FROM products p
-                LEFT JOIN order_items oi ON p.id = oi.product_id
-                LEFT JOIN orders o ON oi.order_id = o.id AND o.order_date >= CURRENT_DATE - INTERVAL '30 days' AND o.status != 'cancelled'
-                GROUP BY p.id, p.name, p.stock
-                ORDER BY demand_last_30_days DESC, inventory_turnover DESC
-            """)
-            
-            return {
-                "sales_forecast": [dict(row) for row in sales_forecast],
-                "churn_prediction": [dict(row) for row in churn_prediction],
-                "customer_activity": [dict(row) for row in customer_activity],
-                "activity_distribution": [dict(row) for row in activity_distribution],
-                "demand_forecast": [dict(row) for row in demand_forecast]
-            }
+
+        # Churn and demand come from the scoring job's tables, one page at a time
+        scores = await PredictiveScores.get_dashboard(limit, offset)
+        return {"sales_forecast": [dict(row) for row in sales_forecast.result()], **scores}
     
     @staticmethod
     async def get_real_time_analytics() -> Dict[str, Any]:
         """Get real-time analytics data"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             
             # Recent orders
-            recent_orders = await conn.fetch("""
+            recent_orders = group.fetch("""
                 SELECT 
                     o.id,
                     o.order_date,
@@ -640,7 +497,7 @@ class AdvancedAnalyticsService:
             """)
             
             # System health
-            system_health = await conn.fetch("""
+            system_health = group.fetch("""
                 SELECT 
                     'orders' as metric,
                     COUNT(*) as count,
@@ -664,7 +521,7 @@ class AdvancedAnalyticsService:
             """)
             
             # Low stock alerts
-            low_stock_alerts = await conn.fetch("""
+            low_stock_alerts = group.fetch("""
                 SELECT 
                     p.id,
                     p.name,
@@ -682,9 +539,9 @@ class AdvancedAnalyticsService:
                 ORDER BY p.stock ASC
                 LIMIT 20
             """)
-            
-            return {
-                "recent_orders": [dict(row) for row in recent_orders],
-                "system_health": [dict(row) for row in system_health],
-                "low_stock_alerts": [dict(row) for row in low_stock_alerts]
-            } 
\ No newline at end of file
+
+        return {
+            "recent_orders": [dict(row) for row in recent_orders.result()],
+            "system_health": [dict(row) for row in system_health.result()],
+            "low_stock_alerts": [dict(row) for row in low_stock_alerts.result()]
+        } 
\ No newline at end of file
@@ -0,0 +1,504 @@
+"""
+In-process columnar cache for the /analytics dashboards
+
+Keeps orders, order_items and customers as NumPy arrays (ids, customer ids,
+order times in microseconds, totals, status codes, item quantities and prices)
+and answers the group-by / time-bucket aggregations behind AnalyticsService
+with vectorized operations instead of re-aggregating the tables in Postgres.
+
+The first use in a process starts a background load and that request falls
+back to SQL. After that, a request older than ANALYTICS_CACHE_REFRESH_SECONDS
+first pulls in the orders whose updated_at moved (new orders, status changes,
+item edits via the order total trigger) plus customers with a higher id. A
+full reload every ANALYTICS_CACHE_FULL_RELOAD_SECONDS drops deleted rows. Past
+ANALYTICS_CACHE_MAX_ROWS rows the cache empties itself and everything goes to
+SQL until the next reload attempt.
+"""
+import asyncio
+import calendar
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.database import get_db_connection
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Same order as the orders.status CHECK constraint; statuses are cached as indexes into this
+ORDER_STATUSES = ('pending', 'approved', 'shipped', 'delivered', 'cancelled')
+CANCELLED = ORDER_STATUSES.index('cancelled')
+
+EPOCH = datetime(1970, 1, 1)
+DAY_US = 86_400_000_000
+HOUR_US = 3_600_000_000
+# Months since 1970 fit below this, so product * MONTH_KEYS + month is a unique int64 group key
+MONTH_KEYS = 1 << 16
+# Re-read orders changed this long before the previous refresh, for transactions that committed late
+UPDATE_OVERLAP = timedelta(minutes=5)
+
+_ORDER_COLUMNS = """
+    SELECT COALESCE(array_agg(id ORDER BY id), '{}') AS ids,
+           COALESCE(array_agg(customer_id ORDER BY id), '{}') AS customer_ids,
+           COALESCE(array_agg((EXTRACT(EPOCH FROM order_date) * 1000000)::int8 ORDER BY id), '{}') AS order_times,
+           COALESCE(array_agg(total_price::float8 ORDER BY id), '{}') AS totals,
+           COALESCE(array_agg(array_position($1::text[], status::text) - 1 ORDER BY id), '{}') AS statuses
+"""
+ALL_ORDERS_SQL = _ORDER_COLUMNS + "FROM orders"
+CHANGED_ORDERS_SQL = _ORDER_COLUMNS + "FROM orders WHERE updated_at >= $2"
+
+_ITEM_COLUMNS = """
+    SELECT COALESCE(array_agg(order_id), '{}') AS order_ids,
+           COALESCE(array_agg(product_id), '{}') AS product_ids,
+           COALESCE(array_agg(quantity), '{}') AS quantities,
+           COALESCE(array_agg(price::float8), '{}') AS prices
+"""
+ALL_ITEMS_SQL = _ITEM_COLUMNS + "FROM order_items"
+ORDER_ITEMS_SQL = _ITEM_COLUMNS + "FROM order_items WHERE order_id = ANY($1::int[])"
+
+# A missing created_at becomes 0 (1970), which never falls inside a dashboard window
+CUSTOMERS_SQL = """
+    SELECT COALESCE(array_agg(id ORDER BY id), '{}') AS ids,
+           COALESCE(array_agg(COALESCE((EXTRACT(EPOCH FROM created_at) * 1000000)::int8, 0) ORDER BY id), '{}') AS created
+    FROM customers
+    WHERE id > $1
+"""
+
+ROW_COUNT_SQL = """
+    SELECT (SELECT COUNT(*) FROM orders) + (SELECT COUNT(*) FROM order_items) + (SELECT COUNT(*) FROM customers)
+"""
+
+CATEGORY_PERFORMANCE_SQL = """
+    SELECT
+        t.tag_name as category,
+        COUNT(DISTINCT o.id) as orders,
+        SUM(oi.quantity) as items_sold,
+        SUM(oi.quantity * oi.price) as revenue
+    FROM order_items oi
+    JOIN products p ON oi.product_id = p.id
+    JOIN product_tags pt ON p.id = pt.product_id
+    JOIN tags t ON pt.tag_id = t.id
+    JOIN orders o ON oi.order_id = o.id
+    WHERE o.order_date >= CURRENT_DATE - INTERVAL '30 days'
+    AND o.status != 'cancelled'
+    GROUP BY t.tag_name
+    ORDER BY revenue DESC
+"""
+
+class _Columns:
+    """One consistent copy of the cached tables. Refreshes build a new one, so readers never see it change."""
+
+    def __init__(self, order_ids, order_customers, order_times, order_totals, order_statuses,
+                 item_orders, item_products, item_quantities, item_prices,
+                 customer_ids, customer_created, watermark: datetime):
+        self.order_ids = order_ids
+        self.order_customers = order_customers
+        self.order_times = order_times
+        self.order_totals = order_totals
+        self.order_statuses = order_statuses
+        self.item_orders = item_orders
+        self.item_products = item_products
+        self.item_quantities = item_quantities
+        self.item_prices = item_prices
+        self.customer_ids = customer_ids
+        self.customer_created = customer_created
+        self.watermark = watermark
+        # Row of each item's order; -1 if the order isn't cached
+        position, found = _locate(order_ids, item_orders)
+        self.item_positions = np.where(found, position, -1)
+
+    @property
+    def rows(self) -> int:
+        return len(self.order_ids) + len(self.item_orders) + len(self.customer_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(value.nbytes for value in vars(self).values() if isinstance(value, np.ndarray))
+
+    def item_mask(self, order_mask):
+        """Items whose order is selected by order_mask"""
+        mask = np.zeros(len(self.item_orders), dtype=bool)
+        cached = self.item_positions >= 0
+        mask[cached] = order_mask[self.item_positions[cached]]
+        return mask
+
+def _locate(ids, values):
+    """Positions of values in the sorted ids array, and which values were found"""
+    if len(ids) == 0:
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    index = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+    return index, ids[index] == values
+
+def _group(keys, *weights):
+    """Distinct keys (sorted), row count per key and per-key sums of each weights array"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique))
+    return unique, counts, [np.bincount(inverse, weights=weight, minlength=len(unique)) for weight in weights]
+
+def _micros(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+def _days_ago(days: int) -> int:
+    """CURRENT_DATE - days, in microseconds"""
+    start = date.today() - timedelta(days=days)
+    return _micros(datetime(start.year, start.month, start.day))
+
+def _months_ago(months: int) -> int:
+    """CURRENT_DATE - INTERVAL 'n months' (day clamped to the month's length), in microseconds"""
+    today = date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    month += 1
+    return _micros(datetime(year, month, min(today.day, calendar.monthrange(year, month)[1])))
+
+def _micros_to_datetime(value) -> datetime:
+    return EPOCH + timedelta(microseconds=int(value))
+
+def _day(day_number) -> date:
+    return (EPOCH + timedelta(days=int(day_number))).date()
+
+def _month_start(times):
+    """DATE_TRUNC('month', ...) of microsecond timestamps, as datetime64[M]"""
+    return times.astype('datetime64[us]').astype('datetime64[M]')
+
+def _month(month) -> datetime:
+    return month.astype('datetime64[us]').item()
+
+def _percent(part: int, whole: int) -> float:
+    return round(part / whole * 100, 2) if whole else 0.0
+
+def _arrays(row, columns, dtypes):
+    return [np.asarray(row[column], dtype=dtype) for column, dtype in zip(columns, dtypes)]
+
+ORDER_COLUMNS = ('ids', 'customer_ids', 'order_times', 'totals', 'statuses')
+ORDER_DTYPES = ('int64', 'int64', 'int64', 'float64', 'int8')
+ITEM_COLUMNS = ('order_ids', 'product_ids', 'quantities', 'prices')
+ITEM_DTYPES = ('int64', 'int64', 'int64', 'float64')
+
+def _build(orders, items, customers, watermark: datetime) -> _Columns:
+    return _Columns(
+        *_arrays(orders, ORDER_COLUMNS, ORDER_DTYPES),
+        *_arrays(items, ITEM_COLUMNS, ITEM_DTYPES),
+        np.asarray(customers['ids'], dtype=np.int64), np.asarray(customers['created'], dtype=np.int64),
+        watermark
+    )
+
+def _merge(data: _Columns, orders, items, customers, watermark: datetime) -> _Columns:
+    """Apply changed orders (with all their items) and new customers to a copy of data"""
+    ids, customer_ids, times, totals, statuses = _arrays(orders, ORDER_COLUMNS, ORDER_DTYPES)
+    position, found = _locate(data.order_ids, ids)
+
+    columns = [data.order_customers, data.order_times, data.order_totals, data.order_statuses]
+    changed = [customer_ids, times, totals, statuses]
+    updated = []
+    for column, values in zip(columns, changed):
+        column = column.copy()
+        column[position[found]] = values[found]
+        updated.append(np.concatenate([column, values[~found]]))
+    order_ids = np.concatenate([data.order_ids, ids[~found]])
+    if len(ids) and not np.all(order_ids[1:] > order_ids[:-1]):
+        # An order committed after one with a higher id
+        order = np.argsort(order_ids, kind='stable')
+        order_ids = order_ids[order]
+        updated = [column[order] for column in updated]
+
+    # Changed orders bring all of their current items
+    keep = ~np.isin(data.item_orders, ids)
+    new_items = _arrays(items, ITEM_COLUMNS, ITEM_DTYPES)
+    item_columns = [
+        np.concatenate([column[keep], values])
+        for column, values in zip([data.item_orders, data.item_products, data.item_quantities, data.item_prices], new_items)
+    ]
+    return _Columns(
+        order_ids, *updated, *item_columns,
+        np.concatenate([data.customer_ids, np.asarray(customers['ids'], dtype=np.int64)]),
+        np.concatenate([data.customer_created, np.asarray(customers['created'], dtype=np.int64)]),
+        watermark
+    )
+
+def _sales_dashboard(data: _Columns, start: int, end: int, top: int = 10) -> Dict[str, Any]:
+    in_window = (data.order_times >= start) & (data.order_times <= end)
+    active = in_window & (data.order_statuses != CANCELLED)
+    totals = data.order_totals[active]
+
+    days, orders, (revenue,) = _group(data.order_times[active] // DAY_US, totals)
+    items = data.item_mask(active)
+    quantities = data.item_quantities[items]
+    products, _, (sold, product_revenue) = _group(data.item_products[items], quantities, quantities * data.item_prices[items])
+    best = np.argsort(-sold, kind='stable')[:top]
+    statuses, status_orders, (status_revenue,) = _group(data.order_statuses[in_window], data.order_totals[in_window])
+
+    return {
+        "total_sales": float(totals.sum()),
+        "total_orders": int(active.sum()),
+        "avg_order_value": float(totals.mean()) if len(totals) else 0.0,
+        "daily_sales": [
+            {"date": _day(day), "orders": int(count), "revenue": float(amount)}
+            for day, count, amount in zip(days, orders, revenue)
+        ],
+        "top_products": [
+            {"id": int(products[i]), "total_sold": int(sold[i]), "revenue": float(product_revenue[i])} for i in best
+        ],
+        "sales_by_status": [
+            {"status": ORDER_STATUSES[status], "count": int(count), "revenue": float(amount)}
+            for status, count, amount in zip(statuses, status_orders, status_revenue)
+        ],
+    }
+
+def _customer_totals(data: _Columns):
+    """Per cached customer: non-cancelled order count, amount spent and last order time (-1 if none)"""
+    active = data.order_statuses != CANCELLED
+    position, found = _locate(data.customer_ids, data.order_customers[active])
+    position = position[found]
+    count = len(data.customer_ids)
+    orders = np.bincount(position, minlength=count)
+    spent = np.bincount(position, weights=data.order_totals[active][found], minlength=count)
+    last = np.full(count, -1, dtype=np.int64)
+    np.maximum.at(last, position, data.order_times[active][found])
+    return orders, spent, last
+
+def _customer_segmentation(data: _Columns, acquisition_start: int, top: int = 20) -> Dict[str, Any]:
+    orders, spent, last = _customer_totals(data)
+    segment = np.select([spent >= 10000, spent >= 5000, spent >= 1000], [0, 1, 2], default=3)
+    labels = ('VIP', 'Premium', 'Regular', 'New')
+    segments, customers, (segment_spent, segment_orders) = _group(segment, spent, orders.astype(float))
+    segment_rows = [
+        {"segment": labels[s], "customer_count": int(n), "avg_spent": float(total / n), "avg_orders": float(order_total / n)}
+        for s, n, total, order_total in zip(segments, customers, segment_spent, segment_orders)
+    ]
+    segment_rows.sort(key=lambda row: row["avg_spent"], reverse=True)
+
+    best = np.argsort(-spent, kind='stable')[:top]
+    recent = data.customer_created >= acquisition_start
+    days, new_customers, _ = _group(data.customer_created[recent] // DAY_US)
+    return {
+        "customer_segments": segment_rows,
+        "customer_behavior": [
+            {
+                "id": int(data.customer_ids[i]),
+                "total_orders": int(orders[i]),
+                "total_spent": float(spent[i]),
+                "last_order_date": _micros_to_datetime(last[i]) if orders[i] else None,
+                "avg_order_value": float(spent[i] / orders[i]) if orders[i] else None,
+            }
+            for i in best
+        ],
+        "customer_acquisition": [
+            {"date": _day(day), "new_customers": int(count)} for day, count in zip(days, new_customers)
+        ],
+    }
+
+def _performance_metrics(data: _Columns, trend_start: int) -> Dict[str, Any]:
+    orders, _, _ = _customer_totals(data)
+    active = data.order_statuses != CANCELLED
+    recent = active & (data.order_times >= trend_start)
+    days, day_orders, (day_revenue,) = _group(data.order_times[recent] // DAY_US, data.order_totals[recent])
+    _, customer_orders, (customer_spent,) = _group(data.order_customers[active], data.order_totals[active])
+    return {
+        "conversion_rate": _percent(int((orders > 0).sum()), len(data.customer_ids)),
+        "avg_order_value_trends": [
+            {"date": _day(day), "avg_order_value": float(revenue / count), "order_count": int(count)}
+            for day, count, revenue in zip(days, day_orders, day_revenue)
+        ],
+        "revenue_per_customer": float(customer_spent.mean()) if len(customer_spent) else 0.0,
+        "return_customer_rate": _percent(int((customer_orders > 1).sum()), len(customer_orders)),
+    }
+
+def _trend_analysis(data: _Columns, monthly_start: int, popular_start: int, peak_start: int) -> Dict[str, Any]:
+    active = data.order_statuses != CANCELLED
+    monthly = active & (data.order_times >= monthly_start)
+    months, month_orders, (month_revenue,) = _group(_month_start(data.order_times[monthly]), data.order_totals[monthly])
+
+    # Grouped by product here; merged by name once names are looked up
+    popular = data.item_mask(active & (data.order_times >= popular_start))
+    item_months = _month_start(data.order_times[data.item_positions[popular]]).astype(np.int64)
+    pairs, _, (sold,) = _group(data.item_products[popular] * MONTH_KEYS + item_months, data.item_quantities[popular])
+
+    peak = active & (data.order_times >= peak_start)
+    hours, hour_orders, (hour_revenue,) = _group((data.order_times[peak] // HOUR_US) % 24, data.order_totals[peak])
+    return {
+        "monthly_trends": [
+            {"month": _month(month), "orders": int(count), "revenue": float(revenue), "avg_order_value": float(revenue / count)}
+            for month, count, revenue in zip(months, month_orders, month_revenue)
+        ],
+        "popular_products_monthly": [
+            (int(pair // MONTH_KEYS), np.datetime64(int(pair % MONTH_KEYS), 'M'), int(quantity))
+            for pair, quantity in zip(pairs, sold)
+        ],
+        "peak_hours": [
+            {"hour": float(hour), "orders": int(count), "avg_order_value": float(revenue / count)}
+            for hour, count, revenue in zip(hours, hour_orders, hour_revenue)
+        ],
+    }
+
+async def _names(table: str, ids: List[int], columns: str) -> Dict[int, Dict[str, Any]]:
+    if not ids:
+        return {}
+    pool = await get_db_connection()
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(f"SELECT id, {columns} FROM {table} WHERE id = ANY($1::int[])", ids)
+    return {row['id']: dict(row) for row in rows}
+
+class AnalyticsCacheService:
+    """Columnar copy of the order tables answering AnalyticsService aggregations; None means use SQL"""
+    _data: Optional[_Columns] = None
+    _lock: Optional[asyncio.Lock] = None
+    _load_task: Optional[asyncio.Task] = None
+    _next_load_at = 0.0
+    _refreshed_at = 0.0
+    stats: Dict[str, Any] = {"hits": 0, "fallbacks": 0, "loads": 0, "refreshes": 0, "over_limit": False}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return np is not None and settings.ANALYTICS_CACHE_MAX_ROWS > 0
+
+    @classmethod
+    def info(cls) -> Dict[str, Any]:
+        data = cls._data
+        return {**cls.stats, "rows": data.rows if data else 0, "bytes": data.nbytes if data else 0}
+
+    @classmethod
+    def _get_lock(cls) -> asyncio.Lock:
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        return cls._lock
+
+    @classmethod
+    def _drop(cls, reason: str) -> None:
+        cls._data = None
+        cls.stats["over_limit"] = True
+        print(f"Warning: analytics cache disabled until the next reload: {reason}")
+
+    @classmethod
+    async def reload(cls) -> None:
+        """Load all rows (unless there are more than ANALYTICS_CACHE_MAX_ROWS) and swap them in"""
+        async with cls._get_lock():
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                async with conn.transaction(isolation='repeatable_read', readonly=True):
+                    rows = await conn.fetchval(ROW_COUNT_SQL)
+                    if rows > settings.ANALYTICS_CACHE_MAX_ROWS:
+                        cls._drop(f"{rows} rows exceed ANALYTICS_CACHE_MAX_ROWS={settings.ANALYTICS_CACHE_MAX_ROWS}")
+                        return
+                    watermark = await conn.fetchval("SELECT LOCALTIMESTAMP")
+                    orders = await conn.fetchrow(ALL_ORDERS_SQL, ORDER_STATUSES)
+                    items = await conn.fetchrow(ALL_ITEMS_SQL)
+                    customers = await conn.fetchrow(CUSTOMERS_SQL, 0)
+            cls._data = await asyncio.to_thread(_build, orders, items, customers, watermark)
+            cls._refreshed_at = time.monotonic()
+            cls.stats.update(loads=cls.stats["loads"] + 1, over_limit=False)
+
+    @classmethod
+    async def refresh(cls) -> None:
+        """Pull in orders changed since the last refresh and customers added since"""
+        async with cls._get_lock():
+            data = cls._data
+            if data is None:
+                return
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                async with conn.transaction(isolation='repeatable_read', readonly=True):
+                    watermark = await conn.fetchval("SELECT LOCALTIMESTAMP")
+                    orders = await conn.fetchrow(CHANGED_ORDERS_SQL, ORDER_STATUSES, data.watermark - UPDATE_OVERLAP)
+                    items = await conn.fetchrow(ORDER_ITEMS_SQL, orders['ids'])
+                    last_customer = int(data.customer_ids[-1]) if len(data.customer_ids) else 0
+                    customers = await conn.fetchrow(CUSTOMERS_SQL, last_customer)
+            merged = await asyncio.to_thread(_merge, data, orders, items, customers, watermark)
+            cls._refreshed_at = time.monotonic()
+            cls.stats["refreshes"] += 1
+            if merged.rows > settings.ANALYTICS_CACHE_MAX_ROWS:
+                cls._drop(f"{merged.rows} rows exceed ANALYTICS_CACHE_MAX_ROWS={settings.ANALYTICS_CACHE_MAX_ROWS}")
+                return
+            cls._data = merged
+
+    @classmethod
+    async def _background_reload(cls) -> None:
+        try:
+            await cls.reload()
+        except Exception as e:
+            print(f"Error loading analytics cache: {e}")
+            cls._next_load_at = time.monotonic() + settings.ANALYTICS_CACHE_REFRESH_SECONDS
+
+    @classmethod
+    async def _columns(cls) -> Optional[_Columns]:
+        """Current columns, brought up to date if due; None until the first load has finished"""
+        if not cls.enabled():
+            return None
+        now = time.monotonic()
+        if now >= cls._next_load_at and (cls._load_task is None or cls._load_task.done()):
+            cls._next_load_at = now + settings.ANALYTICS_CACHE_FULL_RELOAD_SECONDS
+            cls._load_task = asyncio.create_task(cls._background_reload())
+        if cls._data is not None and now - cls._refreshed_at >= settings.ANALYTICS_CACHE_REFRESH_SECONDS:
+            # A reload or refresh already in progress will do; serve what we have meanwhile
+            if not cls._get_lock().locked():
+                try:
+                    await cls.refresh()
+                except Exception as e:
+                    print(f"Error refreshing analytics cache: {e}")
+                    cls.stats["fallbacks"] += 1
+                    return None
+        data = cls._data
+        cls.stats["hits" if data is not None else "fallbacks"] += 1
+        return data
+
+    @classmethod
+    async def sales_dashboard(cls, days: int) -> Optional[Dict[str, Any]]:
+        """AnalyticsService.get_sales_dashboard_data from the cache"""
+        data = await cls._columns()
+        if data is None:
+            return None
+        end = datetime.now()
+        result = await asyncio.to_thread(_sales_dashboard, data, _micros(end - timedelta(days=days)), _micros(end))
+        names = await _names("products", [row["id"] for row in result["top_products"]], "name")
+        result["top_products"] = [
+            {"name": names[row["id"]]["name"], **row} for row in result["top_products"] if row["id"] in names
+        ]
+        return result
+
+    @classmethod
+    async def customer_segmentation(cls) -> Optional[Dict[str, Any]]:
+        """AnalyticsService.get_customer_segmentation from the cache"""
+        data = await cls._columns()
+        if data is None:
+            return None
+        result = await asyncio.to_thread(_customer_segmentation, data, _days_ago(90))
+        names = await _names("customers", [row["id"] for row in result["customer_behavior"]], "first_name, last_name")
+        result["customer_behavior"] = [
+            {**names[row["id"]], **row} for row in result["customer_behavior"] if row["id"] in names
+        ]
+        return result
+
+    @classmethod
+    async def performance_metrics(cls) -> Optional[Dict[str, Any]]:
+        """AnalyticsService.get_performance_metrics from the cache"""
+        data = await cls._columns()
+        if data is None:
+            return None
+        return await asyncio.to_thread(_performance_metrics, data, _days_ago(30))
+
+    @classmethod
+    async def trend_analysis(cls) -> Optional[Dict[str, Any]]:
+        """AnalyticsService.get_trend_analysis from the cache; category performance needs tags, so it stays SQL"""
+        data = await cls._columns()
+        if data is None:
+            return None
+        result = await asyncio.to_thread(_trend_analysis, data, _months_ago(12), _months_ago(6), _days_ago(30))
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            categories = await conn.fetch(CATEGORY_PERFORMANCE_SQL)
+
+        # The SQL version groups by product name
+        pairs = result["popular_products_monthly"]
+        names = await _names("products", sorted({product for product, _, _ in pairs}), "name")
+        sold: Dict[tuple, int] = {}
+        for product, month, quantity in pairs:
+            if product in names:
+                key = (names[product]["name"], month)
+                sold[key] = sold.get(key, 0) + quantity
+        popular = sorted(sold.items(), key=lambda entry: (entry[0][1], entry[1]), reverse=True)
+        result["popular_products_monthly"] = [
+            {"name": name, "month": _month(month), "total_sold": quantity} for (name, month), quantity in popular
+        ]
+        result["category_performance"] = [dict(row) for row in categories]
+        return {key: result[key] for key in ("monthly_trends", "popular_products_monthly", "category_performance", "peak_hours")}
@@ -1,20 +1,24 @@
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
-from app.database import get_db_connection
+from app.utils.query_group import QueryGroup
+from app.services.analytics_cache_service import AnalyticsCacheService
 import json
 
 class AnalyticsService:
     @staticmethod
     async def get_sales_dashboard_data(days: int = 30) -> Dict[str, Any]:
         """Get real-time sales analytics"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        cached = await AnalyticsCacheService.sales_dashboard(days)
+        if cached is not None:
+            return cached
+
+        async with QueryGroup() as group:
             # Get date range
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
             # Total sales
-            total_sales = await conn.fetchval("""
+            total_sales = group.fetchval("""
                 SELECT COALESCE(SUM(total_price), 0)
                 FROM orders 
                 WHERE order_date >= $1 AND order_date <= $2
@@ -22,7 +26,7 @@ class AnalyticsService:
             """, start_date, end_date)
             
             # Total orders
-            total_orders = await conn.fetchval("""
+            total_orders = group.fetchval("""
                 SELECT COUNT(*)
                 FROM orders 
                 WHERE order_date >= $1 AND order_date <= $2
@@ -30,7 +34,7 @@ class AnalyticsService:
             """, start_date, end_date)
             
             # Average order value
-            avg_order_value = await conn.fetchval("""
+            avg_order_value = group.fetchval("""
                 SELECT COALESCE(AVG(total_price), 0)
                 FROM orders 
                 WHERE order_date >= $1 AND order_date <= $2
@@ -38,7 +42,7 @@ class AnalyticsService:
             """, start_date, end_date)
             
             # Daily sales data for chart
-            daily_sales = await conn.fetch("""
+            daily_sales = group.fetch("""
                 SELECT 
                     DATE(order_date) as date,
                     COUNT(*) as orders,
@@ -51,7 +55,7 @@ class AnalyticsService:
             """, start_date, end_date)
             
             # Top selling products
-            top_products = await conn.fetch("""
+            top_products = group.fetch("""
                 SELECT 
                     p.name,
                     p.id,
@@ -68,7 +72,7 @@ class AnalyticsService:
             """, start_date, end_date)
             
             # Sales by status
-            sales_by_status = await conn.fetch("""
+            sales_by_status = group.fetch("""
                 SELECT 
                     status,
                     COUNT(*) as count,
@@ -77,23 +81,22 @@ class AnalyticsService:
                 WHERE order_date >= $1 AND order_date <= $2
                 GROUP BY status
             """, start_date, end_date)
-            
-            return {
-                "total_sales": float(total_sales),
-                "total_orders": total_orders,
-                "avg_order_value": float(avg_order_value),
-                "daily_sales": [dict(row) for row in daily_sales],
-                "top_products": [dict(row) for row in top_products],
-                "sales_by_status": [dict(row) for row in sales_by_status]
-            }
+
+        return {
+            "total_sales": float(total_sales.result()),
+            "total_orders": total_orders.result(),
+            "avg_order_value": float(avg_order_value.result()),
+            "daily_sales": [dict(row) for row in daily_sales.result()],
+            "top_products": [dict(row) for row in top_products.result()],
+            "sales_by_status": [dict(row) for row in sales_by_status.result()]
+        }
 
     @staticmethod
     async def get_inventory_analytics() -> Dict[str, Any]:
         """Get inventory management analytics"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        async with QueryGroup() as group:
             # Low stock alerts (less than 10 items)
-            low_stock_products = await conn.fetch("""
+            low_stock_products = group.fetch("""
                 SELECT 
                     id, name, stock, price,
                     CASE 
@@ -108,13 +111,13 @@ class AnalyticsService:
             """)
             
             # Stock value
-            total_stock_value = await conn.fetchval("""
+            total_stock_value = group.fetchval("""
                 SELECT COALESCE(SUM(stock * price), 0)
                 FROM products
             """)
             
             # Products by stock level
-            stock_distribution = await conn.fetch("""
+            stock_distribution = group.fetch("""
                 SELECT 
                     stock_level,
                     product_count,
@@ -158,7 +161,7 @@ class AnalyticsService:
             """)
             
             # Fast moving products (sold in last 30 days)
-            fast_moving = await conn.fetch("""
+            fast_moving = group.fetch("""
                 SELECT 
                     p.name,
                     p.id,
@@ -176,7 +179,7 @@ class AnalyticsService:
             """)
             
             # Product views and performance
-            product_views = await conn.fetch("""
+            product_views = group.fetch("""
                 SELECT 
                     p.name,
                     COALESCE(p.views, 0) as views,
@@ -191,22 +194,27 @@ class AnalyticsService:
                 LIMIT 10
             """)
             
-            return {
-                "low_stock_products": [dict(row) for row in low_stock_products],
-                "total_stock_value": float(total_stock_value),
-                "stock_distribution": [dict(row) for row in stock_distribution],
-                "fast_moving_products": [dict(row) for row in fast_moving],
-                "product_views": [dict(row) for row in product_views],
-                "total_products": await conn.fetchval("SELECT COUNT(*) FROM products")
-            }
+            total_products = group.fetchval("SELECT COUNT(*) FROM products")
+
+        return {
+            "low_stock_products": [dict(row) for row in low_stock_products.result()],
+            "total_stock_value": float(total_stock_value.result()),
+            "stock_distribution": [dict(row) for row in stock_distribution.result()],
+            "fast_moving_products": [dict(row) for row in fast_moving.result()],
+            "product_views": [dict(row) for row in product_views.result()],
+            "total_products": total_products.result()
+        }
 
     @staticmethod
     async def get_customer_segmentation() -> Dict[str, Any]:
         """Get customer segmentation analytics"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        cached = await AnalyticsCacheService.customer_segmentation()
+        if cached is not None:
+            return cached
+
+        async with QueryGroup() as group:
             # Customer segments by order value
-            customer_segments = await conn.fetch("""
+            customer_segments = group.fetch("""
                 SELECT 
                     CASE 
                         WHEN total_spent >= 10000 THEN 'VIP'
@@ -238,7 +246,7 @@ class AnalyticsService:
             """)
             
             # Customer behavior analysis
-            customer_behavior = await conn.fetch("""
+            customer_behavior = group.fetch("""
                 SELECT 
                     c.id,
                     c.first_name,
@@ -256,7 +264,7 @@ class AnalyticsService:
             """)
             
             # Customer acquisition data
-            customer_acquisition = await conn.fetch("""
+            customer_acquisition = group.fetch("""
                 SELECT 
                     DATE(created_at) as date,
                     COUNT(*) as new_customers
@@ -265,20 +273,23 @@ class AnalyticsService:
                 GROUP BY DATE(created_at)
                 ORDER BY date
             """)
-            
-            return {
-                "customer_segments": [dict(row) for row in customer_segments],
-                "customer_behavior": [dict(row) for row in customer_behavior],
-                "customer_acquisition": [dict(row) for row in customer_acquisition]
-            }
+
+        return {
+            "customer_segments": [dict(row) for row in customer_segments.result()],
+            "customer_behavior": [dict(row) for row in customer_behavior.result()],
+            "customer_acquisition": [dict(row) for row in customer_acquisition.result()]
+        }
 
     @staticmethod
     async def get_performance_metrics() -> Dict[str, Any]:
         """Get performance metrics and KPIs"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        cached = await AnalyticsCacheService.performance_metrics()
+        if cached is not None:
+            return cached
+
+        async with QueryGroup() as group:
             # Conversion rates
-            conversion_data = await conn.fetch("""
+            conversion_data = group.fetch("""
                 SELECT 
                     COUNT(DISTINCT c.id) as total_customers,
                     COUNT(DISTINCT CASE WHEN o.id IS NOT NULL THEN c.id END) as customers_with_orders,
@@ -292,7 +303,7 @@ class AnalyticsService:
             """)
             
             # Average order value trends
-            aov_trends = await conn.fetch("""
+            aov_trends = group.fetch("""
                 SELECT 
                     DATE(order_date) as date,
                     AVG(total_price) as avg_order_value,
@@ -305,7 +316,7 @@ class AnalyticsService:
             """)
             
             # Revenue per customer
-            revenue_per_customer = await conn.fetchval("""
+            revenue_per_customer = group.fetchval("""
                 SELECT COALESCE(AVG(total_spent), 0)
                 FROM (
                     SELECT COALESCE(SUM(total_price), 0) as total_spent
@@ -316,7 +327,7 @@ class AnalyticsService:
             """)
             
             # Return customer rate
-            return_customer_rate = await conn.fetchval("""
+            return_customer_rate = group.fetchval("""
                 SELECT ROUND(
                     (COUNT(DISTINCT customer_id)::DECIMAL / 
                      (SELECT COUNT(DISTINCT customer_id) FROM orders WHERE status != 'cancelled')::DECIMAL) * 100, 2
@@ -329,21 +340,24 @@ class AnalyticsService:
                     HAVING COUNT(*) > 1
                 ) repeat_customers
             """)
-            
-            return {
-                "conversion_rate": float(conversion_data[0]['conversion_rate']) if conversion_data else 0,
-                "avg_order_value_trends": [dict(row) for row in aov_trends],
-                "revenue_per_customer": float(revenue_per_customer),
-                "return_customer_rate": float(return_customer_rate) if return_customer_rate else 0
-            }
+
+        return {
+            "conversion_rate": float(conversion_data.result()[0]['conversion_rate']) if conversion_data.result() else 0,
+            "avg_order_value_trends": [dict(row) for row in aov_trends.result()],
+            "revenue_per_customer": float(revenue_per_customer.result()),
+            "return_customer_rate": float(return_customer_rate.result()) if return_customer_rate.result() else 0
+        }
 
     @staticmethod
     async def get_trend_analysis() -> Dict[str, Any]:
         """Get trend analysis and seasonal patterns"""
-        pool = await get_db_connection()
-        async with pool.acquire() as conn:
+        cached = await AnalyticsCacheService.trend_analysis()
+        if cached is not None:
+            return cached
+
+        async with QueryGroup() as group:
             # Monthly sales trends
-            monthly_trends = await conn.fetch("""
+            monthly_trends = group.fetch("""
                 SELECT 
                     DATE_TRUNC('month', order_date) as month,
                     COUNT(*) as orders,
@@ -357,7 +371,7 @@ class AnalyticsService:
             """)
             
             # Popular products by month
-            popular_products_monthly = await conn.fetch("""
+            popular_products_monthly = group.fetch("""
                 SELECT 
                     p.name,
                     DATE_TRUNC('month', o.order_date) as month,
@@ -372,7 +386,7 @@ class AnalyticsService:
             """)
             
             # Category performance
-            category_performance = await conn.fetch("""
+            category_performance = group.fetch("""
                 SELECT 
                     t.tag_name as category,
                     COUNT(DISTINCT o.id) as orders,
@@ -390,7 +404,7 @@ class AnalyticsService:
             """)
             
             # Peak hours analysis
-            peak_hours = await conn.fetch("""
+            peak_hours = group.fetch("""
                 SELECT 
                     EXTRACT(HOUR FROM order_date) as hour,
                     COUNT(*) as orders,
@@ -401,10 +415,10 @@ class AnalyticsService:
                 GROUP BY EXTRACT(HOUR FROM order_date)
                 ORDER BY hour
             """)
-            
-            return {
-                "monthly_trends": [dict(row) for row in monthly_trends],
-                "popular_products_monthly": [dict(row) for row in popular_products_monthly],
-                "category_performance": [dict(row) for row in category_performance],
-                "peak_hours": [dict(row) for row in peak_hours]
-            } 
\ No newline at end of file
+
+        return {
+            "monthly_trends": [dict(row) for row in monthly_trends.result()],
+            "popular_products_monthly": [dict(row) for row in popular_products_monthly.result()],
+            "category_performance": [dict(row) for row in category_performance.result()],
+            "peak_hours": [dict(row) for row in peak_hours.result()]
+        } 
\ No newline at end of file
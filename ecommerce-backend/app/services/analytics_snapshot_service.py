@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.models.analytics import AnalyticsSnapshot
+from app.services.analytics_service import AnalyticsService
+from app.utils.background import PeriodicService, run_exclusive
+
+# Snapshot name -> AnalyticsService method that computes it
+SNAPSHOT_BUILDERS = {
+    "sales_dashboard": AnalyticsService.get_sales_dashboard_data,
+    "inventory": AnalyticsService.get_inventory_analytics,
+    "customer_segmentation": AnalyticsService.get_customer_segmentation,
+    "performance_metrics": AnalyticsService.get_performance_metrics,
+    "trend_analysis": AnalyticsService.get_trend_analysis,
+}
+
+REFRESH_LOCK_KEY = 84_201_018
+
+# Snapshots kept warm even before anyone has asked for them
+DEFAULT_SNAPSHOTS = [
+    ("sales_dashboard", 30),
+    ("inventory", None),
+    ("customer_segmentation", None),
+    ("performance_metrics", None),
+    ("trend_analysis", None),
+]
+
+class AnalyticsSnapshotService(PeriodicService):
+    """Serves /analytics dashboards from precomputed snapshots.
+
+    Each dashboard is stored in analytics_snapshots as JSON and refreshed in the
+    background every ANALYTICS_SNAPSHOT_REFRESH_SECONDS, so a request is a single
+    primary-key lookup. Missing or too-old snapshots are computed on demand.
+    Non-default variants (e.g. another ``days``) not requested for
+    ANALYTICS_SNAPSHOT_VARIANT_IDLE_SECONDS are no longer refreshed and are deleted.
+    """
+    ERROR_MESSAGE = "Error refreshing analytics snapshots"
+
+    @staticmethod
+    def snapshot_key(name: str, arg: Optional[int] = None) -> str:
+        return name if arg is None else f"{name}:{arg}"
+
+    @classmethod
+    async def refresh(cls, name: str, arg: Optional[int] = None) -> Tuple[Dict[str, Any], datetime]:
+        """Recompute a snapshot from the live tables and store it"""
+        builder = SNAPSHOT_BUILDERS[name]
+        generated_at = datetime.utcnow()
+        data = await (builder(arg) if arg is not None else builder())
+        await AnalyticsSnapshot.save(cls.snapshot_key(name, arg), name, arg, data, generated_at)
+        return data, generated_at
+
+    @classmethod
+    async def get(cls, name: str, arg: Optional[int] = None, fresh: bool = False) -> Tuple[Dict[str, Any], datetime]:
+        """Get dashboard data and when it was generated; ``fresh`` bypasses the snapshot"""
+        if not fresh:
+            snapshot = await AnalyticsSnapshot.get_by_key(cls.snapshot_key(name, arg))
+            max_age = timedelta(seconds=settings.ANALYTICS_SNAPSHOT_MAX_AGE_SECONDS)
+            if snapshot and datetime.utcnow() - snapshot.generated_at <= max_age:
+                return snapshot.data, snapshot.generated_at
+        return await cls.refresh(name, arg)
+
+    @classmethod
+    async def refresh_all(cls) -> None:
+        """Refresh the default snapshots and the variants requested recently; prune the rest"""
+        idle_seconds = settings.ANALYTICS_SNAPSHOT_VARIANT_IDLE_SECONDS
+        keys = {(name, arg) for name, arg in DEFAULT_SNAPSHOTS}
+        await AnalyticsSnapshot.delete_idle(idle_seconds, [cls.snapshot_key(name, arg) for name, arg in keys])
+        keys.update((row['name'], row['arg']) for row in await AnalyticsSnapshot.get_active_keys(idle_seconds))
+        for name, arg in sorted(keys, key=lambda k: (k[0], k[1] or 0)):
+            if name not in SNAPSHOT_BUILDERS:
+                continue
+            try:
+                await cls.refresh(name, arg)
+            except Exception as e:
+                print(f"Error refreshing analytics snapshot {cls.snapshot_key(name, arg)}: {e}")
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        return settings.ANALYTICS_SNAPSHOT_REFRESH_SECONDS
+
+    @classmethod
+    async def run_periodic(cls) -> None:
+        await run_exclusive(REFRESH_LOCK_KEY, lambda conn: cls.refresh_all())
@@ -0,0 +1,40 @@
+import time
+from typing import Any, Dict
+from app.config import settings
+from app.models.customer_order_stats import CustomerOrderStats
+from app.utils.background import PeriodicService, run_exclusive
+
+REBUILD_LOCK_KEY = 84_201_024
+
+class CustomerStatsService(PeriodicService):
+    """Periodically recomputes customer_order_stats and cohort_retention from order history.
+
+    The orders trigger keeps both current within each order's transaction and
+    migration 0004 backfilled them, so this only runs when
+    CUSTOMER_STATS_REBUILD_SECONDS is set. A rebuild holds back order writes
+    that would change them until it finishes.
+    """
+    RUN_AT_START = False
+    ERROR_MESSAGE = "Error rebuilding customer order stats"
+    stats: Dict[str, Any] = {"rebuilds": 0, "customers": 0, "last_rebuild_seconds": 0.0}
+
+    @classmethod
+    async def rebuild(cls) -> bool:
+        """Rebuild unless another worker is already doing it; returns whether it ran"""
+        return bool(await run_exclusive(REBUILD_LOCK_KEY, cls._rebuild))
+
+    @classmethod
+    async def _rebuild(cls, conn) -> bool:
+        start = time.perf_counter()
+        cls.stats["customers"] = await CustomerOrderStats.rebuild()
+        cls.stats["last_rebuild_seconds"] = round(time.perf_counter() - start, 3)
+        cls.stats["rebuilds"] += 1
+        return True
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        return settings.CUSTOMER_STATS_REBUILD_SECONDS
+
+    @classmethod
+    async def run_periodic(cls) -> None:
+        await cls.rebuild()
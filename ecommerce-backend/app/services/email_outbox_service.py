@@ -0,0 +1,200 @@
+import asyncio
+import random
+import smtplib
+import time
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+from app.models.email_outbox import EmailOutbox
+from app.services.email_service import email_service
+
+# Problems with the session or server setup rather than the message; always retried
+SESSION_ERRORS = (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError, smtplib.SMTPHeloError)
+# The session itself broke; reconnect and carry on with the batch
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+def is_permanent_error(error: Exception) -> bool:
+    """Whether the server rejected this message for good (a 5xx reply); 4xx replies are retried"""
+    if isinstance(error, smtplib.SMTPNotSupportedError):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException) and not isinstance(error, SESSION_ERRORS):
+        return 500 <= error.smtp_code < 600
+    return False
+
+class SmtpSession:
+    """
+    One authenticated SMTP connection reused across messages and batches.
+    Blocking (smtplib); the outbox worker drives it from a thread.
+    """
+    def __init__(self, host: str, port: int, username: str = '', password: str = '',
+                 use_tls: bool = True, timeout: float = 30, idle_seconds: float = 60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.connections = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self.connections += 1
+        return smtp
+
+    def _session(self) -> smtplib.SMTP:
+        # Servers drop idle connections; don't bother probing one that sat around
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def send_batch(self, messages: List[Tuple[int, Message]]) -> List[Tuple[int, Optional[Exception]]]:
+        """Send messages over the shared session; returns (id, error or None) per message"""
+        results = []
+        for message_id, message in messages:
+            try:
+                try:
+                    self._session().send_message(message)
+                except CONNECTION_ERRORS:
+                    # Stale session: reconnect once for this message
+                    self.close()
+                    self._session().send_message(message)
+                results.append((message_id, None))
+            except Exception as e:
+                if isinstance(e, CONNECTION_ERRORS) or not isinstance(e, smtplib.SMTPException):
+                    self.close()
+                results.append((message_id, e))
+            self._last_used = time.monotonic()
+        return results
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+class EmailOutboxService:
+    """Delivers queued emails from email_outbox in batches.
+
+    Route handlers only insert into the outbox (see EmailService); this worker
+    claims up to EMAIL_BATCH_SIZE due rows, sends them over one reused SMTP
+    session, and records sent/failed state, retrying failures with jittered
+    exponential backoff up to EMAIL_MAX_ATTEMPTS.
+    """
+    _task: Optional[asyncio.Task] = None
+    _wakeup: Optional[asyncio.Event] = None
+    _session: Optional[SmtpSession] = None
+    _stopping = False
+    stats: Dict[str, Any] = {"sent": 0, "failed": 0, "retried": 0, "batches": 0}
+
+    @classmethod
+    def notify(cls) -> None:
+        """Wake the worker early after an email was queued in this process"""
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Seconds to wait before retrying after ``attempts`` failed attempts (jittered, capped)"""
+        backoff = min(
+            settings.EMAIL_RETRY_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)),
+            settings.EMAIL_RETRY_MAX_BACKOFF_SECONDS
+        )
+        return random.uniform(backoff / 2, backoff)
+
+    @classmethod
+    def _get_session(cls) -> SmtpSession:
+        if cls._session is None:
+            cls._session = SmtpSession(
+                email_service.smtp_server,
+                email_service.smtp_port,
+                email_service.smtp_username,
+                email_service.smtp_password,
+                use_tls=email_service.smtp_use_tls,
+                idle_seconds=settings.EMAIL_SMTP_IDLE_SECONDS
+            )
+        return cls._session
+
+    @classmethod
+    async def deliver_batch(cls) -> int:
+        """Claim and send one batch; returns how many emails were claimed"""
+        emails = await EmailOutbox.claim_batch(settings.EMAIL_BATCH_SIZE, settings.EMAIL_SENDING_TIMEOUT_SECONDS)
+        if not emails:
+            return 0
+
+        messages = [
+            (email.id, email_service.build_message(email.to_email, email.subject, email.html_body, email.text_body))
+            for email in emails
+        ]
+        results = await asyncio.to_thread(cls._get_session().send_batch, messages)
+
+        attempts = {email.id: email.attempts for email in emails}
+        sent, failures = [], []
+        for email_id, error in results:
+            if error is None:
+                sent.append(email_id)
+                continue
+            give_up = is_permanent_error(error) or attempts[email_id] >= settings.EMAIL_MAX_ATTEMPTS
+            failures.append((email_id, f"{type(error).__name__}: {error}", None if give_up else cls.retry_delay(attempts[email_id])))
+            cls.stats["failed" if give_up else "retried"] += 1
+            print(f"Error sending email {email_id} (attempt {attempts[email_id]}): {error}")
+
+        await EmailOutbox.mark_sent(sent)
+        await EmailOutbox.mark_failed(failures)
+        cls.stats["sent"] += len(sent)
+        cls.stats["batches"] += 1
+        return len(emails)
+
+    @classmethod
+    def start(cls) -> None:
+        """Deliver queued emails in the background"""
+        if cls._task is None or cls._task.done():
+            cls._wakeup = asyncio.Event()
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop after the batch in flight, if any, then close the SMTP session.
+
+        The batch isn't cancelled: its send_batch thread would keep using the
+        session regardless, and its emails would be re-sent after the claim expires.
+        """
+        task, cls._task = cls._task, None
+        if task is not None:
+            cls._stopping = True
+            cls._wakeup.set()
+            try:
+                await task
+            finally:
+                cls._stopping = False
+        if cls._session is not None:
+            await asyncio.to_thread(cls._session.close)
+            cls._session = None
+
+    @classmethod
+    async def _run(cls) -> None:
+        while not cls._stopping:
+            cls._wakeup.clear()
+            try:
+                while not cls._stopping and await cls.deliver_batch() == settings.EMAIL_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                print(f"Error delivering outbox emails: {e}")
+            if cls._stopping:
+                return
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), timeout=settings.EMAIL_POLL_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
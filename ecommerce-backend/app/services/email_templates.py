@@ -0,0 +1,225 @@
+"""
+Compiled notification email templates
+
+Each email is described once as a list of content blocks; at startup that
+source is turned into an HTML and a plain-text template and split into static
+chunks and ``{{placeholder}}`` slots. Rendering a message is then just joining
+the chunks with the (HTML-escaped, for the HTML variant) per-customer values.
+
+Paragraph text may use **bold** and `code`; field rows marked optional are
+left out when their value is empty.
+"""
+import html
+import re
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+
+PLACEHOLDER_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*")
+CODE_RE = re.compile(r"`(.+?)`")
+NEEDS_ESCAPE_RE = re.compile(r"[&<>\"']")
+
+class CompiledTemplate:
+    """
+    A template parsed once into its static chunks plus the list positions of
+    its placeholders; rendering copies the list, drops the values into their
+    slots and joins it.
+    """
+    def __init__(self, source: str):
+        self.fields: List[str] = []
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str]] = []
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self._parts.append(source[position:match.start()])
+            self._slots.append((len(self._parts), match.group(1)))
+            self._parts.append("")
+            if match.group(1) not in self.fields:
+                self.fields.append(match.group(1))
+            position = match.end()
+        self._parts.append(source[position:])
+
+    def render(self, values: Dict[str, str]) -> str:
+        parts = self._parts.copy()
+        for index, name in self._slots:
+            parts[index] = values[name]
+        return "".join(parts)
+
+HTML_LAYOUT = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>${title} - {{store_name}}</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: linear-gradient(135deg, ${gradient}); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }
+        .content { background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }
+        .details { background: white; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid ${accent}; }
+        .highlight { background: ${highlight}; padding: 15px; border-radius: 5px; margin: 15px 0; }
+        .footer { text-align: center; margin-top: 30px; padding-top: 20px; border-top: 1px solid #ddd; color: #666; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>${heading}</h1>
+        <p>${tagline}</p>
+    </div>
+    <div class="content">
+        <h2>Hello {{customer_name}},</h2>
+${body}
+        <div class="footer">
+            <p>Best regards,<br>The {{store_name}} Team</p>
+            <p><small>This email was sent on {{sent_at}}</small></p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+TEXT_LAYOUT = Template("""${heading}
+
+Hello {{customer_name}},
+
+${body}
+Best regards,
+The {{store_name}} Team
+
+This email was sent on {{sent_at}}
+""")
+
+EMAIL_TEMPLATE_SOURCES: Dict[str, Dict[str, Any]] = {
+    "shipping_notification": {
+        "subject": "Your Order #{{order_id}} Has Been Shipped! 🚚",
+        "title": "Order Shipped",
+        "heading": "🚚 Your Order Has Been Shipped!",
+        "tagline": "Great news! Your order is on its way to you.",
+        "style": {"gradient": "#9DC08B 0%, #40513B 100%", "accent": "#9DC08B", "highlight": "#e8f5e8"},
+        "blocks": [
+            ("paragraph", "We're excited to let you know that your order **#{{order_id}}** has been shipped and is on its way to you!"),
+            ("details", "📦", "Shipping Details", [
+                ("Courier Service", "{{courier_service}}"),
+                ("Tracking ID", "{{tracking_id}}"),
+                ("Estimated Delivery", "{{estimated_delivery}}", "optional"),
+            ]),
+            ("highlight", "🔍", "Track Your Package", [
+                "You can track your package using the tracking ID above on the courier service's website.",
+                "**Tracking ID:** `{{tracking_id}}`",
+            ], []),
+            ("paragraph", "We'll send you another email once your package has been delivered."),
+            ("paragraph", "If you have any questions about your order, please don't hesitate to contact our customer support team."),
+            ("paragraph", "Thank you for choosing {{store_name}}!"),
+        ],
+    },
+    "delivery_notification": {
+        "subject": "Your Order #{{order_id}} Has Been Delivered! 📦",
+        "title": "Order Delivered",
+        "heading": "📦 Your Order Has Been Delivered!",
+        "tagline": "Your package has arrived safely at your doorstep.",
+        "style": {"gradient": "#28a745 0%, #20c997 100%", "accent": "#28a745", "highlight": "#d4edda"},
+        "blocks": [
+            ("paragraph", "Great news! Your order **#{{order_id}}** has been successfully delivered to your address."),
+            ("details", "🎉", "Delivery Confirmation", [
+                ("Order ID", "#{{order_id}}"),
+                ("Delivery Date", "{{delivery_date}}", "optional"),
+                ("Status", "✅ Delivered"),
+            ]),
+            ("highlight", "📋", "What's Next?", [], [
+                "Please check your package for any damage",
+                "If you're satisfied with your order, consider leaving a review",
+                "Keep your order details for future reference",
+            ]),
+            ("paragraph", "If you have any issues with your delivery or need to return an item, please contact our customer support team within 24 hours."),
+            ("paragraph", "Thank you for choosing {{store_name}}! We hope you enjoy your purchase."),
+        ],
+    },
+}
+
+def _inline_html(text: str) -> str:
+    return CODE_RE.sub(r"<code>\1</code>", BOLD_RE.sub(r"<strong>\1</strong>", text))
+
+def _inline_text(text: str) -> str:
+    return CODE_RE.sub(r"\1", BOLD_RE.sub(r"\1", text))
+
+def _escape(value: str) -> str:
+    # Most values (names, ids) have nothing to escape; skip html.escape's five replaces
+    return html.escape(value) if NEEDS_ESCAPE_RE.search(value) else value
+
+def _text_heading(heading: str) -> str:
+    return heading if heading.endswith(("?", "!")) else heading + ":"
+
+class EmailTemplate:
+    """Subject, HTML and text templates for one kind of email, built from one source"""
+    def __init__(self, source: Dict[str, Any]):
+        # Optional rows become their own small templates, filled in (or not) at render time
+        self._optional: List[Tuple[str, List[str], CompiledTemplate, CompiledTemplate]] = []
+        html_body, text_body = [], []
+        for block in source["blocks"]:
+            kind = block[0]
+            if kind == "paragraph":
+                html_body.append(f"        <p>{_inline_html(block[1])}</p>")
+                text_body.append(f"{_inline_text(block[1])}\n")
+            elif kind == "details":
+                _, icon, heading, rows = block
+                html_body.append(f'        <div class="details">\n            <h3>{icon} {heading}</h3>')
+                text_body.append(_text_heading(heading))
+                for row in rows:
+                    label, value = row[0], row[1]
+                    html_row = f"            <p><strong>{label}:</strong> {_inline_html(value)}</p>"
+                    text_row = f"- {label}: {_inline_text(value)}"
+                    if len(row) > 2:
+                        # Appended to the previous line so an empty row leaves no blank line
+                        slot = f"_optional_{len(self._optional)}"
+                        fields = PLACEHOLDER_RE.findall(value)
+                        self._optional.append((slot, fields, CompiledTemplate("\n" + html_row), CompiledTemplate("\n" + text_row)))
+                        html_body[-1] += "{{%s}}" % slot
+                        text_body[-1] += "{{%s}}" % slot
+                    else:
+                        html_body.append(html_row)
+                        text_body.append(text_row)
+                html_body.append("        </div>")
+                text_body.append("")
+            elif kind == "highlight":
+                _, icon, heading, paragraphs, items = block
+                html_body.append(f'        <div class="highlight">\n            <h4>{icon} {heading}</h4>')
+                text_body.append(_text_heading(heading))
+                for paragraph in paragraphs:
+                    html_body.append(f"            <p>{_inline_html(paragraph)}</p>")
+                    text_body.append(_inline_text(paragraph))
+                if items:
+                    html_body.append("            <ul>")
+                    html_body.extend(f"                <li>{_inline_html(item)}</li>" for item in items)
+                    html_body.append("            </ul>")
+                    text_body.extend(f"- {_inline_text(item)}" for item in items)
+                html_body.append("        </div>")
+                text_body.append("")
+
+        self.subject = CompiledTemplate(source["subject"])
+        self.html = CompiledTemplate(HTML_LAYOUT.substitute(
+            title=source["title"], heading=source["heading"], tagline=source["tagline"],
+            body="\n".join(html_body), **source["style"]
+        ))
+        self.text = CompiledTemplate(TEXT_LAYOUT.substitute(
+            heading=_inline_text(source["heading"]), body="\n".join(text_body)
+        ))
+
+        # Only values that appear in the HTML need escaping
+        self._html_fields = [name for name in self.html.fields if not name.startswith("_optional_")]
+        for _, _, html_row, _ in self._optional:
+            self._html_fields.extend(name for name in html_row.fields if name not in self._html_fields)
+
+    def render(self, values: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Render (subject, html, text); missing optional values drop their row"""
+        text_values = {name: "" if value is None else str(value) for name, value in values.items()}
+        html_values = {name: _escape(text_values.get(name, "")) for name in self._html_fields}
+        for slot, fields, html_row, text_row in self._optional:
+            if all(text_values.get(field) for field in fields):
+                html_values[slot] = html_row.render(html_values)
+                text_values[slot] = text_row.render(text_values)
+            else:
+                html_values[slot] = text_values[slot] = ""
+        return self.subject.render(text_values), self.html.render(html_values), self.text.render(text_values)
+
+def compile_email_templates(sources: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, EmailTemplate]:
+    """Compile every template source; done once when EmailService is created"""
+    return {name: EmailTemplate(source) for name, source in (sources or EMAIL_TEMPLATE_SOURCES).items()}
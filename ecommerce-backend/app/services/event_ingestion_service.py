@@ -0,0 +1,289 @@
+import asyncio
+import json
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import asyncpg
+from app.config import settings
+from app.database import get_db_connection
+from app.services.event_partition_service import EventPartitionService, ROLLUP_LOCK_KEY
+
+EVENT_COLUMNS = ['event_type', 'event_data', 'user_id', 'customer_id', 'product_id', 'order_id', 'timestamp']
+
+# (event_type, event_data JSON, user_id, customer_id, product_id, order_id, timestamp)
+EventRecord = Tuple[str, str, Optional[int], Optional[int], Optional[int], Optional[int], datetime]
+
+# product_id -> (views, add_to_cart, purchases) deltas from a tracked event
+CounterDeltas = Dict[int, Tuple[int, int, int]]
+
+# Columns checked against their parent table before COPY, since one dangling
+# reference would otherwise abort the whole batch
+REFERENCE_COLUMNS = (('customer_id', 3, 'customers'), ('product_id', 4, 'products'), ('order_id', 5, 'orders'))
+PG_INT_MAX = 2**31 - 1
+# Per item, and per product within one event, so a batch's summed counters stay well inside INTEGER
+MAX_EVENT_QUANTITY = 10_000
+
+class EventQueueFull(Exception):
+    """Raised when the ingestion queue stays full past EVENT_ENQUEUE_TIMEOUT_MS"""
+
+class EventIngestionService:
+    """Write-behind buffer for /analytics/track.
+
+    Events are queued in memory and a single background worker flushes them
+    every EVENT_FLUSH_INTERVAL_MS or EVENT_BATCH_SIZE events: rows go in with
+    one COPY and the product view/cart/purchase counters of the whole batch
+    are merged and applied with one UPDATE.
+    """
+    _queue: Optional[asyncio.Queue] = None
+    _worker: Optional[asyncio.Task] = None
+    _stopping = False
+    stats = {"flushed": 0, "rejected": 0, "batches": 0}
+
+    @classmethod
+    def start(cls) -> None:
+        """Create the queue and start the flush worker (idempotent)"""
+        if cls._worker is not None and not cls._worker.done():
+            return
+        cls._stopping = False
+        cls._queue = asyncio.Queue(maxsize=settings.EVENT_QUEUE_MAX_SIZE)
+        cls._worker = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        """Stop accepting events and flush everything still queued"""
+        if cls._worker is None:
+            return
+        cls._stopping = True
+        try:
+            await asyncio.wait_for(cls._worker, timeout=settings.EVENT_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            cls._worker.cancel()
+            print(f"Event ingestion drain timed out, {cls._queue.qsize()} events dropped")
+        cls._worker = None
+
+    @classmethod
+    def queue_size(cls) -> int:
+        return cls._queue.qsize() if cls._queue is not None else 0
+
+    @classmethod
+    async def enqueue(cls, record: EventRecord, counters: CounterDeltas) -> None:
+        """Queue an event, waiting briefly for room when the buffer is full.
+
+        Raises EventQueueFull if no room frees up in time, so callers can shed load.
+        """
+        if cls._stopping:
+            raise EventQueueFull("Event ingestion is shutting down")
+        cls.start()
+        item = (record, counters)
+        try:
+            cls._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(cls._queue.put(item), timeout=settings.EVENT_ENQUEUE_TIMEOUT_MS / 1000)
+            except asyncio.TimeoutError:
+                cls.stats["rejected"] += 1
+                raise EventQueueFull("Event queue is full")
+
+    @classmethod
+    async def _run(cls) -> None:
+        interval = settings.EVENT_FLUSH_INTERVAL_MS / 1000
+        while not (cls._stopping and cls._queue.empty()):
+            batch = await cls._collect_batch(interval)
+            if not batch:
+                continue
+            try:
+                await cls.flush(batch)
+            except Exception as e:
+                print(f"Error flushing {len(batch)} tracked events: {e}")
+
+    @classmethod
+    async def _collect_batch(cls, interval: float) -> List[Tuple[EventRecord, CounterDeltas]]:
+        """Wait for the first event, then gather more until the batch is full or the interval elapses"""
+        batch = []
+        deadline = time.monotonic() + interval
+        while len(batch) < settings.EVENT_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(cls._queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    @classmethod
+    async def flush(cls, batch: List[Tuple[EventRecord, CounterDeltas]]) -> None:
+        """Write a batch of events and their merged product counters"""
+        records = [record for record, _ in batch]
+        totals = defaultdict(lambda: [0, 0, 0])
+        for _, counters in batch:
+            for product_id, deltas in counters.items():
+                total = totals[product_id]
+                for i, delta in enumerate(deltas):
+                    total[i] += delta
+
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            try:
+                async with conn.transaction():
+                    await conn.copy_records_to_table('real_time_events', records=records, columns=EVENT_COLUMNS)
+            except asyncpg.PostgresError as e:
+                # One bad row (e.g. unknown product_id) fails the whole COPY; salvage the rest
+                print(f"Batch insert of tracked events failed, retrying row by row: {e}")
+                records = await cls._insert_individually(conn, records)
+
+            if totals:
+                # Sorted so concurrent workers lock product rows in the same order
+                product_ids = sorted(totals)
+                await conn.execute("""
+                    UPDATE products p
+                    SET views = COALESCE(p.views, 0) + c.views,
+                        add_to_cart_count = COALESCE(p.add_to_cart_count, 0) + c.cart_adds,
+                        purchase_count = COALESCE(p.purchase_count, 0) + c.purchases
+                    FROM unnest($1::int[], $2::int[], $3::int[], $4::int[]) AS c(id, views, cart_adds, purchases)
+                    WHERE p.id = c.id
+                """,
+                    product_ids,
+                    [totals[pid][0] for pid in product_ids],
+                    [totals[pid][1] for pid in product_ids],
+                    [totals[pid][2] for pid in product_ids]
+                )
+
+        cls.stats["flushed"] += len(records)
+        cls.stats["batches"] += 1
+
+    @staticmethod
+    async def _insert_individually(conn, records: List[EventRecord]) -> List[EventRecord]:
+        """Insert rows one at a time, dropping the ones the database rejects"""
+        inserted = []
+        for record in records:
+            try:
+                await conn.execute("""
+                    INSERT INTO real_time_events (
+                        event_type, event_data, user_id, customer_id,
+                        product_id, order_id, timestamp
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+                """, *record)
+                inserted.append(record)
+            except asyncpg.PostgresError as e:
+                print(f"Dropping tracked event {record[0]}: {e}")
+        return inserted
+
+def _parse_positive_int(value: Any, maximum: int) -> int:
+    """Accept only integers and digit strings in 1..maximum, raising ValueError otherwise.
+
+    Rejects bools and floats, which int() would quietly turn into 1 or 3.
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError("not an integer")
+    if isinstance(value, str) and not value.strip().isdigit():
+        raise ValueError("not an integer")
+    parsed = int(value)
+    if not 0 < parsed <= maximum:
+        raise ValueError("out of range")
+    return parsed
+
+def parse_event_id(value: Any) -> Optional[int]:
+    """Parse an optional ID from an event payload, within Postgres INTEGER range"""
+    if value is None or value == "":
+        return None
+    return _parse_positive_int(value, PG_INT_MAX)
+
+def parse_event_quantity(value: Any) -> int:
+    """Parse a purchased item's quantity (default 1), at most MAX_EVENT_QUANTITY"""
+    if value is None:
+        return 1
+    return _parse_positive_int(value, MAX_EVENT_QUANTITY)
+
+def _parse_event_timestamp(value: Any, now: datetime, oldest: datetime, newest: datetime) -> datetime:
+    """Parse an offline event timestamp into naive UTC, raising ValueError if it is unusable"""
+    if value is None:
+        return now
+    if not isinstance(value, str):
+        raise ValueError("timestamp must be an ISO 8601 string")
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is not None:
+        try:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        except OverflowError:
+            # e.g. 0001-01-01T00:00:00+01:00 falls before datetime.min in UTC
+            raise ValueError("timestamp out of range")
+    if timestamp < oldest:
+        raise ValueError(f"timestamp older than {settings.OFFLINE_EVENT_MAX_AGE_DAYS} days")
+    if timestamp > newest:
+        raise ValueError("timestamp is in the future")
+    return timestamp
+
+def validate_offline_events(events: List[Any], user_id: Optional[int]) -> Tuple[List[Tuple[int, EventRecord]], List[Dict[str, Any]]]:
+    """Check a batch of offline events in one pass.
+
+    Returns (index, record) pairs ready for COPY and a list of
+    {"index", "reason"} rejects for events that failed validation.
+    """
+    now = datetime.utcnow()
+    oldest = now - timedelta(days=settings.OFFLINE_EVENT_MAX_AGE_DAYS)
+    newest = now + timedelta(seconds=settings.OFFLINE_EVENT_MAX_CLOCK_SKEW_SECONDS)
+
+    accepted, rejects = [], []
+    for index, event in enumerate(events):
+        try:
+            if not isinstance(event, dict) or not event.get("event_type"):
+                raise ValueError("event_type is required")
+            event_data = event.get("event_data") or {}
+            if not isinstance(event_data, dict):
+                raise ValueError("event_data must be an object")
+            references = []
+            for field, _, _ in REFERENCE_COLUMNS:
+                try:
+                    references.append(parse_event_id(event_data.get(field)))
+                except ValueError:
+                    raise ValueError(f"invalid {field}")
+            timestamp = _parse_event_timestamp(event.get("timestamp"), now, oldest, newest)
+        except ValueError as e:
+            rejects.append({"index": index, "reason": str(e)})
+            continue
+        accepted.append((index, (
+            str(event["event_type"])[:50], json.dumps(event_data), user_id,
+            references[0], references[1], references[2], timestamp
+        )))
+    return accepted, rejects
+
+async def copy_offline_events(conn, events: List[Any], user_id: Optional[int]) -> Tuple[int, List[Dict[str, Any]]]:
+    """Validate offline events and COPY the valid ones into real_time_events in one transaction.
+
+    Returns the number of rows written and the per-event rejects.
+    """
+    accepted, rejects = validate_offline_events(events, user_id)
+    if not accepted:
+        return 0, rejects
+
+    # Events for closed periods may land in partitions that were already rolled up
+    current_period = EventPartitionService.period_start(datetime.utcnow())
+    late = sorted({record[6] for _, record in accepted if record[6] < current_period})
+    async with conn.transaction():
+        # Resolve every referenced ID with one query per parent table. FOR KEY SHARE holds the
+        # rows until commit, so a concurrent delete can't slip in between this check and the COPY.
+        for field, position, table in REFERENCE_COLUMNS:
+            ids = {record[position] for _, record in accepted if record[position] is not None}
+            if not ids:
+                continue
+            rows = await conn.fetch(f"SELECT id FROM {table} WHERE id = ANY($1::int[]) FOR KEY SHARE", list(ids))
+            missing = ids - {row['id'] for row in rows}
+            if missing:
+                rejects.extend(
+                    {"index": index, "reason": f"unknown {field}"}
+                    for index, record in accepted if record[position] in missing
+                )
+                accepted = [(index, record) for index, record in accepted if record[position] not in missing]
+
+        if accepted:
+            if late:
+                await conn.execute("SELECT pg_advisory_xact_lock_shared($1)", ROLLUP_LOCK_KEY)
+            await conn.copy_records_to_table(
+                'real_time_events', records=[record for _, record in accepted], columns=EVENT_COLUMNS
+            )
+            if late:
+                await EventPartitionService.mark_stale_rollups(conn, late)
+    rejects.sort(key=lambda reject: reject["index"])
+    return len(accepted), rejects
@@ -0,0 +1,248 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.utils.background import PeriodicService, run_exclusive
+
+PARTITION_BOUND_RE = re.compile(r"FROM \((.+)\) TO \((.+)\)")
+
+# Any stable key works; it only has to be the same for every worker
+MAINTENANCE_LOCK_KEY = 84_201_017
+# Transaction lock: exclusive while rolling up a partition, shared while inserting late events
+ROLLUP_LOCK_KEY = 84_201_008
+
+class EventPartitionService(PeriodicService):
+    """Maintains the time partitions of real_time_events.
+
+    Partitions are created EVENT_PARTITIONS_AHEAD periods in advance, rolled up
+    into event_rollups_daily_device once closed (and again if late events
+    arrive), and dropped (or detached) after EVENT_RETENTION_DAYS.
+    """
+    ERROR_MESSAGE = "Error maintaining real_time_events partitions"
+    stats: Dict[str, Any] = {"runs": 0, "rollup_failures": 0, "last_failed_partition": None}
+
+    @staticmethod
+    def period_start(moment: datetime) -> datetime:
+        """Start of the partition period containing ``moment``"""
+        if settings.EVENT_PARTITION_INTERVAL == 'month':
+            return datetime(moment.year, moment.month, 1)
+        return datetime(moment.year, moment.month, moment.day)
+
+    @staticmethod
+    def next_period(start: datetime) -> datetime:
+        """Start of the partition period after the one beginning at ``start``"""
+        if settings.EVENT_PARTITION_INTERVAL == 'month':
+            return datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+        return start + timedelta(days=1)
+
+    @staticmethod
+    def partition_name(start: datetime) -> str:
+        if settings.EVENT_PARTITION_INTERVAL == 'month':
+            return f"real_time_events_p{start:%Y%m}"
+        return f"real_time_events_p{start:%Y%m%d}"
+
+    @staticmethod
+    def _parse_bound(value: str) -> Optional[datetime]:
+        if value in ('MINVALUE', 'MAXVALUE'):
+            return None
+        return datetime.fromisoformat(value.strip("'"))
+
+    @classmethod
+    async def get_partitions(cls, conn) -> List[Dict[str, Any]]:
+        """List partitions with their [start, end) range; None means unbounded"""
+        rows = await conn.fetch("""
+            SELECT c.relname as name, pg_get_expr(c.relpartbound, c.oid) as bound
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'real_time_events'::regclass
+        """)
+        partitions = []
+        for row in rows:
+            match = PARTITION_BOUND_RE.search(row['bound'])
+            if not match:
+                continue
+            partitions.append({
+                "name": row['name'],
+                "start": cls._parse_bound(match.group(1)),
+                "end": cls._parse_bound(match.group(2))
+            })
+        partitions.sort(key=lambda p: p["end"] or datetime.max)
+        return partitions
+
+    @classmethod
+    async def ensure_partitions(cls, conn) -> List[str]:
+        """Create missing partitions from the oldest accepted offline event up to EVENT_PARTITIONS_AHEAD periods ahead"""
+        partitions = await cls.get_partitions(conn)
+        now = datetime.utcnow()
+        oldest = now - timedelta(days=settings.OFFLINE_EVENT_MAX_AGE_DAYS)
+        if settings.EVENT_RETENTION_DAYS > 0:
+            oldest = max(oldest, now - timedelta(days=settings.EVENT_RETENTION_DAYS))
+
+        horizon = cls.period_start(now)
+        for _ in range(settings.EVENT_PARTITIONS_AHEAD):
+            horizon = cls.next_period(horizon)
+
+        created = []
+        start = cls.period_start(oldest)
+        while start <= horizon:
+            end = cls.next_period(start)
+            overlaps = any(
+                (p["start"] is None or p["start"] < end) and (p["end"] is None or p["end"] > start)
+                for p in partitions
+            )
+            if not overlaps:
+                name = cls.partition_name(start)
+                await conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {name} PARTITION OF real_time_events
+                    FOR VALUES FROM ('{start.isoformat(sep=' ')}') TO ('{end.isoformat(sep=' ')}')
+                """)
+                created.append(name)
+            start = end
+        return created
+
+    @staticmethod
+    async def roll_up_partition(conn, partition: Dict[str, Any]) -> None:
+        """Aggregate a closed partition into event_rollups_daily_device.
+
+        Runs once per partition, and again if late events marked it stale
+        (see mark_stale_rollups); partitions are day-aligned, so a re-roll
+        replaces exactly the days the partition covers. event_data is
+        unvalidated client input: amounts go through safe_numeric() and text
+        is cut to the rollup's column width.
+        """
+        name = partition["name"]
+        async with conn.transaction():
+            # Waits for in-flight late inserts, and holds new ones back until this rollup commits
+            await conn.execute("SELECT pg_advisory_xact_lock($1)", ROLLUP_LOCK_KEY)
+            stale = await conn.fetchval(
+                "SELECT stale FROM event_partition_rollups WHERE partition_name = $1", name
+            )
+            if stale is False:
+                return
+            await conn.execute("""
+                DELETE FROM event_rollups_daily_device
+                WHERE ($1::date IS NULL OR day >= $1::date) AND day < $2::date
+            """, partition["start"], partition["end"])
+            await conn.execute(f"""
+                INSERT INTO event_rollups_daily_device (
+                    day, device_type, browser, operating_system, unique_users, total_events,
+                    purchases, cart_adds, product_views, revenue, time_spent_total, time_spent_samples
+                )
+                SELECT
+                    timestamp::date,
+                    LEFT(COALESCE(event_data->>'device_type', 'Unknown'), 100),
+                    LEFT(COALESCE(event_data->>'browser', 'Unknown'), 100),
+                    LEFT(COALESCE(event_data->>'operating_system', 'Unknown'), 100),
+                    COUNT(DISTINCT user_id),
+                    COUNT(*),
+                    COUNT(*) FILTER (WHERE event_type = 'purchase'),
+                    COUNT(*) FILTER (WHERE event_type = 'add_to_cart'),
+                    COUNT(*) FILTER (WHERE event_type = 'product_view'),
+                    COALESCE(SUM(safe_numeric(event_data->>'total_amount')) FILTER (WHERE event_type = 'purchase'), 0),
+                    COALESCE(SUM(safe_numeric(event_data->>'time_spent')), 0),
+                    COUNT(safe_numeric(event_data->>'time_spent'))
+                FROM {name}
+                GROUP BY 1, 2, 3, 4
+            """)
+            await conn.execute("""
+                INSERT INTO event_partition_rollups (partition_name, range_end) VALUES ($1, $2)
+                ON CONFLICT (partition_name) DO UPDATE SET stale = FALSE, rolled_up_at = NOW()
+            """, name, partition["end"])
+
+    @classmethod
+    async def mark_stale_rollups(cls, conn, timestamps: List[datetime]) -> None:
+        """Flag rolled-up partitions that just received events at ``timestamps`` for a re-roll.
+
+        Call inside the transaction that inserts the events, after taking
+        pg_advisory_xact_lock_shared(ROLLUP_LOCK_KEY) so a rollup can't read
+        the partition between the insert and this flag.
+        """
+        names = {
+            partition["name"]
+            for partition in await cls.get_partitions(conn)
+            for moment in timestamps
+            if (partition["start"] is None or partition["start"] <= moment)
+            and (partition["end"] is None or moment < partition["end"])
+        }
+        if names:
+            await conn.execute(
+                "UPDATE event_partition_rollups SET stale = TRUE WHERE partition_name = ANY($1::varchar[])",
+                list(names)
+            )
+
+    @classmethod
+    async def _try_roll_up(cls, conn, partition: Dict[str, Any]) -> bool:
+        """Roll up one partition, recording rather than raising a failure so the others still run"""
+        try:
+            await cls.roll_up_partition(conn, partition)
+            return True
+        except Exception as e:
+            cls.stats["rollup_failures"] += 1
+            cls.stats["last_failed_partition"] = partition["name"]
+            print(f"Error rolling up {partition['name']}: {e}")
+            return False
+
+    @classmethod
+    async def roll_up_closed_partitions(cls, conn) -> List[str]:
+        """Roll up partitions that closed more than EVENT_ROLLUP_GRACE_HOURS ago.
+
+        The grace period batches up most late events (e.g. offline sync);
+        ones arriving after the rollup mark the partition stale and it is
+        rolled up again on the next run. A partition that fails is retried
+        on the next run.
+        """
+        closed_before = datetime.utcnow() - timedelta(hours=settings.EVENT_ROLLUP_GRACE_HOURS)
+        current = {
+            row['partition_name']
+            for row in await conn.fetch("SELECT partition_name FROM event_partition_rollups WHERE NOT stale")
+        }
+        rolled_up = []
+        for partition in await cls.get_partitions(conn):
+            if partition["name"] in current:
+                continue
+            if partition["end"] is not None and partition["end"] <= closed_before:
+                if await cls._try_roll_up(conn, partition):
+                    rolled_up.append(partition["name"])
+        return rolled_up
+
+    @classmethod
+    async def apply_retention(cls, conn) -> List[str]:
+        """Drop or detach partitions that ended more than EVENT_RETENTION_DAYS ago.
+
+        A partition whose final rollup fails is kept until it succeeds.
+        """
+        if settings.EVENT_RETENTION_DAYS <= 0:
+            return []
+        cutoff = datetime.utcnow() - timedelta(days=settings.EVENT_RETENTION_DAYS)
+        removed = []
+        for partition in await cls.get_partitions(conn):
+            if partition["end"] is None or partition["end"] > cutoff:
+                continue
+            if not await cls._try_roll_up(conn, partition):
+                continue
+            if settings.EVENT_RETENTION_ACTION == 'detach':
+                await conn.execute(f"ALTER TABLE real_time_events DETACH PARTITION {partition['name']}")
+            else:
+                await conn.execute(f"DROP TABLE {partition['name']}")
+            removed.append(partition["name"])
+        return removed
+
+    @classmethod
+    async def run_maintenance(cls) -> Dict[str, List[str]]:
+        """Create, roll up and expire partitions; skipped if another worker holds the lock"""
+        async def maintain(conn) -> Dict[str, List[str]]:
+            cls.stats["runs"] += 1
+            return {
+                "created": await cls.ensure_partitions(conn),
+                "rolled_up": await cls.roll_up_closed_partitions(conn),
+                "removed": await cls.apply_retention(conn)
+            }
+        return await run_exclusive(MAINTENANCE_LOCK_KEY, maintain) or {}
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        return settings.EVENT_MAINTENANCE_INTERVAL_MINUTES * 60
+
+    @classmethod
+    async def run_periodic(cls) -> None:
+        await cls.run_maintenance()
@@ -0,0 +1,301 @@
+"""
+Offline demand forecasting and churn scoring
+
+Order history is pulled in bulk (a handful of array-valued queries rather than
+a row per order) into NumPy arrays, scored for every customer and product at
+once, and written to customer_churn_scores / product_demand_forecasts.
+
+Demand: daily units per product over PREDICTIVE_HISTORY_DAYS form a products x
+days matrix. Simple exponential smoothing over its weekly totals gives the
+30-day forecast; a seasonal-naive forecast repeats the average day-of-week
+profile of the last four weeks.
+
+Churn: with n orders between first and last, a customer's expected gap between
+orders is (last - first) / (n - 1) (the population median for one-order
+customers). Treating orders as a Poisson process, the chance of seeing no
+order in the days since the last one, if the customer were still active, is
+exp(-recency / gap), so churn probability = 1 - exp(-recency / gap).
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.models.predictive_scores import PredictiveScores
+from app.utils.background import PeriodicService, run_exclusive
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCORING_LOCK_KEY = 84_201_022
+# Floor on the wait between staleness checks
+MIN_RECHECK_SECONDS = 60
+
+SECONDS_PER_DAY = 86400.0
+NEVER_ORDERED_CHURN = 0.9
+MIN_GAP_DAYS = 7.0
+SEASONAL_WEEKS = 4
+HORIZON_DAYS = 30
+# Naive UTC, matching the TIMESTAMP columns
+EPOCH = datetime(1970, 1, 1)
+
+CUSTOMERS_SQL = """
+    SELECT COALESCE(array_agg(id ORDER BY id), '{}') AS ids,
+           COALESCE(array_agg(EXTRACT(EPOCH FROM COALESCE(created_at, NOW()))::float8 ORDER BY id), '{}') AS created
+    FROM customers
+"""
+
+ORDERS_SQL = """
+    SELECT COALESCE(array_agg(customer_id), '{}') AS customer_ids,
+           COALESCE(array_agg(EXTRACT(EPOCH FROM order_date)::float8), '{}') AS order_times,
+           COALESCE(array_agg(total_price::float8), '{}') AS totals
+    FROM orders
+    WHERE status <> 'cancelled'
+"""
+
+PRODUCTS_SQL = """
+    SELECT COALESCE(array_agg(id ORDER BY id), '{}') AS ids,
+           COALESCE(array_agg(stock ORDER BY id), '{}') AS stock
+    FROM products
+"""
+
+# Units per product per day over the window, oldest day = 0; today is excluded as incomplete
+DAILY_DEMAND_SQL = """
+    SELECT COALESCE(array_agg(product_id), '{}') AS product_ids,
+           COALESCE(array_agg(day), '{}') AS days,
+           COALESCE(array_agg(units), '{}') AS units
+    FROM (
+        SELECT oi.product_id, $1::int - (CURRENT_DATE - o.order_date::date) AS day, SUM(oi.quantity)::float8 AS units
+        FROM order_items oi
+        JOIN orders o ON oi.order_id = o.id
+        WHERE o.order_date >= CURRENT_DATE - $1::int * INTERVAL '1 day'
+        AND o.order_date < CURRENT_DATE
+        AND o.status <> 'cancelled'
+        GROUP BY oi.product_id, o.order_date::date
+    ) daily
+"""
+
+def _locate(ids, values):
+    """Positions of values in the sorted ids array, and which values were found"""
+    if len(ids) == 0:
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    index = np.minimum(np.searchsorted(ids, values), len(ids) - 1)
+    return index, ids[index] == values
+
+def _bucket(values, thresholds, labels, default):
+    """Label each value by the first threshold it reaches (thresholds descending)"""
+    return np.select([values >= threshold for threshold in thresholds], labels, default=default)
+
+def score_customers(customer_ids, created, order_customer_ids, order_times, order_totals, now: float) -> Dict[str, Any]:
+    """Vectorized recency/frequency churn scores; times are epoch seconds"""
+    count = len(customer_ids)
+    index, known = _locate(customer_ids, order_customer_ids)
+    index, days, totals = index[known], order_times[known] / SECONDS_PER_DAY, order_totals[known]
+
+    orders = np.bincount(index, minlength=count)
+    lifetime_value = np.bincount(index, weights=totals, minlength=count)
+    first = np.full(count, np.inf)
+    last = np.full(count, -np.inf)
+    np.minimum.at(first, index, days)
+    np.maximum.at(last, index, days)
+
+    has_orders = orders > 0
+    repeat = orders > 1
+    now_days = now / SECONDS_PER_DAY
+    recency = np.where(has_orders, np.maximum(now_days - last, 0.0), np.nan)
+    gap = np.full(count, np.nan)
+    gap[repeat] = (last[repeat] - first[repeat]) / (orders[repeat] - 1)
+    typical_gap = float(np.median(gap[repeat])) if repeat.any() else settings.PREDICTIVE_DEFAULT_GAP_DAYS
+    gap[has_orders & ~repeat] = typical_gap
+    gap = np.maximum(gap, MIN_GAP_DAYS)
+
+    churn = np.full(count, NEVER_ORDERED_CHURN)
+    churn[has_orders] = 1.0 - np.exp(-recency[has_orders] / gap[has_orders])
+
+    days_since = np.floor(recency)
+    return {
+        "total_orders": orders,
+        "lifetime_value": lifetime_value,
+        "avg_order_value": np.divide(lifetime_value, orders, out=np.zeros(count), where=has_orders),
+        "last_order_days": last,
+        "days_since_last_order": days_since,
+        "days_since_registration": np.floor(np.maximum(now_days - created / SECONDS_PER_DAY, 0.0)),
+        "expected_gap_days": gap,
+        "churn_probability": churn,
+        "churn_risk": np.where(has_orders, _bucket(churn, (0.8, 0.6, 0.4), ("High Risk", "Medium Risk", "Low Risk"), "Very Low Risk"), "High Risk"),
+        "activity_status": np.where(
+            has_orders,
+            np.select([days_since <= 7, days_since <= 30, days_since <= 90], ["Very Active", "Active", "Inactive"], default="Very Inactive"),
+            "Never Ordered"
+        ),
+        "customer_segment": _bucket(lifetime_value, (10000, 5000, 1000), ("VIP", "Premium", "Regular"), "New"),
+    }
+
+def forecast_demand(product_ids, stock, demand_product_ids, demand_days, demand_units, history_days: int) -> Dict[str, Any]:
+    """Vectorized per-product demand forecasts from daily unit sales"""
+    count = len(product_ids)
+    index, known = _locate(product_ids, demand_product_ids)
+    days = demand_days[known].astype(np.int64)
+    in_window = (days >= 0) & (days < history_days)
+    flat = index[known][in_window] * history_days + days[in_window]
+    daily = np.bincount(flat, weights=demand_units[known][in_window], minlength=count * history_days)
+    daily = daily.reshape(count, history_days)
+
+    # Simple exponential smoothing over complete weeks, newest last
+    weeks = history_days // 7
+    weekly = daily[:, history_days - weeks * 7:].reshape(count, weeks, 7).sum(axis=2)
+    alpha = settings.PREDICTIVE_SMOOTHING_ALPHA
+    level = weekly[:, 0].copy() if weeks else np.zeros(count)
+    for week in range(1, weeks):
+        level = alpha * weekly[:, week] + (1 - alpha) * level
+    forecast = level * HORIZON_DAYS / 7
+
+    # Seasonal naive: average day-of-week profile of the last weeks, laid over the horizon
+    recent = min(SEASONAL_WEEKS, weeks)
+    profile = daily[:, history_days - recent * 7:].reshape(count, recent, 7).mean(axis=1) if recent else np.zeros((count, 7))
+    # Day k of the horizon (k = 0 is today) falls on profile position k % 7
+    seasonal = profile @ np.bincount(np.arange(HORIZON_DAYS) % 7, minlength=7).astype(float)
+
+    stock = stock.astype(float)
+    avg_daily = forecast / HORIZON_DAYS
+    cover = np.divide(stock, avg_daily, out=np.full(count, np.inf), where=avg_daily > 0)
+    turnover = np.divide(forecast * 12, stock, out=np.zeros(count), where=stock > 0)
+    return {
+        "demand_last_30_days": daily[:, -HORIZON_DAYS:].sum(axis=1),
+        "forecast_next_30_days": forecast,
+        "seasonal_naive_next_30_days": seasonal,
+        "avg_daily_demand": avg_daily,
+        "days_of_cover": cover,
+        "inventory_turnover": turnover,
+        "stock_status": np.select(
+            [stock <= 0, cover < settings.PREDICTIVE_REORDER_DAYS, cover > settings.PREDICTIVE_OVERSTOCK_DAYS],
+            ["Out of Stock", "Understocked", "Overstocked"], default="Well Stocked"
+        ),
+        "turnover_category": np.select(
+            [stock <= 0, turnover > 12, turnover > 6], ["No Turnover", "High Turnover", "Medium Turnover"], default="Low Turnover"
+        ),
+    }
+
+def _customer_records(customer_ids, scores: Dict[str, Any], scored_at: datetime) -> List[tuple]:
+    last_order = [
+        EPOCH + timedelta(days=value) if value != -np.inf else None
+        for value in scores["last_order_days"].tolist()
+    ]
+    has_orders = scores["total_orders"] > 0
+    days_since = [int(value) if ordered else None for value, ordered in zip(scores["days_since_last_order"].tolist(), has_orders.tolist())]
+    gap = [value if ordered else None for value, ordered in zip(scores["expected_gap_days"].tolist(), has_orders.tolist())]
+    return list(zip(
+        customer_ids.tolist(), scores["total_orders"].tolist(), scores["lifetime_value"].tolist(),
+        scores["avg_order_value"].tolist(), last_order, days_since,
+        scores["days_since_registration"].astype(int).tolist(), gap, scores["churn_probability"].tolist(),
+        scores["churn_risk"].tolist(), scores["activity_status"].tolist(), scores["customer_segment"].tolist(),
+        [scored_at] * len(customer_ids)
+    ))
+
+def _product_records(product_ids, stock, forecasts: Dict[str, Any], scored_at: datetime) -> List[tuple]:
+    cover = [value if value != np.inf else None for value in forecasts["days_of_cover"].tolist()]
+    return list(zip(
+        product_ids.tolist(), stock.tolist(), forecasts["demand_last_30_days"].tolist(),
+        forecasts["forecast_next_30_days"].tolist(), forecasts["seasonal_naive_next_30_days"].tolist(),
+        forecasts["avg_daily_demand"].tolist(), cover, forecasts["inventory_turnover"].tolist(),
+        forecasts["stock_status"].tolist(), forecasts["turnover_category"].tolist(),
+        [scored_at] * len(product_ids)
+    ))
+
+async def run_scoring(conn, history_days: Optional[int] = None) -> Dict[str, Any]:
+    """Load history, score everything and replace the score tables; returns timings"""
+    history_days = history_days or settings.PREDICTIVE_HISTORY_DAYS
+    timings = {}
+    start = time.perf_counter()
+    scored_at = datetime.utcnow()
+    customers = await conn.fetchrow(CUSTOMERS_SQL)
+    orders = await conn.fetchrow(ORDERS_SQL)
+    products = await conn.fetchrow(PRODUCTS_SQL)
+    demand = await conn.fetchrow(DAILY_DEMAND_SQL, history_days)
+    timings["load_seconds"] = time.perf_counter() - start
+
+    def compute():
+        customer_ids = np.asarray(customers['ids'], dtype=np.int64)
+        product_ids = np.asarray(products['ids'], dtype=np.int64)
+        stock = np.asarray(products['stock'], dtype=np.int64)
+        customer_scores = score_customers(
+            customer_ids, np.asarray(customers['created'], dtype=float),
+            np.asarray(orders['customer_ids'], dtype=np.int64), np.asarray(orders['order_times'], dtype=float),
+            np.asarray(orders['totals'], dtype=float), (scored_at - EPOCH).total_seconds()
+        )
+        forecasts = forecast_demand(
+            product_ids, stock, np.asarray(demand['product_ids'], dtype=np.int64),
+            np.asarray(demand['days'], dtype=np.int64), np.asarray(demand['units'], dtype=float), history_days
+        )
+        return (_customer_records(customer_ids, customer_scores, scored_at),
+                _product_records(product_ids, stock, forecasts, scored_at))
+
+    start = time.perf_counter()
+    # NumPy releases the GIL for most of this, and it keeps the event loop responsive
+    customer_records, product_records = await asyncio.to_thread(compute)
+    timings["score_seconds"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await PredictiveScores.replace_customer_scores(conn, customer_records)
+    await PredictiveScores.replace_product_forecasts(conn, product_records)
+    timings["write_seconds"] = time.perf_counter() - start
+    timings.update(customers=len(customer_records), products=len(product_records))
+    return timings
+
+class PredictiveScoringService(PeriodicService):
+    """Keeps scores at most PREDICTIVE_SCORING_INTERVAL_SECONDS old.
+
+    The schedule is anchored on the stored scored_at rather than process
+    uptime, so hosts that restart or sleep often (deploys, idle spin-down)
+    still re-score: startup scores immediately if the results are stale and
+    otherwise waits only for the remaining time.
+    """
+    ERROR_MESSAGE = "Error running predictive scoring"
+    stats: Dict[str, Any] = {"runs": 0, "customers": 0, "products": 0, "last_run_seconds": 0.0}
+
+    @classmethod
+    async def run_once(cls, only_if_stale: bool = False) -> bool:
+        """Score unless another worker is already doing it; returns whether it ran"""
+        async def score(conn) -> bool:
+            if only_if_stale and await cls.seconds_until_due() > 0:
+                return False
+            start = time.perf_counter()
+            timings = await run_scoring(conn)
+            cls.stats.update(
+                runs=cls.stats["runs"] + 1, customers=timings["customers"], products=timings["products"],
+                last_run_seconds=round(time.perf_counter() - start, 3)
+            )
+            return True
+        return bool(await run_exclusive(SCORING_LOCK_KEY, score))
+
+    @staticmethod
+    async def seconds_until_due() -> float:
+        """Seconds until the stored scores are PREDICTIVE_SCORING_INTERVAL_SECONDS old (<= 0: due now)"""
+        last = await PredictiveScores.last_scored_at()
+        if last is None:
+            return 0.0
+        age = (datetime.utcnow() - last).total_seconds()
+        return settings.PREDICTIVE_SCORING_INTERVAL_SECONDS - age
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        return settings.PREDICTIVE_SCORING_INTERVAL_SECONDS
+
+    @classmethod
+    def can_start(cls) -> bool:
+        if not super().can_start():
+            return False
+        if np is None:
+            print("Warning: predictive scoring requires numpy; churn scores and demand forecasts will not be refreshed")
+            return False
+        return True
+
+    @classmethod
+    async def run_periodic(cls) -> float:
+        delay = float(settings.PREDICTIVE_SCORING_INTERVAL_SECONDS)
+        if not await cls.run_once(only_if_stale=True):
+            delay = await cls.seconds_until_due()
+        # Another worker may be mid-run (scores still stale); check back shortly rather than spin
+        return max(delay, MIN_RECHECK_SECONDS)
@@ -0,0 +1,39 @@
+import time
+from typing import Any, Dict
+from app.config import settings
+from app.models.product_copurchase import ProductCopurchase
+from app.utils.background import PeriodicService, run_exclusive
+
+REBUILD_LOCK_KEY = 84_201_021
+
+class ProductCopurchaseService(PeriodicService):
+    """Recounts product_copurchase from order history in the background.
+
+    Order creation, cancellation and item changes keep the counts current (see
+    ProductCopurchase); this pass runs at startup, which also backfills a new
+    table, and then every PRODUCT_COPURCHASE_REBUILD_SECONDS to correct drift
+    from failed or racing incremental updates.
+    """
+    ERROR_MESSAGE = "Error rebuilding product co-purchase counts"
+    stats: Dict[str, Any] = {"rebuilds": 0, "corrected_pairs": 0, "last_rebuild_seconds": 0.0}
+
+    @classmethod
+    async def rebuild(cls) -> bool:
+        """Rebuild unless another worker is already doing it; returns whether it ran"""
+        return bool(await run_exclusive(REBUILD_LOCK_KEY, cls._rebuild))
+
+    @classmethod
+    async def _rebuild(cls, conn) -> bool:
+        start = time.perf_counter()
+        cls.stats["corrected_pairs"] = await ProductCopurchase.rebuild()
+        cls.stats["last_rebuild_seconds"] = round(time.perf_counter() - start, 3)
+        cls.stats["rebuilds"] += 1
+        return True
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        return settings.PRODUCT_COPURCHASE_REBUILD_SECONDS
+
+    @classmethod
+    async def run_periodic(cls) -> None:
+        await cls.rebuild()
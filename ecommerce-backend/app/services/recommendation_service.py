@@ -0,0 +1,116 @@
+import time
+from typing import Dict, List, Any, Optional, Tuple
+import asyncpg
+from app.config import settings
+from app.database import get_db_connection
+from app.models.product import Product
+
+# Weight of each customer signal when scoring tag overlap
+ORDER_SIGNAL_WEIGHT = 3
+WISHLIST_SIGNAL_WEIGHT = 2
+CART_SIGNAL_WEIGHT = 1
+
+class RecommendationService:
+    # customer_id -> (expires_at, limit the ranking was computed for, ranked product IDs)
+    _cache: Dict[int, Tuple[float, int, List[int]]] = {}
+
+    @staticmethod
+    async def score_for_you_products(customer_id: int, limit: int = 20) -> Optional[List[int]]:
+        """Rank unseen products by tag overlap with the customer's orders, wishlist and cart.
+
+        Runs as a single read-only query bounded by RECOMMENDATION_TIMEOUT_MS;
+        None is returned if the budget is exceeded, so callers can tell a
+        timeout from a customer with no recommendations.
+        """
+        pool = await get_db_connection()
+        try:
+            async with pool.acquire() as conn:
+                async with conn.transaction(readonly=True):
+                    await conn.execute(
+                        f"SET LOCAL statement_timeout = {int(settings.RECOMMENDATION_TIMEOUT_MS)}"
+                    )
+                    rows = await conn.fetch("""
+                        WITH signals AS (
+                            SELECT oi.product_id, $3::int as weight
+                            FROM order_items oi
+                            JOIN orders o ON oi.order_id = o.id
+                            WHERE o.customer_id = $1
+                            UNION ALL
+                            SELECT wi.product_id, $4::int
+                            FROM wishlist_items wi
+                            JOIN wishlists w ON wi.wishlist_id = w.id
+                            WHERE w.customer_id = $1
+                            UNION ALL
+                            SELECT ci.product_id, $5::int
+                            FROM cart_items ci
+                            JOIN carts c ON ci.cart_id = c.id
+                            WHERE c.customer_id = $1 AND c.is_active = TRUE AND c.is_deleted = FALSE
+                        ),
+                        tag_weights AS (
+                            SELECT pt.tag_id, SUM(s.weight) as weight
+                            FROM signals s
+                            JOIN product_tags pt ON pt.product_id = s.product_id
+                            GROUP BY pt.tag_id
+                        )
+                        SELECT pt.product_id, SUM(tw.weight) as score
+                        FROM tag_weights tw
+                        JOIN product_tags pt ON pt.tag_id = tw.tag_id
+                        WHERE pt.product_id NOT IN (SELECT product_id FROM signals)
+                        GROUP BY pt.product_id
+                        ORDER BY score DESC, pt.product_id
+                        LIMIT $2
+                    """, customer_id, limit, ORDER_SIGNAL_WEIGHT, WISHLIST_SIGNAL_WEIGHT, CART_SIGNAL_WEIGHT)
+        except asyncpg.exceptions.QueryCanceledError:
+            print(f"For You recommendations for customer {customer_id} exceeded "
+                  f"{settings.RECOMMENDATION_TIMEOUT_MS}ms budget")
+            return None
+        return [row['product_id'] for row in rows]
+
+    @classmethod
+    async def get_for_you_recommendations(cls, customer_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get ranked ProductCard data for a customer, using the per-customer cache when enabled"""
+        ttl = settings.RECOMMENDATION_CACHE_TTL_SECONDS
+        cached = cls._cache.get(customer_id) if ttl > 0 else None
+        if cached and cached[0] > time.monotonic() and cached[1] >= limit:
+            product_ids = cached[2][:limit]
+        else:
+            product_ids = await cls.score_for_you_products(customer_id, limit)
+            if product_ids is None:
+                # Timed out: show nothing this time, but don't cache it so the next request retries
+                return []
+            if ttl > 0:
+                if len(cls._cache) >= settings.RECOMMENDATION_CACHE_MAX_CUSTOMERS:
+                    # Evict the oldest entry (dicts keep insertion order)
+                    cls._cache.pop(next(iter(cls._cache)), None)
+                cls._cache.pop(customer_id, None)
+                cls._cache[customer_id] = (time.monotonic() + ttl, limit, product_ids)
+
+        # Card data is always loaded fresh so price, stock and discounts stay current
+        return await Product.get_products_for_card_bulk(product_ids)
+
+    @classmethod
+    def invalidate_customer(cls, customer_id: int) -> None:
+        """Drop cached recommendations for a customer"""
+        cls._cache.pop(customer_id, None)
+
+    @classmethod
+    async def invalidate_cart(cls, cart_id: int) -> None:
+        """Drop cached recommendations for the owner of a cart"""
+        if not cls._cache:
+            return
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            customer_id = await conn.fetchval("SELECT customer_id FROM carts WHERE id = $1", cart_id)
+        if customer_id is not None:
+            cls.invalidate_customer(customer_id)
+
+    @classmethod
+    async def invalidate_wishlist(cls, wishlist_id: int) -> None:
+        """Drop cached recommendations for the owner of a wishlist"""
+        if not cls._cache:
+            return
+        pool = await get_db_connection()
+        async with pool.acquire() as conn:
+            customer_id = await conn.fetchval("SELECT customer_id FROM wishlists WHERE id = $1", wishlist_id)
+        if customer_id is not None:
+            cls.invalidate_customer(customer_id)
@@ -1,22 +1,94 @@
-import requests
-import hashlib
-import json
+import asyncio
+import random
+import httpx
 from typing import Dict, Any, Optional
 from app.config import settings
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.utils.id_generator import id_generator
 
+# Errors raised before the request reached the gateway; safe to retry any call
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Gateway responses worth retrying
+RETRY_STATUS_CODES = {502, 503, 504}
+
 class SSLCommerzService:
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
         self.store_id = settings.SSLCOMMERZ_STORE_ID
         self.store_password = settings.SSLCOMMERZ_STORE_PASSWORD
         self.sandbox = settings.SSLCOMMERZ_SANDBOX
         
-        if self.sandbox:
+        if base_url or settings.SSLCOMMERZ_BASE_URL:
+            self.base_url = (base_url or settings.SSLCOMMERZ_BASE_URL).rstrip('/')
+        elif self.sandbox:
             self.base_url = "https://sandbox.sslcommerz.com"
         else:
             self.base_url = "https://securepay.sslcommerz.com"
+        
+        self.breaker = CircuitBreaker(
+            "SSLCommerz",
+            settings.SSLCOMMERZ_BREAKER_FAILURE_THRESHOLD,
+            settings.SSLCOMMERZ_BREAKER_RESET_SECONDS
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared client so gateway connections (and TLS sessions) are reused"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(
+                    settings.SSLCOMMERZ_READ_TIMEOUT_SECONDS,
+                    connect=settings.SSLCOMMERZ_CONNECT_TIMEOUT_SECONDS,
+                    pool=settings.SSLCOMMERZ_CONNECT_TIMEOUT_SECONDS
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.SSLCOMMERZ_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.SSLCOMMERZ_MAX_CONNECTIONS
+                )
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
-    def create_session(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def _post(self, path: str, data: Dict[str, Any], idempotent: bool) -> httpx.Response:
+        """
+        POST to the gateway with bounded, jittered retries behind the circuit breaker.
+        Non-idempotent calls are only retried when the request never reached the gateway.
+        """
+        retryable = (httpx.TransportError,) if idempotent else CONNECT_ERRORS
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                response = await self._get_client().post(path, data=data)
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt >= settings.SSLCOMMERZ_MAX_RETRIES or not isinstance(e, retryable):
+                    raise
+            except asyncio.CancelledError:
+                # The caller went away mid-call; let the next call take the half-open trial
+                self.breaker.release_trial()
+                raise
+            except Exception:
+                # InvalidURL, DecodingError, bugs: count them so the breaker never stays stuck half-open
+                self.breaker.record_failure()
+                raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    return response
+                self.breaker.record_failure()
+                if attempt >= settings.SSLCOMMERZ_MAX_RETRIES or response.status_code not in RETRY_STATUS_CODES:
+                    return response
+            # Full jitter: sleep a random slice of the exponential backoff
+            backoff = settings.SSLCOMMERZ_RETRY_BACKOFF_MS / 1000 * (2 ** attempt)
+            await asyncio.sleep(random.uniform(0, backoff))
+            attempt += 1
+    
+    async def create_session(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a payment session with SSL Commerz"""
         
         # Generate secure transaction ID
@@ -52,11 +124,7 @@ class SSLCommerzService:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/gwprocess/v4/api.php",
-                data=post_data,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
+            response = await self._post("/gwprocess/v4/api.php", post_data, idempotent=False)
             print("SSLCommerz response:", response.text)
             print("SSLCommerz response JSON:", response.json() if response.status_code == 200 else "No JSON response")
             
@@ -81,6 +149,18 @@ class SSLCommerzService:
                     'error': f'HTTP {response.status_code}: {response.text}'
                 }
                 
+        except CircuitOpenError as e:
+            return {
+                'success': False,
+                'unavailable': True,
+                'error': str(e)
+            }
+        except httpx.TimeoutException:
+            return {
+                'success': False,
+                'unavailable': True,
+                'error': 'Payment gateway timed out'
+            }
         except Exception as e:
             print("Exception in create_session:", str(e))
             return {
@@ -88,7 +168,7 @@ class SSLCommerzService:
                 'error': f'Exception occurred: {str(e)}'
             }
     
-    def validate_payment(self, sessionkey: str, tran_id: str, amount: float) -> Dict[str, Any]:
+    async def validate_payment(self, sessionkey: str, tran_id: str, amount: float) -> Dict[str, Any]:
         """Validate payment after successful transaction"""
         
         # Create validation data
@@ -102,11 +182,7 @@ class SSLCommerzService:
         }
         
         try:
-            response = requests.post(
-                f"{self.base_url}/validator/api/validationserverAPI.php",
-                data=validation_data,
-                headers={'Content-Type': 'application/x-www-form-urlencoded'}
-            )
+            response = await self._post("/validator/api/validationserverAPI.php", validation_data, idempotent=True)
             
             if response.status_code == 200:
                 result = response.json()
@@ -144,6 +220,18 @@ class SSLCommerzService:
                     'error': f'HTTP {response.status_code}: {response.text}'
                 }
                 
+        except CircuitOpenError as e:
+            return {
+                'success': False,
+                'unavailable': True,
+                'error': str(e)
+            }
+        except httpx.TimeoutException:
+            return {
+                'success': False,
+                'unavailable': True,
+                'error': 'Payment gateway timed out'
+            }
         except Exception as e:
             return {
                 'success': False,
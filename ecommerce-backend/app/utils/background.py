@@ -0,0 +1,78 @@
+"""
+Helpers for the periodic background services in app/services
+"""
+import asyncio
+import contextlib
+from typing import Awaitable, Callable, Optional, TypeVar
+import asyncpg
+from app.database import get_db_connection
+
+T = TypeVar("T")
+
+async def run_exclusive(lock_key: int, coro_fn: Callable[[asyncpg.Connection], Awaitable[T]]) -> Optional[T]:
+    """
+    Run ``coro_fn(conn)`` while holding the session advisory lock ``lock_key``,
+    so only one worker across all processes runs that job at a time. ``conn``
+    is the connection holding the lock. Returns coro_fn's result, or None
+    without running it if another worker holds the lock.
+    """
+    pool = await get_db_connection()
+    async with pool.acquire() as conn:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", lock_key):
+            return None
+        try:
+            return await coro_fn(conn)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", lock_key)
+
+class PeriodicService:
+    """Base for services that run a job in a background task every few seconds.
+
+    Subclasses implement ``interval_seconds`` (<= 0 disables the service) and
+    ``run_periodic``, which runs at startup (unless RUN_AT_START is False) and
+    then every interval. run_periodic may return the number of seconds to
+    wait before the next run instead. Failures are printed, prefixed with
+    ERROR_MESSAGE, and the schedule carries on.
+    """
+    RUN_AT_START = True
+    ERROR_MESSAGE = "Error in background service"
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def interval_seconds(cls) -> float:
+        raise NotImplementedError
+
+    @classmethod
+    async def run_periodic(cls) -> Optional[float]:
+        raise NotImplementedError
+
+    @classmethod
+    def can_start(cls) -> bool:
+        return cls.interval_seconds() > 0
+
+    @classmethod
+    def start(cls) -> None:
+        if not cls.can_start():
+            return
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls) -> None:
+        task, cls._task = cls._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    @classmethod
+    async def _run(cls) -> None:
+        if not cls.RUN_AT_START:
+            await asyncio.sleep(cls.interval_seconds())
+        while True:
+            delay = None
+            try:
+                delay = await cls.run_periodic()
+            except Exception as e:
+                print(f"{cls.ERROR_MESSAGE}: {e}")
+            await asyncio.sleep(cls.interval_seconds() if delay is None else delay)
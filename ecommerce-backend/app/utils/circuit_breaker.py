@@ -0,0 +1,82 @@
+"""
+Circuit breaker for calls to external services
+"""
+import time
+from typing import Any, Dict
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit is open"""
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls for
+    ``reset_seconds``. After that a single trial call is let through (half-open):
+    success closes the circuit again, failure re-opens it.
+
+        breaker.before_call()      # raises CircuitOpenError while open
+        try:
+            ...
+        except asyncio.CancelledError:
+            breaker.release_trial()  # no verdict, but free the half-open slot
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+
+    Every path out of the call must end in one of the three, or a half-open
+    circuit keeps its trial "in flight" and rejects everything after it.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self._rejected += 1
+        raise CircuitOpenError(f"{self.name} is unavailable, retry later")
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """The call ended without telling us whether the service is healthy"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._trial_in_flight:
+                self._times_opened += 1
+                print(f"Warning: circuit for {self.name} opened after {self._failures} consecutive failures")
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+        }
@@ -0,0 +1,196 @@
+"""
+Connection pool and query metrics, exposed by /metrics
+"""
+import bisect
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+# Seconds; roughly Prometheus' default buckets, with more resolution at the low end
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+WHITESPACE_RE = re.compile(r"\s+")
+# Literals inlined into SQL (f-string built statements); masked so /metrics never shows values
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r"(?<![\w$.])\d+(?:\.\d+)?\b")
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, like Prometheus)"""
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def cumulative(self) -> List[tuple]:
+        result, total = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        result.append(("+Inf", self.count))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum, 6),
+            "max_seconds": round(self.max, 6),
+            "p50_seconds": self.quantile(0.5),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+class QueryStats:
+    """Call count, errors and timing for one statement"""
+    __slots__ = ("calls", "errors", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+class PoolMetrics:
+    """Counters fed by the instrumented pool and the per-connection query logger"""
+    def __init__(self, max_statements: int = 500):
+        self.max_statements = max_statements
+        self.acquire_wait = Histogram()
+        self.query_duration = Histogram()
+        self.acquired = 0
+        self.reused = 0
+        self.acquire_timeouts = 0
+        self.waiting = 0
+        self.queries: Dict[str, QueryStats] = {}
+        self.queries_dropped = 0
+
+    def observe_acquire(self, seconds: float) -> None:
+        self.acquired += 1
+        self.acquire_wait.observe(seconds)
+
+    def observe_query(self, record) -> None:
+        """asyncpg query logger callback (receives a LoggedQuery)"""
+        self.query_duration.observe(record.elapsed)
+        key = mask_literals(WHITESPACE_RE.sub(" ", record.query).strip())[:300]
+        stats = self.queries.get(key)
+        if stats is None:
+            if len(self.queries) >= self.max_statements:
+                # Keep memory bounded when callers build SQL dynamically
+                self.queries_dropped += 1
+                return
+            stats = self.queries[key] = QueryStats()
+        stats.calls += 1
+        stats.total += record.elapsed
+        if record.elapsed > stats.max:
+            stats.max = record.elapsed
+        if record.exception is not None:
+            stats.errors += 1
+
+    def top_queries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Statements with the most total time"""
+        ranked = sorted(self.queries.items(), key=lambda item: item[1].total, reverse=True)[:limit]
+        return [
+            {
+                "query": query,
+                "calls": stats.calls,
+                "errors": stats.errors,
+                "total_ms": round(stats.total * 1000, 2),
+                "avg_ms": round(stats.total * 1000 / stats.calls, 3),
+                "max_ms": round(stats.max * 1000, 2),
+            }
+            for query, stats in ranked
+        ]
+
+    def snapshot(self, pool: Optional[Any] = None) -> Dict[str, Any]:
+        data = {
+            "acquired_total": self.acquired,
+            "reused_total": self.reused,
+            "acquire_timeouts_total": self.acquire_timeouts,
+            "waiting": self.waiting,
+            "acquire_wait": self.acquire_wait.to_dict(),
+            "query_duration": self.query_duration.to_dict(),
+            "distinct_statements": len(self.queries),
+            "statements_not_tracked": self.queries_dropped,
+        }
+        if pool is not None:
+            size = pool.get_size()
+            data.update({
+                "size": size,
+                "idle": pool.get_idle_size(),
+                "in_use": size - pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+            })
+        return data
+
+pool_metrics = PoolMetrics()
+
+def mask_literals(query: str) -> str:
+    """Replace string and numeric literals with ``?``; $n placeholders are left alone"""
+    return NUMBER_LITERAL_RE.sub("?", STRING_LITERAL_RE.sub("?", query))
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def prometheus_text(pool: Optional[Any], gauges: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Render pool metrics plus flat numeric service stats (``{prefix: {name: value}}``)
+    in the Prometheus text exposition format
+    """
+    lines = []
+
+    def histogram(name: str, help_text: str, hist: Histogram):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for bound, count in hist.cumulative():
+            lines.append(f'{name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{name}_sum {hist.sum:.6f}")
+        lines.append(f"{name}_count {hist.count}")
+
+    histogram("db_pool_acquire_wait_seconds", "Time spent waiting for a pool connection", pool_metrics.acquire_wait)
+    histogram("db_query_duration_seconds", "Query execution time", pool_metrics.query_duration)
+    lines.append("# HELP db_pool_reused_total Acquires served by a request-scoped connection")
+    lines.append("# TYPE db_pool_reused_total counter")
+    lines.append(f"db_pool_reused_total {pool_metrics.reused}")
+    lines.append("# TYPE db_pool_acquire_timeouts_total counter")
+    lines.append(f"db_pool_acquire_timeouts_total {pool_metrics.acquire_timeouts}")
+    lines.append("# TYPE db_pool_waiting gauge")
+    lines.append(f"db_pool_waiting {pool_metrics.waiting}")
+    if pool is not None:
+        size = pool.get_size()
+        for name, value in (("size", size), ("idle", pool.get_idle_size()),
+                            ("in_use", size - pool.get_idle_size()), ("max_size", pool.get_max_size())):
+            lines.append(f"# TYPE db_pool_{name} gauge")
+            lines.append(f"db_pool_{name} {value}")
+
+    lines.append("# TYPE db_statement_calls_total counter")
+    lines.append("# TYPE db_statement_seconds_total counter")
+    for index, query in enumerate(pool_metrics.top_queries()):
+        label = query["query"][:120].replace("\\", "\\\\").replace('"', '\\"')
+        lines.append(f'db_statement_calls_total{{rank="{index + 1}",query="{label}"}} {query["calls"]}')
+        lines.append(f'db_statement_seconds_total{{rank="{index + 1}",query="{label}"}} {query["total_ms"] / 1000:.6f}')
+
+    for prefix, values in gauges.items():
+        for name, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f"{_metric_name(prefix)}_{_metric_name(name)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, List, Sequence
+
+# Postgres INTEGER range; larger ints in a cursor would fail in the driver rather than compare
+PG_INT_MIN, PG_INT_MAX = -2**31, 2**31 - 1
+
+def encode_cursor(sort_key: str, *values: Any) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor token.
+    ``sort_key`` names the listing and its ordering (e.g. "orders:order_date");
+    pass the sort column value(s) followed by the row id.
+    """
+    payload = []
+    for value in values:
+        if isinstance(value, datetime):
+            payload.append({"dt": value.isoformat()})
+        elif isinstance(value, Decimal):
+            payload.append({"dec": str(value)})
+        else:
+            payload.append(value)
+    raw = json.dumps({"k": sort_key, "v": payload}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_value(item: Any, expected: type) -> Any:
+    if item is None:
+        return None
+    if expected is datetime:
+        if not isinstance(item, dict) or not isinstance(item.get("dt"), str):
+            raise ValueError("Invalid pagination cursor")
+        value = datetime.fromisoformat(item["dt"])
+        if value.tzinfo is not None:
+            raise ValueError("Invalid pagination cursor")
+        return value
+    if expected is Decimal:
+        if not isinstance(item, dict) or not isinstance(item.get("dec"), str):
+            raise ValueError("Invalid pagination cursor")
+        try:
+            value = Decimal(item["dec"])
+        except ArithmeticError as e:
+            raise ValueError("Invalid pagination cursor") from e
+        if not value.is_finite() or abs(value.adjusted()) > 100:
+            raise ValueError("Invalid pagination cursor")
+        return value
+    if expected is int:
+        if isinstance(item, bool) or not isinstance(item, int) or not PG_INT_MIN <= item <= PG_INT_MAX:
+            raise ValueError("Invalid pagination cursor")
+        return item
+    if not isinstance(item, expected):
+        raise ValueError("Invalid pagination cursor")
+    return item
+
+def decode_cursor(cursor: str, sort_key: str, *types: type) -> List[Any]:
+    """
+    Decode a cursor token back into its sort key values, one per type in ``types``.
+    Raises ValueError if the token is malformed, was issued for a different
+    ``sort_key`` (another listing or ordering) or holds values of the wrong type.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(payload, dict) or payload.get("k") != sort_key:
+        raise ValueError("Pagination cursor does not belong to this listing or sort order")
+    values = payload.get("v")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Invalid pagination cursor")
+    return [_decode_value(item, expected) for item, expected in zip(values, types)]
+
+def keyset_condition(columns: Sequence[str], descending: bool, param_start: int) -> str:
+    """
+    Row-comparison predicate that seeks past a cursor,
+    e.g. (o.order_date, o.id) < ($1, $2) for a descending listing
+    """
+    placeholders = ", ".join(f"${param_start + i}" for i in range(len(columns)))
+    operator = "<" if descending else ">"
+    return f"({', '.join(columns)}) {operator} ({placeholders})"
+
+async def estimate_count(conn, query: str, *params: Any) -> int:
+    """Approximate the number of rows a query returns from planner statistics, without running it"""
+    plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params)
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def estimate_table_rows(conn, table: str) -> int:
+    """Approximate a table's row count from pg_class statistics (kept current by autovacuum/ANALYZE)"""
+    rows = await conn.fetchval(
+        "SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass($1)", table
+    )
+    return int(rows or 0)
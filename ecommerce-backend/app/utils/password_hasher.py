@@ -0,0 +1,122 @@
+"""
+Password hashing off the event loop
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from passlib.context import CryptContext
+from app.config import settings
+
+class PasswordHasherBusy(Exception):
+    """Raised when more than PASSWORD_HASH_MAX_PENDING hash/verify calls are waiting"""
+
+def _build_context(scheme: str) -> CryptContext:
+    """
+    CryptContext whose default is ``scheme``; bcrypt stays accepted (and deprecated
+    when another scheme is preferred) so existing hashes keep working and get
+    rehashed on the next successful login.
+    """
+    if scheme == "argon2":
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            print("Warning: PASSWORD_HASH_SCHEME=argon2 requires argon2-cffi, falling back to bcrypt")
+            scheme = "bcrypt"
+    schemes = [scheme] if scheme == "bcrypt" else [scheme, "bcrypt"]
+    return CryptContext(schemes=schemes, deprecated="auto")
+
+class PasswordHasher:
+    """
+    Runs passlib hash/verify on a dedicated thread pool (bcrypt, scrypt and
+    argon2 release the GIL), so a burst of logins doesn't stall other requests.
+    """
+    def __init__(self, scheme: str, workers: int, max_pending: int):
+        self._context = _build_context(scheme)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._workers = workers
+        self._max_pending = max_pending
+        self._pending = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "rehashed": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0,
+        }
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the preferred scheme"""
+        return await self._submit(self._context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """Verify a password against its hash"""
+        return await self._submit(self._context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password; when the stored hash uses a deprecated scheme or settings,
+        also return a replacement hash to store
+        """
+        valid, new_hash = await self._submit(self._context.verify_and_update, password, hashed_password)
+        if new_hash:
+            self._metrics["rehashed"] += 1
+        return valid, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool and latency metrics"""
+        metrics = self._metrics
+        completed = metrics["completed"] or 1
+        return {
+            "scheme": self._context.default_scheme(),
+            "workers": self._workers,
+            "max_pending": self._max_pending,
+            "pending": self._pending,
+            "queue_depth": max(self._pending - self._workers, 0),
+            "submitted": metrics["submitted"],
+            "completed": metrics["completed"],
+            "rejected": metrics["rejected"],
+            "rehashed": metrics["rehashed"],
+            "avg_wait_ms": round(metrics["wait_ms_total"] / completed, 2),
+            "max_wait_ms": round(metrics["wait_ms_max"], 2),
+            "avg_run_ms": round(metrics["run_ms_total"] / completed, 2),
+            "max_run_ms": round(metrics["run_ms_max"], 2),
+        }
+
+    async def _submit(self, func: Callable, *args: Any) -> Any:
+        if self._pending >= self._max_pending:
+            self._metrics["rejected"] += 1
+            raise PasswordHasherBusy("Too many password operations in progress")
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        self._pending += 1
+        self._metrics["submitted"] += 1
+        queued = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+
+        wait_ms = (started - queued) * 1000
+        run_ms = (finished - started) * 1000
+        metrics = self._metrics
+        metrics["completed"] += 1
+        metrics["wait_ms_total"] += wait_ms
+        metrics["wait_ms_max"] = max(metrics["wait_ms_max"], wait_ms)
+        metrics["run_ms_total"] += run_ms
+        metrics["run_ms_max"] = max(metrics["run_ms_max"], run_ms)
+        return result
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASH_SCHEME,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_PENDING
+)
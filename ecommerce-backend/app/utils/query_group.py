@@ -0,0 +1,77 @@
+"""
+Concurrent fan-out for independent read queries
+"""
+import asyncio
+from contextvars import ContextVar
+from typing import Any, List, Optional, Sequence
+from app.config import settings
+from app.database import get_db_connection
+
+_request_limit: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("query_group_limit", default=None)
+
+def request_query_limit() -> asyncio.Semaphore:
+    """
+    Semaphore capping how many pool connections the current request's query groups hold.
+    Created on first use; tasks spawned afterwards inherit it, so call this before
+    gathering several service methods to make them share one cap.
+    """
+    semaphore = _request_limit.get()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.QUERY_GROUP_MAX_CONCURRENCY)
+        _request_limit.set(semaphore)
+    return semaphore
+
+class QueryGroup:
+    """
+    Run independent queries concurrently, each on its own pool connection:
+
+        async with QueryGroup() as group:
+            total = group.fetchval("SELECT ...")
+            daily = group.fetch("SELECT ...")
+        return {"total": total.result(), "daily": daily.result()}
+
+    Queries start as soon as they are added. Leaving the block waits for all of
+    them; if one fails the rest are cancelled and the error is re-raised.
+    """
+    def __init__(self):
+        self._limit = request_query_limit()
+        self._tasks: List[asyncio.Task] = []
+
+    async def __aenter__(self) -> 'QueryGroup':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            try:
+                await asyncio.gather(*self._tasks)
+                return False
+            except BaseException:
+                await self._cancel()
+                raise
+        await self._cancel()
+        return False
+
+    def fetch(self, query: str, *args: Any) -> asyncio.Task:
+        return self._start("fetch", query, args)
+
+    def fetchrow(self, query: str, *args: Any) -> asyncio.Task:
+        return self._start("fetchrow", query, args)
+
+    def fetchval(self, query: str, *args: Any) -> asyncio.Task:
+        return self._start("fetchval", query, args)
+
+    def _start(self, method: str, query: str, args: Sequence[Any]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._run(method, query, args))
+        self._tasks.append(task)
+        return task
+
+    async def _run(self, method: str, query: str, args: Sequence[Any]) -> Any:
+        async with self._limit:
+            pool = await get_db_connection()
+            async with pool.acquire() as conn:
+                return await getattr(conn, method)(query, *args)
+
+    async def _cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,85 @@
+"""
+Analytics cache benchmark: vectorized dashboard aggregations
+
+Builds the columnar cache from synthetic data (default 100k customers, 400k
+orders with three items each, about the default ANALYTICS_CACHE_MAX_ROWS) and
+reports its memory footprint, the cost of an incremental refresh, and how
+long each cached dashboard aggregation takes.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.analytics_cache_benchmark --customers 100000 --orders 400000
+"""
+
+import argparse
+import time
+from datetime import datetime
+import numpy as np
+from app.services import analytics_cache_service as cache
+
+ITEMS_PER_ORDER = 3
+PRODUCTS = 10_000
+ITERATIONS = 5
+
+def synthetic_rows(customers: int, orders: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    now = cache._micros(datetime.now())
+    order_ids = np.arange(1, orders + 1, dtype=np.int64)
+    order_rows = {
+        "ids": order_ids,
+        "customer_ids": rng.integers(1, customers + 1, orders),
+        "order_times": now - rng.integers(0, 400 * cache.DAY_US, orders),
+        "totals": rng.gamma(2.0, 60.0, orders).round(2),
+        "statuses": rng.choice(len(cache.ORDER_STATUSES), orders, p=[0.1, 0.1, 0.1, 0.65, 0.05]),
+    }
+    item_rows = {
+        "order_ids": np.repeat(order_ids, ITEMS_PER_ORDER),
+        "product_ids": rng.zipf(1.3, orders * ITEMS_PER_ORDER) % PRODUCTS + 1,
+        "quantities": rng.integers(1, 5, orders * ITEMS_PER_ORDER),
+        "prices": rng.uniform(1, 200, orders * ITEMS_PER_ORDER).round(2),
+    }
+    customer_rows = {
+        "ids": np.arange(1, customers + 1, dtype=np.int64),
+        "created": now - rng.integers(0, 730 * cache.DAY_US, customers),
+    }
+    return order_rows, item_rows, customer_rows
+
+def best_ms(function, *args) -> float:
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def main(customers: int, orders: int):
+    order_rows, item_rows, customer_rows = synthetic_rows(customers, orders)
+    start = time.perf_counter()
+    data = cache._build(order_rows, item_rows, customer_rows, datetime.utcnow())
+    print(f"built {data.rows} rows ({data.nbytes / 2**20:.1f} MiB) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # A refresh touching 1% of orders, e.g. a minute of status changes on a busy store
+    changed = np.sort(np.random.default_rng(3).choice(order_rows["ids"], max(orders // 100, 1), replace=False))
+    index = changed - 1
+    delta_orders = {column: values[index] for column, values in order_rows.items()}
+    delta_orders["statuses"] = np.full(len(changed), cache.CANCELLED)
+    delta_items = {column: values[np.isin(item_rows["order_ids"], changed)] for column, values in item_rows.items()}
+    no_customers = {"ids": [], "created": []}
+
+    now = cache._micros(datetime.now())
+    steps = [
+        ("refresh 1%", cache._merge, data, delta_orders, delta_items, no_customers, datetime.utcnow()),
+        ("sales 30d", cache._sales_dashboard, data, now - 30 * cache.DAY_US, now),
+        ("segmentation", cache._customer_segmentation, data, cache._days_ago(90)),
+        ("performance", cache._performance_metrics, data, cache._days_ago(30)),
+        ("trends", cache._trend_analysis, data, cache._months_ago(12), cache._months_ago(6), cache._days_ago(30)),
+    ]
+    print(f"{'step':>14} {'best ms':>10}")
+    for label, function, *args in steps:
+        print(f"{label:>14} {best_ms(function, *args):>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=400_000)
+    args = parser.parse_args()
+    main(args.customers, args.orders)
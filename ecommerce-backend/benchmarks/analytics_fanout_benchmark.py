@@ -0,0 +1,65 @@
+"""
+Analytics fan-out benchmark: sequential vs. concurrent dashboard queries
+
+Runs every AnalyticsService / AdvancedAnalyticsService dashboard method against
+the configured database (read-only) with the per-request QueryGroup cap set
+to 1, which reproduces the old one-query-after-another behaviour, and then
+with the given caps. Reports median wall-clock latency per method.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.analytics_fanout_benchmark --caps 1 4 8 --iterations 10
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from app.database import close_database_pool
+from app.services.analytics_service import AnalyticsService
+from app.services.advanced_analytics_service import AdvancedAnalyticsService
+from app.utils import query_group
+
+METHODS = [
+    ("sales_dashboard", lambda: AnalyticsService.get_sales_dashboard_data(30)),
+    ("inventory", AnalyticsService.get_inventory_analytics),
+    ("customer_segmentation", AnalyticsService.get_customer_segmentation),
+    ("performance_metrics", AnalyticsService.get_performance_metrics),
+    ("trend_analysis", AnalyticsService.get_trend_analysis),
+    ("geographic", AdvancedAnalyticsService.get_geographic_analytics),
+    ("product", AdvancedAnalyticsService.get_product_analytics),
+    ("marketing", AdvancedAnalyticsService.get_marketing_analytics),
+    ("customer", AdvancedAnalyticsService.get_customer_analytics),
+    ("predictive", AdvancedAnalyticsService.get_predictive_analytics),
+    ("real_time", AdvancedAnalyticsService.get_real_time_analytics),
+]
+
+async def measure(method, cap: int, iterations: int) -> float:
+    timings = []
+    for _ in range(iterations):
+        # Each iteration stands in for a fresh request with its own cap
+        token = query_group._request_limit.set(asyncio.Semaphore(cap))
+        try:
+            start = time.perf_counter()
+            await method()
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            query_group._request_limit.reset(token)
+    return statistics.median(timings)
+
+async def main(caps, iterations):
+    try:
+        header = "".join(f"{f'cap={cap} ms':>12}" for cap in caps)
+        print(f"{'method':>22}{header}")
+        for name, method in METHODS:
+            await method()  # warm up connections and caches
+            results = [await measure(method, cap, iterations) for cap in caps]
+            print(f"{name:>22}" + "".join(f"{result:>12.1f}" for result in results))
+    finally:
+        await close_database_pool()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--caps", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.caps, args.iterations))
@@ -0,0 +1,168 @@
+"""
+Customer order history benchmark: per-order detail queries vs. batched loading
+
+Seeds a throwaway schema with customers holding 10/100/1000 orders (three
+items each) and reports latency and query count of loading a customer's order
+history with the old N+1 loop and with attach_order_details.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.customer_orders_benchmark --orders 10 100 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import asyncpg
+from app.config import settings
+from app.models.order import attach_order_details
+
+SCHEMA = "bench_customer_orders"
+ITEMS_PER_ORDER = 3
+PRODUCTS = 500
+ITERATIONS = 20
+
+ORDERS_QUERY = """
+    SELECT o.id, o.customer_id, o.order_date, o.total_price, o.address_id, o.payment_id, o.status, o.secure_order_id, o.transaction_id
+    FROM orders o
+    WHERE o.customer_id = $1
+    ORDER BY o.order_date DESC, o.id DESC
+"""
+
+class CountingConnection:
+    """Counts the statements sent through it"""
+    def __init__(self, conn: asyncpg.Connection):
+        self._conn = conn
+        self.queries = 0
+
+    async def fetch(self, *args):
+        self.queries += 1
+        return await self._conn.fetch(*args)
+
+    async def fetchrow(self, *args):
+        self.queries += 1
+        return await self._conn.fetchrow(*args)
+
+async def seed(conn: asyncpg.Connection, order_counts):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path = {SCHEMA}")
+    await conn.execute("CREATE TABLE customers (id SERIAL PRIMARY KEY)")
+    await conn.execute("""
+        CREATE TABLE addresses (
+            id SERIAL PRIMARY KEY, customer_id INTEGER NOT NULL, street VARCHAR NOT NULL, city VARCHAR NOT NULL,
+            division VARCHAR NOT NULL, country VARCHAR NOT NULL, postal_code VARCHAR NOT NULL
+        )
+    """)
+    await conn.execute("CREATE TABLE payment_methods (id SERIAL PRIMARY KEY, method_name VARCHAR(100) NOT NULL)")
+    await conn.execute("CREATE TABLE products (id SERIAL PRIMARY KEY, name VARCHAR NOT NULL)")
+    await conn.execute("""
+        CREATE TABLE product_images (
+            id SERIAL PRIMARY KEY, product_id INTEGER NOT NULL, image_url TEXT NOT NULL, is_primary BOOLEAN DEFAULT FALSE
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE orders (
+            id SERIAL PRIMARY KEY, customer_id INTEGER NOT NULL, order_date TIMESTAMP NOT NULL DEFAULT NOW(),
+            total_price DECIMAL(10,2) NOT NULL, address_id INTEGER, payment_id INTEGER,
+            status VARCHAR(20) DEFAULT 'pending', secure_order_id VARCHAR(50), transaction_id VARCHAR(100)
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE order_items (
+            id SERIAL PRIMARY KEY, order_id INTEGER NOT NULL, product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL, price DECIMAL(10,2) NOT NULL
+        )
+    """)
+    await conn.execute("INSERT INTO payment_methods (method_name) VALUES ('Cash on Delivery'), ('SSLCommerz')")
+    await conn.execute("INSERT INTO products (name) SELECT 'Product ' || g FROM generate_series(1, $1) g", PRODUCTS)
+    await conn.execute("""
+        INSERT INTO product_images (product_id, image_url, is_primary)
+        SELECT g, 'https://example.com/' || g || '.jpg', TRUE FROM generate_series(1, $1) g
+    """, PRODUCTS)
+
+    for customer_id, count in enumerate(order_counts, start=1):
+        await conn.execute("INSERT INTO customers (id) VALUES ($1)", customer_id)
+        await conn.execute("""
+            INSERT INTO addresses (customer_id, street, city, division, country, postal_code)
+            SELECT $1, g || ' Main Road', 'Dhaka', 'Dhaka', 'Bangladesh', '1207' FROM generate_series(1, 3) g
+        """, customer_id)
+        await conn.execute("""
+            INSERT INTO orders (customer_id, order_date, total_price, address_id, payment_id, secure_order_id)
+            SELECT $1, NOW() - g * INTERVAL '1 hour', 100 + g % 50,
+                   (SELECT MIN(id) FROM addresses WHERE customer_id = $1) + g % 3, 1 + g % 2, 'ORD-' || $1 || '-' || g
+            FROM generate_series(1, $2) g
+        """, customer_id, count)
+    await conn.execute("""
+        INSERT INTO order_items (order_id, product_id, quantity, price)
+        SELECT o.id, 1 + (o.id * 7 + i) % $2, 1 + i, 19.99
+        FROM orders o, generate_series(1, $1) i
+    """, ITEMS_PER_ORDER, PRODUCTS)
+    await conn.execute("CREATE INDEX ON orders(customer_id)")
+    await conn.execute("CREATE INDEX ON order_items(order_id)")
+    await conn.execute("CREATE INDEX ON product_images(product_id)")
+    await conn.execute("ANALYZE")
+
+async def legacy_load(conn, customer_id: int):
+    # Previous Order.get_by_customer_id_with_details: three queries per order
+    rows = await conn.fetch(ORDERS_QUERY, customer_id)
+    orders = []
+    for row in rows:
+        order_data = dict(row)
+        order_data['order_date'] = order_data['order_date'].isoformat()
+        items = await conn.fetch("""
+            SELECT oi.id, oi.order_id, oi.product_id, oi.quantity, oi.price,
+                   p.name as product_name,
+                   COALESCE(pi.image_url, 'https://via.placeholder.com/100x100?text=No+Image') as product_image
+            FROM order_items oi
+            LEFT JOIN products p ON oi.product_id = p.id
+            LEFT JOIN product_images pi ON p.id = pi.product_id AND pi.is_primary = TRUE
+            WHERE oi.order_id = $1
+        """, order_data['id'])
+        order_data['items'] = [dict(item) for item in items]
+        address = await conn.fetchrow("""
+            SELECT id, street, city, division, country, postal_code FROM addresses WHERE id = $1
+        """, order_data['address_id'])
+        order_data['address'] = dict(address) if address else None
+        payment = await conn.fetchrow("SELECT id, method_name FROM payment_methods WHERE id = $1", order_data['payment_id'])
+        order_data['payment_method'] = payment['method_name'] if payment else None
+        orders.append(order_data)
+    return orders
+
+async def batched_load(conn, customer_id: int):
+    rows = await conn.fetch(ORDERS_QUERY, customer_id)
+    return await attach_order_details(conn, [dict(row) for row in rows])
+
+async def measure(conn: asyncpg.Connection, load, customer_id: int) -> dict:
+    timings = []
+    for _ in range(ITERATIONS):
+        counting = CountingConnection(conn)
+        start = time.perf_counter()
+        orders = await load(counting, customer_id)
+        timings.append((time.perf_counter() - start) * 1000)
+    percentiles = statistics.quantiles(timings, n=100)
+    return {"p50": percentiles[49], "p99": percentiles[98], "queries": counting.queries, "orders": orders}
+
+async def main(order_counts):
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        await seed(conn, order_counts)
+        print(f"{'orders':>8} {'impl':>8} {'queries':>8} {'p50 ms':>10} {'p99 ms':>10}")
+        for customer_id, count in enumerate(order_counts, start=1):
+            results = {}
+            for label, load in (("n+1", legacy_load), ("batched", batched_load)):
+                results[label] = await measure(conn, load, customer_id)
+                result = results[label]
+                print(f"{count:>8} {label:>8} {result['queries']:>8} {result['p50']:>10.2f} {result['p99']:>10.2f}")
+            # The old item query had no ORDER BY
+            for order in results["n+1"]["orders"]:
+                order["items"].sort(key=lambda item: item["id"])
+            assert results["n+1"]["orders"] == results["batched"]["orders"]
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, nargs="+", default=[10, 100, 1000])
+    asyncio.run(main(parser.parse_args().orders))
@@ -0,0 +1,88 @@
+"""
+Email delivery benchmark: one SMTP connection per email vs. a reused session
+
+Starts a local aiosmtpd sink (pip install aiosmtpd) that delays its EHLO reply
+to imitate the handshake round trips of a remote server, then delivers the
+same messages with the old per-email connection and with SmtpSession batches.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.email_delivery_benchmark --messages 200 --handshake-ms 50
+"""
+
+import argparse
+import asyncio
+import smtplib
+import time
+from aiosmtpd.controller import Controller
+from app.services.email_outbox_service import SmtpSession
+from app.services.email_service import email_service
+
+class SinkHandler:
+    def __init__(self, handshake_ms: float):
+        self.handshake_ms = handshake_ms
+        self.received = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        await asyncio.sleep(self.handshake_ms / 1000)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+def make_messages(count: int):
+    return [
+        (i, email_service.build_message(
+            f"customer{i}@example.com", f"Your Order #{i} Has Been Delivered!",
+            f"<p>Order {i} delivered</p>", f"Order {i} delivered"
+        ))
+        for i in range(count)
+    ]
+
+def per_email_connection(host: str, port: int, messages):
+    # Previous behaviour of EmailService._send_email (minus STARTTLS, which the sink lacks)
+    for _, message in messages:
+        with smtplib.SMTP(host, port) as server:
+            server.send_message(message)
+
+def reused_session(host: str, port: int, messages, batch_size: int):
+    session = SmtpSession(host, port, use_tls=False)
+    try:
+        for start in range(0, len(messages), batch_size):
+            results = session.send_batch(messages[start:start + batch_size])
+            assert all(error is None for _, error in results), results
+    finally:
+        session.close()
+    return session.connections
+
+def main(count: int, handshake_ms: float, batch_size: int, port: int):
+    handler = SinkHandler(handshake_ms)
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        messages = make_messages(count)
+        print(f"{'messages':>8} {'impl':>10} {'conns':>6} {'ms':>10} {'emails/s':>10}")
+
+        start = time.perf_counter()
+        per_email_connection("127.0.0.1", port, messages)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8} {'per-email':>10} {count:>6} {elapsed * 1000:>10.1f} {count / elapsed:>10.1f}")
+
+        start = time.perf_counter()
+        connections = reused_session("127.0.0.1", port, messages, batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8} {'session':>10} {connections:>6} {elapsed * 1000:>10.1f} {count / elapsed:>10.1f}")
+
+        assert handler.received == 2 * count
+    finally:
+        controller.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=50)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+    main(args.messages, args.handshake_ms, args.batch_size, args.port)
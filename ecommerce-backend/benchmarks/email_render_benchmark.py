@@ -0,0 +1,195 @@
+"""
+Email render benchmark: per-message f-string templates vs. compiled templates
+
+Renders the shipping notification (HTML + text) for a bulk run such as "all
+orders shipped today" and reports messages/second for the previous f-string
+builders (kept below for comparison) and the compiled templates used by
+EmailService.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.email_render_benchmark --messages 1000 10000
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Optional
+from app.services.email_service import EmailService
+
+STORE_NAME = "Your Store"
+
+def legacy_shipping_html(store_name: str, customer_name: str, order_id: str, 
+                                  courier_service: str, tracking_id: str,
+                                  estimated_delivery: Optional[str] = None) -> str:
+    """Create HTML email content for shipping notification"""
+    delivery_info = f"<p><strong>Estimated Delivery:</strong> {estimated_delivery}</p>" if estimated_delivery else ""
+
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Order Shipped - {store_name}</title>
+        <style>
+            body {{
+                font-family: Arial, sans-serif;
+                line-height: 1.6;
+                color: #333;
+                max-width: 600px;
+                margin: 0 auto;
+                padding: 20px;
+            }}
+            .header {{
+                background: linear-gradient(135deg, #9DC08B 0%, #40513B 100%);
+                color: white;
+                padding: 30px;
+                text-align: center;
+                border-radius: 10px 10px 0 0;
+            }}
+            .content {{
+                background: #f9f9f9;
+                padding: 30px;
+                border-radius: 0 0 10px 10px;
+            }}
+            .shipping-info {{
+                background: white;
+                padding: 20px;
+                border-radius: 8px;
+                margin: 20px 0;
+                border-left: 4px solid #9DC08B;
+            }}
+            .tracking-box {{
+                background: #e8f5e8;
+                padding: 15px;
+                border-radius: 5px;
+                margin: 15px 0;
+            }}
+            .button {{
+                display: inline-block;
+                background: #9DC08B;
+                color: white;
+                padding: 12px 24px;
+                text-decoration: none;
+                border-radius: 5px;
+                margin: 10px 0;
+            }}
+            .footer {{
+                text-align: center;
+                margin-top: 30px;
+                padding-top: 20px;
+                border-top: 1px solid #ddd;
+                color: #666;
+            }}
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <h1>🚚 Your Order Has Been Shipped!</h1>
+            <p>Great news! Your order is on its way to you.</p>
+        </div>
+
+        <div class="content">
+            <h2>Hello {customer_name},</h2>
+
+            <p>We're excited to let you know that your order <strong>#{order_id}</strong> has been shipped and is on its way to you!</p>
+
+            <div class="shipping-info">
+                <h3>📦 Shipping Details</h3>
+                <p><strong>Courier Service:</strong> {courier_service}</p>
+                <p><strong>Tracking ID:</strong> {tracking_id}</p>
+                {delivery_info}
+            </div>
+
+            <div class="tracking-box">
+                <h4>🔍 Track Your Package</h4>
+                <p>You can track your package using the tracking ID above on the courier service's website.</p>
+                <p><strong>Tracking ID:</strong> <code>{tracking_id}</code></p>
+            </div>
+
+            <p>We'll send you another email once your package has been delivered.</p>
+
+            <p>If you have any questions about your order, please don't hesitate to contact our customer support team.</p>
+
+            <p>Thank you for choosing {store_name}!</p>
+
+            <div class="footer">
+                <p>Best regards,<br>The {store_name} Team</p>
+                <p><small>This email was sent on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</small></p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+def legacy_shipping_text(store_name: str, customer_name: str, order_id: str, 
+                                  courier_service: str, tracking_id: str,
+                                  estimated_delivery: Optional[str] = None) -> str:
+    """Create plain text email content for shipping notification"""
+    delivery_info = f"\nEstimated Delivery: {estimated_delivery}" if estimated_delivery else ""
+
+    return f"""
+    Your Order Has Been Shipped! 🚚
+
+    Hello {customer_name},
+
+    Great news! Your order #{order_id} has been shipped and is on its way to you!
+
+    Shipping Details:
+    - Courier Service: {courier_service}
+    - Tracking ID: {tracking_id}{delivery_info}
+
+    Track Your Package:
+    You can track your package using the tracking ID above on the courier service's website.
+
+    We'll send you another email once your package has been delivered.
+
+    If you have any questions about your order, please don't hesitate to contact our customer support team.
+
+    Thank you for choosing {store_name}!
+
+    Best regards,
+    The {store_name} Team
+
+    This email was sent on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+    """
+
+
+def make_orders(count: int):
+    return [
+        {
+            "customer_name": f"Customer {i}",
+            "order_id": f"ORD-{100000 + i}",
+            "courier_service": ("Pathao", "RedX", "Steadfast")[i % 3],
+            "tracking_id": f"TRK{i:08d}",
+            "estimated_delivery": "2-3 business days" if i % 2 else None
+        }
+        for i in range(count)
+    ]
+
+def render_legacy(orders):
+    for order in orders:
+        legacy_shipping_html(STORE_NAME, **order)
+        legacy_shipping_text(STORE_NAME, **order)
+
+def render_compiled(service: EmailService, orders):
+    for order in orders:
+        service.render("shipping_notification", order)
+
+def main(sizes):
+    start = time.perf_counter()
+    service = EmailService()
+    print(f"compile: {(time.perf_counter() - start) * 1000:.2f} ms")
+    print(f"{'messages':>8} {'impl':>10} {'ms':>10} {'msgs/s':>10}")
+    for size in sizes:
+        orders = make_orders(size)
+        for label, render in (("f-string", render_legacy), ("compiled", lambda o: render_compiled(service, o))):
+            start = time.perf_counter()
+            render(orders)
+            elapsed = time.perf_counter() - start
+            print(f"{size:>8} {label:>10} {elapsed * 1000:>10.1f} {size / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, nargs="+", default=[1000, 10000])
+    main(parser.parse_args().messages)
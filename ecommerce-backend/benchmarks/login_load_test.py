@@ -0,0 +1,69 @@
+"""
+Login load test: password verification on the event loop vs. the hashing pool
+
+Fires N concurrent password verifications while a ticker coroutine measures
+event-loop lag (how late a 10 ms sleep wakes up), the way a burst of logins
+delays every other request on the worker. No database is needed.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.login_load_test --concurrency 10 50 --workers 4
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from passlib.context import CryptContext
+from app.utils.password_hasher import PasswordHasher
+
+TICK_SECONDS = 0.01
+PASSWORD = "correct horse battery staple"
+
+async def ticker(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+async def run(label: str, verify, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(verify() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    assert all(results)
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    median = statistics.median(lags) if lags else 0.0
+    print(f"{concurrency:>8} {label:>8} {elapsed * 1000:>10.1f} {concurrency / elapsed:>10.1f} "
+          f"{median:>10.1f} {p99:>10.1f} {max(lags, default=0.0):>10.1f}")
+
+async def main(concurrency_levels, workers: int, scheme: str):
+    context = CryptContext(schemes=[scheme])
+    hashed = context.hash(PASSWORD)
+    hasher = PasswordHasher(scheme, workers, max(concurrency_levels))
+
+    async def inline_verify():
+        # Previous behaviour: the blocking verify runs on the event loop
+        return context.verify(PASSWORD, hashed)
+
+    async def pooled_verify():
+        return await hasher.verify(PASSWORD, hashed)
+
+    print(f"{'logins':>8} {'impl':>8} {'ms':>10} {'logins/s':>10} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+    for concurrency in concurrency_levels:
+        for label, verify in (("inline", inline_verify), ("pool", pooled_verify)):
+            await run(label, verify, concurrency)
+    print(hasher.stats())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scheme", default="bcrypt", choices=["bcrypt", "scrypt"])
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.workers, args.scheme))
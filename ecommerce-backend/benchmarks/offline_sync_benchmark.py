@@ -0,0 +1,102 @@
+"""
+Offline event sync benchmark: per-event INSERT loop vs. validated COPY
+
+Seeds a throwaway schema with the tables real_time_events references and
+reports wall time and events/second for syncing a batch of offline events.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.offline_sync_benchmark --sizes 500 5000 20000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+import asyncpg
+from app.config import settings
+from app.services.event_ingestion_service import copy_offline_events
+
+SCHEMA = "bench_offline_sync"
+PRODUCTS = 1000
+
+async def seed(conn: asyncpg.Connection):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path = {SCHEMA}")
+    await conn.execute("CREATE TABLE customers (id SERIAL PRIMARY KEY)")
+    await conn.execute("CREATE TABLE products (id SERIAL PRIMARY KEY)")
+    await conn.execute("CREATE TABLE orders (id SERIAL PRIMARY KEY)")
+    await conn.execute("""
+        CREATE TABLE real_time_events (
+            id SERIAL PRIMARY KEY,
+            event_type VARCHAR(50) NOT NULL,
+            event_data JSONB NOT NULL,
+            user_id INTEGER,
+            customer_id INTEGER REFERENCES customers(id),
+            product_id INTEGER REFERENCES products(id),
+            order_id INTEGER REFERENCES orders(id),
+            timestamp TIMESTAMP DEFAULT NOW(),
+            processed BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    await conn.execute("CREATE INDEX ON real_time_events(event_type)")
+    await conn.execute("CREATE INDEX ON real_time_events(timestamp)")
+    await conn.execute("INSERT INTO customers SELECT generate_series(1, 100)")
+    await conn.execute("INSERT INTO products SELECT generate_series(1, $1)", PRODUCTS)
+
+def make_events(size: int):
+    start = datetime.utcnow() - timedelta(hours=1)
+    return [
+        {
+            "event_type": "product_view" if i % 4 else "add_to_cart",
+            "event_data": {"product_id": 1 + i % PRODUCTS, "customer_id": 1 + i % 100, "page": "/products"},
+            "timestamp": (start + timedelta(milliseconds=i)).isoformat()
+        }
+        for i in range(size)
+    ]
+
+async def legacy_sync(conn: asyncpg.Connection, events):
+    for event in events:
+        event_data = event.get("event_data", {})
+        await conn.execute("""
+            INSERT INTO real_time_events (
+                event_type, event_data, user_id, customer_id,
+                product_id, order_id, timestamp
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7)
+        """,
+            event.get("event_type"),
+            json.dumps(event_data),
+            None,
+            event_data.get("customer_id"),
+            event_data.get("product_id"),
+            event_data.get("order_id"),
+            datetime.fromisoformat(event["timestamp"])
+        )
+
+async def copy_sync(conn: asyncpg.Connection, events):
+    synced, rejected = await copy_offline_events(conn, events, None)
+    assert synced == len(events) and not rejected, rejected
+
+async def main(sizes):
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        await seed(conn)
+        print(f"{'events':>8} {'impl':>8} {'ms':>10} {'events/s':>12}")
+        for size in sizes:
+            events = make_events(size)
+            for label, sync in (("loop", legacy_sync), ("copy", copy_sync)):
+                await conn.execute("TRUNCATE real_time_events")
+                start = time.perf_counter()
+                await sync(conn, events)
+                elapsed = time.perf_counter() - start
+                print(f"{size:>8} {label:>8} {elapsed * 1000:>10.1f} {size / elapsed:>12.0f}")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 20000])
+    asyncio.run(main(parser.parse_args().sizes))
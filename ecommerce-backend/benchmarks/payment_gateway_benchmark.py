@@ -0,0 +1,99 @@
+"""
+Payment session benchmark: blocking requests.post vs. the async gateway client
+
+Starts the stub gateway in a subprocess, fires N concurrent create_session
+calls and measures wall time plus event-loop lag (how late a 10 ms sleep
+wakes up), i.e. how much a slow gateway stalls unrelated requests.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.payment_gateway_benchmark --concurrency 10 50 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+import requests
+from app.services.sslcommerz_service import SSLCommerzService
+
+TICK_SECONDS = 0.01
+
+ORDER = {
+    "order_id": 1, "total_amount": 1500, "customer_id": "1",
+    "customer_name": "Bench Customer", "customer_email": "bench@example.com",
+    "customer_address": "House 1, Road 2", "customer_city": "Dhaka",
+    "customer_postcode": "1207", "customer_phone": "01700000000",
+    "items": [{"product_id": 1, "quantity": 1}], "product_name": "Bench product"
+}
+
+def start_stub(port: int, latency_ms: float, failure_rate: float) -> subprocess.Popen:
+    stub = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.stub_sslcommerz_gateway", "--port", str(port),
+        "--latency-ms", str(latency_ms), "--failure-rate", str(failure_rate)
+    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            requests.post(f"http://127.0.0.1:{port}/validator/api/validationserverAPI.php", timeout=5)
+            return stub
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    stub.kill()
+    raise RuntimeError("stub gateway did not start")
+
+async def ticker(lags, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+async def run(label: str, create, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(create() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    ok = sum(1 for result in results if result)
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+    median = statistics.median(lags) if lags else 0.0
+    print(f"{concurrency:>8} {label:>8} {ok:>6} {elapsed * 1000:>10.1f} "
+          f"{median:>10.1f} {p99:>10.1f} {max(lags, default=0.0):>10.1f}")
+
+async def main(concurrency_levels, port: int, latency_ms: float, failure_rate: float):
+    stub = start_stub(port, latency_ms, failure_rate)
+    base_url = f"http://127.0.0.1:{port}"
+    service = SSLCommerzService(base_url=base_url)
+
+    async def blocking_create():
+        # Previous behaviour: requests.post inside the async route
+        response = requests.post(f"{base_url}/gwprocess/v4/api.php", data={"total_amount": 1500})
+        return response.status_code == 200
+
+    async def async_create():
+        return (await service.create_session(ORDER))["success"]
+
+    try:
+        print(f"{'calls':>8} {'impl':>8} {'ok':>6} {'ms':>10} {'lag p50':>10} {'lag p99':>10} {'lag max':>10}")
+        for concurrency in concurrency_levels:
+            for label, create in (("blocking", blocking_create), ("async", async_create)):
+                await run(label, create, concurrency)
+        print(service.breaker.stats())
+    finally:
+        await service.close()
+        stub.terminate()
+        stub.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.port, args.latency_ms, args.failure_rate))
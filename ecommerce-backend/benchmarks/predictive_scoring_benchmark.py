@@ -0,0 +1,159 @@
+"""
+Predictive scoring benchmark: vectorized churn scores and demand forecasts
+
+Generates synthetic order history (default 100k customers x 10k products,
+~10 orders per customer) in memory and times score_customers and
+forecast_demand, the NumPy part of the scoring job. With --database it also
+seeds a throwaway schema and times the whole run_scoring pass (bulk load,
+scoring, COPY into the score tables).
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.predictive_scoring_benchmark --customers 100000 --products 10000
+    python -m benchmarks.predictive_scoring_benchmark --database --customers 20000 --products 2000
+"""
+
+import argparse
+import asyncio
+import time
+import numpy as np
+from app.config import settings
+from app.services.predictive_scoring_service import score_customers, forecast_demand, run_scoring
+
+SCHEMA = "bench_predictive_scoring"
+ORDERS_PER_CUSTOMER = 10
+ITEMS_PER_ORDER = 3
+ITERATIONS = 5
+
+def synthetic_history(customers: int, products: int, history_days: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    customer_ids = np.arange(1, customers + 1, dtype=np.int64)
+    created = now - rng.uniform(0, 730, customers) * 86400
+    orders = customers * ORDERS_PER_CUSTOMER
+    # Skewed activity: some customers order a lot, a tail never does
+    order_customers = 1 + (rng.pareto(1.5, orders) * customers / 20).astype(np.int64) % customers
+    order_times = now - rng.exponential(120, orders) * 86400
+    totals = rng.gamma(2.0, 60.0, orders)
+
+    # Daily units per (product, day) with popularity skew and a weekly cycle
+    popularity = rng.zipf(1.3, products).clip(max=500).astype(float)
+    days = np.arange(history_days)
+    weekly = 1 + 0.3 * np.sin(2 * np.pi * days / 7)
+    rate = popularity[:, None] * weekly[None, :] * 0.2
+    units = rng.poisson(rate)
+    product_index, day_index = np.nonzero(units)
+    return {
+        "customer_ids": customer_ids, "created": created, "order_customers": order_customers,
+        "order_times": order_times, "totals": totals, "now": now,
+        "product_ids": np.arange(1, products + 1, dtype=np.int64),
+        "stock": rng.integers(0, 500, products),
+        "demand_products": product_index.astype(np.int64) + 1, "demand_days": day_index.astype(np.int64),
+        "demand_units": units[product_index, day_index].astype(float),
+    }
+
+def time_it(function, *args) -> float:
+    timings = []
+    for _ in range(ITERATIONS):
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+def compute_benchmark(customers: int, products: int, history_days: int):
+    start = time.perf_counter()
+    data = synthetic_history(customers, products, history_days)
+    print(f"generated {customers} customers, {len(data['order_customers'])} orders, "
+          f"{products} products x {history_days} days ({len(data['demand_units'])} non-zero) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    churn_ms = time_it(score_customers, data["customer_ids"], data["created"], data["order_customers"],
+                       data["order_times"], data["totals"], data["now"])
+    demand_ms = time_it(forecast_demand, data["product_ids"], data["stock"], data["demand_products"],
+                        data["demand_days"], data["demand_units"], history_days)
+    print(f"{'step':>16} {'best ms':>10}")
+    print(f"{'churn scores':>16} {churn_ms:>10.1f}")
+    print(f"{'demand forecast':>16} {demand_ms:>10.1f}")
+
+    scores = score_customers(data["customer_ids"], data["created"], data["order_customers"],
+                             data["order_times"], data["totals"], data["now"])
+    risk, counts = np.unique(scores["churn_risk"], return_counts=True)
+    print("churn risk:", dict(zip(risk.tolist(), counts.tolist())))
+
+async def seed(conn, customers: int, products: int):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"SET search_path = {SCHEMA}")
+    await conn.execute("CREATE TABLE customers (id SERIAL PRIMARY KEY, created_at TIMESTAMP DEFAULT NOW())")
+    await conn.execute("CREATE TABLE products (id SERIAL PRIMARY KEY, stock INTEGER NOT NULL)")
+    await conn.execute("""
+        CREATE TABLE orders (
+            id SERIAL PRIMARY KEY, customer_id INTEGER NOT NULL, order_date TIMESTAMP NOT NULL,
+            total_price DECIMAL(10,2) NOT NULL, status VARCHAR(20) DEFAULT 'pending'
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE order_items (
+            id SERIAL PRIMARY KEY, order_id INTEGER NOT NULL, product_id INTEGER NOT NULL, quantity INTEGER NOT NULL
+        )
+    """)
+    # Score tables without the foreign keys to the real schema
+    await conn.execute("""
+        CREATE TABLE customer_churn_scores (
+            customer_id INTEGER PRIMARY KEY, total_orders INTEGER, lifetime_value DOUBLE PRECISION,
+            avg_order_value DOUBLE PRECISION, last_order_date TIMESTAMP, days_since_last_order INTEGER,
+            days_since_registration INTEGER, expected_gap_days DOUBLE PRECISION, churn_probability DOUBLE PRECISION,
+            churn_risk VARCHAR(20), activity_status VARCHAR(20), customer_segment VARCHAR(20), scored_at TIMESTAMP
+        )
+    """)
+    await conn.execute("""
+        CREATE TABLE product_demand_forecasts (
+            product_id INTEGER PRIMARY KEY, stock INTEGER, demand_last_30_days DOUBLE PRECISION,
+            forecast_next_30_days DOUBLE PRECISION, seasonal_naive_next_30_days DOUBLE PRECISION,
+            avg_daily_demand DOUBLE PRECISION, days_of_cover DOUBLE PRECISION, inventory_turnover DOUBLE PRECISION,
+            stock_status VARCHAR(20), turnover_category VARCHAR(20), scored_at TIMESTAMP
+        )
+    """)
+    await conn.execute("""
+        INSERT INTO customers (created_at) SELECT NOW() - random() * INTERVAL '730 days' FROM generate_series(1, $1)
+    """, customers)
+    await conn.execute("INSERT INTO products (stock) SELECT (random() * 500)::int FROM generate_series(1, $1)", products)
+    await conn.execute("""
+        INSERT INTO orders (customer_id, order_date, total_price, status)
+        SELECT 1 + (random() * ($1 - 1))::int, NOW() - random() * INTERVAL '365 days', 20 + random() * 200,
+               CASE WHEN random() < 0.05 THEN 'cancelled' ELSE 'delivered' END
+        FROM generate_series(1, $1 * $2)
+    """, customers, ORDERS_PER_CUSTOMER)
+    await conn.execute("""
+        INSERT INTO order_items (order_id, product_id, quantity)
+        SELECT o.id, 1 + (power(random(), 3) * ($2 - 1))::int, 1 + (random() * 3)::int
+        FROM orders o, generate_series(1, $1)
+    """, ITEMS_PER_ORDER, products)
+    await conn.execute("CREATE INDEX ON order_items(order_id)")
+    await conn.execute("CREATE INDEX ON orders(order_date)")
+    await conn.execute("ANALYZE")
+
+async def database_benchmark(customers: int, products: int, history_days: int):
+    import asyncpg
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        start = time.perf_counter()
+        await seed(conn, customers, products)
+        print(f"seeded {customers} customers x {products} products in {time.perf_counter() - start:.1f}s")
+        timings = await run_scoring(conn, history_days)
+        print(f"{'step':>16} {'seconds':>10}")
+        for step in ("load_seconds", "score_seconds", "write_seconds"):
+            print(f"{step:>16} {timings[step]:>10.2f}")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--history-days", type=int, default=settings.PREDICTIVE_HISTORY_DAYS)
+    parser.add_argument("--database", action="store_true", help="Also time the full job against DATABASE_URL")
+    args = parser.parse_args()
+    compute_benchmark(args.customers, args.products, args.history_days)
+    if args.database:
+        asyncio.run(database_benchmark(args.customers, args.products, args.history_days))
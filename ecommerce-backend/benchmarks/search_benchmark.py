@@ -0,0 +1,100 @@
+"""
+Product search benchmark: legacy ILIKE scan vs. full-text/trigram search
+
+Seeds a throwaway schema with synthetic products and reports p50/p99 latency
+of the search-page query (page + total count) for both implementations.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import asyncpg
+from app.config import settings
+from app.models.product import SEARCH_VECTOR_SQL, build_search_filter
+
+SCHEMA = "bench_search"
+TERMS = ["shi", "cotton", "blue jea", "phone", "leather wal", "xyz"]
+ITERATIONS = 50
+
+WORDS = ("ARRAY['classic','cotton','denim','leather','slim','wireless','smart','phone','shirt','jeans',"
+         "'wallet','watch','blue','black','red','linen','wool','sport','travel','premium']")
+
+async def seed(conn: asyncpg.Connection, size: int):
+    await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    await conn.execute(f"CREATE SCHEMA {SCHEMA}")
+    await conn.execute(f"""
+        CREATE TABLE {SCHEMA}.products (
+            id SERIAL PRIMARY KEY,
+            name VARCHAR NOT NULL,
+            description TEXT NOT NULL,
+            price DECIMAL(10,2) NOT NULL,
+            brand VARCHAR(100),
+            material TEXT,
+            search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED
+        )
+    """)
+    await conn.execute(f"""
+        INSERT INTO {SCHEMA}.products (name, description, price, brand, material)
+        SELECT
+            w[1 + (g * 7) % 20] || ' ' || w[1 + (g * 13) % 20] || ' ' || g,
+            'A ' || w[1 + (g * 3) % 20] || ' item made of ' || w[1 + (g * 11) % 20],
+            (g % 500) + 9.99,
+            'Brand' || (g % 200),
+            w[1 + (g * 5) % 20]
+        FROM generate_series(1, $1) g, (SELECT {WORDS} AS w) words
+    """, size)
+    await conn.execute(f"CREATE INDEX ON {SCHEMA}.products(name)")
+    await conn.execute(f"CREATE INDEX ON {SCHEMA}.products USING GIN(search_vector)")
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    await conn.execute(f"CREATE INDEX ON {SCHEMA}.products USING GIN(name gin_trgm_ops)")
+    await conn.execute(f"ANALYZE {SCHEMA}.products")
+
+async def legacy_search(conn: asyncpg.Connection, term: str):
+    pattern = f"%{term}%"
+    await conn.fetchval(f"SELECT COUNT(DISTINCT p.id) FROM {SCHEMA}.products p WHERE p.name ILIKE $1", pattern)
+    await conn.fetch(f"""
+        SELECT p.id, p.name FROM {SCHEMA}.products p
+        WHERE p.name ILIKE $1 ORDER BY p.name LIMIT 20
+    """, pattern)
+
+async def indexed_search(conn: asyncpg.Connection, term: str):
+    condition, rank, params = build_search_filter(term)
+    await conn.fetch(f"""
+        SELECT p.id, p.name, {rank} as relevance, COUNT(*) OVER() as total_count
+        FROM {SCHEMA}.products p
+        WHERE {condition}
+        ORDER BY relevance DESC, p.name ASC
+        LIMIT 20
+    """, *params)
+
+async def measure(conn: asyncpg.Connection, search) -> dict:
+    timings = []
+    for _ in range(ITERATIONS):
+        for term in TERMS:
+            start = time.perf_counter()
+            await search(conn, term)
+            timings.append((time.perf_counter() - start) * 1000)
+    percentiles = statistics.quantiles(timings, n=100)
+    return {"p50": percentiles[49], "p99": percentiles[98]}
+
+async def main(sizes):
+    conn = await asyncpg.connect(settings.DATABASE_URL)
+    try:
+        print(f"{'products':>10} {'impl':>8} {'p50 ms':>10} {'p99 ms':>10}")
+        for size in sizes:
+            await seed(conn, size)
+            for label, search in (("ilike", legacy_search), ("indexed", indexed_search)):
+                result = await measure(conn, search)
+                print(f"{size:>10} {label:>8} {result['p50']:>10.2f} {result['p99']:>10.2f}")
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    asyncio.run(main(parser.parse_args().sizes))
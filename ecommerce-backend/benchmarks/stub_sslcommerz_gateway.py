@@ -0,0 +1,71 @@
+"""
+Local stub of the SSLCommerz session and validation APIs
+
+Answers like the sandbox gateway after a configurable delay and fails a
+configurable share of requests with 503, so the payment client can be
+exercised without network access. Point the app at it with
+SSLCOMMERZ_BASE_URL=http://127.0.0.1:8765.
+
+Usage (from ecommerce-backend/):
+    python -m benchmarks.stub_sslcommerz_gateway --port 8765 --latency-ms 300 --failure-rate 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import uuid
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def create_stub_app(latency_ms: float = 300, failure_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="SSLCommerz stub")
+    app.state.latency_ms = latency_ms
+    app.state.failure_rate = failure_rate
+    app.state.requests = 0
+
+    async def simulate():
+        app.state.requests += 1
+        await asyncio.sleep(app.state.latency_ms / 1000)
+        if random.random() < app.state.failure_rate:
+            return JSONResponse({"status": "FAILED", "failedreason": "stub outage"}, status_code=503)
+        return None
+
+    @app.post("/gwprocess/v4/api.php")
+    async def create_session(request: Request):
+        form = await request.form()
+        failure = await simulate()
+        if failure:
+            return failure
+        sessionkey = uuid.uuid4().hex
+        return {
+            "status": "SUCCESS",
+            "sessionkey": sessionkey,
+            "GatewayPageURL": f"https://sandbox.sslcommerz.com/EasyCheckOut/{sessionkey}",
+            "tran_id": form.get("tran_id")
+        }
+
+    @app.post("/validator/api/validationserverAPI.php")
+    async def validate(request: Request):
+        form = await request.form()
+        failure = await simulate()
+        if failure:
+            return failure
+        return {
+            "status": "VALID",
+            "tran_id": form.get("tran_id"),
+            "amount": form.get("amount"),
+            "currency": "BDT",
+            "card_type": "VISA-Stub",
+            "bank_tran_id": uuid.uuid4().hex[:16]
+        }
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.latency_ms, args.failure_rate), host="127.0.0.1", port=args.port)
@@ -1,6 +1,9 @@
+import os
 import uvicorn
 
 if __name__ == "__main__":
+    # Local runs create/upgrade the schema at startup; deploys run `python -m app.db.migrate` first
+    os.environ.setdefault("DB_AUTO_MIGRATE", "true")
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
@@ -0,0 +1,80 @@
+import asyncio
+import contextlib
+from app.utils import background
+from app.utils.background import PeriodicService, run_exclusive
+
+class FakeConn:
+    def __init__(self, lock_free: bool):
+        self.lock_free = lock_free
+        self.unlocked = False
+
+    async def fetchval(self, query, *args):
+        return self.lock_free
+
+    async def execute(self, query, *args):
+        self.unlocked = "unlock" in query
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+def test_run_exclusive_skips_when_lock_is_held(monkeypatch):
+    conn = FakeConn(lock_free=False)
+    async def get_pool():
+        return FakePool(conn)
+    monkeypatch.setattr(background, "get_db_connection", get_pool)
+    calls = []
+    async def job(conn):
+        calls.append(conn)
+    assert asyncio.run(run_exclusive(1, job)) is None
+    assert calls == []
+
+def test_run_exclusive_unlocks_after_failure(monkeypatch):
+    conn = FakeConn(lock_free=True)
+    async def get_pool():
+        return FakePool(conn)
+    monkeypatch.setattr(background, "get_db_connection", get_pool)
+    async def job(conn):
+        raise RuntimeError("boom")
+    try:
+        asyncio.run(run_exclusive(1, job))
+    except RuntimeError:
+        pass
+    assert conn.unlocked
+
+def test_periodic_service_keeps_running_after_a_failure():
+    runs = []
+
+    class Flaky(PeriodicService):
+        @classmethod
+        def interval_seconds(cls):
+            return 0.001
+
+        @classmethod
+        async def run_periodic(cls):
+            runs.append(len(runs))
+            if len(runs) == 1:
+                raise RuntimeError("first run fails")
+
+    async def main():
+        Flaky.start()
+        while len(runs) < 3:
+            await asyncio.sleep(0.001)
+        await Flaky.stop()
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+    assert Flaky._task is None
+    assert PeriodicService._task is None
+
+def test_disabled_service_does_not_start():
+    class Disabled(PeriodicService):
+        @classmethod
+        def interval_seconds(cls):
+            return 0
+
+    Disabled.start()
+    assert Disabled._task is None
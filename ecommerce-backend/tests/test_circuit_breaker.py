@@ -0,0 +1,52 @@
+import asyncio
+import httpx
+import pytest
+from app.services.sslcommerz_service import SSLCommerzService
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+def half_open_service(handler) -> SSLCommerzService:
+    """Service whose breaker is half-open and whose client answers with ``handler``"""
+    service = SSLCommerzService(base_url="http://gateway.test")
+    service.breaker = CircuitBreaker("SSLCommerz", failure_threshold=1, reset_seconds=0)
+    service.breaker.record_failure()
+    service._client = httpx.AsyncClient(base_url=service.base_url, transport=httpx.MockTransport(handler))
+    assert service.breaker.state == "half_open"
+    return service
+
+def test_cancelled_trial_call_releases_the_half_open_slot():
+    async def scenario():
+        started = asyncio.Event()
+
+        async def hang(request):
+            started.set()
+            await asyncio.sleep(3600)
+
+        service = half_open_service(hang)
+        trial = asyncio.create_task(service._post("/validate", {}, idempotent=True))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        await service.close()
+        return service.breaker
+
+    breaker = asyncio.run(scenario())
+    breaker.before_call()  # the next caller gets the trial instead of CircuitOpenError
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_unexpected_error_in_trial_call_reopens_the_circuit():
+    async def scenario():
+        def broken(request):
+            raise httpx.DecodingError("bad gzip")
+
+        service = half_open_service(broken)
+        with pytest.raises(httpx.DecodingError):
+            await service._post("/validate", {}, idempotent=True)
+        await service.close()
+        return service.breaker
+
+    breaker = asyncio.run(scenario())
+    assert breaker.stats()["consecutive_failures"] == 2
+    assert breaker.stats()["times_opened"] == 2
+    breaker.before_call()  # reset_seconds=0, so a fresh trial is allowed
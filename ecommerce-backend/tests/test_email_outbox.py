@@ -0,0 +1,51 @@
+import asyncio
+import smtplib
+import time
+import pytest
+from app.services.email_outbox_service import EmailOutboxService, is_permanent_error
+
+@pytest.mark.parametrize("error", [
+    smtplib.SMTPDataError(550, b"message rejected"),
+    smtplib.SMTPSenderRefused(553, b"sender not allowed", "shop@example.com"),
+    smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no such user")}),
+    smtplib.SMTPNotSupportedError("SMTPUTF8 not supported"),
+])
+def test_5xx_rejections_are_permanent(error):
+    assert is_permanent_error(error)
+
+@pytest.mark.parametrize("error", [
+    smtplib.SMTPDataError(451, b"try again later"),
+    smtplib.SMTPSenderRefused(450, b"mailbox busy", "shop@example.com"),
+    smtplib.SMTPRecipientsRefused({"a@example.com": (550, b"no such user"), "b@example.com": (452, b"full")}),
+    smtplib.SMTPAuthenticationError(535, b"bad credentials"),
+    smtplib.SMTPServerDisconnected("connection lost"),
+    TimeoutError(),
+])
+def test_transient_and_session_errors_are_retried(error):
+    assert not is_permanent_error(error)
+
+def test_stop_lets_the_batch_in_flight_finish_before_closing_the_session(monkeypatch):
+    events = []
+
+    class FakeSession:
+        def close(self):
+            events.append("closed")
+
+    async def deliver_batch():
+        events.append("sending")
+        await asyncio.to_thread(time.sleep, 0.05)
+        events.append("sent")
+        return 0
+
+    monkeypatch.setattr(EmailOutboxService, "deliver_batch", deliver_batch)
+    monkeypatch.setattr(EmailOutboxService, "_session", FakeSession())
+
+    async def main():
+        EmailOutboxService.start()
+        while not events:
+            await asyncio.sleep(0.001)
+        await EmailOutboxService.stop()
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+    assert events == ["sending", "sent", "closed"]
+    assert EmailOutboxService._task is None
@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime
+from app.services.event_partition_service import EventPartitionService
+
+class FakeConn:
+    """Answers the pg_inherits lookup in get_partitions and records executed statements"""
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.executed = []
+
+    async def fetch(self, query, *args):
+        return [{"name": name, "bound": bound} for name, bound in self.bounds.items()]
+
+    async def execute(self, query, *args):
+        self.executed.append((query, args))
+
+def test_late_events_mark_the_partition_that_holds_them():
+    conn = FakeConn({
+        "real_time_events_legacy": "FOR VALUES FROM (MINVALUE) TO ('2026-01-01 00:00:00')",
+        "real_time_events_p20260101": "FOR VALUES FROM ('2026-01-01 00:00:00') TO ('2026-01-02 00:00:00')",
+        "real_time_events_p20260102": "FOR VALUES FROM ('2026-01-02 00:00:00') TO ('2026-01-03 00:00:00')",
+    })
+    asyncio.run(EventPartitionService.mark_stale_rollups(conn, [datetime(2025, 6, 1), datetime(2026, 1, 2)]))
+    (query, (names,)), = conn.executed
+    assert sorted(names) == ["real_time_events_legacy", "real_time_events_p20260102"]
+
+def test_failed_rollup_is_recorded_and_not_raised(monkeypatch):
+    async def fail(conn, partition):
+        raise ValueError("invalid input syntax for type numeric")
+    monkeypatch.setattr(EventPartitionService, "roll_up_partition", fail)
+    failures = EventPartitionService.stats["rollup_failures"]
+    partition = {"name": "real_time_events_p20260101", "start": None, "end": None}
+    assert asyncio.run(EventPartitionService._try_roll_up(None, partition)) is False
+    assert EventPartitionService.stats["rollup_failures"] == failures + 1
+    assert EventPartitionService.stats["last_failed_partition"] == "real_time_events_p20260101"
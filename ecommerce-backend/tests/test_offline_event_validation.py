@@ -0,0 +1,42 @@
+import pytest
+from app.services.event_ingestion_service import (
+    MAX_EVENT_QUANTITY, parse_event_id, parse_event_quantity, validate_offline_events
+)
+
+@pytest.mark.parametrize("value, expected", [(None, None), ("", None), (7, 7), ("42", 42)])
+def test_parse_event_id_accepts_integers_and_digit_strings(value, expected):
+    assert parse_event_id(value) == expected
+
+@pytest.mark.parametrize("value", [True, False, 3.9, 3.0, "3.9", "abc", -1, 0, 2**31, {"id": 1}])
+def test_parse_event_id_rejects_everything_else(value):
+    with pytest.raises(ValueError):
+        parse_event_id(value)
+
+@pytest.mark.parametrize("value, expected", [(None, 1), (3, 3), ("12", 12), (MAX_EVENT_QUANTITY, MAX_EVENT_QUANTITY)])
+def test_parse_event_quantity_accepts_bounded_positive_integers(value, expected):
+    assert parse_event_quantity(value) == expected
+
+@pytest.mark.parametrize("value", [0, -2, 2**31, 1e308, 2.5, "abc", "", True, MAX_EVENT_QUANTITY + 1])
+def test_parse_event_quantity_rejects_everything_else(value):
+    with pytest.raises(ValueError):
+        parse_event_quantity(value)
+
+def test_offline_events_with_bool_or_float_ids_are_rejected():
+    events = [
+        {"event_type": "product_view", "event_data": {"product_id": True}},
+        {"event_type": "product_view", "event_data": {"product_id": 3.9}},
+        {"event_type": "product_view", "event_data": {"product_id": "5"}},
+    ]
+    accepted, rejects = validate_offline_events(events, user_id=None)
+    assert [index for index, _ in accepted] == [2]
+    assert rejects == [{"index": 0, "reason": "invalid product_id"}, {"index": 1, "reason": "invalid product_id"}]
+
+@pytest.mark.parametrize("timestamp", ["0001-01-01T00:00:00+01:00", "9999-12-31T23:59:59-01:00", "not a date"])
+def test_unusable_timestamps_reject_only_their_event(timestamp):
+    events = [
+        {"event_type": "product_view", "event_data": {}, "timestamp": timestamp},
+        {"event_type": "product_view", "event_data": {}},
+    ]
+    accepted, rejects = validate_offline_events(events, user_id=None)
+    assert [index for index, _ in accepted] == [1]
+    assert [reject["index"] for reject in rejects] == [0]
@@ -0,0 +1,47 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from app.utils.pagination import decode_cursor, encode_cursor
+
+def _forge(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+def test_cursor_round_trips_its_values():
+    moment = datetime(2026, 3, 1, 12, 30)
+    cursor = encode_cursor("orders:order_date:desc", moment, 42)
+    assert decode_cursor(cursor, "orders:order_date:desc", datetime, int) == [moment, 42]
+    cursor = encode_cursor("products:price:asc", Decimal("19.99"), 7)
+    assert decode_cursor(cursor, "products:price:asc", Decimal, int) == [Decimal("19.99"), 7]
+
+def test_cursor_from_another_listing_or_order_is_rejected():
+    cursor = encode_cursor("products:name:asc", "Mug", 7)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "products:price:asc", Decimal, int)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "products:name:desc", str, int)
+
+@pytest.mark.parametrize("values", [
+    ["Mug", 7],
+    [{"dt": "2026-03-01T12:30:00+02:00"}, 7],
+    [{"dt": 5}, 7],
+    [{"dt": "2026-03-01T12:30:00"}, 2**31],
+    [{"dt": "2026-03-01T12:30:00"}, True],
+    [{"dt": "2026-03-01T12:30:00"}],
+])
+def test_cursor_with_wrong_value_types_is_rejected(values):
+    cursor = _forge({"k": "orders:order_date:desc", "v": values})
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "orders:order_date:desc", datetime, int)
+
+@pytest.mark.parametrize("dec", ["abc", "NaN", "Infinity", "1e999999"])
+def test_cursor_with_unusable_decimal_is_rejected(dec):
+    cursor = _forge({"k": "products:price:asc", "v": [{"dec": dec}, 7]})
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "products:price:asc", Decimal, int)
+
+@pytest.mark.parametrize("cursor", ["not-base64!!", _forge([1, 2]), _forge("x")])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "orders:order_date:desc", datetime, int)